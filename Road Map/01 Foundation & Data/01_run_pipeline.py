@@ -4,11 +4,14 @@ Runs all data processing scripts in order from 04 to 25
 Skips deprecated scripts (01, 03, 12, 19)
 """
 
-import subprocess
+import argparse
 import sys
 import os
 from datetime import datetime
 
+import run_history
+from contracts import preflight
+
 # ============================================================
 # PIPELINE CONFIGURATION
 # ============================================================
@@ -35,7 +38,7 @@ PIPELINE_SCRIPTS = [
     '21_big_events.py',
     '22_moon_illumination.py',
     '23_add_solar_altitude.py',
-    '24_pretrain_prune.py',
+    '24_pretain_prune.py',
     '25_training_complexity_estimator.py',
 ]
 
@@ -48,63 +51,95 @@ SKIP_SCRIPTS = [
 
 # ============================================================
 
-def run_script(script_name, script_number, total_scripts):
+def run_script(script_name, script_number, total_scripts, profile=False, run_id=None):
     """Run a single Python script and return success status"""
     print("\n" + "=" * 80)
     print(f"[{script_number}/{total_scripts}] RUNNING: {script_name}")
     print("=" * 80)
-    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    started = datetime.now()
+    print(f"Started at: {started.strftime('%Y-%m-%d %H:%M:%S')}")
     print()
     
+    folder = os.path.dirname(os.path.abspath(__file__))
+    if not os.path.exists(os.path.join(folder, script_name)):
+        print()
+        print(f"✗ ERROR: Script not found: {script_name}")
+        return False
+    
     try:
-        # Run the script and capture output in real-time
-        result = subprocess.run(
-            [sys.executable, script_name],
-            check=True,  # Raises exception if script fails
-            text=True,
-            cwd=os.path.dirname(os.path.abspath(__file__))
-        )
+        # Run the script (output streams straight to this console); the run
+        # history gets its time, peak memory and output files
+        # (--profile wraps it in profiling.py, which writes a report next to its output)
+        command = [sys.executable, 'profiling.py', script_name] if profile else [sys.executable, script_name]
+        returncode, seconds, peak_mb = run_history.run_child(command, cwd=folder)
+        run_history.record_stage(run_id, os.path.join(folder, script_name),
+                                 started.isoformat(timespec='seconds'), seconds, peak_mb, returncode == 0)
+        
+        if returncode != 0:
+            print()
+            print(f"✗ FAILED: {script_name}")
+            print(f"Error code: {returncode}")
+            print(f"Failed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            return False
         
         print()
         print(f"✓ COMPLETED: {script_name}")
         print(f"Finished at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         return True
         
-    except subprocess.CalledProcessError as e:
-        print()
-        print(f"✗ FAILED: {script_name}")
-        print(f"Error code: {e.returncode}")
-        print(f"Failed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        return False
-    except FileNotFoundError:
-        print()
-        print(f"✗ ERROR: Script not found: {script_name}")
-        return False
     except Exception as e:
         print()
         print(f"✗ UNEXPECTED ERROR: {str(e)}")
         return False
 
 def main():
+    parser = argparse.ArgumentParser(description="Run the full data pipeline")
+    parser.add_argument('--profile', action='store_true',
+                        help="profile every script (see profiling.py)")
+    parser.add_argument('--yes', '-y', action='store_true',
+                        help="start without the ENTER prompt (also skipped when not run from a terminal)")
+    parser.add_argument('--no-preflight', action='store_true',
+                        help="skip the column contract check (see contracts.py)")
+    parser.add_argument('--memory-budget', metavar='GB',
+                        help="memory the heavy stages may use, e.g. 4 or 512MB (see memory_budget.py)")
+    args = parser.parse_args()
+    if args.memory_budget:
+        # Inherited by every script the runner starts
+        os.environ['PIPELINE_MEMORY_BUDGET'] = args.memory_budget
+
     print("=" * 80)
     print("                    CHICAGO CRIME PREDICTION")
     print("                     FULL PIPELINE RUNNER")
     print("=" * 80)
     print(f"\nPipeline started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"Total scripts to run: {len(PIPELINE_SCRIPTS)}")
+    if args.profile:
+        print("Profiling: on (reports are written next to each script's output)")
+    if args.memory_budget:
+        print(f"Memory budget: {args.memory_budget}")
     
     if SKIP_SCRIPTS:
         print(f"Scripts to skip: {len(SKIP_SCRIPTS)}")
         for script in SKIP_SCRIPTS:
             print(f"  - {script}")
     
+    print()
+    # Seconds to check that every stage finds the columns it needs
+    folder = os.path.dirname(os.path.abspath(__file__))
+    to_run = [os.path.join(folder, name) for name in PIPELINE_SCRIPTS if name not in SKIP_SCRIPTS]
+    if not args.no_preflight and not preflight(to_run):
+        sys.exit(1)
+    
     print("\n" + "=" * 80)
-    input("Press ENTER to start the pipeline (or Ctrl+C to cancel)...")
+    # Unattended runs (cron, refresh_service.py) have no terminal to answer
+    if not args.yes and sys.stdin.isatty():
+        input("Press ENTER to start the pipeline (or Ctrl+C to cancel)...")
     print("=" * 80)
     
     # Track results
     start_time = datetime.now()
     results = []
+    run_id = run_history.start_run('pipeline')
     
     # Run each script
     for i, script_name in enumerate(PIPELINE_SCRIPTS, 1):
@@ -115,7 +150,7 @@ def main():
             continue
         
         # Run script
-        success = run_script(script_name, i, len(PIPELINE_SCRIPTS))
+        success = run_script(script_name, i, len(PIPELINE_SCRIPTS), profile=args.profile, run_id=run_id)
         results.append((script_name, 'SUCCESS' if success else 'FAILED'))
         
         # Stop pipeline if script failed
@@ -125,6 +160,8 @@ def main():
             print("=" * 80)
             break
     
+    run_history.finish_run(run_id, all(status != 'FAILED' for _, status in results))
+    
     # Final summary
     end_time = datetime.now()
     duration = end_time - start_time
@@ -162,6 +199,8 @@ def main():
         print("⚠️  PIPELINE INCOMPLETE - Check errors above")
     else:
         print("ℹ️  No scripts were run")
+    if run_id is not None:
+        print(f"   Run history: python run_history.py show {run_id}")
     print("=" * 80)
 
 if __name__ == "__main__":
@@ -1,5 +1,11 @@
 """
 Filter raw crime data to extract only 2023, 2024, 2025 rows
+
+The years are configurable (YEARS below, or PIPELINE_YEARS="2001-2025" for the
+full history). The file names still say 2023_2025 because every later stage
+refers to them. The export is read in chunks, so memory stays flat no matter
+how many years are kept (chunks are sized from PIPELINE_MEMORY_BUDGET, see
+memory_budget.py).
 """
 
 # ============================================================
@@ -7,63 +13,79 @@ Filter raw crime data to extract only 2023, 2024, 2025 rows
 # ============================================================
 INPUT_FILE = '00_chicago_crime_2001_2025_(raw).csv'
 OUTPUT_FILE = '04.1_chicago_crime_2023_2025_(raw).csv'
+
+# Column contract (checked by contracts.py before each run)
+INPUT_COLUMNS = ['Date']               # Every other column is passed through
+
+YEARS = [2023, 2024, 2025]   # Overridden by PIPELINE_YEARS (e.g. "2001-2025")
+CHUNK_ROWS = None            # Raw rows read at a time (None = sized from the memory budget)
+CHUNK_SHARE = 0.25           # Share of the memory budget one chunk may use
 # ============================================================
 
+import os
 import pandas as pd
 from datetime import datetime
+from calendar_rules import pipeline_years
+import memory_budget
 
-def filter_crime_data_by_year(input_file, output_file, years=[2023, 2024, 2025]):
+def filter_crime_data_by_year(input_file, output_file, years=YEARS, chunk_rows=CHUNK_ROWS):
     """
     Filter crime data to only include specified years
+    Chunks are filtered and appended to the output one at a time
     """
     print(f"Loading raw crime data from: {input_file}")
-    print("This may take a moment for large files...")
-    
-    # Read CSV
-    df = pd.read_csv(input_file)
-    print(f"Loaded {len(df):,} total rows")
-    
-    # Parse the Date column (format: 12/27/2025 12:00:00 AM)
-    print("\nParsing dates...")
-    df['parsed_date'] = pd.to_datetime(df['Date'], format='%m/%d/%Y %I:%M:%S %p')
-    df['year'] = df['parsed_date'].dt.year
-    
-    # Filter for specified years
+    if chunk_rows is None:
+        bytes_per_row = memory_budget.csv_bytes_per_row(input_file, dtype=str)
+        chunk_rows = memory_budget.chunk_rows(bytes_per_row, CHUNK_SHARE)
+    print(f"Reading {chunk_rows:,} rows at a time...")
+
+    total_rows = 0
+    kept_rows = 0
+    year_counts = pd.Series(dtype='int64')
+    if os.path.exists(output_file):
+        os.remove(output_file)
+
     print(f"\nFiltering for years: {years}")
-    filtered_df = df[df['year'].isin(years)].copy()
-    
-    # Drop the temporary columns
-    filtered_df = filtered_df.drop(['parsed_date', 'year'], axis=1)
-    
+    # Values are kept as text: rows are copied through unchanged
+    for chunk in pd.read_csv(input_file, chunksize=chunk_rows, dtype=str, keep_default_na=False):
+        # Parse the Date column (format: 12/27/2025 12:00:00 AM)
+        year = pd.to_datetime(chunk['Date'], format='%m/%d/%Y %I:%M:%S %p').dt.year
+        year_counts = year_counts.add(year.value_counts(), fill_value=0)
+
+        # Filter for specified years
+        filtered = chunk[year.isin(years).values]
+        filtered.to_csv(output_file, mode='a', header=total_rows == 0, index=False)
+
+        total_rows += len(chunk)
+        kept_rows += len(filtered)
+        print(f"      {total_rows:,} rows read, {kept_rows:,} kept", end='\r')
+    print()
+
     # Statistics
     print(f"\n=== Filtering Results ===")
-    print(f"Original rows: {len(df):,}")
-    print(f"Filtered rows: {len(filtered_df):,}")
-    print(f"Rows removed: {len(df) - len(filtered_df):,}")
-    print(f"Percentage kept: {len(filtered_df)/len(df)*100:.1f}%")
+    print(f"Original rows: {total_rows:,}")
+    print(f"Filtered rows: {kept_rows:,}")
+    print(f"Rows removed: {total_rows - kept_rows:,}")
+    print(f"Percentage kept: {kept_rows/total_rows*100:.1f}%")
     
     # Show year breakdown
     print("\n=== Year Breakdown ===")
-    year_counts = df.groupby(df['parsed_date'].dt.year).size()
     for year in years:
         if year in year_counts.index:
-            count = year_counts[year]
+            count = int(year_counts[year])
             print(f"{year}: {count:,} rows")
     
-    # Save filtered data
-    print(f"\nSaving filtered data to: {output_file}")
-    filtered_df.to_csv(output_file, index=False)
-    print(f"✓ Saved {len(filtered_df):,} rows to {output_file}")
-    
-    return filtered_df
+    print(f"\n✓ Saved {kept_rows:,} rows to {output_file}")
+    return kept_rows
 
 if __name__ == "__main__":
+    years = pipeline_years(YEARS)
     print("="*60)
-    print("Filter Raw Crime Data: 2023-2025")
+    print(f"Filter Raw Crime Data: {years[0]}-{years[-1]}")
     print("="*60)
     print()
     
-    df = filter_crime_data_by_year(INPUT_FILE, OUTPUT_FILE, years=[2023, 2024, 2025])
+    filter_crime_data_by_year(INPUT_FILE, OUTPUT_FILE, years=years)
     
     print("\n" + "="*60)
     print("✓ Complete! Filtered data saved successfully.")
@@ -2,32 +2,44 @@
 Trim dataset to only essential columns (7 columns)
 """
 
+# ============================================================
+# FILE PATHS - CONFIGURE HERE
+# ============================================================
+INPUT_FILE = '04.1_chicago_crime_2023_2025_(raw).csv'
+OUTPUT_FILE = '05.1_columns_removed.csv'
+
+# Columns to keep (7 essential only), in output order
+# Also the stage's column contract (checked by contracts.py before each run)
+KEEP_COLUMNS = [
+    'ID',
+    'Date',
+    'Primary Type',
+    'Description',
+    'Community Area',
+    'Domestic',
+    'Year'
+]
+# ============================================================
+
 import pandas as pd
 import os
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
-input_file = os.path.join(script_dir, '04.1_chicago_crime_2023_2025_(raw).csv')
-output_file = os.path.join(script_dir, '05.1_columns_removed.csv')
+input_file = os.path.join(script_dir, INPUT_FILE)
+output_file = os.path.join(script_dir, OUTPUT_FILE)
 
 print("=" * 70)
 print("TRIMMING DATASET TO ESSENTIAL COLUMNS (7 COLUMNS)")
 print("=" * 70)
 
-# Columns to keep (7 essential only)
-keep_cols = [
-    'ID',
-    'Date',
-    'Primary Type', 
-    'Description',
-    'Community Area',
-    'Domestic',
-    'Year'
-]
+keep_cols = KEEP_COLUMNS
 
 print(f"\nReading: {input_file}")
-df = pd.read_csv(input_file)
+# Only the kept columns are parsed (the full-history export is large)
+original_cols = len(pd.read_csv(input_file, nrows=0).columns)
+df = pd.read_csv(input_file, usecols=keep_cols)
 
-print(f"Original: {len(df.columns)} columns, {len(df):,} rows")
+print(f"Original: {original_cols} columns, {len(df):,} rows")
 
 # Keep only selected columns
 df_clean = df[keep_cols].copy()
@@ -10,6 +10,10 @@ Also removes the Domestic column after filtering
 # ============================================================
 INPUT_FILE = '05.1_columns_removed.csv'
 OUTPUT_FILE = '07.1_domestics_removed.csv'
+
+# Column contract (checked by contracts.py before each run)
+INPUT_COLUMNS = ['Domestic']
+DROP_COLUMNS = ['Domestic']
 # ============================================================
 
 import pandas as pd
@@ -48,7 +52,7 @@ print(f"      Remaining: {len(df_filtered):,} rows")
 
 # Remove the Domestic column
 print("\n[3/4] Removing 'Domestic' column...")
-df_filtered = df_filtered.drop('Domestic', axis=1)
+df_filtered = df_filtered.drop(columns=DROP_COLUMNS)
 print(f"      Remaining columns: {len(df_filtered.columns)}")
 print(f"      Columns: {list(df_filtered.columns)}")
 
@@ -8,28 +8,12 @@ Reads from 07.1_domestics_removed.csv and saves to 08.1_enforcement_crimes_remov
 # ============================================================
 INPUT_FILE = '07.1_domestics_removed.csv'
 OUTPUT_FILE = '08.1_enforcement_crimes_removed.csv'
-# ============================================================
 
-import pandas as pd
-import os
-
-script_dir = os.path.dirname(os.path.abspath(__file__))
-input_file = os.path.join(script_dir, INPUT_FILE)
-output_file = os.path.join(script_dir, OUTPUT_FILE)
+# Column contract (checked by contracts.py before each run)
+INPUT_COLUMNS = ['Primary Type']
 
-print("=" * 70)
-print("REMOVING ENFORCEMENT-DRIVEN AND NON-PREDICTABLE CRIMES")
-print("=" * 70)
-print(f"\nInput:  {INPUT_FILE}")
-print(f"Output: {OUTPUT_FILE}")
-
-# Read data
-print("\n[1/4] Reading data...")
-df = pd.read_csv(input_file)
-print(f"      Original rows: {len(df):,}")
-
-# Crime types to remove
-remove_list = [
+# Crime types to remove (variant_sweep.py can swap in other lists)
+REMOVE_TYPES = [
     # Enforcement-driven (only found when police present)
     'NARCOTICS',
     'WEAPONS VIOLATION',
@@ -52,12 +36,31 @@ remove_list = [
     'DECEPTIVE PRACTICE',    # Fraud/scams, no spatial pattern
     'OFFENSE INVOLVING CHILDREN'  # Vague, privacy concerns
 ]
+# ============================================================
+
+import pandas as pd
+import os
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+input_file = os.path.join(script_dir, INPUT_FILE)
+output_file = os.path.join(script_dir, OUTPUT_FILE)
+
+print("=" * 70)
+print("REMOVING ENFORCEMENT-DRIVEN AND NON-PREDICTABLE CRIMES")
+print("=" * 70)
+print(f"\nInput:  {INPUT_FILE}")
+print(f"Output: {OUTPUT_FILE}")
+
+# Read data
+print("\n[1/4] Reading data...")
+df = pd.read_csv(input_file)
+print(f"      Original rows: {len(df):,}")
 
 # Show breakdown before removal
 print(f"\n[2/4] Crime types to remove:")
 print("      " + "-" * 66)
 total_to_remove = 0
-for crime in remove_list:
+for crime in REMOVE_TYPES:
     count = len(df[df['Primary Type'] == crime])
     pct = (count / len(df)) * 100 if len(df) > 0 else 0
     if count > 0:
@@ -69,7 +72,7 @@ print(f"      {'TOTAL TO REMOVE':45s}: {total_to_remove:7,} ({total_to_remove/le
 
 # Filter out unwanted crimes
 print(f"\n[3/4] Filtering crimes...")
-df_filtered = df[~df['Primary Type'].isin(remove_list)].copy()
+df_filtered = df[~df['Primary Type'].isin(REMOVE_TYPES)].copy()
 
 removed = len(df) - len(df_filtered)
 print(f"      Removed: {removed:,} rows")
@@ -93,7 +96,7 @@ print("✓ COMPLETE!")
 print("=" * 70)
 print(f"Rows: {len(df_filtered):,}")
 print(f"File size: {file_size_mb:.1f} MB")
-print(f"Crime types removed: {len(remove_list)}")
+print(f"Crime types removed: {len(REMOVE_TYPES)}")
 print(f"Crime types remaining: {df_filtered['Primary Type'].nunique()}")
 print(f"Total rows removed: {removed:,} ({removed/len(df)*100:.1f}%)")
 print("=" * 70)
\ No newline at end of file
@@ -9,6 +9,9 @@ Writes to: 10.1_rare_combos_removed.csv
 # ============================================================
 INPUT_FILE = '08.1_enforcement_crimes_removed.csv'
 OUTPUT_FILE = '10.1_rare_combos_removed.csv'
+
+# Column contract (checked by contracts.py before each run)
+INPUT_COLUMNS = ['Primary Type', 'Description']
 THRESHOLD = 100  # Minimum crimes per combination to keep
 # ============================================================
 
@@ -9,6 +9,10 @@ Writes to: 11.1_severity_added.csv
 # ============================================================
 INPUT_FILE = '10.1_rare_combos_removed.csv'
 OUTPUT_FILE = '11.1_severity_added.csv'
+
+# Column contract (checked by contracts.py before each run)
+INPUT_COLUMNS = ['Primary Type', 'Description']
+ADD_COLUMNS = ['Severity_Score']
 # ============================================================
 
 import pandas as pd
@@ -18,16 +22,11 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 input_file = os.path.join(script_dir, INPUT_FILE)
 output_file = os.path.join(script_dir, OUTPUT_FILE)
 
-print("=" * 80)
-print("ADDING SEVERITY SCORES (Complete 88-combination mapping)")
-print("=" * 80)
-print(f"\nInput:  {INPUT_FILE}")
-print(f"Output: {OUTPUT_FILE}")
-
 # ============================================================================
 # COMPLETE SEVERITY MAPPING (Primary Type, Description) -> Severity Score
+# (variant_sweep.py can run this stage with other tables)
 # ============================================================================
-severity_mapping = {
+SEVERITY_MAPPING = {
     # HOMICIDE (10) - Maximum severity
     ('HOMICIDE', 'FIRST DEGREE MURDER'): 10,
     
@@ -145,64 +144,76 @@ severity_mapping = {
     ('PUBLIC PEACE VIOLATION', 'PEEPING TOM'): 3,
 }
 
-# ============================================================================
-# READ DATA AND APPLY
-# ============================================================================
-print("\n[1/3] Reading data...")
-df = pd.read_csv(input_file)
-print(f"      Rows: {len(df):,}")
-
-print("\n[2/3] Applying severity scores...")
-
-# Apply severity mapping
-df['Severity_Score'] = df.apply(
-    lambda row: severity_mapping.get((row['Primary Type'], row['Description']), None),
-    axis=1
-)
-
-# Check for unmapped combinations
-unmapped = df[df['Severity_Score'].isnull()]
-if len(unmapped) > 0:
-    print(f"\n      ⚠️  WARNING: {len(unmapped):,} rows have no severity score!")
-    print("      Unmapped combinations:")
-    unmapped_combos = unmapped.groupby(['Primary Type', 'Description']).size()
-    for (p_type, desc), count in unmapped_combos.items():
-        print(f"        {p_type} - {desc}: {count:,} crimes")
-else:
-    print("      ✓ All combinations successfully mapped!")
-
-# Show severity distribution
-print("\n      Severity score distribution:")
-severity_dist = df['Severity_Score'].value_counts().sort_index()
-for severity, count in severity_dist.items():
-    if not pd.isna(severity):
-        pct = (count / len(df)) * 100
-        print(f"        Severity {int(severity):2d}: {count:7,} crimes ({pct:5.2f}%)")
-
-# Show examples by severity level
-print("\n      Example crimes by severity:")
-for severity in sorted(df['Severity_Score'].dropna().unique()):
-    examples = df[df['Severity_Score'] == severity][['Primary Type', 'Description']].drop_duplicates().head(3)
-    print(f"\n      Severity {int(severity):2d}:")
-    for idx, row in examples.iterrows():
-        print(f"        - {row['Primary Type']} - {row['Description']}")
-
-# Save to new file
-print(f"\n[3/3] Saving to: {OUTPUT_FILE}")
-df.to_csv(output_file, index=False)
-
-file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
-
-print("\n" + "=" * 80)
-print("✓ COMPLETE!")
-print("=" * 80)
-print(f"Input:  {INPUT_FILE}")
-print(f"Output: {OUTPUT_FILE}")
-print(f"Rows: {len(df):,}")
-print(f"Columns: {len(df.columns)}")
-print(f"File size: {file_size_mb:.1f} MB")
-print(f"New column: Severity_Score (1-10)")
-if len(df[df['Severity_Score'].notna()]) > 0:
-    print(f"Severity range: {int(df['Severity_Score'].min())}-{int(df['Severity_Score'].max())}")
-    print(f"Average severity: {df['Severity_Score'].mean():.2f}")
-print("=" * 80)
\ No newline at end of file
+
+def main():
+    print("=" * 80)
+    print("ADDING SEVERITY SCORES (Complete 88-combination mapping)")
+    print("=" * 80)
+    print(f"\nInput:  {INPUT_FILE}")
+    print(f"Output: {OUTPUT_FILE}")
+
+    # ============================================================================
+    # READ DATA AND APPLY
+    # ============================================================================
+    print("\n[1/3] Reading data...")
+    df = pd.read_csv(input_file)
+    print(f"      Rows: {len(df):,}")
+
+    print("\n[2/3] Applying severity scores...")
+
+    # Apply severity mapping
+    df['Severity_Score'] = df.apply(
+        lambda row: SEVERITY_MAPPING.get((row['Primary Type'], row['Description']), None),
+        axis=1
+    )
+
+    # Check for unmapped combinations
+    unmapped = df[df['Severity_Score'].isnull()]
+    if len(unmapped) > 0:
+        print(f"\n      ⚠️  WARNING: {len(unmapped):,} rows have no severity score!")
+        print("      Unmapped combinations:")
+        unmapped_combos = unmapped.groupby(['Primary Type', 'Description']).size()
+        for (p_type, desc), count in unmapped_combos.items():
+            print(f"        {p_type} - {desc}: {count:,} crimes")
+    else:
+        print("      ✓ All combinations successfully mapped!")
+
+    # Show severity distribution
+    print("\n      Severity score distribution:")
+    severity_dist = df['Severity_Score'].value_counts().sort_index()
+    for severity, count in severity_dist.items():
+        if not pd.isna(severity):
+            pct = (count / len(df)) * 100
+            print(f"        Severity {int(severity):2d}: {count:7,} crimes ({pct:5.2f}%)")
+
+    # Show examples by severity level
+    print("\n      Example crimes by severity:")
+    for severity in sorted(df['Severity_Score'].dropna().unique()):
+        examples = df[df['Severity_Score'] == severity][['Primary Type', 'Description']].drop_duplicates().head(3)
+        print(f"\n      Severity {int(severity):2d}:")
+        for idx, row in examples.iterrows():
+            print(f"        - {row['Primary Type']} - {row['Description']}")
+
+    # Save to new file
+    print(f"\n[3/3] Saving to: {OUTPUT_FILE}")
+    df.to_csv(output_file, index=False)
+
+    file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
+
+    print("\n" + "=" * 80)
+    print("✓ COMPLETE!")
+    print("=" * 80)
+    print(f"Input:  {INPUT_FILE}")
+    print(f"Output: {OUTPUT_FILE}")
+    print(f"Rows: {len(df):,}")
+    print(f"Columns: {len(df.columns)}")
+    print(f"File size: {file_size_mb:.1f} MB")
+    print(f"New column: Severity_Score (1-10)")
+    if len(df[df['Severity_Score'].notna()]) > 0:
+        print(f"Severity range: {int(df['Severity_Score'].min())}-{int(df['Severity_Score'].max())}")
+        print(f"Average severity: {df['Severity_Score'].mean():.2f}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
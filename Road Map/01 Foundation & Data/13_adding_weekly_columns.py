@@ -9,10 +9,15 @@ Writes to: 13.1_weekends_added.csv
 # ============================================================
 INPUT_FILE = '11.1_severity_added.csv'
 OUTPUT_FILE = '13.1_weekends_added.csv'
+
+# Column contract (checked by contracts.py before each run)
+INPUT_COLUMNS = ['Date']
+ADD_COLUMNS = ['hour', 'day_of_week', 'month', 'weekend_night_peak', 'weekend_regular']
 # ============================================================
 
 import pandas as pd
 import os
+from feature_store import compute
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 input_file = os.path.join(script_dir, INPUT_FILE)
@@ -33,23 +38,14 @@ print("\n[2/2] Adding temporal features...")
 df['Date'] = pd.to_datetime(df['Date'])
 
 df['hour'] = df['Date'].dt.hour
-df['day_of_week'] = df['Date'].dt.dayofweek
-df['month'] = df['Date'].dt.month
-
-# Weekend night peak: Fri/Sat 9pm-midnight, Sat/Sun midnight-3am (aligned to 3-hour blocks)
-df['weekend_night_peak'] = (
-    ((df['day_of_week'] == 4) & (df['hour'] >= 21)) |  # Fri 9pm-11pm (21-24 block)
-    ((df['day_of_week'] == 5) & (df['hour'] < 3)) |    # Sat 12am-2am (00-03 block)
-    ((df['day_of_week'] == 5) & (df['hour'] >= 21)) |  # Sat 9pm-11pm (21-24 block)
-    ((df['day_of_week'] == 6) & (df['hour'] < 3))      # Sun 12am-2am (00-03 block)
-).astype(int)
-
-# Weekend regular: Fri 6-9pm, Sat 3am-9pm, Sun 3am-midnight (aligned to 3-hour blocks)
-df['weekend_regular'] = (
-    ((df['day_of_week'] == 4) & (df['hour'] >= 18) & (df['hour'] < 21)) |  # Fri 6-9pm (18-21 block)
-    ((df['day_of_week'] == 5) & (df['hour'] >= 3) & (df['hour'] < 21)) |   # Sat 3am-9pm (03-21 blocks)
-    ((df['day_of_week'] == 6) & (df['hour'] >= 3))                          # Sun 3am-midnight (03-24 blocks)
-).astype(int)
+
+# day_of_week, month and the weekend flags come from the feature store, the
+# same definitions stage 18 fills zero-crime blocks with and prediction uses:
+#   weekend_night_peak: Fri 9pm-midnight, Sat midnight-3am and 9pm-midnight, Sun midnight-3am
+#   weekend_regular:    Fri 6-9pm, Sat 3am-9pm, Sun 3am-midnight
+features = compute(['day_of_week', 'month', 'weekend_night_peak', 'weekend_regular'], df['Date'])
+for col in features.columns:
+    df[col] = features[col].to_numpy()
 
 print("      ✓ Added: hour, day_of_week, month, weekend_night_peak, weekend_regular")
 
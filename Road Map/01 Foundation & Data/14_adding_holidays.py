@@ -9,10 +9,15 @@ Writes to: 14.1_holidays_added.csv
 # ============================================================
 INPUT_FILE = '13.1_weekends_added.csv'
 OUTPUT_FILE = '14.1_holidays_added.csv'
+
+# Column contract (checked by contracts.py before each run)
+INPUT_COLUMNS = ['Date']
+ADD_COLUMNS = ['is_violent_holiday', 'is_theft_holiday']
 # ============================================================
 
 import pandas as pd
 import os
+from calendar_rules import pipeline_years, violent_holiday_dates, theft_holiday_dates
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 input_file = os.path.join(script_dir, INPUT_FILE)
@@ -24,37 +29,6 @@ print("=" * 70)
 print(f"\nInput:  {INPUT_FILE}")
 print(f"Output: {OUTPUT_FILE}")
 
-# Violent crime holidays (NYE, July 4th, Thanksgiving)
-violent_holidays = [
-    # NEW YEAR'S (3 days - 9x violent crime spike)
-    '2023-12-30', '2023-12-31', '2024-01-01',
-    '2024-12-30', '2024-12-31', '2025-01-01',
-    '2025-12-30', '2025-12-31', '2026-01-01',
-    
-    # JULY 4TH (3 days - most violent day of year)
-    '2023-07-03', '2023-07-04', '2023-07-05',
-    '2024-07-03', '2024-07-04', '2024-07-05',
-    '2025-07-03', '2025-07-04', '2025-07-05',
-    
-    # THANKSGIVING (2 days - Thu + Black Friday)
-    '2023-11-23', '2023-11-24',
-    '2024-11-28', '2024-11-29',
-    '2025-11-27', '2025-11-28',
-]
-
-# Theft/property crime holidays (Christmas shopping, Black Friday)
-theft_holidays = [
-    # CHRISTMAS SHOPPING PERIOD (6 days - 30% retail theft spike)
-    '2023-12-20', '2023-12-21', '2023-12-22', '2023-12-23', '2023-12-24', '2023-12-25',
-    '2024-12-20', '2024-12-21', '2024-12-22', '2024-12-23', '2024-12-24', '2024-12-25',
-    '2025-12-20', '2025-12-21', '2025-12-22', '2025-12-23', '2025-12-24', '2025-12-25',
-    
-    # BLACK FRIDAY (already in violent_holidays, but also theft spike)
-    '2023-11-24',
-    '2024-11-29',
-    '2025-11-28',
-]
-
 print("\n[1/3] Reading data...")
 df = pd.read_csv(input_file)
 print(f"      Rows: {len(df):,}")
@@ -63,6 +37,14 @@ print(f"      Current columns: {list(df.columns)}")
 print("\n[2/3] Adding holiday features...")
 df['Date'] = pd.to_datetime(df['Date'])
 
+# Holiday dates for every year in the data (or the whole PIPELINE_YEARS span)
+# Violent crime holidays: NYE, July 4th, Thanksgiving + Black Friday
+# Theft/property crime holidays: Christmas shopping (Dec 20-25), Black Friday
+years = pipeline_years(df['Date'].dt.year.unique())
+violent_holidays = violent_holiday_dates(years)
+theft_holidays = theft_holiday_dates(years)
+print(f"      Holiday years: {years[0]}-{years[-1]}")
+
 # Create date string for matching
 df['date_only'] = df['Date'].dt.date.astype(str)
 
@@ -10,11 +10,18 @@ Writes to: 15.1_weather_data_added.csv
 # ============================================================
 INPUT_FILE = '14.1_holidays_added.csv'
 OUTPUT_FILE = '15.1_weather_data_added.csv'
+
+# Column contract (checked by contracts.py before each run)
+INPUT_COLUMNS = ['Date']
+ADD_COLUMNS = ['temp', 'rhum', 'prcp', 'wspd', 'wdir', 'pres', 'coco']
+
+# Hourly weather CSV to use instead of downloading (columns as Meteostat:
+# time, temp, rhum, ...), e.g. from synthetic_data.py. None = download.
+WEATHER_FILE = None
 # ============================================================
 
 import pandas as pd
 from datetime import datetime
-import meteostat as ms
 import os
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -36,21 +43,28 @@ print(f"      Current columns: {list(df.columns)}")
 # Parse dates
 df['Date'] = pd.to_datetime(df['Date'])
 
-# Step 2: Download weather data
-print("\n[2/4] Downloading weather data from Meteostat...")
-print("      Station: Chicago O'Hare (72530 / KORD)")
-print("      Period: 2023-2025")
+# Step 2: Download weather data (or read a local file when working offline)
+weather_file = os.environ.get('PIPELINE_WEATHER_FILE', WEATHER_FILE)
+if weather_file:
+    print(f"\n[2/4] Reading weather data from: {weather_file}")
+    weather = pd.read_csv(weather_file, index_col='time', parse_dates=['time'])
+else:
+    print("\n[2/4] Downloading weather data from Meteostat...")
+    print("      Station: Chicago O'Hare (72530 / KORD)")
+
+    # Date range: the days covered by the crime data (any years, 2001-2025)
+    start = datetime.combine(df['Date'].min().date(), datetime.min.time())
+    end = datetime.combine(df['Date'].max().date(), datetime.max.time()).replace(microsecond=0)
+    print(f"      Period: {start.date()} to {end.date()}")
 
-# Chicago O'Hare station ID
-station = ms.Station(id='72530')
+    import meteostat as ms  # Imported here: only this step needs it
 
-# Date range
-start = datetime(2023, 1, 1)
-end = datetime(2025, 12, 31, 23, 59)
+    # Chicago O'Hare station ID
+    station = ms.Station(id='72530')
 
-# Fetch hourly data
-ts = ms.hourly(station, start, end)
-weather = ts.fetch()
+    # Fetch hourly data
+    ts = ms.hourly(station, start, end)
+    weather = ts.fetch()
 
 if weather is None or weather.empty:
     print("      ✗ No weather data returned!")
@@ -58,7 +72,7 @@ if weather is None or weather.empty:
     print("        - Try deleting cache: C:\\Users\\14037\\.meteostat\\cache")
     exit()
 
-print(f"      ✓ Downloaded {len(weather):,} hourly weather records")
+print(f"      ✓ Loaded {len(weather):,} hourly weather records")
 
 # Process weather data
 weather = weather.reset_index()
@@ -11,7 +11,8 @@ INPUT_FILE = '16.1_weather_DI_added.csv'
 OUTPUT_FILE = '17.1_columns_truncated.csv'
 
 # Columns to REMOVE (list the column names you want to delete)
-COLUMNS_TO_REMOVE = [
+# Also the stage's column contract (checked by contracts.py before each run)
+DROP_COLUMNS = [
     'prcp',      # Precipitation
     'wdir',      # Wind direction
     'pres',      # Pressure
@@ -49,8 +50,8 @@ for i, col in enumerate(df.columns, 1):
 
 # Remove specified columns
 print(f"\n[2/3] Removing columns...")
-columns_to_remove = [col for col in COLUMNS_TO_REMOVE if col in df.columns]
-columns_not_found = [col for col in COLUMNS_TO_REMOVE if col not in df.columns]
+columns_to_remove = [col for col in DROP_COLUMNS if col in df.columns]
+columns_not_found = [col for col in DROP_COLUMNS if col not in df.columns]
 
 if columns_not_found:
     print(f"      ⚠️  Warning: These columns don't exist:")
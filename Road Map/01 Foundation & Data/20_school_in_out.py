@@ -13,17 +13,28 @@ Block flagged as school=1 if it overlaps with school hours
 # ============================================================
 INPUT_FILE = '18.1_3hour_blocks_with_zeros.csv'
 OUTPUT_FILE = '20.1_school_calendar_added.csv'
+
+# Column contract (checked by contracts.py before each run)
+INPUT_COLUMNS = ['block_datetime', 'time_block']
+ADD_COLUMNS = ['school_in_session']
+
+# Parallel execution (one shard per Community Area)
+WORKERS = None               # None = all CPU cores, 1 = single process
+SHARD_KEY = 'Community Area'
 # ============================================================
 
 import pandas as pd
 from datetime import datetime, date
 import os
+from sharded_executor import run_sharded
+from calendar_rules import school_breaks, school_single_days
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 input_file = os.path.join(script_dir, INPUT_FILE)
 output_file = os.path.join(script_dir, OUTPUT_FILE)
 
 # Chicago Public Schools Calendar Data (2023-2025)
+# Other years (2001-2022, 2026) use the rule-based calendar in calendar_rules.py
 SCHOOL_BREAKS = {
     # 2023
     '2023': {
@@ -88,20 +99,26 @@ def is_school_day(check_date, year_str):
     if check_date.weekday() >= 5:  # Saturday = 5, Sunday = 6
         return False
     
-    # Check if date is in a break period
+    # Published calendar if we have one, rule-based calendar otherwise
     if year_str in SCHOOL_BREAKS:
-        for break_name, (start, end) in SCHOOL_BREAKS[year_str].items():
-            start_date = datetime.strptime(start, '%Y-%m-%d').date()
-            end_date = datetime.strptime(end, '%Y-%m-%d').date()
-            
-            if start_date <= check_date <= end_date:
-                return False
+        breaks = SCHOOL_BREAKS[year_str]
+        single_days = SINGLE_DAY_BREAKS.get(year_str, [])
+    else:
+        breaks = school_breaks(int(year_str))
+        single_days = school_single_days(int(year_str))
+
+    # Check if date is in a break period
+    for break_name, (start, end) in breaks.items():
+        start_date = datetime.strptime(start, '%Y-%m-%d').date()
+        end_date = datetime.strptime(end, '%Y-%m-%d').date()
+        
+        if start_date <= check_date <= end_date:
+            return False
     
     # Check single-day breaks
-    if year_str in SINGLE_DAY_BREAKS:
-        date_str = check_date.strftime('%Y-%m-%d')
-        if date_str in SINGLE_DAY_BREAKS[year_str]:
-            return False
+    date_str = check_date.strftime('%Y-%m-%d')
+    if date_str in single_days:
+        return False
     
     return True
 
@@ -123,76 +140,83 @@ def block_overlaps_school_hours(time_block):
     # Blocks that overlap school hours: 2, 3, 4
     return time_block in [2, 3, 4]
 
-print("=" * 70)
-print("ADDING SCHOOL CALENDAR FEATURE (3-HOUR BLOCKS)")
-print("=" * 70)
-print(f"\nInput:  {INPUT_FILE}")
-print(f"Output: {OUTPUT_FILE}")
-
-# Load data
-print("\n[1/3] Reading 3-hour block data...")
-df = pd.read_csv(input_file)
-df['block_datetime'] = pd.to_datetime(df['block_datetime'])
-print(f"      Rows: {len(df):,}")
-print(f"      Current columns: {list(df.columns)}")
-
-# Add school_in_session feature
-print("\n[2/3] Adding school_in_session feature...")
-print("      School hours: 8am-3pm (hours 8-14)")
-print("      Blocks flagged: 2 (06-09), 3 (09-12), 4 (12-15)")
-
-df['block_date'] = df['block_datetime'].dt.date
-df['year_str'] = df['block_datetime'].dt.year.astype(str)
-
-# Determine if block is during school
-df['school_in_session'] = df.apply(
-    lambda row: 1 if (
-        is_school_day(row['block_date'], row['year_str']) and 
-        block_overlaps_school_hours(row['time_block'])
-    ) else 0,
-    axis=1
-)
-
-# Drop temporary columns
-df = df.drop(['block_date', 'year_str'], axis=1)
-
-# Statistics
-total_rows = len(df)
-in_session = df['school_in_session'].sum()
-not_in_session = total_rows - in_session
-
-print(f"\n      Statistics:")
-print(f"        Total blocks: {total_rows:,}")
-print(f"        School in session: {in_session:,} ({in_session/total_rows*100:.1f}%)")
-print(f"        School NOT in session: {not_in_session:,} ({not_in_session/total_rows*100:.1f}%)")
-
-# Save
-print(f"\n[3/3] Saving to: {OUTPUT_FILE}")
-df.to_csv(output_file, index=False)
-
-# Make read-only
-import stat
-os.chmod(output_file, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
-
-file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
-
-print("\n" + "=" * 70)
-print("✓ COMPLETE!")
-print("=" * 70)
-print(f"Input:  {INPUT_FILE}")
-print(f"Output: {OUTPUT_FILE}")
-print(f"Rows: {len(df):,}")
-print(f"Columns: {len(df.columns)}")
-print(f"File size: {file_size_mb:.1f} MB")
-print(f"✓ File set to read-only")
-print("\nSchool-flagged blocks:")
-print("  Block 2 (06-09): Overlaps hours 8-9")
-print("  Block 3 (09-12): Full school hours")
-print("  Block 4 (12-15): Overlaps hours 12-14")
-print("=" * 70)
-
-# Show sample
-print("\n=== SAMPLE DATA ===")
-sample_cols = ['block_datetime', 'time_block', 'crime_count', 'school_in_session']
-print(df[sample_cols].head(20))
-print("=" * 70)
\ No newline at end of file
+def add_school_in_session(df):
+    """Add school_in_session column (expects parsed block_datetime)"""
+    df = df.copy()
+    df['block_date'] = df['block_datetime'].dt.date
+
+    # Determine if block is during school (each date / block checked once)
+    school_days = {d: is_school_day(d, str(d.year)) for d in df['block_date'].unique()}
+    school_blocks = {tb: block_overlaps_school_hours(tb) for tb in df['time_block'].unique()}
+    df['school_in_session'] = (
+        df['block_date'].map(school_days) & df['time_block'].map(school_blocks)
+    ).astype(int)
+
+    # Drop temporary columns
+    return df.drop(['block_date'], axis=1)
+
+def main():
+    print("=" * 70)
+    print("ADDING SCHOOL CALENDAR FEATURE (3-HOUR BLOCKS)")
+    print("=" * 70)
+    print(f"\nInput:  {INPUT_FILE}")
+    print(f"Output: {OUTPUT_FILE}")
+
+    # Load data
+    print("\n[1/3] Reading 3-hour block data...")
+    df = pd.read_csv(input_file)
+    df['block_datetime'] = pd.to_datetime(df['block_datetime'])
+    print(f"      Rows: {len(df):,}")
+    print(f"      Current columns: {list(df.columns)}")
+
+    # Add school_in_session feature
+    print("\n[2/3] Adding school_in_session feature...")
+    print("      School hours: 8am-3pm (hours 8-14)")
+    print("      Blocks flagged: 2 (06-09), 3 (09-12), 4 (12-15)")
+
+    df = run_sharded(df, os.path.basename(__file__), 'add_school_in_session',
+                     shard_key=SHARD_KEY, workers=WORKERS)
+
+    # Statistics
+    total_rows = len(df)
+    in_session = df['school_in_session'].sum()
+    not_in_session = total_rows - in_session
+
+    print(f"\n      Statistics:")
+    print(f"        Total blocks: {total_rows:,}")
+    print(f"        School in session: {in_session:,} ({in_session/total_rows*100:.1f}%)")
+    print(f"        School NOT in session: {not_in_session:,} ({not_in_session/total_rows*100:.1f}%)")
+
+    # Save
+    print(f"\n[3/3] Saving to: {OUTPUT_FILE}")
+    df.to_csv(output_file, index=False)
+
+    # Make read-only
+    import stat
+    os.chmod(output_file, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+    file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
+
+    print("\n" + "=" * 70)
+    print("✓ COMPLETE!")
+    print("=" * 70)
+    print(f"Input:  {INPUT_FILE}")
+    print(f"Output: {OUTPUT_FILE}")
+    print(f"Rows: {len(df):,}")
+    print(f"Columns: {len(df.columns)}")
+    print(f"File size: {file_size_mb:.1f} MB")
+    print(f"✓ File set to read-only")
+    print("\nSchool-flagged blocks:")
+    print("  Block 2 (06-09): Overlaps hours 8-9")
+    print("  Block 3 (09-12): Full school hours")
+    print("  Block 4 (12-15): Overlaps hours 12-14")
+    print("=" * 70)
+
+    # Show sample
+    print("\n=== SAMPLE DATA ===")
+    sample_cols = ['block_datetime', 'time_block', 'crime_count', 'school_in_session']
+    print(df[sample_cols].head(20))
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
@@ -12,11 +12,20 @@ Block flagged as major_event=1 if it overlaps with event hours
 # ============================================================
 INPUT_FILE = '20.1_school_calendar_added.csv'
 OUTPUT_FILE = '21.1_major_events_added.csv'
+
+# Column contract (checked by contracts.py before each run)
+INPUT_COLUMNS = ['block_datetime', 'time_block']
+ADD_COLUMNS = ['major_event']
+
+# Parallel execution (one shard per Community Area)
+WORKERS = None               # None = all CPU cores, 1 = single process
+SHARD_KEY = 'Community Area'
 # ============================================================
 
 import pandas as pd
 from datetime import datetime, timedelta
 import os
+from sharded_executor import run_sharded
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 input_file = os.path.join(script_dir, INPUT_FILE)
@@ -118,86 +127,96 @@ def block_overlaps_event(check_date, time_block, year):
     
     return 0
 
-print("=" * 70)
-print("ADDING MAJOR EVENTS FEATURE (3-HOUR BLOCKS)")
-print("=" * 70)
-print(f"\nInput:  {INPUT_FILE}")
-print(f"Output: {OUTPUT_FILE}")
-
-# Load data
-print("\n[1/3] Reading 3-hour block data...")
-df = pd.read_csv(input_file)
-df['block_datetime'] = pd.to_datetime(df['block_datetime'])
-print(f"      Rows: {len(df):,}")
-print(f"      Current columns: {list(df.columns)}")
-
-# Add major_event feature
-print("\n[2/3] Adding major_event feature...")
-print("      Events tracked:")
-print("        - St. Patrick's Parade: 3pm-3am (blocks 5,6,7,0)")
-print("        - Pride Parade: 12pm-11pm (blocks 4,5,6,7)")
-print("        - Chicago Marathon: 7am-4pm (blocks 2,3,4,5)")
-print("        - Lollapalooza: 11am-10pm, 4 days (blocks 3,4,5,6,7)")
-
-df['block_date'] = df['block_datetime'].dt.date
-df['year'] = df['block_datetime'].dt.year
-
-df['major_event'] = df.apply(
-    lambda row: block_overlaps_event(row['block_date'], row['time_block'], row['year']),
-    axis=1
-)
-
-# Drop temporary columns
-df = df.drop(['block_date', 'year'], axis=1)
-
-# Statistics
-total_rows = len(df)
-event_blocks = df['major_event'].sum()
-
-print(f"\n      Statistics:")
-print(f"        Total blocks: {total_rows:,}")
-print(f"        Event blocks: {event_blocks:,} ({event_blocks/total_rows*100:.2f}%)")
-
-# Show which events were found
-print("\n      Events detected by year:")
-years = df['block_datetime'].dt.year.unique()
-for year in sorted(years):
-    print(f"\n      {year}:")
-    print(f"        St. Patrick's: {get_st_patricks_parade_date(year)}")
-    print(f"        Pride: {get_pride_parade_date(year)}")
-    print(f"        Marathon: {get_chicago_marathon_date(year)}")
-    lolla = get_lollapalooza_dates(year)
-    print(f"        Lollapalooza: {lolla[0]} to {lolla[-1]} (4 days)")
-
-# Save
-print(f"\n[3/3] Saving to: {OUTPUT_FILE}")
-df.to_csv(output_file, index=False)
-
-# Make read-only
-import stat
-os.chmod(output_file, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
-
-file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
-
-print("\n" + "=" * 70)
-print("✓ COMPLETE!")
-print("=" * 70)
-print(f"Input:  {INPUT_FILE}")
-print(f"Output: {OUTPUT_FILE}")
-print(f"Rows: {len(df):,}")
-print(f"Columns: {len(df.columns)}")
-print(f"File size: {file_size_mb:.1f} MB")
-print(f"✓ File set to read-only")
-print("\nEvent block mappings:")
-print("  St. Patrick's: Blocks 5,6,7 (same day) + 0 (next day)")
-print("  Pride: Blocks 4,5,6,7")
-print("  Marathon: Blocks 2,3,4,5")
-print("  Lollapalooza: Blocks 3,4,5,6,7 (4 days)")
-print("=" * 70)
-
-# Show sample of event blocks
-event_samples = df[df['major_event'] == 1][['block_datetime', 'time_block', 'major_event']].head(20)
-if len(event_samples) > 0:
-    print("\n=== SAMPLE EVENT BLOCKS ===")
-    print(event_samples)
-print("=" * 70)
\ No newline at end of file
+def add_major_event(df):
+    """Add major_event column (expects parsed block_datetime)"""
+    df = df.copy()
+    df['block_date'] = df['block_datetime'].dt.date
+    df['year'] = df['block_datetime'].dt.year
+
+    df['major_event'] = df.apply(
+        lambda row: block_overlaps_event(row['block_date'], row['time_block'], row['year']),
+        axis=1
+    )
+
+    # Drop temporary columns
+    return df.drop(['block_date', 'year'], axis=1)
+
+def main():
+    print("=" * 70)
+    print("ADDING MAJOR EVENTS FEATURE (3-HOUR BLOCKS)")
+    print("=" * 70)
+    print(f"\nInput:  {INPUT_FILE}")
+    print(f"Output: {OUTPUT_FILE}")
+
+    # Load data
+    print("\n[1/3] Reading 3-hour block data...")
+    df = pd.read_csv(input_file)
+    df['block_datetime'] = pd.to_datetime(df['block_datetime'])
+    print(f"      Rows: {len(df):,}")
+    print(f"      Current columns: {list(df.columns)}")
+
+    # Add major_event feature
+    print("\n[2/3] Adding major_event feature...")
+    print("      Events tracked:")
+    print("        - St. Patrick's Parade: 3pm-3am (blocks 5,6,7,0)")
+    print("        - Pride Parade: 12pm-11pm (blocks 4,5,6,7)")
+    print("        - Chicago Marathon: 7am-4pm (blocks 2,3,4,5)")
+    print("        - Lollapalooza: 11am-10pm, 4 days (blocks 3,4,5,6,7)")
+
+    df = run_sharded(df, os.path.basename(__file__), 'add_major_event',
+                     shard_key=SHARD_KEY, workers=WORKERS)
+
+    # Statistics
+    total_rows = len(df)
+    event_blocks = df['major_event'].sum()
+
+    print(f"\n      Statistics:")
+    print(f"        Total blocks: {total_rows:,}")
+    print(f"        Event blocks: {event_blocks:,} ({event_blocks/total_rows*100:.2f}%)")
+
+    # Show which events were found
+    print("\n      Events detected by year:")
+    years = df['block_datetime'].dt.year.unique()
+    for year in sorted(years):
+        print(f"\n      {year}:")
+        print(f"        St. Patrick's: {get_st_patricks_parade_date(year)}")
+        print(f"        Pride: {get_pride_parade_date(year)}")
+        print(f"        Marathon: {get_chicago_marathon_date(year)}")
+        lolla = get_lollapalooza_dates(year)
+        print(f"        Lollapalooza: {lolla[0]} to {lolla[-1]} (4 days)")
+
+    # Save
+    print(f"\n[3/3] Saving to: {OUTPUT_FILE}")
+    df.to_csv(output_file, index=False)
+
+    # Make read-only
+    import stat
+    os.chmod(output_file, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+    file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
+
+    print("\n" + "=" * 70)
+    print("✓ COMPLETE!")
+    print("=" * 70)
+    print(f"Input:  {INPUT_FILE}")
+    print(f"Output: {OUTPUT_FILE}")
+    print(f"Rows: {len(df):,}")
+    print(f"Columns: {len(df.columns)}")
+    print(f"File size: {file_size_mb:.1f} MB")
+    print(f"✓ File set to read-only")
+    print("\nEvent block mappings:")
+    print("  St. Patrick's: Blocks 5,6,7 (same day) + 0 (next day)")
+    print("  Pride: Blocks 4,5,6,7")
+    print("  Marathon: Blocks 2,3,4,5")
+    print("  Lollapalooza: Blocks 3,4,5,6,7 (4 days)")
+    print("=" * 70)
+
+    # Show sample of event blocks
+    event_samples = df[df['major_event'] == 1][['block_datetime', 'time_block', 'major_event']].head(20)
+    if len(event_samples) > 0:
+        print("\n=== SAMPLE EVENT BLOCKS ===")
+        print(event_samples)
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
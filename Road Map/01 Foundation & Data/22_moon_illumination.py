@@ -11,12 +11,21 @@ Moon illumination: 0-100% (calculated for each block's start datetime)
 # ============================================================
 INPUT_FILE = '21.1_major_events_added.csv'
 OUTPUT_FILE = '22.1_moon_phase_added.csv'
+
+# Column contract (checked by contracts.py before each run)
+INPUT_COLUMNS = ['block_datetime']
+ADD_COLUMNS = ['moon_illumination']
+
+# Parallel execution (one shard per Community Area)
+WORKERS = None               # None = all CPU cores, 1 = single process
+SHARD_KEY = 'Community Area'
 # ============================================================
 
 import pandas as pd
 from datetime import datetime
 import math
 import os
+from sharded_executor import run_sharded
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 input_file = os.path.join(script_dir, INPUT_FILE)
@@ -71,71 +80,82 @@ def get_moon_phase_name(illumination):
     else:
         return "Waning Crescent"
 
-print("=" * 70)
-print("ADDING MOON ILLUMINATION FEATURE (3-HOUR BLOCKS)")
-print("=" * 70)
-print(f"\nInput:  {INPUT_FILE}")
-print(f"Output: {OUTPUT_FILE}")
-
-# Load data
-print("\n[1/3] Reading 3-hour block data...")
-df = pd.read_csv(input_file)
-df['block_datetime'] = pd.to_datetime(df['block_datetime'])
-print(f"      Rows: {len(df):,}")
-print(f"      Current columns: {list(df.columns)}")
-
-# Add moon_illumination feature
-print("\n[2/3] Calculating moon illumination...")
-print("      Using block start datetime for each calculation")
-print("      Formula: Astronomical calculation based on 29.53-day synodic month")
-
-df['moon_illumination'] = df['block_datetime'].apply(get_moon_illumination)
-
-# Statistics
-total_rows = len(df)
-avg_illumination = df['moon_illumination'].mean()
-min_illumination = df['moon_illumination'].min()
-max_illumination = df['moon_illumination'].max()
-
-# Count blocks during different moon phases
-new_moon_count = len(df[df['moon_illumination'] < 25])
-full_moon_count = len(df[df['moon_illumination'] > 75])
-
-print(f"\n      Statistics:")
-print(f"        Total blocks: {total_rows:,}")
-print(f"        Average illumination: {avg_illumination:.1f}%")
-print(f"        Range: {min_illumination:.1f}% to {max_illumination:.1f}%")
-print(f"        New moon blocks (<25%): {new_moon_count:,} ({new_moon_count/total_rows*100:.1f}%)")
-print(f"        Full moon blocks (>75%): {full_moon_count:,} ({full_moon_count/total_rows*100:.1f}%)")
-
-# Save
-print(f"\n[3/3] Saving to: {OUTPUT_FILE}")
-df.to_csv(output_file, index=False)
-
-# Make read-only
-import stat
-os.chmod(output_file, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
-
-file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
-
-print("\n" + "=" * 70)
-print("✓ COMPLETE!")
-print("=" * 70)
-print(f"Input:  {INPUT_FILE}")
-print(f"Output: {OUTPUT_FILE}")
-print(f"Rows: {len(df):,}")
-print(f"Columns: {len(df.columns)}")
-print(f"File size: {file_size_mb:.1f} MB")
-print(f"✓ File set to read-only")
-print("\nMoon illumination: 0-100%")
-print("  0% = New Moon (darkest)")
-print("  50% = Quarter Moon")
-print("  100% = Full Moon (brightest)")
-print("=" * 70)
-
-# Show sample
-print("\n=== SAMPLE MOON PHASES ===")
-sample = df[['block_datetime', 'time_block', 'crime_count', 'moon_illumination']].head(20).copy()
-sample['moon_phase'] = sample['moon_illumination'].apply(get_moon_phase_name)
-print(sample[['block_datetime', 'moon_illumination', 'moon_phase', 'crime_count']])
-print("=" * 70)
\ No newline at end of file
+def add_moon_illumination(df):
+    """Add moon_illumination column (expects parsed block_datetime)"""
+    df = df.copy()
+    df['moon_illumination'] = df['block_datetime'].apply(get_moon_illumination)
+    return df
+
+def main():
+    print("=" * 70)
+    print("ADDING MOON ILLUMINATION FEATURE (3-HOUR BLOCKS)")
+    print("=" * 70)
+    print(f"\nInput:  {INPUT_FILE}")
+    print(f"Output: {OUTPUT_FILE}")
+
+    # Load data
+    print("\n[1/3] Reading 3-hour block data...")
+    df = pd.read_csv(input_file)
+    df['block_datetime'] = pd.to_datetime(df['block_datetime'])
+    print(f"      Rows: {len(df):,}")
+    print(f"      Current columns: {list(df.columns)}")
+
+    # Add moon_illumination feature
+    print("\n[2/3] Calculating moon illumination...")
+    print("      Using block start datetime for each calculation")
+    print("      Formula: Astronomical calculation based on 29.53-day synodic month")
+
+    df = run_sharded(df, os.path.basename(__file__), 'add_moon_illumination',
+                     shard_key=SHARD_KEY, workers=WORKERS)
+
+    # Statistics
+    total_rows = len(df)
+    avg_illumination = df['moon_illumination'].mean()
+    min_illumination = df['moon_illumination'].min()
+    max_illumination = df['moon_illumination'].max()
+
+    # Count blocks during different moon phases
+    new_moon_count = len(df[df['moon_illumination'] < 25])
+    full_moon_count = len(df[df['moon_illumination'] > 75])
+
+    print(f"\n      Statistics:")
+    print(f"        Total blocks: {total_rows:,}")
+    print(f"        Average illumination: {avg_illumination:.1f}%")
+    print(f"        Range: {min_illumination:.1f}% to {max_illumination:.1f}%")
+    print(f"        New moon blocks (<25%): {new_moon_count:,} ({new_moon_count/total_rows*100:.1f}%)")
+    print(f"        Full moon blocks (>75%): {full_moon_count:,} ({full_moon_count/total_rows*100:.1f}%)")
+
+    # Save
+    print(f"\n[3/3] Saving to: {OUTPUT_FILE}")
+    df.to_csv(output_file, index=False)
+
+    # Make read-only
+    import stat
+    os.chmod(output_file, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+    file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
+
+    print("\n" + "=" * 70)
+    print("✓ COMPLETE!")
+    print("=" * 70)
+    print(f"Input:  {INPUT_FILE}")
+    print(f"Output: {OUTPUT_FILE}")
+    print(f"Rows: {len(df):,}")
+    print(f"Columns: {len(df.columns)}")
+    print(f"File size: {file_size_mb:.1f} MB")
+    print(f"✓ File set to read-only")
+    print("\nMoon illumination: 0-100%")
+    print("  0% = New Moon (darkest)")
+    print("  50% = Quarter Moon")
+    print("  100% = Full Moon (brightest)")
+    print("=" * 70)
+
+    # Show sample
+    print("\n=== SAMPLE MOON PHASES ===")
+    sample = df[['block_datetime', 'time_block', 'crime_count', 'moon_illumination']].head(20).copy()
+    sample['moon_phase'] = sample['moon_illumination'].apply(get_moon_phase_name)
+    print(sample[['block_datetime', 'moon_illumination', 'moon_phase', 'crime_count']])
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
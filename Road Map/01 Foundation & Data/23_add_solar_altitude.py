@@ -12,13 +12,19 @@ Calculated at midpoint of each 3-hour block
 # ============================================================
 INPUT_FILE = '22.1_moon_phase_added.csv'
 OUTPUT_FILE = '23.1_solar_altitude_added.csv'
+
+# Column contract (checked by contracts.py before each run)
+INPUT_COLUMNS = ['block_datetime', 'time_block']
+ADD_COLUMNS = ['solar_altitude']
+
+# Parallel execution (one shard per Community Area)
+WORKERS = None               # None = all CPU cores, 1 = single process
+SHARD_KEY = 'Community Area'
 # ============================================================
 
 import pandas as pd
-from astral import LocationInfo
-from astral.sun import elevation
-import pytz
 import os
+from sharded_executor import run_sharded
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 input_file = os.path.join(script_dir, INPUT_FILE)
@@ -27,8 +33,18 @@ output_file = os.path.join(script_dir, OUTPUT_FILE)
 # Chicago Coordinates
 CITY_LAT = 41.8781
 CITY_LON = -87.6298
-city = LocationInfo("Chicago", "USA", "America/Chicago", CITY_LAT, CITY_LON)
-chicago_tz = pytz.timezone("America/Chicago")
+_solar_context = None
+
+def get_solar_context():
+    """Chicago observer, timezone and elevation function (astral/pytz imported on first use)"""
+    global _solar_context
+    if _solar_context is None:
+        from astral import LocationInfo
+        from astral.sun import elevation
+        import pytz
+        city = LocationInfo("Chicago", "USA", "America/Chicago", CITY_LAT, CITY_LON)
+        _solar_context = (city.observer, pytz.timezone("America/Chicago"), elevation)
+    return _solar_context
 
 def get_solar_altitude_for_block(block_datetime, time_block):
     """
@@ -44,6 +60,7 @@ def get_solar_altitude_for_block(block_datetime, time_block):
     6 (18-21): 19:30
     7 (21-24): 22:30
     """
+    observer, chicago_tz, elevation = get_solar_context()
     try:
         # Calculate midpoint: block start + 1.5 hours
         midpoint = block_datetime + pd.Timedelta(hours=1, minutes=30)
@@ -52,81 +69,92 @@ def get_solar_altitude_for_block(block_datetime, time_block):
         local_dt = chicago_tz.localize(midpoint)
         
         # Calculate solar altitude
-        alt = elevation(city.observer, local_dt)
+        alt = elevation(observer, local_dt)
         return round(float(alt), 2)
         
     except Exception:
         return -999.0  # Error value
 
-print("=" * 70)
-print("ADDING SOLAR ALTITUDE FEATURE (3-HOUR BLOCKS)")
-print("=" * 70)
-print(f"\nInput:  {INPUT_FILE}")
-print(f"Output: {OUTPUT_FILE}")
-
-# Load data
-print("\n[1/3] Reading 3-hour block data...")
-df = pd.read_csv(input_file)
-df['block_datetime'] = pd.to_datetime(df['block_datetime'])
-print(f"      Rows: {len(df):,}")
-print(f"      Current columns: {list(df.columns)}")
-
-# Add solar_altitude feature
-print("\n[2/3] Calculating solar altitude...")
-print("      Location: Chicago (41.88°N, 87.63°W)")
-print("      Calculated at midpoint of each 3-hour block")
-print("      Range: -90° (below horizon) to 90° (directly overhead)")
-
-df['solar_altitude'] = df.apply(
-    lambda row: get_solar_altitude_for_block(row['block_datetime'], row['time_block']),
-    axis=1
-)
-
-# Statistics
-total_rows = len(df)
-avg_altitude = df[df['solar_altitude'] != -999.0]['solar_altitude'].mean()
-min_altitude = df[df['solar_altitude'] != -999.0]['solar_altitude'].min()
-max_altitude = df[df['solar_altitude'] != -999.0]['solar_altitude'].max()
-
-# Count daytime vs nighttime blocks
-daytime_count = len(df[df['solar_altitude'] > 0])
-nighttime_count = len(df[df['solar_altitude'] <= 0])
-
-print(f"\n      Statistics:")
-print(f"        Total blocks: {total_rows:,}")
-print(f"        Average altitude: {avg_altitude:.1f}°")
-print(f"        Range: {min_altitude:.1f}° to {max_altitude:.1f}°")
-print(f"        Daytime blocks (>0°): {daytime_count:,} ({daytime_count/total_rows*100:.1f}%)")
-print(f"        Nighttime blocks (≤0°): {nighttime_count:,} ({nighttime_count/total_rows*100:.1f}%)")
-
-# Save
-print(f"\n[3/3] Saving to: {OUTPUT_FILE}")
-df.to_csv(output_file, index=False)
-
-# Make read-only
-import stat
-os.chmod(output_file, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
-
-file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
-
-print("\n" + "=" * 70)
-print("✓ COMPLETE!")
-print("=" * 70)
-print(f"Input:  {INPUT_FILE}")
-print(f"Output: {OUTPUT_FILE}")
-print(f"Rows: {len(df):,}")
-print(f"Columns: {len(df.columns)}")
-print(f"File size: {file_size_mb:.1f} MB")
-print(f"✓ File set to read-only")
-print("\nSolar altitude interpretation:")
-print("  > 0° = Sun above horizon (daytime)")
-print("  0° = Sunrise/sunset")
-print("  < 0° = Sun below horizon (nighttime)")
-print("  -18° = End of astronomical twilight (full darkness)")
-print("=" * 70)
-
-# Show sample
-print("\n=== SAMPLE SOLAR ALTITUDES ===")
-sample = df[['block_datetime', 'time_block', 'solar_altitude', 'crime_count']].head(24)
-print(sample)
-print("=" * 70)
\ No newline at end of file
+def add_solar_altitude(df):
+    """Add solar_altitude column (expects parsed block_datetime)"""
+    df = df.copy()
+    df['solar_altitude'] = df.apply(
+        lambda row: get_solar_altitude_for_block(row['block_datetime'], row['time_block']),
+        axis=1
+    )
+    return df
+
+def main():
+    print("=" * 70)
+    print("ADDING SOLAR ALTITUDE FEATURE (3-HOUR BLOCKS)")
+    print("=" * 70)
+    print(f"\nInput:  {INPUT_FILE}")
+    print(f"Output: {OUTPUT_FILE}")
+
+    # Load data
+    print("\n[1/3] Reading 3-hour block data...")
+    df = pd.read_csv(input_file)
+    df['block_datetime'] = pd.to_datetime(df['block_datetime'])
+    print(f"      Rows: {len(df):,}")
+    print(f"      Current columns: {list(df.columns)}")
+
+    # Add solar_altitude feature
+    print("\n[2/3] Calculating solar altitude...")
+    print("      Location: Chicago (41.88°N, 87.63°W)")
+    print("      Calculated at midpoint of each 3-hour block")
+    print("      Range: -90° (below horizon) to 90° (directly overhead)")
+
+    df = run_sharded(df, os.path.basename(__file__), 'add_solar_altitude',
+                     shard_key=SHARD_KEY, workers=WORKERS)
+
+    # Statistics
+    total_rows = len(df)
+    avg_altitude = df[df['solar_altitude'] != -999.0]['solar_altitude'].mean()
+    min_altitude = df[df['solar_altitude'] != -999.0]['solar_altitude'].min()
+    max_altitude = df[df['solar_altitude'] != -999.0]['solar_altitude'].max()
+
+    # Count daytime vs nighttime blocks
+    daytime_count = len(df[df['solar_altitude'] > 0])
+    nighttime_count = len(df[df['solar_altitude'] <= 0])
+
+    print(f"\n      Statistics:")
+    print(f"        Total blocks: {total_rows:,}")
+    print(f"        Average altitude: {avg_altitude:.1f}°")
+    print(f"        Range: {min_altitude:.1f}° to {max_altitude:.1f}°")
+    print(f"        Daytime blocks (>0°): {daytime_count:,} ({daytime_count/total_rows*100:.1f}%)")
+    print(f"        Nighttime blocks (≤0°): {nighttime_count:,} ({nighttime_count/total_rows*100:.1f}%)")
+
+    # Save
+    print(f"\n[3/3] Saving to: {OUTPUT_FILE}")
+    df.to_csv(output_file, index=False)
+
+    # Make read-only
+    import stat
+    os.chmod(output_file, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+    file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
+
+    print("\n" + "=" * 70)
+    print("✓ COMPLETE!")
+    print("=" * 70)
+    print(f"Input:  {INPUT_FILE}")
+    print(f"Output: {OUTPUT_FILE}")
+    print(f"Rows: {len(df):,}")
+    print(f"Columns: {len(df.columns)}")
+    print(f"File size: {file_size_mb:.1f} MB")
+    print(f"✓ File set to read-only")
+    print("\nSolar altitude interpretation:")
+    print("  > 0° = Sun above horizon (daytime)")
+    print("  0° = Sunrise/sunset")
+    print("  < 0° = Sun below horizon (nighttime)")
+    print("  -18° = End of astronomical twilight (full darkness)")
+    print("=" * 70)
+
+    # Show sample
+    print("\n=== SAMPLE SOLAR ALTITUDES ===")
+    sample = df[['block_datetime', 'time_block', 'solar_altitude', 'crime_count']].head(24)
+    print(sample)
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ INPUT_FILE = '23.1_solar_altitude_added.csv'
 OUTPUT_FILE = '24.1_training_ready.csv'
 
 # Columns to remove (not needed for training)
+# Also the stage's column contract (checked by contracts.py before each run)
 DROP_COLUMNS = [
     'block_datetime',  # Already encoded in other features
     'time_block',      # Redundant with time-based features
@@ -84,6 +85,6 @@ print(f"Columns dropped: {dropped}")
 print(f"File size: {file_size_mb:.1f} MB")
 print(f"✓ File set to read-only")
 print("\nReady for XGBoost training!")
-print("  Features (X): 14 columns")
+print(f"  Features (X): {new_cols - 1} columns (01_train_model.py drops some, see contracts.py)")
 print("  Target (y): Severity_Score")
 print("=" * 70)
\ No newline at end of file
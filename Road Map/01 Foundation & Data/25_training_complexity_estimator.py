@@ -9,15 +9,30 @@ Writes to: 25.1_dataset_analysis.txt
 # ============================================================
 INPUT_FILE = '24.1_training_ready.csv'
 OUTPUT_FILE = '25.1_dataset_analysis.md'
+# Measured by training_benchmark.py; without it the estimate is a rule of thumb
+BENCHMARK_FILE = '../02 Create Prediction Models/training_benchmark/results.csv'
 # ============================================================
 
 import pandas as pd
 import numpy as np
 import os
+from artifact_cache import read_artifact
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 input_file = os.path.join(script_dir, INPUT_FILE)
 output_file = os.path.join(script_dir, OUTPUT_FILE)
+benchmark_file = os.path.join(script_dir, BENCHMARK_FILE)
+
+
+def measured_throughput():
+    """hist row of the training benchmark with the most rows (best throughput among ties), or None"""
+    if not os.path.exists(benchmark_file):
+        return None
+    results = pd.read_csv(benchmark_file)
+    hist = results[results['tree_method'] == 'hist']
+    if hist.empty:
+        return None
+    return hist[hist['rows'] == hist['rows'].max()].sort_values('train_rate').iloc[-1]
 
 def main():
     if not os.path.exists(input_file):
@@ -28,7 +43,7 @@ def main():
     print(f"Writing analysis to: {OUTPUT_FILE}")
     
     # Load data
-    df = pd.read_csv(input_file)
+    df = read_artifact(input_file)  # Served from memory when artifact_cache.py is running
     
     # --- METRICS ---
     num_rows = len(df)
@@ -85,20 +100,37 @@ def main():
     lines.append("---")
     lines.append("")
     lines.append("## Estimated Training Time")
-    lines.append("*Standard Laptop CPU (8-16GB RAM, 4-8 cores)*")
+    benchmark = measured_throughput()
+    if benchmark is not None:
+        lines.append(f"*Measured by training_benchmark.py: hist, {benchmark['n_jobs']} thread(s), "
+                     f"depth {benchmark['max_depth']}, {benchmark['rows']:,} rows*")
+    else:
+        lines.append("*Standard Laptop CPU (8-16GB RAM, 4-8 cores) - not measured*")
     lines.append("")
     
     if len(text_cols) > 0:
         lines.append("❌ **CANNOT ESTIMATE** - Text columns must be fixed first")
     else:
-        estimated_seconds = (complexity_factor / 200000) 
+        if benchmark is not None:
+            # Rows x trees per second, scaled by the feature count it was measured with
+            features = max(num_cols - 1, 1)
+            estimated_seconds = (num_rows * benchmark['n_estimators'] / benchmark['train_rate']
+                                 * features / benchmark['features'])
+        else:
+            estimated_seconds = (complexity_factor / 200000) 
         
         if estimated_seconds < 60:
             lines.append(f"🚀 **FAST:** ~{estimated_seconds:.1f} seconds")
         else:
             lines.append(f"⏳ **NORMAL:** ~{estimated_seconds/60:.1f} minutes")
     lines.append("")        
-    lines.append("> Assumes standard model (100-500 trees). Grid Search multiply by 50x.")
+    if benchmark is not None:
+        lines.append(f"> {benchmark['n_estimators']} trees on all {num_rows:,} rows at "
+                     f"{benchmark['train_rate']:,.0f} rows x trees / s. Fit time grows linearly "
+                     f"with trees; grid search multiplies it by the number of trials.")
+    else:
+        lines.append("> Rule of thumb (rows x columns / 200,000 s), not a measurement: "
+                     "run training_benchmark.py in '02 Create Prediction Models' for one.")
     lines.append("")
     
     lines.append("---")
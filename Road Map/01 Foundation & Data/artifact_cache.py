@@ -0,0 +1,382 @@
+"""
+Artifact cache daemon - keeps hot CSV artifacts in memory across script runs
+
+Training, prediction and the analyzers are re-run by hand many times during
+tuning, and every run re-parses the same CSV (e.g. 24.1_training_ready.csv).
+This daemon parses each artifact once, keeps its columns in shared memory
+and hands them to client scripts over a local socket. Clients map the
+columns directly, so a warm load takes milliseconds instead of a full parse.
+Files are watched and reloaded when they change on disk.
+
+Start it once in a separate terminal:
+    python artifact_cache.py            # serve (Ctrl+C to stop)
+    python artifact_cache.py status     # list cached artifacts
+    python artifact_cache.py stop       # shut down a running daemon
+
+In scripts, use read_artifact() in place of pd.read_csv(). When the daemon
+is not running it simply falls back to pd.read_csv(). Served frames are
+read-only (see read_artifact).
+
+Clients authenticate with a random key generated per user on first use and
+kept in a file only that user can read (CACHE_KEY_FILE). The daemon only
+serves files under this folder and the models folder (SERVED_DIRS).
+"""
+
+import os
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+CACHE_HOST = '127.0.0.1'
+CACHE_PORT = 50731
+CACHE_KEY_FILE = os.path.join(os.path.expanduser('~'), '.chicago_crime', 'artifact_cache.key')
+WATCH_INTERVAL = 2.0   # Seconds between file-change checks
+
+# Only files under these folders are served (relative to this folder)
+SERVED_DIRS = ['.', '../02 Create Prediction Models']
+
+# Loaded at startup (paths relative to this folder)
+PRELOAD_FILES = [
+    '24.1_training_ready.csv',
+    '../02 Create Prediction Models/02.1_predictions_2026.csv',
+]
+# ============================================================
+
+import argparse
+import secrets
+import stat
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+import pandas as pd
+
+from shared_columns import SharedColumns, attach
+from memory_budget import read_csv as read_csv_budgeted
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Segments attached by this client process; kept open so the returned frames
+# stay valid for the life of the process
+_ATTACHED_SEGMENTS = []
+
+
+def _artifact_key(path):
+    return os.path.realpath(path)
+
+
+def _authkey():
+    """
+    The per-user key clients and daemon authenticate with, created on first use
+    The file is created 0600 and refused when anyone else can read it, since
+    whoever holds the key can send the daemon pickled requests.
+    """
+    try:
+        fd = os.open(CACHE_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        mode = os.stat(CACHE_KEY_FILE).st_mode
+        if mode & (stat.S_IRWXG | stat.S_IRWXO):
+            raise PermissionError(f"{CACHE_KEY_FILE} is readable by other users "
+                                  f"(chmod 600 it, or delete it to get a new key)")
+        with open(CACHE_KEY_FILE, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(CACHE_KEY_FILE), mode=0o700, exist_ok=True)
+        return _authkey()
+    key = secrets.token_bytes(32)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    return key
+
+
+def _check_served(key):
+    """Raise PermissionError unless the (real) path is a file under SERVED_DIRS"""
+    for folder in SERVED_DIRS:
+        root = os.path.realpath(os.path.join(script_dir, folder))
+        if os.path.commonpath([root, key]) == root:
+            if not os.path.isfile(key):
+                raise FileNotFoundError(f"not a file: {key}")
+            return
+    raise PermissionError(f"not served (outside the pipeline and model folders): {key}")
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class ArtifactCache:
+    """Server side: parsed artifacts held as shared-memory columns"""
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()   # Guards entries; never held while parsing
+        self.load_locks = {}           # One per artifact, so it is parsed once at a time
+
+    def load(self, path):
+        """Parse a CSV and move its columns into shared memory"""
+        start = time.perf_counter()
+        signature = _file_signature(path)
+        df = pd.read_csv(path)
+        shared = SharedColumns.from_frame(df)
+        entry = {
+            'path': path,
+            'signature': signature,
+            'shared': shared,
+            'columns': list(df.columns),
+            'rows': len(df),
+            'nbytes': sum(s.size for s in shared.segments.values()),
+            'load_seconds': time.perf_counter() - start,
+            'hits': 0,
+        }
+        print(f"  ✓ Loaded {os.path.basename(path)}: {entry['rows']:,} rows, "
+              f"{entry['nbytes'] / 1024**2:.1f} MB in {entry['load_seconds']:.2f}s")
+        return entry
+
+    def get(self, path):
+        """Return the shared spec for an artifact, (re)loading it if needed"""
+        key = _artifact_key(path)
+        _check_served(key)
+        while True:
+            with self.lock:
+                entry = self._current(key)
+                if entry is not None:
+                    entry['hits'] += 1
+                    return {
+                        'spec': entry['shared'].spec,
+                        'columns': entry['columns'],
+                        'rows': entry['rows'],
+                    }
+            self._reload(key)
+
+    def _current(self, key):
+        # The entry if it still matches the file on disk (self.lock held)
+        entry = self.entries.get(key)
+        if entry is not None and entry['signature'] == _file_signature(key):
+            return entry
+        return None
+
+    def _reload(self, key):
+        """
+        Parse an artifact without holding self.lock, then swap it in
+        Requests for other artifacts are served meanwhile. The file signature
+        is checked again after parsing; a file that changed in the meantime
+        is discarded and left to the next request or watch pass.
+        """
+        with self.lock:
+            load_lock = self.load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            with self.lock:
+                if self._current(key) is not None:
+                    return   # Another request loaded it while this one waited
+            entry = self.load(key)
+            with self.lock:
+                if entry['signature'] == _file_signature(key):
+                    self._replace(key, entry)
+                    return
+            print(f"  ↻ {os.path.basename(key)} changed while loading, discarded")
+            entry['shared'].close()
+
+    def _replace(self, key, entry):
+        # Clients that already mapped the old segments keep their mapping;
+        # unlinking only removes the name
+        old = self.entries.pop(key, None)
+        if entry is not None:
+            self.entries[key] = entry
+        if old is not None:
+            old['shared'].close()
+
+    def refresh_changed(self):
+        """Reload artifacts whose file changed, drop ones that were deleted"""
+        changed = []
+        with self.lock:
+            for key in list(self.entries):
+                if not os.path.exists(key):
+                    print(f"  - Dropped {os.path.basename(key)} (file removed)")
+                    self._replace(key, None)
+                elif self.entries[key]['signature'] != _file_signature(key):
+                    changed.append(key)
+        for key in changed:
+            print(f"  ↻ {os.path.basename(key)} changed on disk, reloading...")
+            try:
+                self._reload(key)
+            except Exception as e:   # e.g. removed or half-written; the next pass retries
+                print(f"  ⚠️  Could not reload {os.path.basename(key)}: {e}")
+
+    def status(self):
+        with self.lock:
+            return [
+                {k: entry[k] for k in ('path', 'rows', 'nbytes', 'load_seconds', 'hits')}
+                for entry in self.entries.values()
+            ]
+
+    def close(self):
+        with self.lock:
+            for key in list(self.entries):
+                self._replace(key, None)
+
+
+def _handle_connection(cache, conn, stop_event):
+    try:
+        request = conn.recv()
+        command = request.get('cmd')
+        if command == 'get':
+            conn.send({'ok': True, **cache.get(request['path'])})
+        elif command == 'status':
+            conn.send({'ok': True, 'artifacts': cache.status()})
+        elif command == 'stop':
+            conn.send({'ok': True})
+            stop_event.set()
+        else:
+            conn.send({'ok': False, 'error': f"Unknown command: {command}"})
+    except Exception as e:
+        try:
+            conn.send({'ok': False, 'error': str(e)})
+        except Exception:
+            pass
+    finally:
+        conn.close()
+
+
+def serve():
+    """Run the cache daemon until Ctrl+C or a 'stop' request"""
+    print("=" * 70)
+    print("ARTIFACT CACHE DAEMON")
+    print("=" * 70)
+    print(f"Listening on {CACHE_HOST}:{CACHE_PORT}")
+
+    cache = ArtifactCache()
+    stop_event = threading.Event()
+
+    print("\nPreloading artifacts...")
+    for name in PRELOAD_FILES:
+        path = os.path.join(script_dir, name)
+        if os.path.exists(path):
+            cache.get(path)
+        else:
+            print(f"  ⚠️  Not found, skipping: {name}")
+
+    def watch():
+        while not stop_event.wait(WATCH_INTERVAL):
+            cache.refresh_changed()
+
+    threading.Thread(target=watch, daemon=True).start()
+
+    authkey = _authkey()
+    listener = Listener((CACHE_HOST, CACHE_PORT), authkey=authkey)
+    # accept() blocks, so a helper thread wakes it when a stop is requested
+    def close_on_stop():
+        stop_event.wait()
+        try:
+            Client((CACHE_HOST, CACHE_PORT), authkey=authkey).close()
+        except OSError:
+            pass
+
+    threading.Thread(target=close_on_stop, daemon=True).start()
+
+    print("\n✓ Ready. Scripts using read_artifact() will now load from memory.")
+    try:
+        while not stop_event.is_set():
+            try:
+                conn = listener.accept()
+            except Exception:
+                continue
+            if stop_event.is_set():
+                conn.close()
+                break
+            threading.Thread(target=_handle_connection, args=(cache, conn, stop_event), daemon=True).start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_event.set()
+        listener.close()
+        cache.close()
+        print("\n✓ Cache daemon stopped, shared memory released")
+
+
+def _request(message):
+    conn = Client((CACHE_HOST, CACHE_PORT), authkey=_authkey())
+    try:
+        conn.send(message)
+        return conn.recv()
+    finally:
+        conn.close()
+
+
+def read_artifact(path, writable=False, **read_csv_kwargs):
+    """
+    Drop-in replacement for pd.read_csv(path) backed by the cache daemon
+    Numeric columns are mapped read-only straight from shared memory; text
+    columns are rebuilt as regular object columns. Any read_csv options, or
+    a daemon that isn't running, fall back to a normal pd.read_csv()
+    (float columns read as float32 if the file wouldn't fit the memory budget).
+
+    READ-ONLY: a served frame's numeric columns are the daemon's memory, so
+    writing into them in place (df.loc[...] = ..., fillna(inplace=True),
+    df.values[...] = ...) raises "assignment destination is read-only".
+    Adding, dropping or replacing whole columns is fine. Pass writable=True
+    to get private copies of the columns instead.
+    """
+    if read_csv_kwargs or not os.path.exists(path):
+        return pd.read_csv(path, **read_csv_kwargs)
+
+    try:
+        response = _request({'cmd': 'get', 'path': _artifact_key(path)})
+    except (ConnectionRefusedError, OSError, EOFError):   # Includes a key file others can read
+        return read_csv_budgeted(path)
+
+    if not response.get('ok'):
+        print(f"⚠️  Artifact cache error ({response.get('error')}), reading file directly")
+        return read_csv_budgeted(path)
+
+    spec = response['spec']
+    try:
+        arrays, segments = attach(spec, readonly=True, track=False)
+    except FileNotFoundError:
+        # The file changed and the daemon swapped segments mid-request
+        return read_csv_budgeted(path)
+    _ATTACHED_SEGMENTS.extend(segments)
+
+    data = {}
+    for name in response['columns']:
+        categories = spec[name].get('categories')
+        if categories is not None:
+            codes = arrays[name]
+            lookup = np.array(list(categories) + [np.nan], dtype=object)
+            data[name] = lookup[codes]  # code -1 (missing) picks the trailing NaN
+        else:
+            data[name] = arrays[name].copy() if writable else arrays[name]
+    return pd.DataFrame(data, copy=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Artifact cache daemon")
+    parser.add_argument('command', nargs='?', default='serve', choices=['serve', 'status', 'stop'])
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve()
+        return
+
+    try:
+        response = _request({'cmd': args.command})
+    except PermissionError as e:
+        print(f"✗ {e}")
+        return
+    except (ConnectionRefusedError, OSError):
+        print("Cache daemon is not running")
+        return
+
+    if args.command == 'stop':
+        print("✓ Stop requested")
+    else:
+        artifacts = response['artifacts']
+        print(f"{len(artifacts)} cached artifact(s):")
+        for a in artifacts:
+            print(f"  {os.path.basename(a['path']):40s} {a['rows']:>10,} rows  "
+                  f"{a['nbytes'] / 1024**2:8.1f} MB  hits={a['hits']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Rule-based calendar dates for any year (holidays and the CPS school calendar)
+
+The holiday stages (14, 18) and the school stage (20) used to list dates for
+2023-2025 only. These rules produce the same dates for those years and extend
+them to the full 2001-2025 history (and to the 2026 prediction year):
+
+    violent holidays   Dec 30, Dec 31, Jan 1 of the next year
+                       Jul 3-5
+                       Thanksgiving (4th Thursday of November) + Black Friday
+    theft holidays     Dec 20-25 + Black Friday
+
+The school calendar (stage 20) keeps the published CPS calendars it lists and
+falls back to school_breaks() / school_single_days() for other years:
+
+    winter break       Dec 22 - Jan 2
+    spring break       last full Monday-Friday week of March
+    summer break       2nd Friday of June - Sunday before the 3rd Monday of August
+    thanksgiving       Monday-Friday of Thanksgiving week
+    single days        MLK Day, Presidents Day, Labor Day, Indigenous Peoples Day,
+                       Veterans Day
+
+PIPELINE_YEARS (e.g. "2001-2025" or "2023,2024,2025") selects the years the
+pipeline keeps in stage 04; the holiday stages use the same span so that year
+partitions (see full_history.py) flag the same dates as one full run.
+"""
+
+import os
+from datetime import date, timedelta
+
+
+def parse_years(text):
+    """'2001-2025' or '2023,2024,2025' -> sorted list of ints"""
+    years = set()
+    for part in text.replace(' ', '').split(','):
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-', 1)
+            years.update(range(int(first), int(last) + 1))
+        else:
+            years.add(int(part))
+    if not years:
+        raise ValueError(f"No years in {text!r}")
+    return sorted(years)
+
+
+def pipeline_years(default):
+    """Years selected by PIPELINE_YEARS, else `default`"""
+    text = os.environ.get('PIPELINE_YEARS')
+    return parse_years(text) if text else sorted(default)
+
+
+def nth_weekday(year, month, weekday, n):
+    """n-th given weekday (Monday=0) of a month, e.g. Thanksgiving = (11, 3, 4)"""
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def thanksgiving(year):
+    return nth_weekday(year, 11, 3, 4)
+
+
+def _days(start, count):
+    return [start + timedelta(days=i) for i in range(count)]
+
+
+def violent_holiday_dates(years):
+    """NYE (Dec 30 - Jan 1), July 4th (Jul 3-5), Thanksgiving + Black Friday"""
+    dates = []
+    for year in years:
+        dates += _days(date(year, 12, 30), 3)
+        dates += _days(date(year, 7, 3), 3)
+        dates += _days(thanksgiving(year), 2)
+    return sorted(d.isoformat() for d in dates)
+
+
+def theft_holiday_dates(years):
+    """Christmas shopping (Dec 20-25) and Black Friday"""
+    dates = []
+    for year in years:
+        dates += _days(date(year, 12, 20), 6)
+        dates.append(thanksgiving(year) + timedelta(days=1))
+    return sorted(d.isoformat() for d in dates)
+
+
+def school_breaks(year):
+    """Rule-based CPS break periods touching `year`, as {name: (start, end)} strings"""
+    march_31 = date(year, 3, 31)
+    spring_start = march_31 - timedelta(days=(march_31.weekday() - 4) % 7 + 4)
+    summer_end = nth_weekday(year, 8, 0, 3) - timedelta(days=1)
+    thanksgiving_monday = thanksgiving(year) - timedelta(days=3)
+
+    periods = {
+        f'winter_break_{year - 1}': (date(year - 1, 12, 22), date(year, 1, 2)),
+        'spring_break': (spring_start, spring_start + timedelta(days=4)),
+        'summer_break': (nth_weekday(year, 6, 4, 2), summer_end),
+        'thanksgiving': (thanksgiving_monday, thanksgiving_monday + timedelta(days=4)),
+        f'winter_break_{year}': (date(year, 12, 22), date(year + 1, 1, 2)),
+    }
+    return {name: (start.isoformat(), end.isoformat()) for name, (start, end) in periods.items()}
+
+
+def school_single_days(year):
+    """Rule-based single-day CPS holidays in `year`"""
+    return [
+        nth_weekday(year, 1, 0, 3).isoformat(),   # MLK Day
+        nth_weekday(year, 2, 0, 3).isoformat(),   # Presidents Day
+        nth_weekday(year, 9, 0, 1).isoformat(),   # Labor Day
+        nth_weekday(year, 10, 0, 2).isoformat(),  # Indigenous Peoples Day
+        date(year, 11, 11).isoformat(),           # Veterans Day
+    ]
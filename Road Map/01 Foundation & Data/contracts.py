@@ -0,0 +1,344 @@
+"""
+Pre-flight column contract check: validates the whole chain in seconds,
+before any stage loads data
+
+Every stage declares its column contract next to INPUT_FILE / OUTPUT_FILE:
+    INPUT_COLUMNS    columns it needs from INPUT_FILE
+    ADD_COLUMNS      columns it appends (the others pass through)
+    DROP_COLUMNS     input columns it doesn't write
+    KEEP_COLUMNS     the only columns it writes, in order (also all required)
+    OUTPUT_COLUMNS   the exact columns it writes, when rows are rebuilt (stage 18)
+Training declares TARGET and DROP_FEATURES (its features are the input's
+columns minus both); prediction declares FEATURE_COLUMNS, the model inputs
+it builds.
+
+From these declarations alone (read with read_config, nothing is imported),
+the columns of every artifact are derived from the first stage onwards.
+Checked for each script about to run:
+  ✗ its input file is missing and no earlier stage in this run writes it
+  ✗ a required column isn't in its input (with the closest existing name)
+  ✗ the prediction grid's features differ from the model's (names or order)
+  ⚠️ an artifact on disk doesn't match its contract (stale: rerun its stage)
+  ⚠️ a stage reads past another stage's output that nothing else reads
+  ⚠️ a drop list names columns that aren't there
+Only headers (first line) and the feature list of the model file are read.
+
+Usage:
+    python contracts.py                 # every stage and model script
+    python contracts.py 18 24 01_train  # scripts starting with these names
+The CLI, 01_run_pipeline.py and refresh_service.py run it before starting
+(skip with --no-preflight or PIPELINE_PREFLIGHT=0).
+"""
+
+import argparse
+import difflib
+import json
+import os
+import re
+import sys
+import time
+
+from pipeline_utils import SCRIPT_DIR, read_config
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+MODELS_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, '..', '02 Create Prediction Models'))
+SCRIPT_FOLDERS = [SCRIPT_DIR, MODELS_DIR]   # Numbered scripts here take part in the chain
+MODEL_HEADER_BYTES = 1 << 20                # The model JSON lists feature_names near the start
+# ============================================================
+
+CONTRACT_KEYS = ['INPUT_COLUMNS', 'ADD_COLUMNS', 'DROP_COLUMNS', 'KEEP_COLUMNS',
+                 'OUTPUT_COLUMNS', 'TARGET', 'FEATURE_COLUMNS']
+
+
+def enabled():
+    return os.environ.get('PIPELINE_PREFLIGHT', '1') != '0'
+
+
+# ============================================================
+# CONTRACTS AND ARTIFACTS
+# ============================================================
+
+class Stage:
+    """One script's files and column contract, as declared in its constants"""
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.name = os.path.basename(path)
+        folder = os.path.dirname(self.path)
+        self.config = read_config(self.path)
+
+        def resolve(key):
+            value = self.config.get(key)
+            return os.path.normpath(os.path.join(folder, value)) if isinstance(value, str) else None
+
+        self.input = resolve('INPUT_FILE')
+        self.output = resolve('OUTPUT_FILE')
+        self.model_output = resolve('MODEL_OUTPUT')   # Training
+        self.model_file = resolve('MODEL_FILE')       # Prediction
+        self.has_contract = any(key in self.config for key in CONTRACT_KEYS)
+
+    def get(self, key):
+        return self.config.get(key) or []
+
+    def required(self):
+        return self.get('INPUT_COLUMNS') + self.get('KEEP_COLUMNS') + (
+            [self.config['TARGET']] if 'TARGET' in self.config else [])
+
+    def output_columns(self, columns):
+        """Columns written, given the input's columns (None = unknown)"""
+        if self.get('KEEP_COLUMNS'):
+            return list(self.get('KEEP_COLUMNS'))
+        if self.get('OUTPUT_COLUMNS'):
+            return list(self.get('OUTPUT_COLUMNS'))
+        if columns is None:
+            return None
+        dropped = set(self.get('DROP_COLUMNS'))
+        kept = [c for c in columns if c not in dropped]
+        return kept + [c for c in self.get('ADD_COLUMNS') if c not in kept]
+
+    def features(self, columns):
+        """Training: model features, given the training file's columns"""
+        if columns is None:
+            return None
+        dropped = set(self.get('DROP_FEATURES')) | {self.config.get('TARGET')}
+        return [c for c in columns if c not in dropped]
+
+
+def known_stages():
+    """Every numbered, non-deprecated script, in chain order (pipeline, then models)"""
+    stages = []
+    for folder in SCRIPT_FOLDERS:
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if name.endswith('.py') and name[:2].isdigit() and 'deprecated' not in name:
+                stages.append(Stage(os.path.join(folder, name)))
+    return stages
+
+
+def csv_header(path):
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        line = f.readline().rstrip('\r\n')
+    return [column.strip('"') for column in line.split(',')] if line else []
+
+
+def model_features(path):
+    """feature_names stored in an XGBoost JSON model (None if not recorded)"""
+    with open(path, 'rb') as f:
+        head = f.read(MODEL_HEADER_BYTES).decode('utf-8', 'replace')
+    match = re.search(r'"feature_names"\s*:\s*(\[[^\]]*\])', head)
+    if match:
+        return json.loads(match.group(1)) or None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f).get('learner', {}).get('feature_names') or None
+
+
+def closest(column, columns):
+    match = difflib.get_close_matches(column, columns, n=1, cutoff=0.6)
+    return f" (did you mean '{match[0]}'?)" if match else ""
+
+
+class Chain:
+    """Derives artifact columns from the contracts of the stages that write them"""
+
+    def __init__(self, stages):
+        self.stages = stages
+        self.producers = {}
+        for stage in stages:
+            for path in (stage.output, stage.model_output):
+                if path:
+                    self.producers[path] = stage
+        self._columns = {}
+
+    def readers(self, path):
+        return [s for s in self.stages if path in (s.input, s.model_file)]
+
+    def columns(self, path):
+        """Columns the contracts say `path` has (the header on disk when no contract covers it)"""
+        if path not in self._columns:
+            self._columns[path] = None   # Guards against cycles
+            producer = self.producers.get(path)
+            if producer is not None and producer.has_contract:
+                upstream = self.columns(producer.input) if producer.input else None
+                self._columns[path] = producer.output_columns(upstream)
+            elif os.path.exists(path) and path.endswith('.csv'):
+                self._columns[path] = csv_header(path)
+        return self._columns[path]
+
+    def model_features(self, model_path):
+        """Features the training contract gives the model written to `model_path`"""
+        trainer = self.producers.get(model_path)
+        if trainer is None or trainer.input is None:
+            return None
+        return trainer.features(self.columns(trainer.input))
+
+
+# ============================================================
+# CHECKS
+# ============================================================
+
+def check_stage(stage, chain, produced, errors, warnings):
+    """Checks one script; `produced` holds the files earlier scripts in this run write"""
+    short = lambda path: os.path.basename(path)
+
+    columns = None
+    if stage.input:
+        read_as_is = stage.input not in produced
+        producer = chain.producers.get(stage.input)
+        expected = chain.columns(stage.input)
+
+        if read_as_is and not os.path.exists(stage.input):
+            source = f"run {producer.name} first" if producer else "no stage writes it"
+            errors.append(f"{short(stage.input)} not found ({source})")
+        elif read_as_is and stage.input.endswith('.csv'):
+            # This file is read as it is on disk: its header is what counts
+            columns = csv_header(stage.input)
+            if expected is not None and producer is not None and producer.has_contract and columns != expected:
+                missing = [c for c in expected if c not in columns]
+                extra = [c for c in columns if c not in expected]
+                detail = "; ".join(part for part in (
+                    f"missing {missing}" if missing else "", f"unexpected {extra}" if extra else "",
+                    "different order" if not (missing or extra) else "") if part)
+                warnings.append(f"{short(stage.input)} on disk doesn't match {producer.name}'s contract "
+                                f"({detail}) - stale? rerun from {producer.name}")
+        else:
+            columns = expected
+
+        # A stage that reads past the previous stage's output (which nothing reads)
+        if producer is not None and producer in chain.stages and stage in chain.stages:
+            between = chain.stages[chain.stages.index(producer) + 1:chain.stages.index(stage)]
+            for skipped in between:
+                if (skipped.has_contract and skipped.output and skipped.output.endswith('.csv')
+                        and not chain.readers(skipped.output)):
+                    warnings.append(f"reads {short(stage.input)} from {producer.name}, skipping "
+                                    f"{short(skipped.output)} from {skipped.name}, which nothing reads")
+
+    if columns is not None:
+        for column in stage.required():
+            if column not in columns:
+                errors.append(f"needs '{column}', not in {short(stage.input)}{closest(column, columns)}")
+        missing_drops = [c for c in stage.get('DROP_COLUMNS') if c not in columns]
+        if missing_drops:
+            warnings.append(f"DROP_COLUMNS not in {short(stage.input)}: {missing_drops}")
+
+    notes = []
+    if 'TARGET' in stage.config and columns is not None:
+        features = stage.features(columns)
+        missing_drops = [c for c in stage.get('DROP_FEATURES') if c not in columns]
+        if missing_drops:
+            warnings.append(f"DROP_FEATURES not in {short(stage.input)}: {missing_drops}")
+        notes.append(f"{short(stage.input)} has {len(columns) - 1} feature column(s); "
+                     f"training drops {len(columns) - 1 - len(features)} -> model uses "
+                     f"{len(features)}: {features}")
+        if stage.model_output and os.path.exists(stage.model_output):
+            on_disk = model_features(stage.model_output)
+            if on_disk is not None and on_disk != features:
+                warnings.append(f"existing {short(stage.model_output)} was trained on {on_disk} "
+                                f"(this run replaces it)")
+
+    if 'FEATURE_COLUMNS' in stage.config and stage.model_file:
+        built = stage.get('FEATURE_COLUMNS')
+        if stage.model_file in produced:
+            expected, source = chain.model_features(stage.model_file), "the training contract"
+        elif os.path.exists(stage.model_file):
+            expected, source = model_features(stage.model_file), short(stage.model_file)
+        else:
+            expected, source = None, None
+            errors.append(f"{short(stage.model_file)} not found (train the model first)")
+        if expected is not None and built != expected:
+            if sorted(built) == sorted(expected):
+                errors.append(f"FEATURE_COLUMNS order {built} differs from {source}: {expected}")
+            else:
+                for column in built:
+                    if column not in expected:
+                        errors.append(f"builds feature '{column}', which {source} doesn't have"
+                                      f"{closest(column, expected)}")
+                for column in expected:
+                    if column not in built:
+                        errors.append(f"doesn't build '{column}', which {source} needs"
+                                      f"{closest(column, built)}")
+        trained = chain.model_features(stage.model_file)
+        if source != "the training contract" and expected is not None and trained not in (None, expected):
+            warnings.append(f"{short(stage.model_file)} features {expected} differ from the training "
+                            f"contract {trained} - retrain")
+    return notes
+
+
+def check(script_paths, quiet=False):
+    """
+    Check the scripts (in run order) against the whole chain
+    Prints a report unless quiet; returns (errors, warnings) as counts.
+    """
+    start = time.perf_counter()
+    stages = known_stages()
+    by_path = {stage.path: stage for stage in stages}
+    chain = Chain(stages)
+
+    if not quiet:
+        print("=" * 70)
+        print("PRE-FLIGHT CONTRACT CHECK")
+        print("=" * 70)
+
+    total_errors = total_warnings = 0
+    produced = set()
+    for path in script_paths:
+        stage = by_path.get(os.path.abspath(path)) or Stage(path)
+        errors, warnings = [], []
+        notes = check_stage(stage, chain, produced, errors, warnings) if stage.has_contract else []
+        produced.update(p for p in (stage.output, stage.model_output) if p)
+        total_errors += len(errors)
+        total_warnings += len(warnings)
+
+        if quiet:
+            continue
+        if not stage.has_contract:
+            print(f"  - {stage.name} (no column contract)")
+            continue
+        columns = chain.columns(stage.output) if stage.output else None
+        summary = f"-> {len(columns)} columns" if columns and 'FEATURE_COLUMNS' not in stage.config else ""
+        mark = "✗" if errors else "⚠️ " if warnings else "✓"
+        print(f"  {mark} {stage.name} {summary}".rstrip())
+        for message in errors:
+            print(f"      ✗ {message}")
+        for message in warnings:
+            print(f"      ⚠️  {message}")
+        for message in notes:
+            print(f"      ℹ️  {message}")
+
+    if not quiet:
+        print("-" * 70)
+        mark = "✗" if total_errors else "✓"
+        print(f"{mark} {len(script_paths)} script(s) checked in {time.perf_counter() - start:.2f}s: "
+              f"{total_errors} error(s), {total_warnings} warning(s)")
+    return total_errors, total_warnings
+
+
+def preflight(script_paths):
+    """Runs the check before a pipeline run; False when the run would fail on a contract"""
+    if not enabled():
+        return True
+    errors, _ = check(script_paths)
+    if errors:
+        print("\n✗ Fix the contract errors above before running "
+              "(or skip this check with --no-preflight / PIPELINE_PREFLIGHT=0)")
+    return errors == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the column contracts of the pipeline scripts")
+    parser.add_argument('scripts', nargs='*', help="script names or prefixes (default: all)")
+    args = parser.parse_args()
+
+    stages = [s for s in known_stages() if s.input or s.output or s.model_file]
+    if args.scripts:
+        stages = [s for s in stages if any(s.name.startswith(prefix) for prefix in args.scripts)]
+        if not stages:
+            raise SystemExit(f"✗ No script starts with {args.scripts}")
+    errors, _ = check([stage.path for stage in stages])
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
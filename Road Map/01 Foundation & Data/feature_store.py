@@ -0,0 +1,222 @@
+"""
+Feature store: block features defined once, for training and prediction
+
+Every feature that follows from a block's keys alone - its Community Area and
+block_datetime (the start of the 3-hour block) - is one vectorized function
+here. Stage 13 flags crimes with them, stage 18 fills the zero-crime blocks
+with them, and 02_generate_prediction_data.py builds its grid from them, so
+a future block gets exactly the values a training block with the same keys
+had. Before, stage 13 flagged hours, stage 18 re-derived the flags per block,
+and the prediction grid used a third rule of its own (Fri/Sat blocks 6, 7, 0).
+
+Features that need observed data (weather, events) stay in their stages.
+
+table(start, end) materializes the keys (every area x day x block) and the
+features for any date range, historical or future, as a cached table under
+feature_cache/<key>/ (one .npy file per column). The key covers the range,
+the areas, the features, PIPELINE_YEARS and the source of this module and
+the modules it imports, so changing a definition builds a new table.
+
+Usage:
+    python feature_store.py --start 2026-01-01 --end 2026-12-31
+    python feature_store.py --start 2023-01-01 --end 2025-12-31 --features weekend_night_peak
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from calendar_rules import pipeline_years, violent_holiday_dates, theft_holiday_dates
+from pipeline_utils import script_dependencies
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'feature_cache')
+KEEP_TABLES = 4
+BLOCK_HOURS = 3
+BLOCKS_PER_DAY = 24 // BLOCK_HOURS
+COMMUNITY_AREAS = list(range(1, 78))
+# ============================================================
+
+AREA = 'Community Area'
+WHEN = 'block_datetime'
+
+
+# ============================================================
+# FEATURE DEFINITIONS - f(area, when) -> array, one value per key
+# `when` is a datetime Series (any time inside the block will do)
+# ============================================================
+
+def time_block(area, when):
+    """0-7: 0 = 00-03, 1 = 03-06, ..., 7 = 21-24"""
+    return (when.dt.hour // BLOCK_HOURS).to_numpy()
+
+
+def year(area, when):
+    return when.dt.year.to_numpy()
+
+
+def day_of_week(area, when):
+    """0 = Monday ... 6 = Sunday"""
+    return when.dt.dayofweek.to_numpy()
+
+
+def month(area, when):
+    return when.dt.month.to_numpy()
+
+
+def weekend_night_peak(area, when):
+    """Fri 21-24, Sat 00-03, Sat 21-24, Sun 00-03"""
+    dow, tb = day_of_week(area, when), time_block(area, when)
+    return (((dow == 4) & (tb == 7)) | ((dow == 5) & ((tb == 0) | (tb == 7)))
+            | ((dow == 6) & (tb == 0))).astype(int)
+
+
+def weekend_regular(area, when):
+    """Fri 18-21, Sat 03-21, Sun 03-24"""
+    dow, tb = day_of_week(area, when), time_block(area, when)
+    return (((dow == 4) & (tb == 6)) | ((dow == 5) & (tb >= 1) & (tb <= 6))
+            | ((dow == 6) & (tb >= 1))).astype(int)
+
+
+def _on_dates(when, dates_for_years):
+    dates = pd.to_datetime(dates_for_years(pipeline_years(when.dt.year.unique())))
+    return when.dt.normalize().isin(dates).astype(int).to_numpy()
+
+
+def is_violent_holiday(area, when):
+    """calendar_rules.violent_holiday_dates over PIPELINE_YEARS (else the keys' years)"""
+    return _on_dates(when, violent_holiday_dates)
+
+
+def is_theft_holiday(area, when):
+    """calendar_rules.theft_holiday_dates over PIPELINE_YEARS (else the keys' years)"""
+    return _on_dates(when, theft_holiday_dates)
+
+
+FEATURES = {
+    'time_block': time_block,
+    'Year': year,
+    'day_of_week': day_of_week,
+    'month': month,
+    'weekend_night_peak': weekend_night_peak,
+    'weekend_regular': weekend_regular,
+    'is_violent_holiday': is_violent_holiday,
+    'is_theft_holiday': is_theft_holiday,
+}
+
+
+# ============================================================
+# COMPUTING / MATERIALIZING
+# ============================================================
+
+def compute(names, when, area=None):
+    """DataFrame of the named features for the keys (area may be None when no feature needs it)"""
+    unknown = [name for name in names if name not in FEATURES]
+    if unknown:
+        raise KeyError(f"not in the feature store: {unknown} (known: {list(FEATURES)})")
+    when = pd.Series(pd.to_datetime(when)).reset_index(drop=True)
+    area = None if area is None else np.asarray(area)
+    return pd.DataFrame({name: FEATURES[name](area, when) for name in names})
+
+
+def grid(start, end, areas=None):
+    """Keys of every area x day x block from start to end (inclusive), date-major"""
+    areas = np.asarray(COMMUNITY_AREAS if areas is None else areas)
+    days = pd.date_range(start, end, freq='D')
+    offsets = pd.to_timedelta(np.arange(BLOCKS_PER_DAY) * BLOCK_HOURS, unit='h')
+    starts = days.values[:, None] + offsets.values[None, :]   # (day, block)
+    return pd.DataFrame({
+        AREA: np.tile(np.repeat(areas, BLOCKS_PER_DAY), len(days)),
+        WHEN: np.repeat(starts, len(areas), axis=0).ravel(),   # each day's blocks once per area
+    })
+
+
+def definition_hash():
+    """Hash of this module and the local modules it imports"""
+    digest = hashlib.blake2b(digest_size=12)
+    for path in script_dependencies([os.path.abspath(__file__)]):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def table_key(start, end, areas, names):
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(json.dumps({
+        'start': str(pd.Timestamp(start).date()), 'end': str(pd.Timestamp(end).date()),
+        'areas': [int(a) for a in areas], 'features': list(names),
+        'years': os.environ.get('PIPELINE_YEARS', ''), 'definitions': definition_hash(),
+    }, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def table(start, end, areas=None, names=None, cache=True):
+    """
+    Keys (Community Area, block_datetime) plus features for start..end, date-major
+    Loaded from feature_cache/ when this range was materialized with the same
+    definitions before. Returns (DataFrame, {'key', 'cached', 'seconds'})
+    """
+    areas = COMMUNITY_AREAS if areas is None else list(areas)
+    names = list(FEATURES) if names is None else list(names)
+    key = table_key(start, end, areas, names)
+    folder = os.path.join(CACHE_DIR, key)
+    begin = time.perf_counter()
+
+    if cache and os.path.exists(os.path.join(folder, 'meta.json')):
+        with open(os.path.join(folder, 'meta.json')) as f:
+            columns = json.load(f)['columns']
+        df = pd.DataFrame({column: np.load(os.path.join(folder, f'{i}.npy'))
+                           for i, column in enumerate(columns)})
+        os.utime(folder)
+        return df, {'key': key, 'cached': True, 'seconds': time.perf_counter() - begin}
+
+    keys = grid(start, end, areas)
+    df = pd.concat([keys, compute(names, keys[WHEN], keys[AREA])], axis=1)
+    if cache:
+        partial = folder + f'.partial{os.getpid()}'
+        shutil.rmtree(partial, ignore_errors=True)
+        os.makedirs(partial)
+        for i, column in enumerate(df.columns):
+            np.save(os.path.join(partial, f'{i}.npy'), df[column].to_numpy())
+        with open(os.path.join(partial, 'meta.json'), 'w') as f:
+            json.dump({'columns': list(df.columns), 'rows': len(df), 'start': str(start), 'end': str(end),
+                       'created': time.strftime('%Y-%m-%d %H:%M:%S')}, f, indent=2)
+        shutil.rmtree(folder, ignore_errors=True)
+        os.replace(partial, folder)
+        prune()
+    return df, {'key': key, 'cached': False, 'seconds': time.perf_counter() - begin}
+
+
+def prune(keep=KEEP_TABLES):
+    """Delete all but the `keep` most recently used tables"""
+    tables = [(os.path.getmtime(os.path.join(CACHE_DIR, name)), name) for name in os.listdir(CACHE_DIR)
+              if '.partial' not in name and os.path.isdir(os.path.join(CACHE_DIR, name))]
+    for _, name in sorted(tables, reverse=True)[keep:]:
+        shutil.rmtree(os.path.join(CACHE_DIR, name), ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Materialize a feature table for a date range")
+    parser.add_argument('--start', required=True, help="first day (YYYY-MM-DD)")
+    parser.add_argument('--end', required=True, help="last day (YYYY-MM-DD)")
+    parser.add_argument('--features', nargs='+', choices=list(FEATURES), help="default: all")
+    args = parser.parse_args(argv)
+
+    df, info = table(args.start, args.end, names=args.features)
+    print(f"{'✓ Cached' if info['cached'] else '✓ Built'} table {info['key']}: {len(df):,} blocks x "
+          f"{len(df.columns) - 2} feature(s) in {info['seconds'] * 1000:.0f} ms")
+    print(df.head(BLOCKS_PER_DAY).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
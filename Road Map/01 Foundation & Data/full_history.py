@@ -0,0 +1,365 @@
+"""
+FULL-HISTORY FEATURE BUILD (2001-2025), ONE YEAR PARTITION AT A TIME
+Builds 24.1_training_ready.csv from every year in 11.1_severity_added.csv
+without ever holding more than one year of rows per process
+
+Feature stages 13-24 only look at one day at a time (the heat_DI / cold_DI
+fill in stage 18 averages over the same block on the same day), so each year
+can be processed on its own. What must stay global is pinned per partition:
+  - stage 18's zero-crime grid: every Community Area in the full data, and the
+    year's days inside the full date range (PIPELINE_GRID_*)
+  - holiday years: the partition's year and the year before (Jan 1 belongs
+    to the previous year's New Year's Eve), within the PIPELINE_YEARS span
+Stage 10's rare-combination threshold is applied before this script, over all
+years, by the normal ingest run.
+
+Steps:
+  [1/3] Split 11.1 into partitions/<year>/ (streamed in chunks; each year's
+        rows are appended to its own file, so nothing is held in memory)
+  [2/3] Run stages 13-24 inside each partition folder (a copy of the scripts).
+        Partitions run side by side only as far as the memory budget allows.
+        A partition is rebuilt only when its crimes, its pinned settings or
+        the stage scripts (or modules they import) changed (fingerprint in
+        partitions/<year>/.complete), so an interrupted run resumes and a
+        nightly refresh after new data only rebuilds the current year.
+  [3/3] Append the partition outputs, oldest year first, to 24.1_training_ready.csv
+
+Rows come out year-major (sorted by Community Area / date / block within each
+year) instead of Community Area-major; training shuffles rows in its split.
+
+Usage:
+    PIPELINE_YEARS=2001-2025 python chicago_crime.py ingest   # 04-11, all years
+    python full_history.py
+    python full_history.py --memory-budget 8 --workers 2   # GB, see memory_budget.py
+    python full_history.py --restart                          # ignore finished partitions
+"""
+
+# ============================================================
+# FILE PATHS - CONFIGURE HERE
+# ============================================================
+INPUT_FILE = '11.1_severity_added.csv'
+OUTPUT_FILE = '24.1_training_ready.csv'
+PARTITION_DIR = 'partitions'
+
+PARTITION_STAGES = [
+    '13_adding_weekly_columns.py',
+    '14_adding_holidays.py',
+    '15_download_add_weather.py',
+    '16_weather_DI_add.py',
+    '17_column_truncator.py',
+    '18_3h_blocks_0_crime_blocks.py',
+    '20_school_in_out.py',
+    '21_big_events.py',
+    '22_moon_illumination.py',
+    '23_add_solar_altitude.py',
+    '24_pretain_prune.py',
+]
+
+# Peak-memory model of one partition (from the 1M-row benchmark: stages 20-23
+# peak at ~1 KB per 3-hour block row, the crime-level stages far lower)
+PROCESS_OVERHEAD_MB = 150
+BYTES_PER_BLOCK_ROW = 1_000
+BYTES_PER_CRIME_ROW = 1_500
+
+CHUNK_SHARE = 0.25     # Share of the memory budget per chunk when splitting / concatenating
+DATE_FORMAT = '%m/%d/%Y %I:%M:%S %p'
+DONE_MARKER = '.complete'
+# ============================================================
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+import memory_budget
+from calendar_rules import parse_years
+from contracts import preflight
+from pipeline_utils import script_dependencies
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def split_by_year(input_file, partition_root):
+    """
+    Stream the crime file into one CSV per year
+    Returns the split summary: rows per year, full date range, Community Areas
+    """
+    for name in os.listdir(partition_root):
+        stale = os.path.join(partition_root, name, INPUT_FILE)
+        if os.path.exists(stale):
+            os.remove(stale)
+
+    rows = {}
+    areas = set()
+    first_date = last_date = None
+    for chunk in memory_budget.iter_csv(input_file, CHUNK_SHARE, dtype=str, keep_default_na=False):
+        dates = pd.to_datetime(chunk['Date'], format=DATE_FORMAT)
+        if first_date is None:
+            first_date, last_date = dates.min(), dates.max()
+        first_date, last_date = min(first_date, dates.min()), max(last_date, dates.max())
+        areas.update(area for area in chunk['Community Area'].unique() if area)
+
+        for year, rows_for_year in chunk.groupby(dates.dt.year.values):
+            folder = os.path.join(partition_root, str(year))
+            os.makedirs(folder, exist_ok=True)
+            path = os.path.join(folder, INPUT_FILE)
+            rows_for_year.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+            rows[str(year)] = rows.get(str(year), 0) + len(rows_for_year)
+        print(f"      {sum(rows.values()):,} rows split into {len(rows)} year(s)", end='\r')
+    print()
+
+    return {
+        'source_size': os.path.getsize(input_file),
+        'source_mtime': os.path.getmtime(input_file),
+        'rows': dict(sorted(rows.items())),
+        'first_date': first_date.strftime('%Y-%m-%d'),
+        'last_date': last_date.strftime('%Y-%m-%d'),
+        'areas': sorted(areas, key=float),
+    }
+
+
+def load_split(input_file, partition_root):
+    """Reuse an earlier split if the input file hasn't changed since"""
+    summary_path = os.path.join(partition_root, 'split.json')
+    if not os.path.exists(summary_path):
+        return None
+    with open(summary_path) as f:
+        summary = json.load(f)
+    if (summary['source_size'] != os.path.getsize(input_file)
+            or summary['source_mtime'] != os.path.getmtime(input_file)):
+        return None
+    return summary
+
+
+def partition_env(year, summary, workers, budget_gb):
+    """Environment that makes a partition's stages match one full run"""
+    first_year = summary['first_date'][:4]
+    last_year = summary['last_date'][:4]
+    span = parse_years(os.environ.get('PIPELINE_YEARS') or f'{first_year}-{last_year}')
+    env = dict(os.environ)
+    env['PIPELINE_YEARS'] = ','.join(str(y) for y in span if y in (int(year) - 1, int(year)))
+    env['PIPELINE_GRID_START'] = max(summary['first_date'], f'{year}-01-01')
+    env['PIPELINE_GRID_END'] = min(summary['last_date'], f'{year}-12-31')
+    env['PIPELINE_GRID_AREAS'] = ','.join(summary['areas'])
+    env['PIPELINE_WORKERS'] = str(workers)
+    env['PIPELINE_MEMORY_BUDGET'] = f'{budget_gb:.3f}GB'
+    return env
+
+
+def partition_fingerprint(folder, env):
+    """Hash of everything a partition's output depends on"""
+    digest = hashlib.sha256()
+    with open(os.path.join(folder, INPUT_FILE), 'rb') as f:
+        for block in iter(lambda: f.read(1 << 24), b''):
+            digest.update(block)
+    for name in ('PIPELINE_YEARS', 'PIPELINE_GRID_START', 'PIPELINE_GRID_END',
+                 'PIPELINE_GRID_AREAS', 'PIPELINE_WEATHER_FILE'):
+        digest.update(f'{name}={env.get(name, "")}\n'.encode())
+    for path in script_dependencies(os.path.join(script_dir, name) for name in PARTITION_STAGES):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def is_current(folder, fingerprint):
+    marker = os.path.join(folder, DONE_MARKER)
+    if not os.path.exists(marker):
+        return False
+    with open(marker) as f:
+        return f.read().strip() == fingerprint
+
+
+def estimate_partition_mb(crime_rows, areas, days):
+    block_rows = areas * days * 8
+    return PROCESS_OVERHEAD_MB + (block_rows * BYTES_PER_BLOCK_ROW + crime_rows * BYTES_PER_CRIME_ROW) / 1024 ** 2
+
+
+def run_partition(year, folder, env, fingerprint):
+    """Run stages 13-24 in one partition folder; returns (year, ok, seconds, failed stage)"""
+    start = time.perf_counter()
+    for name in os.listdir(script_dir):
+        if name.endswith('.py'):
+            shutil.copy2(os.path.join(script_dir, name), folder)
+
+    for stage in PARTITION_STAGES:
+        # Stages mark some outputs read-only; a resumed run must be able to replace them
+        for name in os.listdir(folder):
+            path = os.path.join(folder, name)
+            if os.path.isfile(path):
+                os.chmod(path, 0o644)
+        with open(os.path.join(folder, stage.replace('.py', '.log')), 'w') as log:
+            result = subprocess.run([sys.executable, stage], cwd=folder, env=env,
+                                    stdout=log, stderr=subprocess.STDOUT)
+        if result.returncode != 0:
+            return year, False, time.perf_counter() - start, stage
+
+    with open(os.path.join(folder, DONE_MARKER), 'w') as f:
+        f.write(fingerprint)
+    return year, True, time.perf_counter() - start, None
+
+
+def output_signature(path):
+    stat_result = os.stat(path)
+    return stat_result.st_size, stat_result.st_mtime_ns
+
+
+def concatenate(partition_root, years, output_file):
+    """Append each year's training rows to the output; returns (rows, columns)"""
+    if os.path.exists(output_file):
+        os.chmod(output_file, 0o644)
+        os.remove(output_file)
+
+    rows = 0
+    columns = None
+    for year in years:
+        path = os.path.join(partition_root, year, OUTPUT_FILE)
+        for chunk in memory_budget.iter_csv(path, CHUNK_SHARE):
+            if columns is None:
+                columns = list(chunk.columns)
+            elif list(chunk.columns) != columns:
+                raise ValueError(f"{year}: columns differ from the first partition")
+            chunk.to_csv(output_file, mode='a', header=rows == 0, index=False)
+            rows += len(chunk)
+    return rows, columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the training set for all years, one year at a time")
+    parser.add_argument('--memory-budget', metavar='GB',
+                        help="memory for all partitions running at once (default: PIPELINE_MEMORY_BUDGET)")
+    parser.add_argument('--workers', type=int, help="partitions run at once (default: as many as fit the budget)")
+    parser.add_argument('--restart', action='store_true', help="re-split and rebuild every partition")
+    parser.add_argument('--no-preflight', action='store_true', help="skip the column contract check")
+    args = parser.parse_args()
+    if args.memory_budget:
+        os.environ['PIPELINE_MEMORY_BUDGET'] = args.memory_budget
+    budget_gb = memory_budget.budget_gb()
+
+    input_file = os.path.join(script_dir, INPUT_FILE)
+    output_file = os.path.join(script_dir, OUTPUT_FILE)
+    partition_root = os.path.join(script_dir, PARTITION_DIR)
+
+    print("=" * 70)
+    print("FULL-HISTORY FEATURE BUILD (YEAR PARTITIONS)")
+    print("=" * 70)
+    print(f"\nInput:  {INPUT_FILE}")
+    print(f"Output: {OUTPUT_FILE}")
+    print(f"Memory budget: {memory_budget.budget_label()}")
+
+    if not os.path.exists(input_file):
+        print(f"\n✗ {INPUT_FILE} not found - run the ingest stages (04-11) first")
+        sys.exit(1)
+    if not args.no_preflight and not preflight([os.path.join(script_dir, name) for name in PARTITION_STAGES]):
+        sys.exit(1)
+
+    # Step 1: split
+    print("\n[1/3] Splitting crimes by year...")
+    if args.restart:
+        shutil.rmtree(partition_root, ignore_errors=True)
+    os.makedirs(partition_root, exist_ok=True)
+    summary = load_split(input_file, partition_root)
+    if summary:
+        print("      ✓ Input unchanged since the last split - reusing partitions")
+    else:
+        summary = split_by_year(input_file, partition_root)
+        with open(os.path.join(partition_root, 'split.json'), 'w') as f:
+            json.dump(summary, f, indent=2)
+    years = list(summary['rows'])
+    print(f"      Date range: {summary['first_date']} to {summary['last_date']}")
+    print(f"      Community Areas: {len(summary['areas'])}")
+    for year in years:
+        print(f"        {year}: {summary['rows'][year]:,} crimes")
+
+    # Step 2: features per partition
+    print("\n[2/3] Building features per year...")
+    estimates = {
+        year: estimate_partition_mb(summary['rows'][year], len(summary['areas']), 366)
+        for year in years
+    }
+    fit = max(1, int(budget_gb * 1024 // max(estimates.values())))
+    workers = args.workers or min(fit, os.cpu_count() or 1, len(years))
+    if workers > fit:
+        print(f"      ⚠️  {workers} partitions at once may exceed the budget (fits {fit})")
+    # Cores and memory are split between partitions running at once
+    stage_workers = max(1, (os.cpu_count() or 1) // workers)
+    print(f"      Largest partition: ~{max(estimates.values()):,.0f} MB")
+    print(f"      Partitions at once: {workers} ({stage_workers} worker(s) each)")
+
+    envs = {year: partition_env(year, summary, stage_workers, budget_gb / workers) for year in years}
+    fingerprints = {year: partition_fingerprint(os.path.join(partition_root, year), envs[year])
+                    for year in years}
+    pending = [year for year in years
+               if not is_current(os.path.join(partition_root, year), fingerprints[year])]
+    if len(pending) < len(years):
+        print(f"      ✓ {len(years) - len(pending)} partition(s) up to date - skipped")
+
+    start_time = time.perf_counter()
+    failures = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(run_partition, year, os.path.join(partition_root, year),
+                        envs[year], fingerprints[year])
+            for year in pending
+        ]
+        for future in as_completed(futures):
+            year, ok, seconds, failed_stage = future.result()
+            if ok:
+                print(f"      ✓ {year} ({seconds:.0f}s)")
+            else:
+                log = os.path.join(PARTITION_DIR, year, failed_stage.replace('.py', '.log'))
+                print(f"      ✗ {year}: {failed_stage} failed (log: {log})")
+                failures.append(year)
+
+    if failures:
+        print(f"\n✗ {len(failures)} partition(s) failed - fix and re-run to resume")
+        sys.exit(1)
+
+    # Step 3: concatenate (skipped when the output already holds these partitions)
+    print(f"\n[3/3] Writing {OUTPUT_FILE}...")
+    record_path = os.path.join(partition_root, 'output.json')
+    record = {'fingerprints': [fingerprints[year] for year in years]}
+    previous = {}
+    if os.path.exists(record_path):
+        with open(record_path) as f:
+            previous = json.load(f)
+    if (os.path.exists(output_file) and previous.get('fingerprints') == record['fingerprints']
+            and previous.get('signature') == list(output_signature(output_file))):
+        rows, columns = previous['rows'], previous['columns']
+        print("      ✓ Output already up to date")
+    else:
+        rows, columns = concatenate(partition_root, years, output_file)
+        os.chmod(output_file, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        record.update(rows=rows, columns=columns, signature=list(output_signature(output_file)))
+        with open(record_path, 'w') as f:
+            json.dump(record, f)
+
+    # Training loads the whole table (float64): warn before it can't fit
+    training_gb = rows * len(columns) * 8 * 3 / 1024 ** 3
+    file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
+
+    print("\n" + "=" * 70)
+    print("✓ COMPLETE!")
+    print("=" * 70)
+    print(f"Years: {years[0]}-{years[-1]} ({len(years)} partitions)")
+    print(f"Output: {OUTPUT_FILE}")
+    print(f"Rows: {rows:,}")
+    print(f"Columns: {len(columns)}")
+    print(f"File size: {file_size_mb:.1f} MB")
+    print(f"Build time: {time.perf_counter() - start_time:.0f}s")
+    print(f"Estimated training memory: ~{training_gb:.1f} GB")
+    if training_gb > budget_gb:
+        print(f"⚠️  Over the {memory_budget.budget_label()} budget - train on fewer years "
+              f"(PIPELINE_YEARS) or a larger machine")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
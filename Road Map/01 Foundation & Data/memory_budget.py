@@ -0,0 +1,170 @@
+"""
+Memory budget for the pipeline: chunk sizes and spill-to-disk
+
+One setting bounds how much memory the heavy steps use at a time:
+    PIPELINE_MEMORY_BUDGET=4          # GB (also "4GB", "512MB")
+The CLI, 01_run_pipeline.py and full_history.py set it from --memory-budget.
+Unset, the budget is MEMORY_FRACTION of the machine's physical memory.
+
+Stages don't check memory while running; they size their work up front:
+    df = read_csv(path)                           # floats as float32 if it won't fit
+    for chunk in iter_csv(path, share=0.25):      # CSV read in budget-sized pieces
+    rows = chunk_rows(bytes_per_row, share=0.5)   # rows to process at once
+    with SpillStore() as spill:                   # intermediates parked on disk
+        spill.append('partials', frame)
+        frame = spill.read('partials')
+
+`share` is the fraction of the budget a step may use, leaving room for what
+the stage already holds. With a generous budget everything fits in one chunk
+and the stages behave exactly as before.
+"""
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+DEFAULT_BUDGET_GB = None     # None = MEMORY_FRACTION of physical memory
+MEMORY_FRACTION = 0.6
+MIN_CHUNK_ROWS = 10_000      # Never process fewer rows than this at a time
+SAMPLE_ROWS = 10_000         # Rows parsed to estimate a CSV's in-memory size
+SPILL_DIR = None             # None = system temp directory
+# ============================================================
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+_UNITS = {'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'TB': 1024 ** 4}
+
+
+def parse_size(text):
+    """'4' / '4GB' / '512MB' -> bytes (a bare number is GB)"""
+    text = str(text).strip().upper().replace(' ', '')
+    for unit, factor in _UNITS.items():
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    return int(float(text) * _UNITS['GB'])
+
+
+def total_memory_bytes():
+    """Physical memory of this machine (None if it can't be determined)"""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def budget_bytes():
+    """The memory budget in bytes"""
+    configured = os.environ.get('PIPELINE_MEMORY_BUDGET') or DEFAULT_BUDGET_GB
+    if configured:
+        return parse_size(configured)
+    total = total_memory_bytes()
+    return int((total or 8 * _UNITS['GB']) * MEMORY_FRACTION)
+
+
+def budget_gb():
+    return budget_bytes() / _UNITS['GB']
+
+
+def budget_label():
+    """The budget for messages, e.g. '4.0 GB' or '512 MB'"""
+    gb = budget_gb()
+    return f"{gb:.1f} GB" if gb >= 1 else f"{gb * 1024:.0f} MB"
+
+
+def chunk_rows(bytes_per_row, share=1.0, minimum=MIN_CHUNK_ROWS):
+    """Rows of `bytes_per_row` each that fit in `share` of the budget"""
+    return max(minimum, int(budget_bytes() * share // max(bytes_per_row, 1)))
+
+
+def frame_bytes_per_row(df):
+    """In-memory bytes per row of a DataFrame (strings counted in full)"""
+    return df.memory_usage(deep=True, index=False).sum() / max(len(df), 1)
+
+
+def csv_bytes_per_row(path, **read_csv_kwargs):
+    """Estimated in-memory bytes per row of a CSV, from a parsed sample"""
+    sample = pd.read_csv(path, nrows=SAMPLE_ROWS, **read_csv_kwargs)
+    return frame_bytes_per_row(sample)
+
+
+def csv_frame_bytes(path, **read_csv_kwargs):
+    """Estimated in-memory size of a whole CSV once parsed"""
+    sample = pd.read_csv(path, nrows=SAMPLE_ROWS, **read_csv_kwargs)
+    if len(sample) < SAMPLE_ROWS:
+        return frame_bytes_per_row(sample) * len(sample)
+    # Scale by file size: the sample's share of the file's bytes
+    with open(path, 'rb') as f:
+        sample_file_bytes = sum(len(f.readline()) for _ in range(SAMPLE_ROWS + 1))
+    return frame_bytes_per_row(sample) * SAMPLE_ROWS * os.path.getsize(path) / sample_file_bytes
+
+
+def read_csv(path, share=0.5):
+    """
+    pd.read_csv(path), degraded when the parsed frame wouldn't fit `share` of the budget
+    Float columns are then read as float32 (what XGBoost uses internally
+    anyway), which halves their memory.
+    """
+    if csv_frame_bytes(path) <= budget_bytes() * share:
+        return pd.read_csv(path)
+    sample = pd.read_csv(path, nrows=SAMPLE_ROWS)
+    floats = {column: 'float32' for column in sample.columns if sample[column].dtype == 'float64'}
+    print(f"⚠️  {os.path.basename(path)} is larger than {share:.0%} of the "
+          f"{budget_label()} memory budget - reading {len(floats)} float column(s) as float32")
+    return pd.read_csv(path, dtype=floats)
+
+
+def iter_csv(path, share=0.25, **read_csv_kwargs):
+    """
+    Read a CSV in chunks that fit `share` of the budget
+    Yields the whole file as one frame when it fits
+    """
+    rows = chunk_rows(csv_bytes_per_row(path, **read_csv_kwargs), share)
+    yield from pd.read_csv(path, chunksize=rows, **read_csv_kwargs)
+
+
+class SpillStore:
+    """
+    Temporary columnar storage for intermediates that don't need to stay in memory
+    Each appended frame becomes one part: a folder with one .npy file per
+    column. Parts are read back in order, one at a time or concatenated.
+    The folder is deleted on close().
+    """
+
+    def __init__(self, prefix='pipeline_spill_'):
+        self.path = tempfile.mkdtemp(prefix=prefix, dir=SPILL_DIR)
+        self.parts = {}
+        self.bytes_written = 0
+
+    def append(self, name, df):
+        part = os.path.join(self.path, f'{name}_{len(self.parts.get(name, [])):05d}')
+        os.makedirs(part)
+        for i, column in enumerate(df.columns):
+            values = df[column].to_numpy()
+            np.save(os.path.join(part, f'{i:04d}.npy'), values, allow_pickle=values.dtype == object)
+        self.parts.setdefault(name, []).append((part, list(df.columns)))
+        self.bytes_written += sum(os.path.getsize(os.path.join(part, f)) for f in os.listdir(part))
+
+    def iter_parts(self, name):
+        for part, columns in self.parts.get(name, []):
+            yield pd.DataFrame({
+                column: np.load(os.path.join(part, f'{i:04d}.npy'), allow_pickle=True)
+                for i, column in enumerate(columns)
+            })
+
+    def read(self, name):
+        frames = list(self.iter_parts(name))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def close(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.parts = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
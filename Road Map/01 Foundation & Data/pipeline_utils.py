@@ -0,0 +1,202 @@
+"""
+Shared helpers for the pipeline scripts
+
+The numbered stage scripts can't be imported with a normal import statement
+(their names start with a digit), so load_stage() loads them by file name.
+Only stages that keep their work inside main() can be loaded this way.
+"""
+
+import ast
+import importlib.util
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def stage_path(script_name):
+    """Absolute path of a stage script (names are relative to this folder)"""
+    if os.path.isabs(script_name):
+        return script_name
+    return os.path.join(SCRIPT_DIR, script_name)
+
+
+def load_stage(script_name):
+    """
+    Import a numbered stage script as a module without running its main()
+    Modules are cached, so repeated calls (e.g. once per shard) are cheap
+    """
+    path = stage_path(script_name)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    module_name = 'stage_' + stem.replace('.', '_').replace(' ', '_')
+
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
+
+
+def run_script(script_path, argv=()):
+    """
+    Run a script in this interpreter as if started with `python script.py`
+    The working directory is switched to the script's folder (the scripts in
+    '02 Create Prediction Models' use paths relative to it). Modules such as
+    pandas stay imported between scripts, so a chain of stages pays the
+    import cost once instead of once per stage.
+    Returns True if the script finished without error.
+    """
+    import runpy
+    import traceback
+
+    script_path = os.path.abspath(script_path)
+    folder = os.path.dirname(script_path)
+    saved_cwd, saved_argv, saved_path = os.getcwd(), sys.argv, list(sys.path)
+
+    os.chdir(folder)
+    sys.argv = [script_path, *argv]
+    sys.path.insert(0, folder)
+    try:
+        runpy.run_path(script_path, run_name='__main__')
+        return True
+    except SystemExit as e:
+        return e.code in (None, 0)
+    except Exception:
+        traceback.print_exc()
+        return False
+    finally:
+        os.chdir(saved_cwd)
+        sys.argv = saved_argv
+        sys.path[:] = saved_path
+
+
+def _is_setup(node):
+    """Top-level statements run_imports() executes: imports, constants, sys.path changes"""
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return True
+    if isinstance(node, ast.Try):
+        return all(_is_setup(child) for child in node.body)
+    if isinstance(node, ast.Assign):
+        return all(isinstance(t, ast.Name) and t.id.isupper() for t in node.targets)
+    if isinstance(node, ast.If):   # e.g. `if PIPELINE_DIR not in sys.path:`
+        return 'sys.path' in ast.unparse(node.test) and all(_is_setup(child) for child in node.body)
+    if isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
+        return ast.unparse(node.value.func).startswith('sys.path.')
+    return False
+
+
+def run_imports(script_path):
+    """
+    Run only what a script imports at module level, as run_script() would
+    Top-level imports (also inside a top-level try), UPPER_CASE constants and
+    sys.path changes run in order with the script's folder as working
+    directory; everything else (reading data, imports inside functions or
+    behind other conditions) is skipped. chicago_crime.py startup-check uses
+    this to time what a subcommand imports before its first stage starts work.
+    """
+    script_path = os.path.abspath(script_path)
+    folder = os.path.dirname(script_path)
+    with open(script_path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), script_path)
+    setup = ast.Module(body=[node for node in tree.body if _is_setup(node)], type_ignores=[])
+
+    saved_cwd, saved_path = os.getcwd(), list(sys.path)
+    os.chdir(folder)
+    sys.path.insert(0, folder)
+    try:
+        exec(compile(setup, script_path, 'exec'), {'__name__': '__imports__', '__file__': script_path})
+    finally:
+        os.chdir(saved_cwd)
+        sys.path[:] = saved_path
+
+
+def read_config(script_name):
+    """
+    Literal UPPER_CASE constants assigned at the top level of a script
+    (INPUT_FILE, OUTPUT_FILE, THRESHOLD, ...), read without running it
+    """
+    with open(stage_path(script_name), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+
+    config = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target = node.targets[0]
+            if isinstance(target, ast.Name) and target.id.isupper():
+                try:
+                    config[target.id] = ast.literal_eval(node.value)
+                except ValueError:
+                    pass
+    return config
+
+
+def script_dependencies(script_names):
+    """
+    The scripts plus every local module they import (directly or through
+    each other, including load_stage('NN_...py') calls), as sorted paths
+    Modules are looked up next to the importing script, then in this folder
+    (scripts elsewhere, e.g. training, add it to sys.path).
+    Used to fingerprint a step: editing an unrelated tool in this folder
+    doesn't invalidate its output.
+    """
+    pending = [stage_path(name) for name in script_names]
+    found = set()
+    while pending:
+        path = pending.pop()
+        if path in found or not os.path.exists(path):
+            continue
+        found.add(path)
+        folder = os.path.dirname(path)
+        with open(path, encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            elif (isinstance(node, ast.Call) and getattr(node.func, 'id', None) == 'load_stage'
+                  and node.args and isinstance(node.args[0], ast.Constant)):
+                pending.append(os.path.join(folder, node.args[0].value))
+                continue
+            else:
+                continue
+            for name in names:
+                for search in (folder, SCRIPT_DIR):
+                    module = os.path.join(search, name.split('.')[0] + '.py')
+                    if os.path.exists(module):
+                        pending.append(module)
+                        break
+    return sorted(found)
+
+
+def override_constants(source, overrides):
+    """
+    A script's source with top-level UPPER_CASE constants replaced by new
+    literal values ({name: value}), the inverse of read_config(). Used to run
+    a copy of a stage with different settings without editing the original.
+    """
+    tree = ast.parse(source)
+    spans = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target = node.targets[0]
+            if isinstance(target, ast.Name) and target.id in overrides:
+                spans[target.id] = (node.lineno, node.end_lineno)
+
+    missing = sorted(set(overrides) - set(spans))
+    if missing:
+        raise KeyError(f"no top-level constant named {', '.join(missing)}")
+
+    lines = source.splitlines(keepends=True)
+    for name, (first, last) in sorted(spans.items(), key=lambda item: -item[1][0]):
+        text = repr(overrides[name])
+        ast.literal_eval(text)  # Only literals survive a round trip through the source
+        lines[first - 1:last] = [f"{name} = {text}\n"]
+    return ''.join(lines)
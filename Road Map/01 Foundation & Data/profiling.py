@@ -0,0 +1,189 @@
+"""
+Profile one pipeline script: hot functions, a flamegraph and memory allocations
+
+Runs the script in-process (like the CLI does) under three collectors:
+  - cProfile: exact call counts and times, for the hot-function table
+  - a stack sampler: records the full call stack every few milliseconds and
+    writes it in the "collapsed" format read by flamegraph.pl, speedscope
+    (speedscope.app) and inferno
+  - tracemalloc: the allocation sites holding the most memory near the peak
+
+Files written next to the script's output (same folder):
+    <script>.profile.txt         top-N functions and allocation sites
+    <script>.profile.collapsed   flamegraph input
+    <script>.prof                raw cProfile data (snakeviz, pstats)
+
+Usage:
+    python profiling.py 20_school_in_out.py
+    python profiling.py 18_3h_blocks_0_crime_blocks.py --top 40 --no-memory
+    python 01_run_pipeline.py --profile       # every stage
+
+Parallel stages run with one worker while profiled (PIPELINE_WORKERS=1) so
+the work shows up in this process instead of in pool workers.
+"""
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+TOP_N = 25                 # Rows in each table
+SAMPLE_INTERVAL = 0.005    # Seconds between stack samples
+MEMORY_CHECK_INTERVAL = 1.0  # Seconds between peak-memory checks
+# ============================================================
+
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+from pipeline_utils import run_script, stage_path
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples one thread's call stack at a fixed interval
+    Also snapshots tracemalloc whenever traced memory reaches a new peak, so
+    the allocation table shows what was alive at the high-water mark.
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL, track_memory=False, root_file=None):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.root_file = root_file   # Stacks are cut above this file's frame
+        self.interval = interval
+        self.track_memory = track_memory
+        self.stacks = Counter()
+        self.peak_bytes = 0
+        self.peak_snapshot = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        next_memory_check = time.perf_counter()
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                if frame.f_code.co_filename == self.root_file:
+                    break
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+            if self.track_memory and time.perf_counter() >= next_memory_check:
+                self.check_memory()
+                next_memory_check = time.perf_counter() + MEMORY_CHECK_INTERVAL
+
+    def check_memory(self):
+        current, _ = tracemalloc.get_traced_memory()
+        # Snapshots are expensive; only retake on a >10% higher peak
+        if current > self.peak_bytes * 1.1:
+            self.peak_bytes = current
+            self.peak_snapshot = tracemalloc.take_snapshot()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        if self.track_memory:
+            self.check_memory()
+
+
+def _stats_table(profiler, sort_key, top_n):
+    buffer = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buffer)
+    stats.strip_dirs().sort_stats(sort_key).print_stats(top_n)
+    # Drop pstats' preamble, keep the table
+    text = buffer.getvalue()
+    start = text.find('   ncalls')
+    return text[start:].rstrip() if start >= 0 else text.rstrip()
+
+
+def profile_script(script_name, argv=(), top_n=TOP_N, interval=SAMPLE_INTERVAL, memory=True):
+    """Run a script under the profilers and write the report files; returns True on success"""
+    script = stage_path(script_name)
+    folder = os.path.dirname(script)
+    stem = os.path.splitext(os.path.basename(script))[0]
+    os.environ.setdefault('PIPELINE_WORKERS', '1')
+
+    if memory:
+        tracemalloc.start()
+    sampler = StackSampler(threading.get_ident(), interval, track_memory=memory, root_file=script)
+    profiler = cProfile.Profile()
+
+    start = time.perf_counter()
+    sampler.start()
+    profiler.enable()
+    try:
+        ok = run_script(script, argv)
+    finally:
+        profiler.disable()
+        sampler.stop()
+        wall = time.perf_counter() - start
+        _, traced_peak = tracemalloc.get_traced_memory() if memory else (0, 0)
+        if memory:
+            tracemalloc.stop()
+
+    report_path = os.path.join(folder, f'{stem}.profile.txt')
+    collapsed_path = os.path.join(folder, f'{stem}.profile.collapsed')
+    profiler.dump_stats(os.path.join(folder, f'{stem}.prof'))
+
+    with open(collapsed_path, 'w', encoding='utf-8') as f:
+        for stack, count in sampler.stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+    lines = [
+        f"PROFILE: {os.path.basename(script)}",
+        f"Date: {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"Wall time: {wall:.2f}s (profiled; cProfile adds overhead)",
+        f"Stack samples: {sum(sampler.stacks.values()):,} every {interval * 1000:.0f} ms",
+        f"Result: {'success' if ok else 'FAILED'}",
+        "",
+        f"TOP {top_n} FUNCTIONS BY CUMULATIVE TIME",
+        "-" * 80,
+        _stats_table(profiler, 'cumulative', top_n),
+        "",
+        f"TOP {top_n} FUNCTIONS BY OWN TIME",
+        "-" * 80,
+        _stats_table(profiler, 'tottime', top_n),
+    ]
+    if memory:
+        lines += ["", f"TOP {top_n} ALLOCATION SITES NEAR PEAK "
+                      f"(peak traced memory {traced_peak / 1024 ** 2:,.1f} MB)", "-" * 80]
+        if sampler.peak_snapshot is not None:
+            for stat in sampler.peak_snapshot.statistics('lineno')[:top_n]:
+                frame = stat.traceback[0]
+                lines.append(f"{stat.size / 1024 ** 2:10.1f} MB {stat.count:>10,} blocks  "
+                             f"{os.path.basename(frame.filename)}:{frame.lineno}")
+
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+    print(f"\n✓ Profile written: {report_path}")
+    print(f"  Flamegraph input: {collapsed_path}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile a pipeline script")
+    parser.add_argument('script', help="script name (relative to this folder) or path")
+    parser.add_argument('--top', type=int, default=TOP_N, help="rows per table")
+    parser.add_argument('--interval', type=float, default=SAMPLE_INTERVAL, help="seconds between stack samples")
+    parser.add_argument('--no-memory', action='store_true', help="skip tracemalloc (much lower overhead)")
+    args, script_args = parser.parse_known_args()
+
+    ok = profile_script(args.script, script_args, args.top, args.interval, memory=not args.no_memory)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
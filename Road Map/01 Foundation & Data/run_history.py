@@ -0,0 +1,547 @@
+"""
+Run history: every pipeline and training run recorded in one SQLite file
+
+The runners (chicago_crime.py, 01_run_pipeline.py, refresh_service.py) record
+for each script: wall time, peak memory (its own process, plus its worker
+processes when chicago_crime.py runs it in-process), status, and the files it declares
+(OUTPUT_FILE / MODEL_OUTPUT / RESULTS_OUTPUT) with their size, row count,
+column count and checksum. 01_train_model.py adds its metrics (RMSE, MAE, R²,
+training time, ...). Scripts started by a runner attach to the runner's run
+through PIPELINE_RUN_ID; started on their own they record a run of their own.
+
+Tables (run_history.db in the repository root, PIPELINE_HISTORY_DB to move it):
+    runs       id, kind, started, finished, status, seconds, host, cpus,
+               memory_budget, workers, git_commit
+    stages     run_id, script, started, seconds, peak_mb, status,
+               children_peak_mb, children_source (see ChildMemory)
+    artifacts  run_id, script, path, bytes, rows, columns, checksum
+    metrics    run_id, name, value
+
+Queries:
+    python run_history.py runs --last 20
+    python run_history.py show 42
+    python run_history.py stage 23 --last 30            # duration / memory trend
+    python run_history.py metric test_rmse --vs train_seconds
+    python run_history.py artifact 24.1                  # when did the training set change?
+
+PIPELINE_HISTORY=0 turns recording off. Only the standard library is used, so
+the CLI can import this module without loading pandas.
+"""
+
+import argparse
+import hashlib
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from pipeline_utils import SCRIPT_DIR, read_config
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+ROOT_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, '..', '..'))
+DEFAULT_DB = 'run_history.db'    # In ROOT_DIR unless PIPELINE_HISTORY_DB is set
+CHECKSUM_ARTIFACTS = True        # Hash output files (one extra read of each)
+DEFAULT_LAST = 30                # Runs shown by the queries
+# ============================================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    started TEXT NOT NULL,
+    finished TEXT,
+    status TEXT NOT NULL,
+    seconds REAL,
+    host TEXT,
+    cpus INTEGER,
+    memory_budget TEXT,
+    workers TEXT,
+    git_commit TEXT
+);
+CREATE TABLE IF NOT EXISTS stages (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    script TEXT NOT NULL,
+    started TEXT NOT NULL,
+    seconds REAL,
+    peak_mb REAL,
+    status TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    script TEXT NOT NULL,
+    path TEXT NOT NULL,
+    bytes INTEGER,
+    rows INTEGER,
+    columns INTEGER,
+    checksum TEXT
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS stages_script ON stages(script);
+CREATE INDEX IF NOT EXISTS metrics_name ON metrics(name);
+"""
+# Columns added after the first release: (table, column, type), added to older databases
+ADDED_COLUMNS = [
+    ('stages', 'children_peak_mb', 'REAL'),
+    ('stages', 'children_source', 'TEXT'),
+]
+
+# Config constants naming the files a script writes
+OUTPUT_KEYS = ['OUTPUT_FILE', 'MODEL_OUTPUT', 'RESULTS_OUTPUT']
+
+
+def enabled():
+    return os.environ.get('PIPELINE_HISTORY', '1') != '0'
+
+
+def db_path():
+    return os.environ.get('PIPELINE_HISTORY_DB') or os.path.join(ROOT_DIR, DEFAULT_DB)
+
+
+@contextmanager
+def connect():
+    """Connection to the history database; commits and closes on exit"""
+    conn = sqlite3.connect(db_path(), timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.executescript(SCHEMA)
+        for table, column, kind in ADDED_COLUMNS:
+            if column not in {row['name'] for row in conn.execute(f"PRAGMA table_info({table})")}:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+# ============================================================
+# RECORDING
+# ============================================================
+
+def start_run(kind):
+    """
+    Open a run and export its id as PIPELINE_RUN_ID, so scripts started from
+    here (in this process or as children) attach to it. Returns the id (None
+    when recording is off).
+    """
+    if not enabled():
+        return None
+    with connect() as conn:
+        cursor = conn.execute(
+            "INSERT INTO runs (kind, started, status, host, cpus, memory_budget, workers, git_commit) "
+            "VALUES (?, ?, 'running', ?, ?, ?, ?, ?)",
+            (kind, _now(), platform.node(), os.cpu_count(), os.environ.get('PIPELINE_MEMORY_BUDGET'),
+             os.environ.get('PIPELINE_WORKERS'), _git_commit()))
+        run_id = cursor.lastrowid
+    os.environ['PIPELINE_RUN_ID'] = str(run_id)
+    return run_id
+
+
+def finish_run(run_id, ok):
+    if run_id is None:
+        return
+    with connect() as conn:
+        started = conn.execute("SELECT started FROM runs WHERE id = ?", (run_id,)).fetchone()['started']
+        seconds = (datetime.now() - datetime.fromisoformat(started)).total_seconds()
+        conn.execute("UPDATE runs SET finished = ?, status = ?, seconds = ? WHERE id = ?",
+                     (_now(), 'ok' if ok else 'failed', seconds, run_id))
+    if os.environ.get('PIPELINE_RUN_ID') == str(run_id):
+        del os.environ['PIPELINE_RUN_ID']
+
+
+def describe_file(path):
+    """(bytes, rows, columns, checksum) of an output file; rows/columns for CSVs only"""
+    is_csv = path.lower().endswith('.csv')
+    digest = hashlib.blake2b(digest_size=16) if CHECKSUM_ARTIFACTS else None
+    lines = 0
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(0)
+        for block in iter(lambda: f.read(1 << 24), b''):
+            if digest:
+                digest.update(block)
+            if is_csv:
+                lines += block.count(b'\n')
+    rows = max(lines - 1, 0) if is_csv else None
+    columns = len(header.decode('utf-8', 'replace').split(',')) if is_csv and header else None
+    return os.path.getsize(path), rows, columns, digest.hexdigest() if digest else None
+
+
+def record_stage(run_id, script_path, started, seconds, peak_mb, ok, children=None):
+    """
+    One script's timing plus the files it declares as outputs
+    peak_mb is the script's own process; children (a finished ChildMemory)
+    adds its worker processes when the script ran inside the runner.
+    """
+    if run_id is None:
+        return
+    script = os.path.basename(script_path)
+    folder = os.path.dirname(os.path.abspath(script_path))
+    try:
+        config = read_config(script_path)
+    except (OSError, SyntaxError):
+        config = {}
+
+    artifacts = []
+    if ok:
+        for key in OUTPUT_KEYS:
+            relative = config.get(key)
+            path = os.path.normpath(os.path.join(folder, relative)) if isinstance(relative, str) else None
+            if path and os.path.isfile(path):
+                artifacts.append((run_id, script, os.path.relpath(path, ROOT_DIR), *describe_file(path)))
+
+    with connect() as conn:
+        conn.execute("INSERT INTO stages (run_id, script, started, seconds, peak_mb, status, "
+                     "children_peak_mb, children_source) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                     (run_id, script, started, seconds, peak_mb, 'ok' if ok else 'failed',
+                      children.peak_mb if children else None, children.source if children else None))
+        conn.executemany("INSERT INTO artifacts VALUES (?, ?, ?, ?, ?, ?, ?)", artifacts)
+
+
+def record_metrics(kind, metrics):
+    """
+    Model metrics ({name: number}) for the current run (PIPELINE_RUN_ID), or
+    for a new run of `kind` when the script was started on its own
+    """
+    if not enabled():
+        return
+    run_id = os.environ.get('PIPELINE_RUN_ID')
+    own_run = run_id is None
+    if own_run:
+        run_id = start_run(kind)
+    with connect() as conn:
+        conn.executemany("INSERT INTO metrics VALUES (?, ?, ?)",
+                         [(int(run_id), name, float(value)) for name, value in metrics.items()
+                          if value is not None])
+    if own_run:
+        finish_run(run_id, True)
+
+
+# ============================================================
+# PEAK MEMORY
+# ============================================================
+
+def run_child(command, cwd, env=None, stdout=None):
+    """subprocess.run() that also returns the child's peak memory: (returncode, seconds, peak MB)"""
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, cwd=cwd, env=env, stdout=stdout,
+                            stderr=subprocess.STDOUT if stdout else None,
+                            stdin=subprocess.DEVNULL if stdout else None)
+    if hasattr(os, 'wait4'):
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss is KB on Linux, bytes on macOS
+        peak_mb = usage.ru_maxrss / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+    else:
+        proc.wait()
+        peak_mb = None
+    return proc.returncode, time.perf_counter() - start, peak_mb
+
+
+def reset_peak():
+    """Restart this process's peak-memory counter (Linux); scripts run in-process are measured from here"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def peak_mb():
+    """This process's peak memory since reset_peak() (since start where it can't be reset)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+
+
+def _descendants(pid):
+    """Child, grandchild, ... process ids of pid (Linux /proc)"""
+    found = []
+    pending = [pid]
+    while pending:
+        parent = pending.pop()
+        try:
+            tasks = os.listdir(f'/proc/{parent}/task')
+        except OSError:
+            continue
+        for task in tasks:
+            try:
+                with open(f'/proc/{parent}/task/{task}/children') as f:
+                    children = [int(child) for child in f.read().split()]
+            except OSError:
+                continue
+            found += children
+            pending += children
+    return found
+
+
+def _pss_mb(pid):
+    """Proportional set size of a process: shared pages split between the processes sharing them"""
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def _children_maxrss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return usage / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+
+
+class ChildMemory:
+    """
+    Peak memory of the worker processes a script starts while it runs inside
+    this process (the sharded stages' ProcessPoolExecutor, the prediction
+    workers); peak_mb() only sees this process. Use as a context manager
+    around the script, then read .peak_mb and .source:
+
+      'pss_sum'        Linux: every SAMPLE_SECONDS the PSS of all descendant
+                       processes is summed (shared memory counted once) and
+                       the highest total kept. The stage's footprint is
+                       about peak_mb() + this. Spikes between samples are missed.
+      'largest_child'  Elsewhere: the largest single child's peak RSS
+                       (RUSAGE_CHILDREN), only when it grew during the
+                       script (the counter can't be reset), else None.
+    """
+
+    SAMPLE_SECONDS = 0.2
+
+    def __init__(self):
+        self.peak_mb = None
+        self.source = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._maxrss_before = None
+
+    def __enter__(self):
+        if os.path.exists(f'/proc/{os.getpid()}/task'):
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        else:
+            self._maxrss_before = _children_maxrss_mb()
+        return self
+
+    def _sample(self):
+        me = os.getpid()
+        highest = None
+        while True:
+            children = _descendants(me)
+            if children:
+                total = sum(_pss_mb(pid) for pid in children)
+                highest = total if highest is None else max(highest, total)
+                self.peak_mb = highest
+            if self._stop.wait(self.SAMPLE_SECONDS):
+                break
+
+    def __exit__(self, *exc):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self.source = 'pss_sum' if self.peak_mb is not None else None
+        else:
+            after = _children_maxrss_mb()
+            if after is not None and self._maxrss_before is not None and after > self._maxrss_before:
+                self.peak_mb, self.source = after, 'largest_child'
+        return False
+
+
+# ============================================================
+# QUERIES
+# ============================================================
+
+def _fmt(value, spec):
+    return format(value, spec) if value is not None else '-'
+
+
+def _trend(values):
+    """'+12.3%' comparing the newer half of the values with the older half"""
+    values = [v for v in values if v is not None]
+    if len(values) < 4:
+        return "not enough runs"
+    half = len(values) // 2
+    older, newer = sorted(values[:half])[half // 2], sorted(values[-half:])[half // 2]
+    return f"{(newer - older) / older:+.1%} (median of newest {half} vs oldest {half})" if older else "-"
+
+
+def show_runs(conn, args):
+    query = "SELECT * FROM runs"
+    params = []
+    if args.kind:
+        query += " WHERE kind = ?"
+        params.append(args.kind)
+    rows = conn.execute(query + " ORDER BY id DESC LIMIT ?", (*params, args.last)).fetchall()
+
+    print(f"{'Run':>5}  {'Kind':<10} {'Started':<20} {'Status':<8} {'Time':>9}  {'Budget':<7} {'Commit'}")
+    print("-" * 80)
+    for row in reversed(rows):
+        print(f"{row['id']:>5}  {row['kind']:<10} {row['started']:<20} {row['status']:<8} "
+              f"{_fmt(row['seconds'], '8.1f')}s  {row['memory_budget'] or '-':<7} {row['git_commit'] or '-'}")
+
+
+def show_run(conn, args):
+    run = conn.execute("SELECT * FROM runs WHERE id = ?", (args.run_id,)).fetchone()
+    if run is None:
+        raise SystemExit(f"✗ No run {args.run_id}")
+    print(f"Run {run['id']}: {run['kind']}, {run['status']}, started {run['started']}, "
+          f"{_fmt(run['seconds'], '.1f')}s on {run['host']} ({run['cpus']} CPUs)")
+
+    print(f"\n{'Script':<40} {'Time':>9} {'Peak MB':>9} {'Workers':>9}  Status")
+    print("-" * 80)
+    for row in conn.execute("SELECT * FROM stages WHERE run_id = ? ORDER BY rowid", (args.run_id,)):
+        print(f"{row['script']:<40} {_fmt(row['seconds'], '8.1f')}s {_fmt(row['peak_mb'], '9,.0f')} "
+              f"{_fmt(row['children_peak_mb'], '9,.0f')}  {row['status']}")
+    print("(Peak MB: the script's process. Workers: its worker processes together, see ChildMemory)")
+
+    artifacts = conn.execute("SELECT * FROM artifacts WHERE run_id = ? ORDER BY rowid", (args.run_id,)).fetchall()
+    if artifacts:
+        print(f"\n{'Artifact':<48} {'Rows':>12} {'Cols':>5} {'MB':>8}  Checksum")
+        print("-" * 80)
+        for row in artifacts:
+            print(f"{os.path.basename(row['path']):<48} {_fmt(row['rows'], '12,')} {_fmt(row['columns'], '5')} "
+                  f"{row['bytes'] / 1024 ** 2:8.1f}  {(row['checksum'] or '-')[:12]}")
+
+    metrics = conn.execute("SELECT name, value FROM metrics WHERE run_id = ?", (args.run_id,)).fetchall()
+    if metrics:
+        print(f"\n{'Metric':<24} Value")
+        print("-" * 80)
+        for row in metrics:
+            print(f"{row['name']:<24} {row['value']:.4f}")
+
+
+def show_stage(conn, args):
+    rows = conn.execute(
+        "SELECT s.*, r.kind FROM stages s JOIN runs r ON r.id = s.run_id "
+        "WHERE s.script LIKE ? AND s.status = 'ok' ORDER BY s.started DESC LIMIT ?",
+        (f"{args.name}%", args.last)).fetchall()[::-1]
+    if not rows:
+        raise SystemExit(f"✗ No successful runs of a script starting with '{args.name}'")
+
+    print(f"{'Run':>5}  {'Started':<20} {'Script':<28} {'Time':>9} {'Peak MB':>9} {'Workers':>9}")
+    print("-" * 86)
+    for row in rows:
+        print(f"{row['run_id']:>5}  {row['started']:<20} {row['script'][:28]:<28} "
+              f"{_fmt(row['seconds'], '8.1f')}s {_fmt(row['peak_mb'], '9,.0f')} "
+              f"{_fmt(row['children_peak_mb'], '9,.0f')}")
+    print("-" * 86)
+    print(f"Duration trend: {_trend([row['seconds'] for row in rows])}")
+    print(f"Memory trend:   {_trend([row['peak_mb'] for row in rows])}")
+    print(f"Workers trend:  {_trend([row['children_peak_mb'] for row in rows])}")
+
+
+def show_metric(conn, args):
+    names = [args.name] + ([args.vs] if args.vs else [])
+    runs = {}
+    for name in names:
+        for row in conn.execute("SELECT run_id, value FROM metrics WHERE name = ?", (name,)):
+            runs.setdefault(row['run_id'], {})[name] = row['value']
+    rows = sorted((run_id, values) for run_id, values in runs.items() if len(values) == len(names))[-args.last:]
+    if not rows:
+        available = [row['name'] for row in conn.execute("SELECT DISTINCT name FROM metrics ORDER BY name")]
+        raise SystemExit(f"✗ No runs with {' and '.join(names)}. Recorded metrics: {', '.join(available) or 'none'}")
+
+    print(f"{'Run':>5}  " + "  ".join(f"{name:>16}" for name in names))
+    print("-" * 80)
+    for run_id, values in rows:
+        print(f"{run_id:>5}  " + "  ".join(f"{values[name]:>16.4f}" for name in names))
+    print("-" * 80)
+    print(f"{args.name} trend: {_trend([values[args.name] for _, values in rows])}")
+
+    if args.vs and len(rows) >= 3:
+        xs = [values[args.vs] for _, values in rows]
+        ys = [values[args.name] for _, values in rows]
+        mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+        cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+        spread = (sum((x - mean_x) ** 2 for x in xs) * sum((y - mean_y) ** 2 for y in ys)) ** 0.5
+        if spread:
+            print(f"Correlation {args.name} vs {args.vs}: {cov / spread:+.2f}")
+
+
+def show_artifact(conn, args):
+    rows = conn.execute(
+        "SELECT a.*, r.started FROM artifacts a JOIN runs r ON r.id = a.run_id "
+        "WHERE a.path LIKE ? ORDER BY a.run_id DESC LIMIT ?",
+        (f"%{args.name}%", args.last)).fetchall()[::-1]
+    if not rows:
+        raise SystemExit(f"✗ No recorded artifact matching '{args.name}'")
+
+    print(f"{'Run':>5}  {'Started':<20} {'Artifact':<34} {'Rows':>12} {'MB':>8}  Checksum")
+    print("-" * 80)
+    previous = {}
+    for row in rows:
+        name = os.path.basename(row['path'])
+        changed = "" if previous.get(name) in (None, row['checksum']) else "  changed"
+        previous[name] = row['checksum']
+        print(f"{row['run_id']:>5}  {row['started']:<20} {name[:34]:<34} {_fmt(row['rows'], '12,')} "
+              f"{row['bytes'] / 1024 ** 2:8.1f}  {(row['checksum'] or '-')[:12]}{changed}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the pipeline run history")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    runs = subparsers.add_parser('runs', help="recent runs")
+    runs.add_argument('--kind', help="only runs of this kind (pipeline, features, train, refresh, ...)")
+    show = subparsers.add_parser('show', help="stages, artifacts and metrics of one run")
+    show.add_argument('run_id', type=int)
+    stage = subparsers.add_parser('stage', help="duration and peak memory of a script over time")
+    stage.add_argument('name', help="script name or prefix, e.g. 23")
+    metric = subparsers.add_parser('metric', help="a model metric over time, optionally against another")
+    metric.add_argument('name', help="e.g. test_rmse")
+    metric.add_argument('--vs', metavar='NAME', help="second metric, e.g. train_seconds")
+    artifact = subparsers.add_parser('artifact', help="size, rows and checksum of an output file over time")
+    artifact.add_argument('name', help="part of the file name, e.g. 24.1")
+    for sub in (runs, stage, metric, artifact):
+        sub.add_argument('--last', type=int, default=DEFAULT_LAST, help="number of runs")
+
+    args = parser.parse_args()
+    if not os.path.exists(db_path()):
+        raise SystemExit(f"✗ No run history yet ({db_path()})")
+    handlers = {'runs': show_runs, 'show': show_run, 'stage': show_stage,
+                'metric': show_metric, 'artifact': show_artifact}
+    with connect() as conn:
+        handlers[args.command](conn, args)
+
+
+if __name__ == "__main__":
+    main()
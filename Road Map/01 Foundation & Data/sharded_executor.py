@@ -0,0 +1,100 @@
+"""
+Sharded process-pool execution for pipeline stages
+
+After aggregation (stage 18) every block-level transform is independent per
+Community Area, and the hourly stages (16 and earlier) are independent per
+time partition. This module splits a DataFrame into shards, runs a stage's
+transform on each shard in a process pool and puts the results back together
+in the original row order, so the output is identical to a single-process run.
+
+Usage from a stage script:
+    from sharded_executor import run_sharded
+    df = run_sharded(df, '20_school_in_out.py', 'add_school_in_session',
+                     shard_key='Community Area', workers=WORKERS)
+
+The transform is passed by (script name, function name) rather than as a
+function object so workers can re-import it even with the 'spawn' start
+method (Windows / macOS).
+
+Worker count: the stage's WORKERS setting, overridden by the PIPELINE_WORKERS
+environment variable. None or 0 means "all CPU cores", 1 runs in-process.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import pandas as pd
+
+from pipeline_utils import load_stage
+
+DEFAULT_SHARD_KEY = 'Community Area'
+
+
+def resolve_workers(workers=None):
+    """Turn a WORKERS setting (or PIPELINE_WORKERS env override) into a count"""
+    env_workers = os.environ.get('PIPELINE_WORKERS')
+    if env_workers:
+        workers = int(env_workers)
+    if not workers or workers < 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def time_partition(column, freq='M'):
+    """
+    Shard key for hourly data: one shard per calendar period of `column`
+    e.g. shard_key=time_partition('Date', 'M') gives one shard per month
+    """
+    def key(df):
+        return pd.to_datetime(df[column]).dt.to_period(freq)
+    return key
+
+
+def split_into_shards(df, shard_key=DEFAULT_SHARD_KEY):
+    """
+    Split df into a list of shards, ordered by shard key
+    shard_key is a column name or a function df -> Series of keys
+    """
+    keys = shard_key(df) if callable(shard_key) else df[shard_key]
+    return [shard for _, shard in df.groupby(keys, sort=True, dropna=False)]
+
+
+def _run_shard(script_name, func_name, shard, kwargs):
+    """Worker entry point: load the stage module and apply its transform"""
+    transform = getattr(load_stage(script_name), func_name)
+    return transform(shard, **kwargs)
+
+
+def run_sharded(df, script_name, func_name, shard_key=DEFAULT_SHARD_KEY, workers=None, **kwargs):
+    """
+    Run `func_name` from stage `script_name` over shards of df in parallel
+
+    The transform must take a DataFrame (plus **kwargs) and return a frame
+    with the same index. Results are concatenated and re-ordered to match
+    the input, so the output does not depend on the worker count.
+    """
+    workers = resolve_workers(workers)
+
+    if workers == 1:
+        return _run_shard(script_name, func_name, df, kwargs)
+
+    if not df.index.is_unique:
+        df = df.reset_index(drop=True)
+
+    shards = split_into_shards(df, shard_key)
+    if len(shards) <= 1:
+        return _run_shard(script_name, func_name, df, kwargs)
+
+    workers = min(workers, len(shards))
+    key_name = shard_key if isinstance(shard_key, str) else 'time partition'
+    print(f"      Sharded run: {len(shards)} shards by {key_name}, {workers} worker processes")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(
+            _run_shard,
+            repeat(script_name), repeat(func_name), shards, repeat(kwargs),
+        ))
+
+    combined = pd.concat(results)
+    return combined.reindex(df.index)
@@ -0,0 +1,241 @@
+"""
+Shared-memory column buffers for zero-copy hand-off to worker processes
+
+Sending a 2M-row frame to a process pool normally means pickling it to every
+worker and pickling the results back. SharedColumns instead copies each
+column once into a named shared-memory segment (plain NumPy buffers). Workers
+receive only a small spec (segment names, dtypes, lengths), map the inputs
+read-only and write their results straight into preallocated shared output
+arrays.
+
+Usage:
+    with SharedColumns.from_frame(df[['day_of_week', 'time_block']]) as inputs, \\
+         SharedColumns() as outputs:
+        outputs.allocate('flag', 'int64', len(df))
+        map_row_ranges(my_worker, inputs, outputs, len(df), workers=4)
+        df['flag'] = outputs.column('flag')
+
+    def my_worker(inputs, outputs, start, stop):
+        outputs['flag'][start:stop] = inputs['day_of_week'][start:stop] >= 5
+
+Workers are module-level functions, or (script name, function name) tuples for
+functions that live in numbered stage scripts (see pipeline_utils.load_stage).
+
+Supported columns: numeric, bool and naive datetime64 columns are shared as-is.
+Text and categorical columns are shared as integer codes plus their categories.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from pipeline_utils import load_stage
+from sharded_executor import resolve_workers
+
+if os.name == 'posix':
+    from multiprocessing import resource_tracker
+else:
+    resource_tracker = None
+
+
+def _open_segment(name, track=True):
+    """
+    Attach to an existing segment
+    track=False is for processes that never own the segment (e.g. clients of
+    a long-running server): without it Python's resource tracker would unlink
+    the segment when this process exits.
+    """
+    segment = shared_memory.SharedMemory(name=name)
+    if not track and resource_tracker is not None:
+        resource_tracker.unregister(segment._name, 'shared_memory')
+    return segment
+
+
+def _view(segment, dtype, length):
+    """NumPy array backed by a shared-memory segment"""
+    return np.ndarray((length,), dtype=np.dtype(dtype), buffer=segment.buf)
+
+
+class SharedColumns:
+    """
+    A set of named 1-D arrays living in shared memory, owned by this process
+    The owner unlinks the segments on close(); use it as a context manager.
+    """
+
+    def __init__(self):
+        self.segments = {}
+        self.spec = {}
+        self._arrays = {}
+
+    @classmethod
+    def from_frame(cls, df, columns=None):
+        """Copy the columns of df into shared memory (one segment per column)"""
+        shared = cls()
+        try:
+            for col in (columns if columns is not None else df.columns):
+                shared.add_series(col, df[col])
+        except BaseException:
+            shared.close()
+            raise
+        return shared
+
+    def add_series(self, name, series):
+        """Share one pandas column"""
+        categories = None
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            values = series.cat.codes.to_numpy()
+            categories = list(series.cat.categories)
+        elif series.dtype == object or pd.api.types.is_string_dtype(series.dtype):
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+            values = codes
+            categories = list(uniques)
+        elif pd.api.types.is_datetime64_any_dtype(series.dtype):
+            if getattr(series.dtype, 'tz', None) is not None:
+                raise TypeError(f"Column '{name}': timezone-aware datetimes are not supported")
+            values = series.to_numpy(dtype='datetime64[ns]')
+        elif isinstance(series.dtype, np.dtype):
+            values = series.to_numpy()
+        else:
+            raise TypeError(f"Column '{name}': dtype {series.dtype} can't be shared "
+                            f"(convert nullable/extension types to NumPy first)")
+        self.add_array(name, values)
+        if categories is not None:
+            self.spec[name]['categories'] = categories
+
+    def add_array(self, name, values):
+        """Share a NumPy array (copied once into a new segment)"""
+        values = np.ascontiguousarray(values)
+        target = self.allocate(name, values.dtype, len(values))
+        target[:] = values
+        return target
+
+    def allocate(self, name, dtype, length, fill=None):
+        """Create an empty shared array, e.g. an output column for workers to fill"""
+        if name in self.segments:
+            raise ValueError(f"Shared column '{name}' already exists")
+        dtype = np.dtype(dtype)
+        segment = shared_memory.SharedMemory(create=True, size=max(dtype.itemsize * length, 1))
+        self.segments[name] = segment
+        self.spec[name] = {'segment': segment.name, 'dtype': dtype.str, 'length': length}
+        array = _view(segment, dtype, length)
+        if fill is not None:
+            array[:] = fill
+        self._arrays[name] = array
+        return array
+
+    def arrays(self):
+        """Owner-side views of every shared column"""
+        return dict(self._arrays)
+
+    def column(self, name):
+        """Copy one column out of shared memory (safe to keep after close())"""
+        array = np.array(self._arrays[name])
+        categories = self.spec[name].get('categories')
+        if categories is not None:
+            return pd.Categorical.from_codes(array, categories=categories)
+        return array
+
+    def to_frame(self, columns=None):
+        """Copy shared columns back into a regular DataFrame"""
+        names = columns if columns is not None else list(self.spec)
+        return pd.DataFrame({name: self.column(name) for name in names})
+
+    def close(self):
+        """Release and unlink every segment"""
+        self._arrays.clear()
+        for segment in self.segments.values():
+            try:
+                segment.close()
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+        self.segments.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def attach(spec, readonly=True, track=True):
+    """
+    Map shared columns described by `spec` in another process
+    Returns (arrays, segments); call detach(segments) when done.
+    """
+    arrays = {}
+    segments = []
+    for name, info in spec.items():
+        segment = _open_segment(info['segment'], track=track)
+        segments.append(segment)
+        array = _view(segment, info['dtype'], info['length'])
+        if readonly:
+            array.setflags(write=False)
+        arrays[name] = array
+    return arrays, segments
+
+
+def detach(segments):
+    """Unmap segments attached with attach() (does not unlink them)"""
+    for segment in segments:
+        try:
+            segment.close()
+        except BufferError:
+            # A caller still holds a view; the mapping goes away with the process
+            pass
+
+
+def _resolve_worker(worker):
+    if isinstance(worker, tuple):
+        script_name, func_name = worker
+        return getattr(load_stage(script_name), func_name)
+    return worker
+
+
+def _range_task(worker, in_spec, out_spec, start, stop, args):
+    """Pool entry point: attach inputs/outputs, run one row range"""
+    inputs, in_segments = attach(in_spec, readonly=True)
+    outputs, out_segments = attach(out_spec, readonly=False)
+    try:
+        _resolve_worker(worker)(inputs, outputs, start, stop, *args)
+    finally:
+        inputs.clear()
+        outputs.clear()
+        detach(in_segments)
+        detach(out_segments)
+
+
+def row_ranges(n_rows, n_parts):
+    """Split range(n_rows) into n_parts contiguous (start, stop) pairs"""
+    bounds = np.linspace(0, n_rows, n_parts + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def map_row_ranges(worker, inputs, outputs, n_rows, workers=None, args=(), chunks_per_worker=1):
+    """
+    Run worker(inputs, outputs, start, stop, *args) over contiguous row ranges
+
+    inputs / outputs are SharedColumns owned by the caller. Each call writes
+    its own rows of the output arrays, so no locking is needed. With one
+    worker the function runs in-process on the owner's arrays.
+    """
+    workers = resolve_workers(workers)
+    ranges = row_ranges(n_rows, workers * chunks_per_worker)
+
+    if workers == 1 or len(ranges) <= 1:
+        func = _resolve_worker(worker)
+        arrays_in, arrays_out = inputs.arrays(), outputs.arrays()
+        for start, stop in ranges:
+            func(arrays_in, arrays_out, start, stop, *args)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+        futures = [
+            executor.submit(_range_task, worker, inputs.spec, outputs.spec, start, stop, args)
+            for start, stop in ranges
+        ]
+        for future in futures:
+            future.result()
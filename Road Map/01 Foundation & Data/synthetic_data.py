@@ -0,0 +1,437 @@
+"""
+Synthetic Chicago crime data for offline benchmarking
+
+Writes a raw crime export with the same 22 columns and formats as the City of
+Chicago data portal download that 04_data_row_truncator_2023_2025.py reads,
+plus an hourly weather file that 15_download_add_weather.py can use instead of
+Meteostat (set WEATHER_FILE / PIPELINE_WEATHER_FILE). No network needed.
+
+What it reproduces:
+  - Yearly volume (2001 peak, long decline, 2020 dip), monthly seasonality
+    (summer high), weekday skew (Fri/Sat) and the hourly curve including the
+    midnight and noon spikes from rounded report times
+  - Primary Type / Description pairs: the 88 combinations scored in
+    11_add_severity_scores.py, crimes that 08 removes (NARCOTICS, DECEPTIVE
+    PRACTICE, ...), and a few very rare pairs for 10 to drop
+  - Domestic / Arrest rates by crime type, skewed Community Area volumes
+  - Null rates: missing coordinates (~1.5%), missing Location Description,
+    and Community Area / Ward missing for most 2001 rows
+
+Rows are generated and written in chunks, so 50M rows never sit in memory.
+
+Usage:
+    python synthetic_data.py --rows 1M
+    python synthetic_data.py --rows 50M --output-dir /data/synthetic --seed 7
+"""
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+OUTPUT_DIR = 'synthetic'                            # Relative to this folder
+RAW_OUTPUT = '00_chicago_crime_2001_2025_(raw).csv'  # Name stage 04 reads
+WEATHER_OUTPUT = 'synthetic_weather_hourly.csv'
+DEFAULT_ROWS = 1_000_000
+CHUNK_ROWS = 1_000_000
+START_YEAR = 2001
+END_YEAR = 2025
+SEED = 42
+# ============================================================
+
+import argparse
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from pipeline_utils import load_stage
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+RAW_COLUMNS = [
+    'ID', 'Case Number', 'Date', 'Block', 'IUCR', 'Primary Type', 'Description',
+    'Location Description', 'Arrest', 'Domestic', 'Beat', 'District', 'Ward',
+    'Community Area', 'FBI Code', 'X Coordinate', 'Y Coordinate', 'Year',
+    'Updated On', 'Latitude', 'Longitude', 'Location',
+]
+
+# Reported crimes per year (thousands), shape of the real export
+YEAR_VOLUME = {
+    2001: 486, 2002: 486, 2003: 475, 2004: 469, 2005: 453, 2006: 448, 2007: 437,
+    2008: 427, 2009: 392, 2010: 370, 2011: 352, 2012: 336, 2013: 307, 2014: 275,
+    2015: 264, 2016: 269, 2017: 269, 2018: 268, 2019: 261, 2020: 212, 2021: 209,
+    2022: 239, 2023: 262, 2024: 258, 2025: 230,
+}
+MONTH_WEIGHT = [0.85, 0.78, 0.90, 0.93, 1.04, 1.07, 1.12, 1.11, 1.03, 1.03, 0.95, 0.90]
+WEEKDAY_WEIGHT = [1.00, 0.97, 0.98, 0.98, 1.05, 1.03, 0.98]   # Mon..Sun
+HOUR_WEIGHT = [5.0, 3.3, 2.9, 2.4, 1.9, 1.6, 1.9, 2.6, 3.5, 4.1, 4.3, 4.5,
+               5.6, 4.7, 5.0, 5.3, 5.2, 5.3, 5.4, 5.3, 5.0, 4.7, 4.6, 3.9]
+ROUND_MINUTE_SHARE = 0.35   # Report times entered as hh:00
+HALF_HOUR_SHARE = 0.10      # ... or hh:30
+
+# Share of the scored (88-combination) crimes by Primary Type
+SCORED_TYPE_SHARE = {
+    'THEFT': 0.30, 'BATTERY': 0.22, 'CRIMINAL DAMAGE': 0.13, 'ASSAULT': 0.09,
+    'MOTOR VEHICLE THEFT': 0.07, 'BURGLARY': 0.06, 'ROBBERY': 0.04,
+    'CRIMINAL TRESPASS': 0.03, 'PUBLIC PEACE VIOLATION': 0.01, 'SEX OFFENSE': 0.006,
+    'CRIMINAL SEXUAL ASSAULT': 0.006, 'HOMICIDE': 0.002, 'ARSON': 0.002,
+    'INTIMIDATION': 0.001,
+}
+# Most common description within a type
+COMMON_DESCRIPTIONS = {
+    ('THEFT', '$500 AND UNDER'), ('THEFT', 'OVER $500'), ('THEFT', 'RETAIL THEFT'),
+    ('BATTERY', 'SIMPLE'), ('ASSAULT', 'SIMPLE'), ('CRIMINAL DAMAGE', 'TO VEHICLE'),
+    ('CRIMINAL DAMAGE', 'TO PROPERTY'), ('MOTOR VEHICLE THEFT', 'AUTOMOBILE'),
+    ('BURGLARY', 'FORCIBLE ENTRY'), ('ROBBERY', 'ARMED - HANDGUN'),
+    ('CRIMINAL TRESPASS', 'TO LAND'),
+}
+
+# Crimes removed by 08_remove_enforcement_crimes.py (share of all rows)
+UNSCORED_COMBOS = {
+    ('NARCOTICS', 'POSS: CANNABIS 30GMS OR LESS'): 0.040,
+    ('NARCOTICS', 'POSS: CRACK'): 0.020,
+    ('DECEPTIVE PRACTICE', 'FINANCIAL IDENTITY THEFT OVER $ 300'): 0.020,
+    ('DECEPTIVE PRACTICE', 'CREDIT CARD FRAUD'): 0.015,
+    ('OTHER OFFENSE', 'TELEPHONE THREAT'): 0.020,
+    ('OTHER OFFENSE', 'HARASSMENT BY TELEPHONE'): 0.025,
+    ('WEAPONS VIOLATION', 'UNLAWFUL POSSESSION - HANDGUN'): 0.015,
+    ('INTERFERENCE WITH PUBLIC OFFICER', 'RESISTING, OBSTRUCTING, OR DISARMING AN OFFICER'): 0.005,
+    ('OFFENSE INVOLVING CHILDREN', 'ENDANGERING LIFE / HEALTH OF CHILD'): 0.007,
+    ('PROSTITUTION', 'SOLICIT FOR PROSTITUTE'): 0.004,
+    ('STALKING', 'SIMPLE'): 0.002,
+    ('LIQUOR LAW VIOLATION', 'SELL / GIVE / DELIVER LIQUOR TO MINOR'): 0.002,
+    ('CONCEALED CARRY LICENSE VIOLATION', 'PRESENT WHEN DETAINED BY OFFICER'): 0.001,
+    ('GAMBLING', 'GAME / DICE'): 0.001,
+    ('PUBLIC INDECENCY', 'LICENSED PREMISE'): 0.0005,
+    ('NON-CRIMINAL', 'FOUND PASSPORT'): 0.0005,
+    ('HUMAN TRAFFICKING', 'COMMERCIAL SEX ACTS'): 0.0001,
+    ('OBSCENITY', 'OBSCENE MATTER'): 0.0001,
+}
+# Combinations rare enough for 10_remove_rare_combinations.py to drop
+RARE_COMBOS = {
+    ('THEFT', 'ATTEMPT FINANCIAL IDENTITY THEFT'): 1e-6,
+    ('BATTERY', 'AGGRAVATED OF A UNBORN CHILD'): 1e-6,
+    ('ROBBERY', 'ATTEMPT ARMED - OTHER FIREARM'): 1e-6,
+    ('HOMICIDE', 'RECKLESS HOMICIDE'): 1e-6,
+    ('ARSON', 'POSSESSION - EXPLOSIVE / INCENDIARY DEVICE'): 1e-6,
+}
+
+DOMESTIC_RATE = {'BATTERY': 0.50, 'ASSAULT': 0.30, 'OFFENSE INVOLVING CHILDREN': 0.40,
+                 'CRIMINAL DAMAGE': 0.15, 'INTIMIDATION': 0.10, 'STALKING': 0.40}
+DOMESTIC_RATE_DEFAULT = 0.04
+ARREST_RATE = {'NARCOTICS': 0.95, 'WEAPONS VIOLATION': 0.85, 'PROSTITUTION': 0.98,
+               'GAMBLING': 0.95, 'LIQUOR LAW VIOLATION': 0.95,
+               'CONCEALED CARRY LICENSE VIOLATION': 0.95,
+               'INTERFERENCE WITH PUBLIC OFFICER': 0.90, 'CRIMINAL TRESPASS': 0.55}
+ARREST_RATE_DEFAULT = 0.12
+
+FBI_CODE = {'HOMICIDE': '01A', 'CRIMINAL SEXUAL ASSAULT': '02', 'ROBBERY': '03',
+            'ASSAULT': '04A', 'BATTERY': '04B', 'BURGLARY': '05', 'THEFT': '06',
+            'MOTOR VEHICLE THEFT': '07', 'ARSON': '09', 'DECEPTIVE PRACTICE': '11',
+            'CRIMINAL DAMAGE': '14', 'WEAPONS VIOLATION': '15', 'PROSTITUTION': '16',
+            'SEX OFFENSE': '17', 'NARCOTICS': '18', 'GAMBLING': '19',
+            'OFFENSE INVOLVING CHILDREN': '20', 'LIQUOR LAW VIOLATION': '22'}
+
+LOCATION_DESCRIPTIONS = {
+    'STREET': 0.22, 'RESIDENCE': 0.16, 'APARTMENT': 0.14, 'SIDEWALK': 0.08,
+    'OTHER': 0.05, 'PARKING LOT / GARAGE (NON RESIDENTIAL)': 0.04,
+    'SMALL RETAIL STORE': 0.04, 'RESTAURANT': 0.03, 'ALLEY': 0.03,
+    'DEPARTMENT STORE': 0.03, 'RESIDENCE - PORCH / HALLWAY': 0.03,
+    'GROCERY FOOD STORE': 0.03, 'VEHICLE NON-COMMERCIAL': 0.03,
+    'COMMERCIAL / BUSINESS OFFICE': 0.03, 'CTA TRAIN': 0.02, 'GAS STATION': 0.02,
+    'SCHOOL - PUBLIC BUILDING': 0.02,
+}
+STREETS = ['STATE ST', 'MICHIGAN AVE', 'HALSTED ST', 'ASHLAND AVE', 'WESTERN AVE',
+           'PULASKI RD', 'CICERO AVE', 'MADISON ST', 'CHICAGO AVE', 'NORTH AVE',
+           'DIVISION ST', 'ROOSEVELT RD', 'CERMAK RD', '63RD ST', '79TH ST',
+           'KEDZIE AVE', 'CLARK ST', 'BROADWAY', 'LAWRENCE AVE', 'IRVING PARK RD']
+
+# Rates of missing values
+COORDINATE_NULL_RATE = 0.015
+LOCATION_DESCRIPTION_NULL_RATE = 0.004
+COMMUNITY_AREA_NULL_RATE = 0.0001
+COMMUNITY_AREA_NULL_RATE_2001 = 0.90   # Community Area / Ward were not recorded yet
+
+# Chicago bounding box and State Plane coordinate ranges
+LAT_RANGE = (41.65, 42.02)
+LON_RANGE = (-87.93, -87.53)
+X_RANGE = (1_100_000, 1_205_000)
+Y_RANGE = (1_813_000, 1_951_000)
+N_COMMUNITY_AREAS = 77
+
+
+def parse_rows(text):
+    """'100k' / '2.5M' / '50000000' -> int"""
+    text = str(text).strip().lower().replace('_', '').replace(',', '')
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    if multiplier > 1:
+        text = text[:-1]
+    return int(float(text) * multiplier)
+
+
+def format_portal_dates(timestamps):
+    """
+    datetime64 array -> portal date strings ('%m/%d/%Y %I:%M:%S %p')
+    strftime on millions of rows is slow; formatting each distinct day and
+    each minute of the day once, then joining the pieces, is much faster.
+    Timestamps are assumed to fall on whole minutes.
+    """
+    days = timestamps.astype('datetime64[D]')
+    unique_days, day_index = np.unique(days, return_inverse=True)
+    day_text = pd.DatetimeIndex(unique_days).strftime('%m/%d/%Y ').to_numpy(dtype=object)
+    minute_text = pd.date_range('2000-01-01', periods=24 * 60, freq='min').strftime('%I:%M:%S %p').to_numpy(dtype=object)
+    minute_of_day = ((timestamps - days) // np.timedelta64(1, 'm')).astype(int)
+    return day_text[day_index] + minute_text[minute_of_day]
+
+
+def crime_combinations():
+    """(primary type, description) pairs and their probabilities"""
+    severity_mapping = load_stage('11_add_severity_scores.py').SEVERITY_MAPPING
+    unscored_total = sum(UNSCORED_COMBOS.values())
+    rare_total = sum(RARE_COMBOS.values())
+    scored_total = 1.0 - unscored_total - rare_total
+
+    type_share_total = sum(SCORED_TYPE_SHARE.values())
+    combos, weights = [], []
+    for primary_type, share in SCORED_TYPE_SHARE.items():
+        descriptions = [(combo, score) for combo, score in severity_mapping.items()
+                        if combo[0] == primary_type]
+        # Lower-severity variants are the common ones
+        raw = np.array([np.exp(-0.5 * score) * (5.0 if combo in COMMON_DESCRIPTIONS else 1.0)
+                        for combo, score in descriptions])
+        raw = raw / raw.sum() * share / type_share_total * scored_total
+        combos.extend(combo for combo, _ in descriptions)
+        weights.extend(raw)
+
+    for extra in (UNSCORED_COMBOS, RARE_COMBOS):
+        combos.extend(extra)
+        weights.extend(extra.values())
+
+    weights = np.array(weights)
+    return combos, weights / weights.sum()
+
+
+def community_areas():
+    """Fixed per-area volume weights, centroids, districts, beats and wards"""
+    rng = np.random.default_rng(77)   # Same geography for every seed
+    weights = rng.lognormal(mean=0.0, sigma=0.6, size=N_COMMUNITY_AREAS)
+    lat = rng.uniform(LAT_RANGE[0] + 0.02, LAT_RANGE[1] - 0.02, N_COMMUNITY_AREAS)
+    lon = rng.uniform(LON_RANGE[0] + 0.04, LON_RANGE[1] - 0.02, N_COMMUNITY_AREAS)
+    district = rng.integers(1, 26, N_COMMUNITY_AREAS)
+    ward = rng.integers(1, 51, N_COMMUNITY_AREAS)
+    return {
+        'area': np.arange(1, N_COMMUNITY_AREAS + 1),
+        'weight': weights / weights.sum(),
+        'lat': lat, 'lon': lon, 'district': district, 'ward': ward,
+    }
+
+
+def day_weights(start_year, end_year):
+    """Every day in the range with its relative crime volume"""
+    days = pd.date_range(f'{start_year}-01-01', f'{end_year}-12-31', freq='D')
+    year_volume = np.array([YEAR_VOLUME.get(y, 260) for y in days.year], dtype=float)
+    days_in_year = np.where(days.is_leap_year, 366, 365)
+    weights = (year_volume / days_in_year
+               * np.take(MONTH_WEIGHT, days.month - 1)
+               * np.take(WEEKDAY_WEIGHT, days.dayofweek))
+    return days.values.astype('datetime64[s]'), weights / weights.sum()
+
+
+def iter_crime_chunks(rows, start_year=START_YEAR, end_year=END_YEAR, seed=SEED,
+                      chunk_rows=CHUNK_ROWS):
+    """Yield DataFrames of raw-schema rows, chunk_rows at a time"""
+    combos, combo_p = crime_combinations()
+    combo_types = np.array([c[0] for c in combos], dtype=object)
+    combo_desc = np.array([c[1] for c in combos], dtype=object)
+    combo_iucr = np.array([f"{(i * 37) % 9000 + 100:04d}" for i in range(len(combos))], dtype=object)
+    combo_fbi = np.array([FBI_CODE.get(t, '26') for t in combo_types], dtype=object)
+    combo_domestic = np.array([DOMESTIC_RATE.get(t, DOMESTIC_RATE_DEFAULT) for t in combo_types])
+    combo_arrest = np.array([ARREST_RATE.get(t, ARREST_RATE_DEFAULT) for t in combo_types])
+
+    areas = community_areas()
+    days, day_p = day_weights(start_year, end_year)
+    hour_p = np.array(HOUR_WEIGHT) / sum(HOUR_WEIGHT)
+    location_names = np.array(list(LOCATION_DESCRIPTIONS), dtype=object)
+    location_p = np.array(list(LOCATION_DESCRIPTIONS.values()))
+    location_p = location_p / location_p.sum()
+
+    block_rng = np.random.default_rng(seed + 1)
+    blocks = np.array([f"{block_rng.integers(0, 130):03d}XX {block_rng.choice(['N', 'S', 'E', 'W'])} "
+                       f"{block_rng.choice(STREETS)}" for _ in range(4000)], dtype=object)
+
+    children = np.random.SeedSequence(seed).spawn((rows + chunk_rows - 1) // chunk_rows)
+    next_id = 1_000_000
+    for chunk_index, child in enumerate(children):
+        n = min(chunk_rows, rows - chunk_index * chunk_rows)
+        rng = np.random.default_rng(child)
+
+        # Timestamps: day (year/month/weekday skew) + hour curve + rounded minutes
+        minute = rng.integers(0, 60, n)
+        minute_kind = rng.random(n)
+        minute = np.where(minute_kind < ROUND_MINUTE_SHARE, 0,
+                          np.where(minute_kind < ROUND_MINUTE_SHARE + HALF_HOUR_SHARE, 30, minute))
+        timestamps = (rng.choice(days, n, p=day_p)
+                      + rng.choice(24, n, p=hour_p).astype('timedelta64[h]')
+                      + minute.astype('timedelta64[m]'))
+        years = timestamps.astype('datetime64[Y]').astype(int) + 1970
+
+        combo = rng.choice(len(combos), n, p=combo_p)
+        area_idx = rng.choice(N_COMMUNITY_AREAS, n, p=areas['weight'])
+
+        lat = areas['lat'][area_idx] + rng.normal(0, 0.012, n)
+        lon = areas['lon'][area_idx] + rng.normal(0, 0.015, n)
+        lat = np.clip(lat, *LAT_RANGE)
+        lon = np.clip(lon, *LON_RANGE)
+        x = X_RANGE[0] + (lon - LON_RANGE[0]) / (LON_RANGE[1] - LON_RANGE[0]) * (X_RANGE[1] - X_RANGE[0])
+        y = Y_RANGE[0] + (lat - LAT_RANGE[0]) / (LAT_RANGE[1] - LAT_RANGE[0]) * (Y_RANGE[1] - Y_RANGE[0])
+
+        district = areas['district'][area_idx]
+        beat = district * 100 + rng.integers(11, 35, n)
+
+        # Missing values
+        no_coords = rng.random(n) < COORDINATE_NULL_RATE
+        area_null_rate = np.where(years == 2001, COMMUNITY_AREA_NULL_RATE_2001, COMMUNITY_AREA_NULL_RATE)
+        no_area = rng.random(n) < area_null_rate
+        no_location = rng.random(n) < LOCATION_DESCRIPTION_NULL_RATE
+
+        lat = np.round(np.where(no_coords, np.nan, lat), 9)
+        lon = np.round(np.where(no_coords, np.nan, lon), 9)
+        location = np.where(no_coords, None,
+                            '(' + pd.Series(lat).astype(str) + ', ' + pd.Series(lon).astype(str) + ')')
+
+        updated = timestamps + rng.integers(1, 400, n).astype('timedelta64[D]')
+        case_letter = np.array(list('GHIJKLMN'), dtype=object)[(years - 2001).clip(0) // 4 % 8]
+
+        chunk = pd.DataFrame({
+            'ID': np.arange(next_id, next_id + n),
+            'Case Number': case_letter + pd.Series(rng.integers(0, 1_000_000, n)).astype(str).str.zfill(6).to_numpy(),
+            'Date': format_portal_dates(timestamps),
+            'Block': blocks[rng.integers(0, len(blocks), n)],
+            'IUCR': combo_iucr[combo],
+            'Primary Type': combo_types[combo],
+            'Description': combo_desc[combo],
+            'Location Description': np.where(no_location, None,
+                                             rng.choice(location_names, n, p=location_p)),
+            'Arrest': rng.random(n) < combo_arrest[combo],
+            'Domestic': rng.random(n) < combo_domestic[combo],
+            'Beat': beat,
+            'District': district,
+            'Ward': pd.array(np.where(no_area, np.nan, areas['ward'][area_idx]), dtype='Int64'),
+            'Community Area': pd.array(np.where(no_area, np.nan, areas['area'][area_idx]), dtype='Int64'),
+            'FBI Code': combo_fbi[combo],
+            'X Coordinate': pd.array(np.where(no_coords, np.nan, np.round(x)), dtype='Int64'),
+            'Y Coordinate': pd.array(np.where(no_coords, np.nan, np.round(y)), dtype='Int64'),
+            'Year': years,
+            'Updated On': format_portal_dates(updated),
+            'Latitude': lat,
+            'Longitude': lon,
+            'Location': location,
+        }, columns=RAW_COLUMNS)
+
+        next_id += n
+        yield chunk
+
+
+def generate_crimes(path, rows, start_year=START_YEAR, end_year=END_YEAR, seed=SEED,
+                    chunk_rows=CHUNK_ROWS):
+    """Stream a raw-schema crime CSV to disk; returns the number of rows written"""
+    written = 0
+    for i, chunk in enumerate(iter_crime_chunks(rows, start_year, end_year, seed, chunk_rows)):
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        written += len(chunk)
+        print(f"      {written:>12,} / {rows:,} rows", end='\r')
+    print()
+    return written
+
+
+def generate_weather(path, start_year=START_YEAR, end_year=END_YEAR, seed=SEED):
+    """
+    Hourly weather in Meteostat's column layout (time, temp, rhum, prcp, wspd,
+    wdir, pres, coco) with a Chicago-like annual and daily temperature cycle
+    """
+    rng = np.random.default_rng(seed + 2)
+    hours = pd.date_range(f'{start_year}-01-01', f'{end_year}-12-31 23:00', freq='h')
+    n_days = len(hours) // 24
+
+    # Multi-day warm/cold spells and pressure systems (AR(1) per day)
+    anomaly = np.zeros(n_days)
+    pressure = np.zeros(n_days)
+    shocks = rng.normal(0, 1, (n_days, 2))
+    for d in range(1, n_days):
+        anomaly[d] = 0.8 * anomaly[d - 1] + 2.0 * shocks[d, 0]
+        pressure[d] = 0.7 * pressure[d - 1] + 4.0 * shocks[d, 1]
+    anomaly = np.repeat(anomaly, 24)
+    pressure = np.repeat(pressure, 24)
+
+    doy = hours.dayofyear.to_numpy()
+    hour = hours.hour.to_numpy()
+    temp = (10.5 - 14.5 * np.cos(2 * np.pi * (doy - 20) / 365.25)
+            + 4.0 * np.cos(2 * np.pi * (hour - 15) / 24)
+            + anomaly + rng.normal(0, 0.8, len(hours)))
+    rhum = np.clip(68 + 12 * np.cos(2 * np.pi * (hour - 5) / 24) + rng.normal(0, 8, len(hours)), 20, 100)
+
+    rainy_day = np.repeat(rng.random(n_days) < 0.30, 24)
+    raining = rainy_day & (rng.random(len(hours)) < 0.30)
+    prcp = np.where(raining, rng.exponential(1.2, len(hours)), 0.0)
+
+    coco = np.where(raining, np.where(temp < 0, 15, 8), rng.integers(1, 5, len(hours)))
+
+    weather = pd.DataFrame({
+        'time': hours,
+        'temp': temp.round(1),
+        'rhum': rhum.round(0),
+        'prcp': prcp.round(1),
+        'wspd': rng.gamma(2.0, 8.0, len(hours)).round(1),
+        'wdir': (rng.integers(0, 36, len(hours)) * 10).astype(float),
+        'pres': (1016 + pressure).round(1),
+        'coco': coco.astype(float),
+    })
+    weather.to_csv(path, index=False)
+    return len(weather)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic Chicago crime data")
+    parser.add_argument('--rows', default=str(DEFAULT_ROWS), help="e.g. 100k, 1M, 50M")
+    parser.add_argument('--output-dir', default=os.path.join(script_dir, OUTPUT_DIR))
+    parser.add_argument('--start-year', type=int, default=START_YEAR)
+    parser.add_argument('--end-year', type=int, default=END_YEAR)
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--chunk-rows', default=str(CHUNK_ROWS))
+    parser.add_argument('--no-weather', action='store_true', help="skip the hourly weather file")
+    args = parser.parse_args()
+
+    rows = parse_rows(args.rows)
+    chunk_rows = parse_rows(args.chunk_rows)
+    os.makedirs(args.output_dir, exist_ok=True)
+    crime_path = os.path.join(args.output_dir, RAW_OUTPUT)
+    weather_path = os.path.join(args.output_dir, WEATHER_OUTPUT)
+
+    print("=" * 70)
+    print("GENERATING SYNTHETIC CHICAGO CRIME DATA")
+    print("=" * 70)
+    print(f"\nRows:   {rows:,} ({args.start_year}-{args.end_year}, seed {args.seed})")
+    print(f"Output: {args.output_dir}")
+
+    start = datetime.now()
+    print(f"\n[1/2] Writing crimes to {RAW_OUTPUT}...")
+    generate_crimes(crime_path, rows, args.start_year, args.end_year, args.seed, chunk_rows)
+    size_mb = os.path.getsize(crime_path) / (1024 * 1024)
+    print(f"      ✓ {size_mb:,.1f} MB")
+
+    if args.no_weather:
+        print("\n[2/2] Skipping weather")
+    else:
+        print(f"\n[2/2] Writing hourly weather to {WEATHER_OUTPUT}...")
+        hours = generate_weather(weather_path, args.start_year, args.end_year, args.seed)
+        print(f"      ✓ {hours:,} hourly records")
+
+    print("\n" + "=" * 70)
+    print(f"✓ COMPLETE in {datetime.now() - start}")
+    print("=" * 70)
+    print("To run the pipeline on this data, point stage 04 at the crime file and")
+    print(f"set PIPELINE_WEATHER_FILE={weather_path} so stage 15 works offline.")
+
+
+if __name__ == "__main__":
+    main()
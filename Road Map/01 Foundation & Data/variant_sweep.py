@@ -0,0 +1,488 @@
+"""
+PIPELINE VARIANT SWEEP
+Runs the pipeline under a grid of stage settings and compares the models
+
+A sweep varies the UPPER_CASE constants of stages (THRESHOLD in 10,
+REMOVE_TYPES in 08, SEVERITY_MAPPING in 11, ...). Every combination is one
+variant: the chain from the first varied stage to training, with its own
+settings. Variants that agree up to a stage share that prefix, so the runs
+form a tree:
+
+    08.1 ─ 10 THRESHOLD=50  ─ 11 ─ 13 ... 24 ─ train
+         ├ 10 THRESHOLD=100 ─ 11 ─ 13 ... 24 ─ train
+         └ 10 THRESHOLD=200 ─ 11 ─ 13 ... 24 ─ train
+
+Each node of the tree (one stage with one set of settings) runs once, in its
+own folder under variants/nodes/ with a copy of the scripts whose constants
+are rewritten (the originals are never edited). Its input is a link to its
+parent's output. Nodes whose parents are done run side by side. A node is
+keyed by a hash of its parent, its scripts and its settings, so re-running a
+sweep, or a new sweep sharing a prefix with an old one, reuses finished nodes.
+
+The chain starts from the first varied stage's input in this folder (e.g.
+08.1_enforcement_crimes_removed.csv for a THRESHOLD sweep), so run the normal
+pipeline up to there first. Training runs 01_train_model.py without plots or
+SHAP on each variant's 24.1 and collects its metrics; each training node
+registers its model in a registry of its own (MODEL_REGISTRY_DIR), never
+the one prediction uses.
+
+Steps:
+  [1/3] Plan the variant tree (nodes shared between variants listed once)
+  [2/3] Run the nodes, parents before children, as many at once as --workers
+  [3/3] Compare the variants: data size, build and training time, metrics
+        (variants/sweep_results.csv / .md)
+
+Usage:
+    python variant_sweep.py                                   # GRID below
+    python variant_sweep.py --vary 10:THRESHOLD=50,100,200
+    python variant_sweep.py --vary 10:THRESHOLD=50,200 --vary "08:REMOVE_TYPES=['NARCOTICS'],[]"
+    python variant_sweep.py --workers 3 --clean               # remove nodes of older sweeps
+    python chicago_crime.py sweep --vary 10:THRESHOLD=50,100,200
+
+Note: variants that change SEVERITY_MAPPING change the target itself, so
+their test metrics measure different things.
+"""
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+# Stages a sweep can vary, in pipeline order (training follows the last one)
+CHAIN = [
+    '04_data_row_truncator_2023_2025.py',
+    '05_data_column_truncator.py',
+    '07_domestic_remove.py',
+    '08_remove_enforcement_crimes.py',
+    '10_remove_rare_combinations.py',
+    '11_add_severity_scores.py',
+    '13_adding_weekly_columns.py',
+    '14_adding_holidays.py',
+    '15_download_add_weather.py',
+    '16_weather_DI_add.py',
+    '17_column_truncator.py',
+    '18_3h_blocks_0_crime_blocks.py',
+    '20_school_in_out.py',
+    '21_big_events.py',
+    '22_moon_illumination.py',
+    '23_add_solar_altitude.py',
+    '24_pretain_prune.py',
+]
+TRAIN_SCRIPT = '../02 Create Prediction Models/01_train_model.py'
+
+# Default grid: {stage: {CONSTANT: values}}. Values are a list of literals, or
+# a dict {label: value} where a value may be a function of the stage's own
+# setting. --vary replaces this grid.
+GRID = {
+    '10_remove_rare_combinations.py': {'THRESHOLD': [50, 100, 200]},
+    # '08_remove_enforcement_crimes.py': {'REMOVE_TYPES': {
+    #     'default': lambda types: types,
+    #     'keep narcotics': lambda types: [t for t in types if t != 'NARCOTICS'],
+    # }},
+    # '11_add_severity_scores.py': {'SEVERITY_MAPPING': {
+    #     'default': lambda table: table,
+    #     'flat battery': lambda table: {k: (4 if k[0] == 'BATTERY' else v) for k, v in table.items()},
+    # }},
+}
+
+# Row counts reported per variant: {column: stage whose output is counted}
+SIZE_STAGES = {
+    'Crimes': '17_column_truncator.py',
+    'Blocks': '24_pretain_prune.py',
+}
+
+VARIANTS_DIR = 'variants'
+NODES_DIR = 'nodes'
+RESULTS_CSV = 'sweep_results.csv'
+RESULTS_MD = 'sweep_results.md'
+DONE_MARKER = '.complete'
+MAX_LABEL_LENGTH = 24    # Longer values are labelled "option N"
+
+# Settings outside the scripts that change a node's output
+FINGERPRINT_ENV = ['PIPELINE_YEARS', 'PIPELINE_WEATHER_FILE']
+# ============================================================
+
+import argparse
+import ast
+import csv
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import memory_budget
+import run_history
+from contracts import preflight
+from pipeline_utils import SCRIPT_DIR, override_constants, read_config, script_dependencies
+
+TRAIN_PATH = os.path.normpath(os.path.join(SCRIPT_DIR, TRAIN_SCRIPT))
+
+
+def stage_name(prefix):
+    """'10' / '10_remove' / '10_remove_rare_combinations.py' -> the CHAIN entry"""
+    matches = [name for name in CHAIN if name.startswith(prefix)]
+    if len(matches) != 1:
+        raise SystemExit(f"✗ '{prefix}' matches {len(matches)} stages of the sweep chain")
+    return matches[0]
+
+
+def short_label(value, index):
+    text = repr(value)
+    return text if len(text) <= MAX_LABEL_LENGTH else f"option {index}"
+
+
+def parse_vary(specs):
+    """--vary STAGE:CONSTANT=v1,v2,... -> grid (values are Python literals)"""
+    grid = {}
+    for spec in specs:
+        try:
+            target, values = spec.split('=', 1)
+            prefix, constant = target.split(':', 1)
+            parsed = ast.literal_eval(f"[{values}]")
+        except (ValueError, SyntaxError):
+            raise SystemExit(f"✗ Can't read --vary {spec!r} (expected STAGE:CONSTANT=value,value,...)")
+        grid.setdefault(stage_name(prefix), {})[constant.strip()] = parsed
+    return grid
+
+
+def stage_options(stage, settings):
+    """[(label, {CONSTANT: value})] for every combination of one stage's settings"""
+    current = read_config(stage)
+    per_constant = []
+    for constant, values in settings.items():
+        if constant not in current:
+            raise SystemExit(f"✗ {stage} has no literal top-level constant {constant}")
+        items = values.items() if isinstance(values, dict) else (
+            (short_label(value, i), value) for i, value in enumerate(values, 1))
+        resolved = [(f"{constant}={label}", value(current[constant]) if callable(value) else value)
+                    for label, value in items]
+        per_constant.append([(label, constant, value) for label, value in resolved])
+
+    options = []
+    for combo in itertools.product(*per_constant):
+        label = f"{stage[:2]} " + ' '.join(label for label, _, _ in combo)
+        options.append((label, {constant: value for _, constant, value in combo}))
+    return options
+
+
+class Node:
+    """One stage (or training) with one set of settings, below its parent's output"""
+
+    def __init__(self, script, overrides, parent, root, root_key):
+        self.script = script
+        self.overrides = overrides
+        self.parent = parent
+        self.children = []
+        self.is_train = script == TRAIN_PATH
+        config = read_config(script)
+
+        digest = hashlib.sha256((parent.key if parent else root_key).encode())
+        digest.update(os.path.basename(script).encode())
+        digest.update(repr(sorted(overrides.items())).encode())
+        for path in script_dependencies([script]):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        for name in FINGERPRINT_ENV:
+            digest.update(f'{name}={os.environ.get(name, "")}\n'.encode())
+        self.key = digest.hexdigest()
+
+        self.folder = os.path.join(SCRIPT_DIR, VARIANTS_DIR, NODES_DIR, self.key[:16])
+        self.input = parent.output if parent else root
+        self.input_name = config.get('INPUT_FILE')
+        self.output = os.path.join(self.folder, 'metrics.json' if self.is_train else config['OUTPUT_FILE'])
+        self.log = os.path.join(self.folder, os.path.basename(script).replace('.py', '.log'))
+        self.info = None
+
+    def is_current(self):
+        marker = os.path.join(self.folder, DONE_MARKER)
+        if not os.path.exists(marker) or not os.path.exists(self.output):
+            return False
+        with open(marker) as f:
+            info = json.load(f)
+        if info.get('key') != self.key:
+            return False
+        self.info = info
+        return True
+
+
+def file_digest(path):
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 24), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def plan(grid):
+    """
+    Build the variant tree
+    Returns (chain scripts, root input, first-level nodes, [(label, train node)], node count)
+    """
+    first = min(CHAIN.index(stage) for stage in grid)
+    chain = CHAIN[first:]
+    root = os.path.join(SCRIPT_DIR, read_config(chain[0])['INPUT_FILE'])
+    if not os.path.exists(root):
+        raise SystemExit(f"✗ {os.path.basename(root)} not found - run the pipeline up to "
+                         f"{chain[0]} first")
+
+    root_key = file_digest(root)
+    choices = [stage_options(stage, grid[stage]) if stage in grid else [('', {})] for stage in chain]
+    nodes = {}
+    tops = []
+    variants = []
+    for picks in itertools.product(*choices):
+        parent = None
+        for stage, (_, overrides) in zip(chain + [TRAIN_PATH], list(picks) + [('', {})]):
+            node = Node(os.path.join(SCRIPT_DIR, stage), overrides, parent, root, root_key)
+            if node.key not in nodes:
+                nodes[node.key] = node
+                (parent.children if parent else tops).append(node)
+            parent = nodes[node.key]
+        label = ', '.join(label for label, _ in picks if label) or 'baseline'
+        variants.append((label, parent))
+    return [os.path.join(SCRIPT_DIR, stage) for stage in chain] + [TRAIN_PATH], root, tops, variants, len(nodes)
+
+
+def child_env(workers, budget_gb):
+    """Environment of a node's script: an equal share of the cores and memory, no history"""
+    env = dict(os.environ)
+    env['PIPELINE_WORKERS'] = str(max(1, (os.cpu_count() or 1) // workers))
+    env['PIPELINE_MEMORY_BUDGET'] = f'{budget_gb / workers:.3f}GB'
+    env['PIPELINE_HISTORY'] = '0'     # Variant runs would blur the main run history
+    env['TRAIN_MAKE_PLOTS'] = '0'
+    env['TRAIN_RUN_SHAP'] = '0'
+    env.pop('PIPELINE_RUN_ID', None)
+    env.pop('TRAIN_INCREMENTAL', None)
+    return env
+
+
+def run_node(node, env):
+    """Run one node in its folder; returns (node, ok, reused)"""
+    if node.is_current():
+        return node, True, True
+
+    shutil.rmtree(node.folder, ignore_errors=True)
+    os.makedirs(node.folder)
+    if node.is_train:
+        # Model, report and registry land in the node folder: a variant never becomes the current model
+        command = [sys.executable, node.script]
+        env = dict(env, TRAIN_INPUT_FILE=node.input, TRAIN_METRICS_FILE=node.output,
+                   MODEL_REGISTRY_DIR=os.path.join(node.folder, 'registry'))
+        cwd = node.folder
+    else:
+        for name in os.listdir(SCRIPT_DIR):
+            if name.endswith('.py'):
+                shutil.copy2(os.path.join(SCRIPT_DIR, name), node.folder)
+        script = os.path.join(node.folder, os.path.basename(node.script))
+        if node.overrides:
+            with open(node.script, encoding='utf-8') as f:
+                source = override_constants(f.read(), node.overrides)
+            with open(script, 'w', encoding='utf-8') as f:
+                f.write(source)
+        os.symlink(node.input, os.path.join(node.folder, node.input_name))
+        command = [sys.executable, script]
+        cwd = node.folder
+
+    with open(node.log, 'w') as log:
+        returncode, seconds, peak_mb = run_history.run_child(command, cwd=cwd, env=env, stdout=log)
+    if returncode != 0 or not os.path.exists(node.output):
+        return node, False, False
+
+    node.info = {'key': node.key, 'seconds': seconds, 'peak_mb': peak_mb}
+    if not node.is_train:
+        size, rows, _, _ = run_history.describe_file(node.output)
+        node.info.update(rows=rows, mb=size / 1024 ** 2)
+    with open(os.path.join(node.folder, DONE_MARKER), 'w') as f:
+        json.dump(node.info, f)
+    return node, True, False
+
+
+def describe(node):
+    name = os.path.basename(node.script)
+    return name if not node.overrides else f"{name} ({', '.join(sorted(node.overrides))})"
+
+
+def run_tree(tops, workers, env):
+    """Run every node once its parent is done; returns the failed nodes"""
+    failed = []
+    built = reused = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(run_node, node, env): node for node in tops}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                del pending[future]
+                node, ok, was_reused = future.result()
+                if not ok:
+                    print(f"      ✗ {describe(node)} failed (log: {os.path.relpath(node.log, SCRIPT_DIR)})")
+                    failed.append(node)
+                    continue
+                if was_reused:
+                    reused += 1
+                else:
+                    built += 1
+                    print(f"      ✓ {describe(node)} [{node.key[:8]}] ({node.info['seconds']:.0f}s)")
+                for child in node.children:
+                    pending[pool.submit(run_node, child, env)] = child
+    return failed, built, reused
+
+
+def chain_of(node):
+    nodes = []
+    while node:
+        nodes.append(node)
+        node = node.parent
+    return nodes[::-1]
+
+
+def variant_row(label, train_node):
+    """One row of the comparison table"""
+    chain = chain_of(train_node)
+    row = {'variant': label}
+    for column, stage in SIZE_STAGES.items():
+        matches = [n for n in chain if os.path.basename(n.script) == stage and n.info]
+        row[column] = matches[0].info['rows'] if matches else None
+    built = [n for n in chain if n.info and not n.is_train]
+    row['build_s'] = sum(n.info['seconds'] for n in built) if len(built) == len(chain) - 1 else None
+    if train_node.info is None or not os.path.exists(train_node.output):
+        failed = next((n for n in chain if n.info is None), train_node)
+        row['status'] = f"failed at {os.path.basename(failed.script)}"
+        return row
+    with open(train_node.output) as f:
+        metrics = json.load(f)
+    row.update({
+        'train_rows': metrics['train_rows'],
+        'train_s': metrics['train_seconds'],
+        'test_rmse': metrics['test_rmse'],
+        'test_mae': metrics['test_mae'],
+        'test_r2': metrics['test_r2'],
+        'train_rmse': metrics['train_rmse'],
+        'status': 'ok',
+    })
+    return row
+
+
+def fmt(value, spec):
+    return '-' if value is None else format(value, spec)
+
+
+def write_results(rows, folder):
+    columns = ['variant', *SIZE_STAGES, 'build_s', 'train_rows', 'train_s',
+               'test_rmse', 'test_mae', 'test_r2', 'train_rmse', 'status']
+    with open(os.path.join(folder, RESULTS_CSV), 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    header = ['Variant', *SIZE_STAGES, 'Build (s)', 'Train rows', 'Train (s)',
+              'Test RMSE', 'Test MAE', 'Test R²', 'Train RMSE']
+    lines = [
+        "# Pipeline Variant Sweep",
+        "",
+        f"Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        "",
+        "| " + " | ".join(header) + " |",
+        "|" + "|".join("---" for _ in header) + "|",
+    ]
+    for row in rows:
+        cells = [row['variant'], *(fmt(row.get(c), ',') for c in SIZE_STAGES),
+                 fmt(row.get('build_s'), '.0f'), fmt(row.get('train_rows'), ','),
+                 fmt(row.get('train_s'), '.1f'), fmt(row.get('test_rmse'), '.4f'),
+                 fmt(row.get('test_mae'), '.4f'), fmt(row.get('test_r2'), '.4f'),
+                 fmt(row.get('train_rmse'), '.4f')]
+        if row['status'] != 'ok':
+            cells[-1] += f" ({row['status']})"
+        lines.append("| " + " | ".join(cells) + " |")
+    with open(os.path.join(folder, RESULTS_MD), 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def clean(nodes_root, keep):
+    removed = 0
+    for name in os.listdir(nodes_root):
+        if name not in keep:
+            shutil.rmtree(os.path.join(nodes_root, name), ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run and compare pipeline variants")
+    parser.add_argument('--vary', action='append', metavar='STAGE:CONSTANT=V1,V2',
+                        help="settings to sweep (repeatable; replaces GRID)")
+    parser.add_argument('--workers', type=int, help="nodes run at once (default: CPU cores)")
+    parser.add_argument('--memory-budget', metavar='GB',
+                        help="memory for all nodes running at once (default: PIPELINE_MEMORY_BUDGET)")
+    parser.add_argument('--clean', action='store_true', help="delete nodes not used by this sweep")
+    parser.add_argument('--no-preflight', action='store_true', help="skip the column contract check")
+    args = parser.parse_args(argv)
+    if args.memory_budget:
+        os.environ['PIPELINE_MEMORY_BUDGET'] = args.memory_budget
+
+    grid = parse_vary(args.vary) if args.vary else GRID
+    if not grid:
+        raise SystemExit("✗ Nothing to sweep - set GRID or pass --vary")
+
+    print("=" * 70)
+    print("PIPELINE VARIANT SWEEP")
+    print("=" * 70)
+    for stage, settings in grid.items():
+        for constant, values in settings.items():
+            print(f"  {stage}: {constant} x {len(values)}")
+
+    # Step 1: plan
+    print("\n[1/3] Planning the variant tree...")
+    chain_scripts, root, tops, variants, node_count = plan(grid)
+    if not args.no_preflight and not preflight(chain_scripts):
+        sys.exit(1)
+    unshared = len(variants) * len(chain_scripts)
+    print(f"      Input: {os.path.basename(root)}")
+    print(f"      Variants: {len(variants)}")
+    print(f"      Nodes: {node_count} (vs {unshared} without shared prefixes)")
+
+    # Step 2: run
+    workers = args.workers or min(os.cpu_count() or 1, len(variants))
+    print(f"\n[2/3] Running nodes ({workers} at once, {memory_budget.budget_label()} memory budget)...")
+    os.makedirs(os.path.join(SCRIPT_DIR, VARIANTS_DIR, NODES_DIR), exist_ok=True)
+    start_time = time.perf_counter()
+    failed, built, reused = run_tree(tops, workers, child_env(workers, memory_budget.budget_gb()))
+    if reused:
+        print(f"      ✓ {reused} node(s) reused from earlier sweeps")
+    print(f"      Built {built} node(s) in {time.perf_counter() - start_time:.0f}s")
+
+    # Step 3: compare
+    print("\n[3/3] Comparing variants...")
+    folder = os.path.join(SCRIPT_DIR, VARIANTS_DIR)
+    rows = [variant_row(label, node) for label, node in variants]
+    rows.sort(key=lambda row: (row['status'] != 'ok', row.get('test_rmse') or 0))
+    write_results(rows, folder)
+
+    width = max(len(row['variant']) for row in rows)
+    print(f"\n  {'Variant':<{width}} {'Crimes':>10} {'Blocks':>10} {'Train (s)':>10} "
+          f"{'RMSE':>8} {'MAE':>8} {'R²':>8}")
+    print("  " + "-" * (width + 60))
+    for row in rows:
+        if row['status'] != 'ok':
+            print(f"  {row['variant']:<{width}} ✗ {row['status']}")
+            continue
+        print(f"  {row['variant']:<{width}} {fmt(row['Crimes'], ','):>10} {fmt(row['Blocks'], ','):>10} "
+              f"{row['train_s']:>10.1f} {row['test_rmse']:>8.4f} {row['test_mae']:>8.4f} "
+              f"{row['test_r2']:>8.4f}")
+
+    if args.clean:
+        keep = {node.folder.rsplit(os.sep, 1)[1] for _, train in variants for node in chain_of(train)}
+        removed = clean(os.path.join(folder, NODES_DIR), keep)
+        print(f"\n  Removed {removed} node(s) of older sweeps")
+
+    print("\n" + "=" * 70)
+    print("✓ COMPLETE!" if not failed else f"⚠️  {len(failed)} node(s) failed")
+    print("=" * 70)
+    print(f"Results: {VARIANTS_DIR}/{RESULTS_CSV}, {VARIANTS_DIR}/{RESULTS_MD}")
+    print("=" * 70)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,33 +5,38 @@ Use this to get baseline results quickly, then tune later
 
 Input: 24.1_training_ready.csv
 Outputs:
-  - Trained model: 01.3_xgboost_model_quick.json
+  - Trained model: 01.3_xgboost_model_quick.json (and a new version in registry/)
   - Performance report: 01.1_training_results_quick.md
   - Feature importance plot: 01.2_feature_importance_quick.png
 
-Estimated Runtime: 5-10 minutes
+Runtime: measured each run (report and run history); training_benchmark.py
+measures how it scales with rows, threads and tree settings
 """
 
+# Heavy modules (sklearn, matplotlib) are imported inside the functions
+# that use them, so runs that skip plotting don't pay for them
 import pandas as pd
 import numpy as np
 import xgboost as xgb
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
-from sklearn.utils.class_weight import compute_sample_weight
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime
+from datetime import datetime, timedelta
+import json
+import os
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
-# Try to import SHAP, but continue if not available
-try:
-    import shap
-    SHAP_AVAILABLE = True
-except ImportError:
-    SHAP_AVAILABLE = False
-    print("⚠️  SHAP not installed - feature contribution ranges will be skipped")
-    print("   Install with: pip install shap")
+# Shared helpers live in the pipeline folder
+PIPELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '01 Foundation & Data')
+sys.path.append(PIPELINE_DIR)
+from artifact_cache import read_artifact
+from parallel_predict import predict_in_parallel
+import temporal_cv
+import run_history
+import training_cache
+import external_memory
+import categories
+import feature_contributions
+import model_registry
 
 # ============================================================
 # CONFIGURATION
@@ -42,6 +47,23 @@ MODEL_OUTPUT = '01.3_xgboost_model_final.json'
 RESULTS_OUTPUT = '01.1_training_results_final.md'
 FEATURE_IMPORTANCE_PLOT = '01.2_feature_importance_final.png'
 
+# Column contract (checked by contracts.py before each run): the model's
+# features are the input's columns minus TARGET and DROP_FEATURES
+TARGET = 'Severity_Score'
+DROP_FEATURES = [
+    # Weak features (low importance)
+    'is_violent_holiday',   # 1.01x impact - useless
+    'is_theft_holiday',     # 0.88x impact - counterproductive
+    'moon_illumination',    # 1.8% importance - no theoretical basis
+    'weekend_regular',      # 1.9% importance - redundant with time_block
+    # Complex features (require future data generation)
+    'heat_DI',              # 3.0% - requires weather forecast
+    'cold_DI',              # 2.9% - requires weather forecast
+    'solar_altitude',       # 2.8% - requires calculation
+    'school_in_session',    # 2.8% - requires school calendar
+    'major_event',          # 4.1% - requires manual tracking
+]
+
 # Quick baseline parameters (optimized based on feature analysis)
 QUICK_PARAMS = {
     'max_depth': 7,              # Deeper for Community Area × time_block interactions
@@ -50,13 +72,92 @@ QUICK_PARAMS = {
     'subsample': 0.8,
     'colsample_bytree': 0.8,
     'min_child_weight': 4,       # Slightly less conservative (was 5)
+    'tree_method': 'hist',       # Histogram splits (also needed for categorical features)
     'objective': 'reg:squarederror',
     'random_state': 42,
     'n_jobs': -1
 }
 
+# Community Area, time_block, day_of_week and month as native categorical
+# features (categories.py; XGBoost hist method) instead of ordinal numbers.
+# Off until categorical_benchmark.py shows a win on real data.
+# The CLI's --categorical flag sets TRAIN_CATEGORICAL=1.
+CATEGORICAL = os.environ.get('TRAIN_CATEGORICAL', '0') != '0'
+
+# Zero-block downsampling: keep each zero-severity training block with
+# probability ZERO_SAMPLE_RATE and weight the kept ones 1 / rate, so the
+# weighted loss is unbiased while training sees far fewer rows (see
+# zero_sampling_benchmark.py for accuracy vs time). 1.0 = keep all.
+# The CLI's --zero-rate flag sets TRAIN_ZERO_RATE.
+ZERO_SAMPLE_RATE = float(os.environ.get('TRAIN_ZERO_RATE', '1.0'))
+
 TEST_SIZE = 0.2
 RANDOM_STATE = 42
+NONZERO_WEIGHT = 2.5   # Sample weight of non-zero blocks (zero blocks: 1.0)
+
+# Temporal cross-validation by calendar month (see temporal_cv.py), run
+# before the final fit: 'rolling' = train on the months before each test
+# window, 'monthly' = hold out contiguous blocks of months in turn.
+# The CLI's --cv flag sets TRAIN_CV. None = random split only.
+CV_MODE = os.environ.get('TRAIN_CV') or None
+CV_FOLDS = 4
+CV_TEST_MONTHS = 3      # Months per test window ('rolling')
+CV_WORKERS = None       # Folds trained at once (None = all CPU cores, at most CV_FOLDS)
+
+# Optional outputs (skipping the plots also skips importing matplotlib)
+# The CLI's --no-plots / --no-shap flags set these environment variables
+MAKE_PLOTS = os.environ.get('TRAIN_MAKE_PLOTS', '1') != '0'
+RUN_SHAP = os.environ.get('TRAIN_RUN_SHAP', '1') != '0'
+
+# Evaluation prediction workers (feature columns shared via shared memory)
+PREDICT_WORKERS = None  # None = all CPU cores, 1 = single process
+
+# Incremental retraining: continue the current registered model with
+# INCREMENTAL_ROUNDS more trees fitted on the new and changed training rows
+# (rows are matched to the model's own training and test rows by content),
+# instead of training from scratch on everything. INCREMENTAL_REPLAY known
+# training rows per new row are fitted alongside, weighted for all the known
+# rows they stand for (like the zero-block downsampling), and the added trees
+# take smaller steps: trees fitted on a week of blocks alone also move every
+# other block and drift away from a full retrain (test RMSE +0.23 on the
+# synthetic 675k-row set with 30 trees at the full learning rate). A full retrain
+# runs instead when the last one is FULL_RETRAIN_DAYS old, when more than
+# INCREMENTAL_MAX_SHARE of the rows are new, changed or gone, or when the
+# features, params or settings changed. The CLI's train --incremental and
+# refresh_service.py set TRAIN_INCREMENTAL=1; --compare-full
+# (TRAIN_COMPARE_FULL=1) also trains from scratch on the same rows and
+# reports how far apart the two models are.
+INCREMENTAL = os.environ.get('TRAIN_INCREMENTAL', '0') != '0'
+INCREMENTAL_ROUNDS = int(os.environ.get('TRAIN_INCREMENTAL_ROUNDS', '10'))
+INCREMENTAL_LEARNING_RATE = 0.02
+INCREMENTAL_REPLAY = 20
+FULL_RETRAIN_DAYS = int(os.environ.get('TRAIN_FULL_RETRAIN_DAYS', '7'))
+INCREMENTAL_MAX_SHARE = 0.25
+COMPARE_FULL = os.environ.get('TRAIN_COMPARE_FULL', '0') != '0'
+
+# variant_sweep.py trains on a variant's data (TRAIN_INPUT_FILE instead of
+# INPUT_FILE) and collects the metrics as JSON (TRAIN_METRICS_FILE)
+INPUT_OVERRIDE = os.environ.get('TRAIN_INPUT_FILE') or None
+METRICS_OUTPUT = os.environ.get('TRAIN_METRICS_FILE') or None
+
+# Model registry (model_registry.py): every trained model is registered as a
+# version with its data hash, features, params and metrics. A run whose data,
+# params and settings match a registered version reuses that model instead of
+# training; TRAIN_REUSE=0 (the CLI's --retrain) always trains.
+REUSE_REGISTERED = os.environ.get('TRAIN_REUSE', '1') != '0'
+
+# Prepared-data cache (training_cache.py): the split and the training DMatrix
+# are stored once per version of the input file and split settings, so later
+# runs load them in milliseconds. TRAIN_CACHE=0 rebuilds them every run.
+SPLIT_CACHE = os.environ.get('TRAIN_CACHE', '1') != '0'
+
+# External-memory training (external_memory.py) for inputs larger than RAM:
+# the input is streamed into columnar parts once per data version and the
+# model trains on them through an XGBoost data iterator, so peak memory
+# follows the part size instead of the row count. Temporal CV is skipped.
+# The CLI's --external-memory flag sets TRAIN_EXTERNAL_MEMORY.
+EXTERNAL_MEMORY = os.environ.get('TRAIN_EXTERNAL_MEMORY', '0') != '0'
+EXTERNAL_BATCH_ROWS = None   # Rows per part (None = sized from the memory budget)
 # ============================================================
 
 def print_header(text):
@@ -70,27 +171,13 @@ def load_data(filepath):
     print_header("LOADING DATA")
     print(f"Reading: {filepath}")
     
-    df = pd.read_csv(filepath)
+    df = read_artifact(filepath)  # Served from memory when artifact_cache.py is running
     print(f"✓ Loaded {len(df):,} rows × {len(df.columns)} columns")
     
     # DROP WEAK AND COMPLEX-TO-PREDICT FEATURES
-    features_to_drop = [
-        # Weak features (low importance)
-        'is_violent_holiday',   # 1.01x impact - useless
-        'is_theft_holiday',     # 0.88x impact - counterproductive
-        'moon_illumination',    # 1.8% importance - no theoretical basis
-        'weekend_regular',      # 1.9% importance - redundant with time_block
-        # Complex features (require future data generation)
-        'heat_DI',              # 3.0% - requires weather forecast
-        'cold_DI',              # 2.9% - requires weather forecast
-        'solar_altitude',       # 2.8% - requires calculation
-        'school_in_session',    # 2.8% - requires school calendar
-        'major_event',          # 4.1% - requires manual tracking
-    ]
-    
-    print(f"\n⚠️  Dropping 9 features (weak + complex to predict):")
+    print(f"\n⚠️  Dropping {len(DROP_FEATURES)} features (weak + complex to predict):")
     dropped_count = 0
-    for feat in features_to_drop:
+    for feat in DROP_FEATURES:
         if feat in df.columns:
             print(f"    - {feat}")
             df = df.drop(feat, axis=1)
@@ -99,10 +186,12 @@ def load_data(filepath):
     print(f"\n✓ Dropped {dropped_count} features")
     
     # Separate features and target
-    X = df.drop('Severity_Score', axis=1)
-    y = df['Severity_Score']
+    X = df.drop(TARGET, axis=1)
+    y = df[TARGET]
     
     print(f"✓ Training with {len(X.columns)} features: {list(X.columns)}")
+    if CATEGORICAL:
+        print(f"✓ Categorical: {[c for c in X.columns if c in categories.CATEGORICAL_FEATURES]}")
     print(f"✓ Target: Severity_Score")
     
     # Quick stats
@@ -115,19 +204,24 @@ def load_data(filepath):
     
     return X, y
 
+def severity_bins(y):
+    """Severity bins the train/test split is stratified on (the top bin is open-ended)"""
+    return pd.cut(y, bins=[-1, 0, 3, 8, 15, np.inf], labels=[0,1,2,3,4])
+
 def split_data(X, y):
     """Split into train/test with stratification"""
+    from sklearn.model_selection import train_test_split
+
     print_header("SPLITTING DATA")
     
     # Bin severity scores for stratified split (handles zero imbalance)
     print("Creating stratified bins to handle 57% zero-severity blocks...")
-    y_binned = pd.cut(y, bins=[-1, 0, 3, 8, 15, 200], labels=[0,1,2,3,4])
     
     X_train, X_test, y_train, y_test = train_test_split(
         X, y,
         test_size=TEST_SIZE,
         random_state=RANDOM_STATE,
-        stratify=y_binned
+        stratify=severity_bins(y)
     )
     
     print(f"✓ Train: {len(X_train):,} samples ({(1-TEST_SIZE)*100:.0f}%)")
@@ -142,8 +236,94 @@ def split_data(X, y):
     
     return X_train, X_test, y_train, y_test
 
-def train_model(X_train, y_train, params):
-    """Train XGBoost with sample weights for class imbalance"""
+def split_settings():
+    """Everything besides the input file that shapes the prepared split"""
+    return {
+        'target': TARGET,
+        'drop_features': DROP_FEATURES,
+        'test_size': TEST_SIZE,
+        'random_state': RANDOM_STATE,
+        'nonzero_weight': NONZERO_WEIGHT,
+        'categorical': CATEGORICAL,
+    }
+
+def model_settings():
+    """Everything besides the data and params that decides the trained model (registry request key)"""
+    settings = dict(split_settings(), zero_sample_rate=ZERO_SAMPLE_RATE, external_memory=EXTERNAL_MEMORY)
+    if EXTERNAL_MEMORY:
+        settings['external_batch_rows'] = EXTERNAL_BATCH_ROWS
+    return settings
+
+def sample_weights(y):
+    """Sample weights for class imbalance (more importance to rare non-zero blocks)"""
+    return np.where(y == 0, 1.0, NONZERO_WEIGHT)
+
+def training_weights(y, rate=None, seed=RANDOM_STATE):
+    """
+    Sample weights of the training rows with zero blocks downsampled to `rate`
+    (None = ZERO_SAMPLE_RATE): a zero block is kept with probability rate and
+    then weighted 1 / rate, so in expectation the zero blocks carry the same
+    total weight as before. Rows left out get weight 0.
+    """
+    rate = ZERO_SAMPLE_RATE if rate is None else rate
+    if not 0 < rate <= 1:
+        raise ValueError(f"zero-block sample rate must be in (0, 1], got {rate}")
+    weights = sample_weights(y)
+    if rate == 1:
+        return weights
+    zero = np.asarray(y) == 0
+    kept = np.random.default_rng(seed).random(len(weights)) < rate
+    return np.where(zero, np.where(kept, weights / rate, 0.0), weights)
+
+def downsample_zeros(dtrain, y_train):
+    """Training matrix with only the rows training_weights() keeps"""
+    weights = training_weights(y_train)
+    keep = np.flatnonzero(weights > 0)
+    dtrain = dtrain.slice(keep)
+    dtrain.set_weight(weights[keep])
+    print(f"\n✂️  Zero blocks downsampled to {ZERO_SAMPLE_RATE:.0%}: training on {len(keep):,} "
+          f"of {len(weights):,} rows (kept zero blocks weighted {1 / ZERO_SAMPLE_RATE:.1f}x)")
+    return dtrain
+
+def model_features(X):
+    """Feature frame as the model sees it (categorical features as categories)"""
+    return categories.as_categorical(X) if CATEGORICAL else X
+
+def training_matrix(X_train, y_train):
+    """Training DMatrix with sample weights for class imbalance"""
+    return xgb.DMatrix(X_train, label=y_train, weight=sample_weights(y_train), enable_categorical=True)
+
+def prepare_data(input_file):
+    """
+    Train/test split and training DMatrix, loaded from the prepared-data cache
+    when this version of the input was split before
+    Returns (X_train, X_test, y_train, y_test, dtrain, cache key or None)
+    """
+    key = training_cache.data_key(input_file, split_settings()) if SPLIT_CACHE else None
+    cached = training_cache.load(key) if key else None
+    if cached:
+        print_header("LOADING PREPARED DATA")
+        start = datetime.now()
+        dtrain = training_cache.dmatrix(key, 'train')
+        X_train, X_test = model_features(cached['X_train']), model_features(cached['X_test'])
+        print(f"✓ Cached split {key} (same input and split settings as before)")
+        print(f"✓ Train: {len(X_train):,} samples, Test: {len(X_test):,} samples, "
+              f"{len(X_train.columns)} features")
+        print(f"✓ Loaded in {(datetime.now() - start).total_seconds() * 1000:.0f} ms")
+        return X_train, X_test, cached['y_train'], cached['y_test'], dtrain, key
+
+    X, y = load_data(input_file)
+    X_train, X_test, y_train, y_test = split_data(X, y)
+    frames = {'X_train': X_train, 'X_test': X_test, 'y_train': y_train, 'y_test': y_test}
+    X_train, X_test = model_features(X_train), model_features(X_test)
+    dtrain = training_matrix(X_train, y_train)
+    if key:
+        training_cache.save(key, frames, {'train': dtrain}, split_settings())
+        print(f"\n✓ Prepared split cached as {key} (next run loads it directly)")
+    return X_train, X_test, y_train, y_test, dtrain, key
+
+def train_model(dtrain, params, base=None, rounds=None):
+    """Train XGBoost on the weighted training matrix (or add `rounds` trees to a base booster)"""
     print_header("TRAINING MODEL")
     
     print("Model Configuration:")
@@ -151,52 +331,270 @@ def train_model(X_train, y_train, params):
         if key not in ['random_state', 'n_jobs', 'objective']:
             print(f"  {key:20s} = {value}")
     
-    # Compute sample weights (give more importance to rare non-zero blocks)
-    print("\n⚖️  Computing sample weights for class imbalance...")
-    sample_weights = np.where(y_train == 0, 1.0, 2.5)
+    # Sample weights are part of the training matrix (see training_matrix)
+    print("\n⚖️  Sample weights for class imbalance:")
     print(f"  Zero blocks: weight = 1.0")
-    print(f"  Non-zero blocks: weight = 2.5")
+    print(f"  Non-zero blocks: weight = {NONZERO_WEIGHT}")
+    if ZERO_SAMPLE_RATE < 1:
+        print(f"  Zero blocks kept at {ZERO_SAMPLE_RATE:.0%}, weighted 1/{ZERO_SAMPLE_RATE:g} "
+              f"= {1 / ZERO_SAMPLE_RATE:.1f}")
     
-    # Train model
+    # Train model (or add trees to an existing one)
+    rounds = rounds or params['n_estimators']
+    if base is not None:
+        print(f"\n🔁 Continuing the current model ({base.num_boosted_rounds()} trees): adding {rounds} trees "
+              f"fitted on {dtrain.num_row():,} rows (new and changed, plus known rows replayed)")
     print("\n🚀 Training XGBoost model...")
     start_time = datetime.now()
     
-    model = xgb.XGBRegressor(**params)
-    model.fit(
-        X_train, y_train,
-        sample_weight=sample_weights,
-        verbose=False
-    )
+    # Native training on the (possibly cached) DMatrix, same result as
+    # XGBRegressor.fit; the booster is then wrapped back into a regressor
+    model = xgb.XGBRegressor(**params, enable_categorical=CATEGORICAL)
+    booster = xgb.train(model.get_xgb_params(), dtrain, num_boost_round=rounds, xgb_model=base)
+    model.load_model(bytearray(booster.save_raw()))
     
     duration = datetime.now() - start_time
     print(f"✓ Training completed in {duration}")
     
     return model
 
+def row_hashes(X, y):
+    """Content hash of each row (features as the model sees them, and the target)"""
+    frame = categories.category_codes(X).reset_index(drop=True)
+    frame[TARGET] = np.asarray(y)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+def match_rows(hashes, *previous):
+    """
+    For each row, the index of the first of the `previous` sorted hash arrays
+    that still holds an unmatched copy of it, -1 for new and changed rows.
+    Identical rows are matched copy by copy.
+    Returns (matches, number of previous rows left unmatched)
+    """
+    order = np.argsort(hashes, kind='stable')
+    ordered = hashes[order]
+    copy = np.empty(len(hashes), dtype=np.int64)   # 0 for a row's first copy, 1 for the second, ...
+    copy[order] = np.arange(len(hashes)) - np.searchsorted(ordered, ordered, side='left')
+
+    matches = np.full(len(hashes), -1)
+    taken = np.zeros(len(hashes), dtype=np.int64)
+    for i, known in enumerate(previous):
+        count = np.searchsorted(known, hashes, side='right') - np.searchsorted(known, hashes, side='left')
+        matches[(matches == -1) & (copy < taken + count)] = i
+        taken += count
+    unmatched = sum(len(known) for known in previous) - int((matches >= 0).sum())
+    return matches, unmatched
+
+def incremental_base(feature_names):
+    """(current version, None) when this run may continue it, else (None, why it retrains in full)"""
+    version = model_registry.current()
+    if version is None:
+        return None, "no registered model to continue"
+    info = model_registry.meta(version)
+    full = info.get('incremental') or {'full_version': version, 'full_created': info['created']}
+    age = datetime.now() - datetime.strptime(full['full_created'], '%Y-%m-%d %H:%M:%S')
+    settings = {name: value for name, value in info['settings'].items() if name != 'incremental'}
+    if info['features'] != list(feature_names):
+        return None, f"{version} was trained on other features"
+    if info['params'] != QUICK_PARAMS or settings != model_settings():
+        return None, f"params or settings changed since {version}"
+    if age >= timedelta(days=FULL_RETRAIN_DAYS):
+        return None, (f"the last full retrain ({full['full_version']}) is {age.days} day(s) old "
+                      f"(FULL_RETRAIN_DAYS = {FULL_RETRAIN_DAYS})")
+    if model_registry.array(version, 'rows_train') is None:
+        return None, f"{version} has no row fingerprints"
+    return version, None
+
+def split_new_rows(index, y):
+    """Training share of the new rows, split like split_data (at random when too few to stratify)"""
+    from sklearn.model_selection import train_test_split
+
+    for stratify in (severity_bins(y), None):
+        try:
+            return train_test_split(index, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=stratify)[0]
+        except ValueError:
+            continue
+    return index
+
+def incremental_split(base, X_train, X_test, y_train, y_test):
+    """
+    Rows of this data matched to the base version's training and test rows
+    Rows the base model trained on stay training rows and its test rows stay
+    test rows, so the evaluation never sees a row the model was fitted on.
+    New and changed rows are split like a fresh split. Returns (X_train,
+    X_test, y_train, y_test, fit weights over X_train, stats): the new
+    training rows weigh 1, INCREMENTAL_REPLAY known rows for each weigh
+    known rows / replayed rows, all other rows 0 (not fitted)
+    """
+    print_header("MATCHING ROWS TO THE CURRENT MODEL")
+    X = pd.concat([X_train, X_test], ignore_index=True)
+    y = pd.concat([y_train, y_test], ignore_index=True)
+    
+    matches, removed = match_rows(row_hashes(X, y), model_registry.array(base, 'rows_train'),
+                                  model_registry.array(base, 'rows_test'))
+    new = matches == -1
+    new_train = np.zeros(len(X), dtype=bool)
+    new_train[split_new_rows(np.flatnonzero(new), y[new])] = True
+    known = np.flatnonzero(matches == 0)
+    replay = np.random.default_rng(RANDOM_STATE).choice(
+        known, min(len(known), INCREMENTAL_REPLAY * int(new_train.sum())), replace=False)
+    fit = new_train.astype(float)
+    fit[replay] = len(known) / max(len(replay), 1)
+    
+    train = (matches == 0) | new_train
+    test = (matches == 1) | (new & ~new_train)
+    stats = {'new_rows': int(new.sum()), 'fit_rows': int(new_train.sum()), 'replay_rows': len(replay),
+             'removed_rows': removed}
+    stats['changed_share'] = (stats['new_rows'] + removed) / len(X)
+    
+    print(f"✓ {base}: {int((matches == 0).sum()):,} training and {int((matches == 1).sum()):,} "
+          f"test rows unchanged")
+    print(f"✓ New or changed: {stats['new_rows']:,} rows ({stats['fit_rows']:,} for training)")
+    print(f"✓ No longer in the data: {removed:,} rows")
+    print(f"✓ Fitting the new training rows with {len(replay):,} known rows replayed "
+          f"({INCREMENTAL_REPLAY} per new row)")
+    return (X[train].reset_index(drop=True), X[test].reset_index(drop=True),
+            y[train].reset_index(drop=True), y[test].reset_index(drop=True), fit[train], stats)
+
+def incremental_matrix(X_train, y_train, fit_weights):
+    """
+    Training DMatrix of the rows an incremental run fits, with class and replay
+    weights, and zero blocks downsampled like a full run (training_weights)
+    """
+    weights = training_weights(y_train) * fit_weights
+    fit = weights > 0
+    if ZERO_SAMPLE_RATE < 1:
+        print(f"\n✂️  Zero blocks downsampled to {ZERO_SAMPLE_RATE:.0%}: fitting {int(fit.sum()):,} "
+              f"of {int((fit_weights > 0).sum()):,} rows (kept zero blocks weighted {1 / ZERO_SAMPLE_RATE:.1f}x)")
+    return xgb.DMatrix(X_train[fit], label=y_train[fit], weight=weights[fit], enable_categorical=True)
+
+def fit_matrix(X, y):
+    """Training DMatrix of a frame, with zero blocks downsampled like the full training matrix"""
+    dtrain = training_matrix(X, y)
+    return downsample_zeros(dtrain, y) if ZERO_SAMPLE_RATE < 1 else dtrain
+
+def compare_full_retrain(predictions, base, X_train, y_train, X_test, y_test, incremental_seconds):
+    """
+    How close the incremental model (its test predictions) is to its base and
+    (with COMPARE_FULL) to a model trained from scratch on the same training
+    rows, on the same test rows
+    """
+    print_header("INCREMENTAL vs FULL RETRAIN")
+    y_true = y_test.to_numpy(dtype=np.float32)
+    base_predictions = predict_in_parallel(load_registered(base, quiet=True), X_test, workers=PREDICT_WORKERS)
+    comparison = {
+        'base_version': base,
+        'base_rmse': temporal_cv.regression_metrics(y_true, base_predictions)['rmse'],
+        'incremental_rmse': temporal_cv.regression_metrics(y_true, predictions)['rmse'],
+        'incremental_seconds': incremental_seconds,
+    }
+    print(f"Test RMSE of {base} (before):      {comparison['base_rmse']:.4f}")
+    print(f"Test RMSE incremental (after):   {comparison['incremental_rmse']:.4f}")
+    
+    if COMPARE_FULL:
+        print(f"\nTraining from scratch on the same {len(X_train):,} rows for comparison...")
+        start = datetime.now()
+        full = xgb.XGBRegressor(**QUICK_PARAMS, enable_categorical=CATEGORICAL)
+        booster = xgb.train(full.get_xgb_params(), fit_matrix(X_train, y_train),
+                            num_boost_round=QUICK_PARAMS['n_estimators'])
+        full.load_model(bytearray(booster.save_raw()))
+        comparison['full_seconds'] = (datetime.now() - start).total_seconds()
+        full_predictions = predict_in_parallel(full, X_test, workers=PREDICT_WORKERS)
+        difference = np.abs(predictions - full_predictions)
+        comparison['full_rmse'] = temporal_cv.regression_metrics(y_true, full_predictions)['rmse']
+        comparison['rmse_gap'] = comparison['incremental_rmse'] - comparison['full_rmse']
+        comparison['mean_abs_difference'] = float(difference.mean())
+        comparison['max_abs_difference'] = float(difference.max())
+        print(f"Test RMSE full retrain:          {comparison['full_rmse']:.4f} "
+              f"(incremental {comparison['rmse_gap']:+.4f})")
+        print(f"Predictions vs full retrain:     mean |Δ| {comparison['mean_abs_difference']:.4f}, "
+              f"max |Δ| {comparison['max_abs_difference']:.4f}")
+        reference, source = comparison['full_seconds'], 'measured now'
+    else:
+        info = model_registry.meta(base)
+        reference = (info.get('incremental') or {}).get('full_train_seconds', info['train_seconds'])
+        source = 'last full retrain'
+    comparison['full_reference_seconds'] = reference
+    comparison['time_saved_seconds'] = reference - incremental_seconds
+    print(f"\nTraining time: {incremental_seconds:.1f}s incremental vs {reference:.1f}s full ({source}): "
+          f"{comparison['time_saved_seconds']:.1f}s saved ({reference / max(incremental_seconds, 1e-9):.1f}x)")
+    if not COMPARE_FULL:
+        print("  (--compare-full / TRAIN_COMPARE_FULL=1 also trains from scratch to measure the gap)")
+    return comparison
+
+def cross_validate_temporal(X, y, params):
+    """Temporal K-fold validation, folds trained side by side"""
+    print_header(f"TEMPORAL CROSS-VALIDATION ({CV_MODE}, {CV_FOLDS} folds)")
+    
+    folds, wall_seconds, workers, nthread = temporal_cv.cross_validate(
+        X, y, params, mode=CV_MODE, folds=CV_FOLDS, test_months=CV_TEST_MONTHS,
+        workers=CV_WORKERS, nonzero_weight=NONZERO_WEIGHT
+    )
+    print(f"Folds at once: {workers} ({nthread} XGBoost thread(s) each)")
+    
+    print(f"\n{'Fold':<5} {'Train months':<18} {'Test months':<18} {'Train rows':>11} {'Test rows':>10} "
+          f"{'RMSE':>8} {'MAE':>8} {'R²':>8} {'Fit (s)':>8}")
+    print("-" * 100)
+    for i, fold in enumerate(folds, 1):
+        print(f"{i:<5} {fold['train_months']:<18} {fold['test_months']:<18} {fold['train_rows']:>11,} "
+              f"{fold['test_rows']:>10,} {fold['rmse']:>8.4f} {fold['mae']:>8.4f} {fold['r2']:>8.4f} "
+              f"{fold['fit_seconds']:>8.1f}")
+    
+    summary = {}
+    for name in ('rmse', 'mae', 'r2'):
+        values = np.array([fold[name] for fold in folds])
+        summary[name] = (values.mean(), values.std())
+    print("-" * 100)
+    print(f"Mean ± std:  RMSE {summary['rmse'][0]:.4f} ± {summary['rmse'][1]:.4f}   "
+          f"MAE {summary['mae'][0]:.4f} ± {summary['mae'][1]:.4f}   "
+          f"R² {summary['r2'][0]:.4f} ± {summary['r2'][1]:.4f}")
+    
+    sequential = sum(fold['seconds'] for fold in folds)
+    print(f"\n✓ {len(folds)} folds in {wall_seconds:.1f}s "
+          f"(one after another: {sequential:.1f}s, {sequential / wall_seconds:.1f}x)")
+    
+    return {'folds': folds, 'summary': summary, 'seconds': wall_seconds, 'workers': workers}
+
 def evaluate_model(model, X_train, y_train, X_test, y_test):
     """Evaluate model performance"""
+    from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+
     print_header("MODEL EVALUATION")
     
     # Predictions
-    y_train_pred = model.predict(X_train)
-    y_test_pred = model.predict(X_test)
+    y_train_pred = predict_in_parallel(model, X_train, workers=PREDICT_WORKERS)
+    y_test_pred = predict_in_parallel(model, X_test, workers=PREDICT_WORKERS)
     
     # Metrics
-    def calc_metrics(y_true, y_pred, dataset_name):
+    def calc_metrics(y_true, y_pred):
         mse = mean_squared_error(y_true, y_pred)
-        rmse = np.sqrt(mse)
-        mae = mean_absolute_error(y_true, y_pred)
-        r2 = r2_score(y_true, y_pred)
-        
-        print(f"\n{dataset_name} Performance:")
-        print(f"  RMSE: {rmse:.4f}  (avg error ±{rmse:.2f} severity points)")
-        print(f"  MAE:  {mae:.4f}  (typical error {mae:.2f} severity points)")
-        print(f"  R²:   {r2:.4f}  (explains {r2*100:.1f}% of variance)")
-        
-        return {'mse': mse, 'rmse': rmse, 'mae': mae, 'r2': r2}
+        return {'mse': mse, 'rmse': np.sqrt(mse), 'mae': mean_absolute_error(y_true, y_pred),
+                'r2': r2_score(y_true, y_pred)}
     
-    train_metrics = calc_metrics(y_train, y_train_pred, "TRAINING SET")
-    test_metrics = calc_metrics(y_test, y_test_pred, "TEST SET")
+    train_metrics = calc_metrics(y_train, y_train_pred)
+    test_metrics = calc_metrics(y_test, y_test_pred)
+    
+    # Predictions on zero vs non-zero blocks
+    zero_mask = y_test == 0
+    nonzero_mask = y_test > 0
+    zero_mae = mean_absolute_error(y_test[zero_mask], y_test_pred[zero_mask]) if zero_mask.sum() > 0 else None
+    nonzero_mae = (mean_absolute_error(y_test[nonzero_mask], y_test_pred[nonzero_mask])
+                   if nonzero_mask.sum() > 0 else None)
+    print_evaluation(train_metrics, test_metrics, zero_mae, nonzero_mae)
+    
+    return {
+        'train': train_metrics,
+        'test': test_metrics,
+        'predictions': y_test_pred
+    }
+
+def print_evaluation(train_metrics, test_metrics, zero_mae, nonzero_mae):
+    """Print train/test metrics, the generalization check and zero vs non-zero MAE"""
+    for metrics, dataset_name in ((train_metrics, "TRAINING SET"), (test_metrics, "TEST SET")):
+        print(f"\n{dataset_name} Performance:")
+        print(f"  RMSE: {metrics['rmse']:.4f}  (avg error ±{metrics['rmse']:.2f} severity points)")
+        print(f"  MAE:  {metrics['mae']:.4f}  (typical error {metrics['mae']:.2f} severity points)")
+        print(f"  R²:   {metrics['r2']:.4f}  (explains {metrics['r2']*100:.1f}% of variance)")
     
     # Overfitting check
     overfit_ratio = train_metrics['rmse'] / test_metrics['rmse']
@@ -211,63 +609,99 @@ def evaluate_model(model, X_train, y_train, X_test, y_test):
     
     # Analyze predictions on zero vs non-zero blocks
     print(f"\nPrediction Analysis:")
-    zero_mask = y_test == 0
-    nonzero_mask = y_test > 0
-    
-    if zero_mask.sum() > 0:
-        zero_mae = mean_absolute_error(y_test[zero_mask], y_test_pred[zero_mask])
+    if zero_mae is not None:
         print(f"  Zero-severity blocks MAE: {zero_mae:.4f}")
-    
-    if nonzero_mask.sum() > 0:
-        nonzero_mae = mean_absolute_error(y_test[nonzero_mask], y_test_pred[nonzero_mask])
+    if nonzero_mae is not None:
         print(f"  Non-zero blocks MAE: {nonzero_mae:.4f}")
+
+def prepare_external(input_file):
+    """
+    Stream the input into columnar train/test parts (once per data version)
+    and open the training matrix over them
+    Returns (training matrix, (parts folder, manifest))
+    """
+    from sklearn.model_selection import train_test_split
+
+    print_header("PARTITIONING DATA (EXTERNAL MEMORY)")
+    print(f"Reading: {input_file}")
+    key = training_cache.data_key(input_file, dict(split_settings(), external_batch_rows=EXTERNAL_BATCH_ROWS))
+    folder = training_cache.touch(key)
+    
+    def split_chunk(X, y, index):
+        # Each chunk is stratified on its own; a chunk too small for that is split at random
+        try:
+            return train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE + index,
+                                    stratify=severity_bins(y))
+        except ValueError:
+            return train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE + index)
+    
+    manifest = external_memory.write_parts(
+        input_file, folder, TARGET, DROP_FEATURES, split_chunk, EXTERNAL_BATCH_ROWS,
+        categorical=list(categories.CATEGORICAL_FEATURES) if CATEGORICAL else ()
+    )
+    train_parts, test_parts = manifest['parts']['train'], manifest['parts']['test']
+    if manifest['cached']:
+        print(f"✓ Parts cached as {key} (same input and split settings as before)")
+    else:
+        print(f"✓ Written in {manifest['seconds']:.1f}s ({manifest['rows_per_second']:,.0f} rows/s)")
+    print(f"✓ Train: {sum(p['rows'] for p in train_parts):,} samples in {len(train_parts)} part(s)")
+    print(f"✓ Test:  {sum(p['rows'] for p in test_parts):,} samples in {len(test_parts)} part(s)")
+    print(f"✓ Training with {len(manifest['features'])} features: {manifest['features']}")
+    if manifest['categorical']:
+        print(f"✓ Categorical: {manifest['categorical']}")
+    
+    # Seeded by part, so every pass over the parts keeps the same rows
+    weight_fn = lambda y, index: training_weights(y, seed=RANDOM_STATE + index)
+    dtrain, stats = external_memory.training_matrix(folder, manifest, weight_fn,
+                                                    max_bin=QUICK_PARAMS.get('max_bin'))
+    print(f"✓ Quantile sketch over {stats['batches']} batch(es), {stats['passes']} pass(es), in {stats['seconds']:.1f}s "
+          f"({stats['rows'] / max(stats['seconds'], 1e-9):,.0f} rows/s)")
+    if ZERO_SAMPLE_RATE < 1:
+        print(f"\n✂️  Zero blocks downsampled to {ZERO_SAMPLE_RATE:.0%}: training on {stats['rows']:,} rows "
+              f"(kept zero blocks weighted {1 / ZERO_SAMPLE_RATE:.1f}x)")
+    return dtrain, (folder, manifest)
+
+def evaluate_external(model, parts):
+    """Evaluate model performance part by part"""
+    print_header("MODEL EVALUATION")
+    
+    folder, manifest = parts
+    booster = model.get_booster()
+    train_metrics = external_memory.evaluate(booster, folder, manifest, 'train')
+    test_metrics = external_memory.evaluate(booster, folder, manifest, 'test')
+    print(f"Predicted {test_metrics['rows_per_second']:,.0f} rows/s")
+    print_evaluation(train_metrics, test_metrics, test_metrics['zero_mae'], test_metrics['nonzero_mae'])
     
+    keep = ('mse', 'rmse', 'mae', 'r2')
     return {
-        'train': train_metrics,
-        'test': test_metrics,
-        'predictions': y_test_pred
+        'train': {name: train_metrics[name] for name in keep},
+        'test': {name: test_metrics[name] for name in keep},
     }
 
-def analyze_feature_contribution_ranges(model, X_test, feature_names):
-    """Calculate min/max contribution range for each feature using SHAP"""
-    if not SHAP_AVAILABLE:
-        print("\n⚠️  Skipping feature contribution analysis (SHAP not installed)")
+def analyze_feature_contribution_ranges(model, batches, feature_names, cache_folder=None):
+    """
+    Min/max contribution range of each feature over every test row
+    (XGBoost's native TreeSHAP contributions, see feature_contributions.py)
+    batches() yields the test rows as float32 matrices; results are cached
+    per model in cache_folder
+    """
+    if not RUN_SHAP:
         return None
     
     print_header("FEATURE CONTRIBUTION RANGES")
     print("Calculating how much each feature can swing predictions...")
-    print("(This may take 30-60 seconds with SHAP)")
     
     try:
-        # Create SHAP explainer
-        explainer = shap.TreeExplainer(model)
-        
-        # Calculate SHAP values (use sample if dataset too large)
-        sample_size = min(5000, len(X_test))
-        X_sample = X_test.sample(n=sample_size, random_state=42) if len(X_test) > 5000 else X_test
-        
-        print(f"\nCalculating SHAP values for {len(X_sample):,} samples...")
-        shap_values = explainer.shap_values(X_sample)
-        
-        # Calculate ranges for each feature
-        ranges = []
-        for i, feature in enumerate(feature_names):
-            feature_shap = shap_values[:, i]
-            min_effect = feature_shap.min()
-            max_effect = feature_shap.max()
-            range_span = max_effect - min_effect
-            mean_abs_effect = np.abs(feature_shap).mean()
-            
-            ranges.append({
-                'feature': feature,
-                'min_effect': min_effect,
-                'max_effect': max_effect,
-                'range': range_span,
-                'mean_abs_effect': mean_abs_effect
-            })
-        
-        # Create DataFrame and sort by range
-        df_ranges = pd.DataFrame(ranges).sort_values('range', ascending=False)
+        df_ranges, stats = feature_contributions.cached_ranges(
+            model.get_booster(), batches, feature_names, cache_folder
+        )
+        if stats['cached']:
+            print(f"\n✓ Cached contributions of model {stats['model_hash']} ({stats['rows']:,} test rows)")
+        else:
+            print(f"\n✓ Contributions for all {stats['rows']:,} test rows in {stats['seconds']:.1f}s "
+                  f"({stats['unique_rows']:,} distinct, {stats['rows_per_second']:,.0f} rows/s, "
+                  f"{stats['batches']} batch(es), "
+                  f"{stats['threads']} thread(s))")
         
         print("\n" + "="*80)
         print("FEATURE CONTRIBUTION RANGES (How much each feature can swing predictions)")
@@ -283,12 +717,13 @@ def analyze_feature_contribution_ranges(model, X_test, feature_names):
         print("  Min/Max Effect: How much this feature can decrease/increase severity")
         print("  Range: Total swing from lowest to highest effect")
         print("  Avg Impact: Average absolute contribution per prediction")
+        print(f"  Base value (bias): {stats['bias']:+.4f}")
         print("="*80)
         
         return df_ranges
         
     except Exception as e:
-        print(f"\n⚠️  Error calculating SHAP values: {str(e)}")
+        print(f"\n⚠️  Error calculating feature contributions: {str(e)}")
         print("   Continuing without contribution range analysis...")
         return None
 
@@ -309,7 +744,12 @@ def analyze_feature_importance(model, feature_names, output_file):
         bar = "█" * int(row['importance'] * 50)
         print(f"  {rank:2d}. {row['feature']:25s} {row['importance']:.4f} {bar}")
     
+    if not MAKE_PLOTS:
+        return feature_df
+
     # Plot
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(10, 8))
     colors = plt.cm.viridis(np.linspace(0.3, 0.9, len(feature_df)))
     plt.barh(feature_df['feature'], feature_df['importance'], color=colors)
@@ -322,7 +762,21 @@ def analyze_feature_importance(model, feature_names, output_file):
     
     return feature_df
 
-def save_results(metrics, params, feature_importance, output_file):
+def load_registered(version, quiet=False):
+    """Regressor wrapping a registered version's booster"""
+    booster, info = model_registry.load(version)
+    model = xgb.XGBRegressor(**QUICK_PARAMS, enable_categorical=CATEGORICAL)
+    model.load_model(bytearray(booster.save_raw()))
+    if quiet:
+        return model
+    print_header("REGISTERED MODEL")
+    print(f"✓ {version}: same data ({info['data_hash'][:8]}), params and settings as this run - training skipped")
+    print(f"  Trained {info['created']} in {info['train_seconds']:.1f}s, {info['trees']} trees")
+    print(f"  (TRAIN_REUSE=0 / --retrain trains again)")
+    return model
+
+def save_results(metrics, params, feature_importance, output_file, cv=None, train_seconds=None, version=None,
+                 incremental=None):
     """Save markdown report"""
     lines = []
     lines.append("# XGBoost Training Results - ULTRA-SIMPLE MODEL")
@@ -332,7 +786,15 @@ def save_results(metrics, params, feature_importance, output_file):
     lines.append(f"**Features:** 5 core features (location + calendar only)")
     lines.append(f"**Removed:** 9 features (all weak or complex-to-predict)")
     lines.append(f"**Hyperparameters:** max_depth=7, n_estimators=200, learning_rate=0.08")
-    lines.append(f"**Runtime:** ~5 seconds")
+    if train_seconds is not None:
+        lines.append(f"**Training Time:** {train_seconds:.1f} seconds (measured)")
+    if version:
+        lines.append(f"**Model Version:** {version} (`python model_registry.py show {version}`)")
+    if incremental:
+        lines.append(f"**Incremental:** {incremental['rounds']} trees (learning rate {incremental['learning_rate']}) "
+                     f"added to {incremental['base']} on {incremental['fit_rows']:,} new and changed training rows "
+                     f"and {incremental['replay_rows']:,} replayed ones (update "
+                     f"{incremental['runs_since_full']} since full retrain {incremental['full_version']})")
     lines.append("")
     lines.append("---")
     lines.append("")
@@ -345,7 +807,15 @@ def save_results(metrics, params, feature_importance, output_file):
         if key not in ['random_state', 'n_jobs', 'objective']:
             lines.append(f"| {key} | {value} |")
     lines.append("")
-    lines.append("**Note:** Sample weights used (non-zero blocks weighted 2.5x)")
+    lines.append(f"**Note:** Sample weights used (non-zero blocks weighted {NONZERO_WEIGHT}x)")
+    if ZERO_SAMPLE_RATE < 1:
+        lines.append("")
+        lines.append(f"**Zero-block downsampling:** {ZERO_SAMPLE_RATE:.0%} of zero blocks kept, "
+                     f"weighted {1 / ZERO_SAMPLE_RATE:.1f}x")
+    if CATEGORICAL:
+        lines.append("")
+        lines.append(f"**Categorical features:** {', '.join(categories.CATEGORICAL_FEATURES)} "
+                     f"(native XGBoost categories, where present)")
     lines.append("")
     lines.append("---")
     lines.append("")
@@ -368,6 +838,40 @@ def save_results(metrics, params, feature_importance, output_file):
     lines.append(f"| R² Score | {metrics['test']['r2']:.4f} |")
     lines.append("")
     
+    if incremental and 'base_rmse' in incremental:
+        lines.append("### Incremental Update")
+        lines.append("| Model | Test RMSE | Training time |")
+        lines.append("|-------|-----------|---------------|")
+        lines.append(f"| {incremental['base']} (before) | {incremental['base_rmse']:.4f} | - |")
+        lines.append(f"| Incremental (+{incremental['rounds']} trees) | {incremental['incremental_rmse']:.4f} | "
+                     f"{incremental['incremental_seconds']:.1f}s |")
+        if 'full_rmse' in incremental:
+            lines.append(f"| Full retrain, same rows | {incremental['full_rmse']:.4f} | "
+                         f"{incremental['full_seconds']:.1f}s |")
+        lines.append("")
+        lines.append(f"{incremental['new_rows']:,} rows new or changed, {incremental['removed_rows']:,} gone. "
+                     f"Training-set metrics above are over the fitted rows. "
+                     f"Time saved: {incremental['time_saved_seconds']:.1f}s against "
+                     f"{incremental['full_reference_seconds']:.1f}s for a full retrain"
+                     + (f"; predictions differ from the full retrain's by {incremental['mean_abs_difference']:.4f} "
+                        f"on average." if 'full_rmse' in incremental else " (the last one)."))
+        lines.append("")
+    
+    if cv:
+        lines.append(f"### Temporal Cross-Validation ({CV_MODE}, {len(cv['folds'])} folds)")
+        lines.append("| Fold | Train months | Test months | Test rows | RMSE | MAE | R² |")
+        lines.append("|------|--------------|-------------|-----------|------|-----|----|")
+        for i, fold in enumerate(cv['folds'], 1):
+            lines.append(f"| {i} | {fold['train_months']} | {fold['test_months']} | {fold['test_rows']:,} | "
+                         f"{fold['rmse']:.4f} | {fold['mae']:.4f} | {fold['r2']:.4f} |")
+        summary = cv['summary']
+        lines.append(f"| **Mean ± std** | | | | {summary['rmse'][0]:.4f} ± {summary['rmse'][1]:.4f} | "
+                     f"{summary['mae'][0]:.4f} ± {summary['mae'][1]:.4f} | "
+                     f"{summary['r2'][0]:.4f} ± {summary['r2'][1]:.4f} |")
+        lines.append("")
+        lines.append(f"Folds trained {cv['workers']} at a time in {cv['seconds']:.1f}s.")
+        lines.append("")
+    
     lines.append("### Interpretation")
     lines.append(f"- **Average prediction error:** ±{metrics['test']['rmse']:.2f} severity points")
     lines.append(f"- **Typical error:** {metrics['test']['mae']:.2f} severity points")
@@ -400,7 +904,9 @@ def save_results(metrics, params, feature_importance, output_file):
     lines.append("   - Two-stage model (predict zero vs. non-zero, then predict severity)")
     lines.append("   - Try LightGBM or CatBoost")
     lines.append("   - Add interaction features (e.g., Community_Area × weekend_night_peak)")
-    lines.append("4. **Temporal validation:** Train on 2023-2024, test on 2025")
+    if not cv:
+        lines.append("4. **Temporal validation:** Train on 2023-2024, test on 2025 "
+                     "(`--cv rolling` runs rolling-origin folds)")
     lines.append("")
     lines.append("---")
     lines.append("")
@@ -419,38 +925,172 @@ def main():
     print("     QUICK XGBOOST TRAINING - CHICAGO CRIME PREDICTION")
     print("="*80)
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("Estimated runtime: 5-10 minutes")
     
-    # Load data
-    X, y = load_data(INPUT_FILE)
+    # Load and split data (or load the cached split)
+    prepare_start = datetime.now()
+    if EXTERNAL_MEMORY:
+        dtrain, parts = prepare_external(INPUT_OVERRIDE or INPUT_FILE)
+        feature_names = parts[1]['features']
+    else:
+        X_train, X_test, y_train, y_test, dtrain, key = prepare_data(INPUT_OVERRIDE or INPUT_FILE)
+        feature_names = X_train.columns
+        if ZERO_SAMPLE_RATE < 1:
+            dtrain = downsample_zeros(dtrain, y_train)
+    prepare_seconds = (datetime.now() - prepare_start).total_seconds()
+    train_rows = dtrain.num_row()
+    
+    # Temporal cross-validation (optional) over all rows
+    cv = None
+    if CV_MODE and EXTERNAL_MEMORY:
+        print("\n⚠️  Temporal cross-validation needs every row in memory - skipped in external-memory mode")
+    elif CV_MODE:
+        cv = cross_validate_temporal(pd.concat([X_train, X_test], ignore_index=True),
+                                     pd.concat([y_train, y_test], ignore_index=True), QUICK_PARAMS)
     
-    # Split data
-    X_train, X_test, y_train, y_test = split_data(X, y)
+    # Incremental: continue the current model on the new and changed rows,
+    # unless the full-retrain policy says otherwise
+    base = incremental = None
+    if INCREMENTAL and EXTERNAL_MEMORY:
+        print("\n⚠️  Incremental retraining needs the rows in memory - full retrain in external-memory mode")
+    elif INCREMENTAL:
+        base, reason = incremental_base(feature_names)
+        if base:
+            split = incremental_split(base, X_train, X_test, y_train, y_test)
+            delta = split[-1]
+            if delta['changed_share'] > INCREMENTAL_MAX_SHARE:
+                reason = (f"{delta['changed_share']:.0%} of the rows are new, changed or gone "
+                          f"(INCREMENTAL_MAX_SHARE = {INCREMENTAL_MAX_SHARE:.0%})")
+            elif not delta['fit_rows']:
+                reason = "no new or changed training rows to fit"
+        if reason:
+            print(f"\nℹ️  Full retrain: {reason}")
+            base = None
+        else:
+            X_train, X_test, y_train, y_test, fit_weights, delta = split
+            info = model_registry.meta(base)
+            chain = info.get('incremental') or {'full_version': base, 'full_created': info['created'],
+                                                'full_train_seconds': info['train_seconds'], 'runs_since_full': 0}
+            incremental = {'base': base, 'rounds': INCREMENTAL_ROUNDS,
+                           'learning_rate': INCREMENTAL_LEARNING_RATE, **delta,
+                           **{name: chain[name] for name in ('full_version', 'full_created', 'full_train_seconds')},
+                           'runs_since_full': chain['runs_since_full'] + 1}
     
-    # Train model
-    model = train_model(X_train, y_train, QUICK_PARAMS)
+    # Train model (or reuse the registered model of an identical request)
+    data_hash = training_cache.file_hash(INPUT_OVERRIDE or INPUT_FILE)
+    settings = model_settings()
+    if base:
+        # Continuing a model: the starting model is part of the request
+        settings['incremental'] = {'base': model_registry.meta(base)['request_key'], 'rounds': INCREMENTAL_ROUNDS,
+                                   'learning_rate': INCREMENTAL_LEARNING_RATE, 'replay': INCREMENTAL_REPLAY}
+    request = model_registry.request_key(data_hash, QUICK_PARAMS, settings)
+    registered = model_registry.find(request) if REUSE_REGISTERED else None
+    train_start = datetime.now()
+    if registered:
+        model = load_registered(registered)
+    elif base:
+        model = train_model(incremental_matrix(X_train, y_train, fit_weights),
+                            dict(QUICK_PARAMS, learning_rate=INCREMENTAL_LEARNING_RATE),
+                            base=model_registry.load(base)[0], rounds=INCREMENTAL_ROUNDS)
+    else:
+        model = train_model(dtrain, QUICK_PARAMS)
+    train_seconds = (datetime.now() - train_start).total_seconds()
+    if incremental:
+        train_rows = incremental['fit_rows'] + incremental['replay_rows']
     
     # Evaluate
-    results = evaluate_model(model, X_train, y_train, X_test, y_test)
+    if EXTERNAL_MEMORY and not registered:
+        trees = model.get_booster().num_boosted_rounds()
+        print(f"✓ Throughput: {train_rows * trees / train_seconds:,.0f} row-rounds/s")
+        peak = run_history.peak_mb()
+        if peak:
+            print(f"✓ Peak memory: {peak:,.0f} MB")
+    if EXTERNAL_MEMORY:
+        results = evaluate_external(model, parts)
+        folder, manifest = parts
+        test_batches = lambda: (external_memory.read_part(folder, 'test', index, manifest)[0]
+                                for index in range(len(manifest['parts']['test'])))
+        contributions_folder = folder
+    elif incremental:
+        # Training metrics over the fitted rows (new and replayed): predicting
+        # every known training row would take longer than the update itself
+        fitted = fit_weights > 0
+        print("\nℹ️  Incremental update: training-set metrics are over the fitted rows "
+              f"({int(fitted.sum()):,}), the test set is complete")
+        results = evaluate_model(model, X_train[fitted], y_train[fitted], X_test, y_test)
+        test_batches = lambda: feature_contributions.frame_batches(X_test)
+        contributions_folder = training_cache.version_dir(key) if key else None
+    else:
+        results = evaluate_model(model, X_train, y_train, X_test, y_test)
+        test_batches = lambda: feature_contributions.frame_batches(X_test)
+        contributions_folder = training_cache.version_dir(key) if key else None
+    
+    # How close the incremental model is to its base and a full retrain
+    if incremental and not registered:
+        incremental.update(compare_full_retrain(results['predictions'], base, X_train, y_train,
+                                                X_test, y_test, train_seconds))
     
     # Feature importance
     feature_importance = analyze_feature_importance(
-        model, X.columns, FEATURE_IMPORTANCE_PLOT
+        model, feature_names, FEATURE_IMPORTANCE_PLOT
     )
     
-    # Feature contribution ranges (SHAP analysis)
+    # Feature contribution ranges (native TreeSHAP over the whole test split)
     contribution_ranges = analyze_feature_contribution_ranges(
-        model, X_test, X.columns
+        model, test_batches, feature_names, contributions_folder
     )
     
-    # Save model
+    # Metrics for the run history (run_history.py metric test_rmse --vs train_seconds)
+    metrics = {
+        **{f'{split}_{name}': float(value) for split in ('train', 'test') for name, value in results[split].items()},
+        'train_seconds': train_seconds,
+        'prepare_seconds': prepare_seconds,
+        'train_rows': train_rows,
+        'zero_sample_rate': ZERO_SAMPLE_RATE,
+        'features': len(feature_names),
+        'trees': model.get_booster().num_boosted_rounds(),
+        'model_reused': int(bool(registered)),
+        'incremental': int(bool(incremental)),
+    }
+    if incremental:
+        metrics.update({name: float(incremental[name]) for name in
+                        ('new_rows', 'removed_rows', 'base_rmse', 'time_saved_seconds', 'rmse_gap')
+                        if name in incremental})
+    if cv:
+        for name, (mean, std) in cv['summary'].items():
+            metrics[f'cv_{name}_mean'] = float(mean)
+            metrics[f'cv_{name}_std'] = float(std)
+        metrics['cv_seconds'] = cv['seconds']
+    
+    # Register and save model (01.3 stays the current model's export)
     print_header("SAVING OUTPUTS")
+    if registered:
+        version = registered
+        model_registry.set_current(version)
+        print(f"✓ Current model: {version} (registered before)")
+    else:
+        # Content hashes of the rows behind this model, for the next incremental run
+        rows = None if EXTERNAL_MEMORY else {'rows_train': np.sort(row_hashes(X_train, y_train)),
+                                             'rows_test': np.sort(row_hashes(X_test, y_test))}
+        version = model_registry.register(
+            model.get_booster(), request, data_hash, feature_names, QUICK_PARAMS, settings,
+            metrics, train_seconds, arrays=rows,
+            extra={'input_file': os.path.basename(INPUT_OVERRIDE or INPUT_FILE), 'incremental': incremental},
+        )
+        print(f"✓ Model registered: {version} (now current)")
     # Use get_booster() to access the underlying XGBoost model
     model.get_booster().save_model(MODEL_OUTPUT)
     print(f"✓ Model saved: {MODEL_OUTPUT}")
     
     # Save report
-    save_results(results, QUICK_PARAMS, feature_importance, RESULTS_OUTPUT)
+    save_results(results, QUICK_PARAMS, feature_importance, RESULTS_OUTPUT, cv,
+                 model_registry.meta(version)['train_seconds'], version,
+                 model_registry.meta(version).get('incremental'))
+    
+    run_history.record_metrics('train', metrics)
+    if METRICS_OUTPUT:
+        with open(METRICS_OUTPUT, 'w') as f:
+            json.dump(metrics, f, indent=2)
+        print(f"✓ Metrics saved: {METRICS_OUTPUT}")
     
     # Final summary
     print_header("✅ QUICK TRAINING COMPLETE!")
@@ -458,6 +1098,12 @@ def main():
     print(f"  RMSE: {results['test']['rmse']:.4f} (±{results['test']['rmse']:.2f} severity points)")
     print(f"  MAE:  {results['test']['mae']:.4f} ({results['test']['mae']:.2f} severity points avg error)")
     print(f"  R²:   {results['test']['r2']:.4f} ({results['test']['r2']*100:.1f}% variance explained)")
+    if cv:
+        print(f"\nTemporal CV ({CV_MODE}, {len(cv['folds'])} folds):")
+        print(f"  RMSE: {cv['summary']['rmse'][0]:.4f} ± {cv['summary']['rmse'][1]:.4f}")
+    if incremental and 'time_saved_seconds' in incremental:
+        print(f"\nIncremental update of {incremental['base']}: {train_seconds:.1f}s, "
+              f"{incremental['time_saved_seconds']:.1f}s saved against a full retrain")
     
     print(f"\nTop 3 Most Important Features:")
     for i, row in feature_importance.head(3).iterrows():
@@ -1,35 +1,62 @@
 """
 Generate Predictions for Power BI Dashboard
-Loads trained model and generates predictions for all combinations of:
+Loads the current registered model (model_registry.py) and generates predictions for all combinations of:
 - 77 Community_Area
 - 365 days (full year)
 - 8 time blocks per day
 
+The grid and its features come from the feature store (feature_store.py in
+'01 Foundation & Data'), the same definitions the training blocks were built
+with, as a cached table: no training data is read.
+
 Output: CSV file ready for Power BI import
 """
 
 import pandas as pd
 import numpy as np
 import xgboost as xgb
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
+import sys
+
+# Shared helpers live in the pipeline folder
+PIPELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '01 Foundation & Data')
+sys.path.append(PIPELINE_DIR)
+import feature_store
+from parallel_predict import predict_in_parallel
+from categories import as_categorical, is_categorical_model
+import model_registry
 
 # ============================================================
 # CONFIGURATION
 # ============================================================
-MODEL_FILE = '01.3_xgboost_model_final.json'
-TRAINING_DATA = '../01 Foundation & Data/24.1_training_ready.csv'
+MODEL_FILE = '01.3_xgboost_model_final.json'   # Only used when no model is registered yet
+# Registered model to predict with (model_registry.py); None = the current
+# version. The CLI's predict --model-version sets PREDICT_MODEL_VERSION.
+MODEL_VERSION = os.environ.get('PREDICT_MODEL_VERSION') or None
 OUTPUT_FILE = '02.1_predictions_2026.csv'
 
-# Prediction period
-START_DATE = '2026-01-01'
-END_DATE = '2026-12-31'
+# Prediction period (refresh_service.py moves it to the coming horizon
+# through PREDICT_START_DATE / PREDICT_END_DATE)
+START_DATE = os.environ.get('PREDICT_START_DATE', '2026-01-01')
+END_DATE = os.environ.get('PREDICT_END_DATE', '2026-12-31')
+
+# Prediction worker processes (feature columns shared via shared memory)
+PREDICT_WORKERS = None  # None = all CPU cores, 1 = single process
+
+# Model inputs, in training order: must match the features 01_train_model.py
+# keeps from 24.1 (checked by contracts.py before each run). The grid is built
+# with the Power BI column names; MODEL_COLUMN_NAMES maps them to the model's.
+FEATURE_COLUMNS = ['Community Area', 'Year', 'day_of_week', 'month', 'weekend_night_peak']
+MODEL_COLUMN_NAMES = {'Community_Area': 'Community Area'}
 
 # Chicago Community_Area (1-77)
 COMMUNITY_AREAS = list(range(1, 78))
 
+# Grid columns taken from the feature store (the model features plus time_block)
+GRID_FEATURES = ['time_block', 'Year', 'day_of_week', 'month', 'weekend_night_peak']
+
 # Time blocks (0-7 representing 3-hour periods)
-TIME_BLOCKS = list(range(8))
 TIME_BLOCK_LABELS = {
     0: '00:00-03:00 (Midnight-3am)',
     1: '03:00-06:00 (3am-6am)',
@@ -44,88 +71,55 @@ TIME_BLOCK_LABELS = {
 # ============================================================
 
 def load_model():
-    """Load the trained XGBoost model"""
-    print(f"Loading model: {MODEL_FILE}")
+    """
+    Load the trained XGBoost model (a registered version, or MODEL_FILE when
+    nothing is registered yet) and check it takes FEATURE_COLUMNS, in order
+    """
+    if MODEL_VERSION or model_registry.current():
+        booster, info = model_registry.load(MODEL_VERSION)
+        print(f"Loading model: {info['version']} from the registry "
+              f"(trained {info['created']} on data {info['data_hash'][:8]})")
+    else:
+        print(f"Loading model: {MODEL_FILE} (no registered model yet)")
+        booster = xgb.Booster()
+        booster.load_model(MODEL_FILE)
+        info = {'version': MODEL_FILE, 'features': booster.feature_names}
+    if info['features'] is None:
+        print("⚠️  The model file has no feature names - feature order not checked")
+    else:
+        model_registry.check_features(info, FEATURE_COLUMNS)
     model = xgb.XGBRegressor()
-    model.load_model(MODEL_FILE)
-    print(f"✓ Model loaded successfully")
+    model.load_model(bytearray(booster.save_raw()))
+    print(f"✓ Model loaded successfully (features match: {', '.join(FEATURE_COLUMNS)})")
     return model
 
-def load_feature_template():
-    """Load training data to get feature names and typical values"""
-    print(f"\nLoading training data template: {TRAINING_DATA}")
-    df = pd.read_csv(TRAINING_DATA)
-    
-    # Use only the 5 features the model was trained on
-    features = ['Community_Area', 'time_block', 'day_of_week', 'month', 'weekend_night_peak']
-    print(f"✓ Features to predict with: {features}")
-    
-    return features, df
-
-def generate_date_features(date):
-    """Generate date-related features for a given date"""
-    return {
-        'day_of_week': date.weekday(),  # 0=Monday, 6=Sunday
-        'month': date.month,
-        'weekend_night_peak': 1 if (date.weekday() in [4, 5]) else 0,  # Simplified
-    }
-
-def generate_prediction_data(features, template_df):
-    """Generate all combinations of area × date × time for predictions"""
+def generate_prediction_data(features):
+    """All combinations of area × date × time block, with their features, from the feature store"""
     print("\n" + "="*70)
     print("GENERATING PREDICTION DATA")
     print("="*70)
     
-    # Generate date range
-    start = pd.to_datetime(START_DATE)
-    end = pd.to_datetime(END_DATE)
-    dates = pd.date_range(start, end, freq='D')
-    
+    days = pd.date_range(START_DATE, END_DATE, freq='D')
     print(f"\nDate range: {START_DATE} to {END_DATE}")
-    print(f"Days: {len(dates)}")
+    print(f"Days: {len(days)}")
     print(f"Community_Area: {len(COMMUNITY_AREAS)}")
-    print(f"Time blocks per day: {len(TIME_BLOCKS)}")
-    print(f"Total predictions: {len(dates) * len(COMMUNITY_AREAS) * len(TIME_BLOCKS):,}")
-    
-    # Create all combinations
-    data = []
-    
-    for date in dates:
-        month = date.month
-        dow = date.weekday()
-        
-        # Generate for each area and time block
-        for area in COMMUNITY_AREAS:
-            for time_block in TIME_BLOCKS:
-                row = {
-                    'Date': date.strftime('%Y-%m-%d'),
-                    'Community_Area': area,
-                    'time_block': time_block,
-                    'time_block_label': TIME_BLOCK_LABELS[time_block],
-                    'day_of_week': dow,
-                    'month': month,
-                    'Year': date.year,
-                    'Week': date.isocalendar()[1],
-                    'DayName': date.strftime('%A'),
-                }
-                
-                # Adjust weekend_night_peak based on day and time
-                # Fri/Sat during blocks 6,7,0 (6pm-3am)
-                if dow in [4, 5] and time_block in [6, 7, 0]:
-                    row['weekend_night_peak'] = 1
-                else:
-                    row['weekend_night_peak'] = 0
-                
-                data.append(row)
-    
-    df = pd.DataFrame(data)
+    print(f"Time blocks per day: {feature_store.BLOCKS_PER_DAY}")
+    print(f"Total predictions: {len(days) * len(COMMUNITY_AREAS) * feature_store.BLOCKS_PER_DAY:,}")
+    
+    # Keys and features for every block of the period (cached after the first run)
+    table, info = feature_store.table(START_DATE, END_DATE, COMMUNITY_AREAS, GRID_FEATURES)
+    source = 'loaded from the feature cache' if info['cached'] else 'built and cached'
+    print(f"\n✓ Feature table {info['key'][:8]} {source} in {info['seconds'] * 1000:.0f} ms")
+    
+    df = table.rename(columns={feature_store.AREA: 'Community_Area'})
+    day = df.pop(feature_store.WHEN).dt.normalize()
+    df['Date'] = day.dt.strftime('%Y-%m-%d')
+    df['Week'] = day.dt.isocalendar().week.astype(int).to_numpy()
+    df['DayName'] = day.dt.day_name()
+    df['time_block_label'] = df['time_block'].map(TIME_BLOCK_LABELS)
+    
     print(f"\n✓ Generated {len(df):,} prediction rows")
-    print(f"\nFeatures used (5 total):")
-    print(f"  - Community_Area (1-77)")
-    print(f"  - time_block (0-7)")
-    print(f"  - day_of_week (0-6)")
-    print(f"  - month (1-12)")
-    print(f"  - weekend_night_peak (0/1) [auto-calculated]")
+    print(f"\nFeatures used ({len(features)} total): {', '.join(features)}")
     print(f"\n✓ ALL features calculated automatically from date!")
      
     return df
@@ -137,14 +131,17 @@ def make_predictions(model, df, features):
     print("="*70)
     
     # Prepare feature matrix (match training feature order)
-    X = df[features].copy()
+    X = df.rename(columns=MODEL_COLUMN_NAMES)[features].copy()
+    if is_categorical_model(model.get_booster()):
+        # Same fixed categories as in training (categories.py)
+        X = as_categorical(X)
     
     print(f"\nFeature matrix shape: {X.shape}")
     print(f"Features: {list(X.columns)}")
     
     # Make predictions
     print("\nGenerating predictions...")
-    predictions = model.predict(X)
+    predictions = predict_in_parallel(model, X, workers=PREDICT_WORKERS)
     
     # Add predictions to dataframe
     df['Predicted_Severity'] = predictions
@@ -272,12 +269,16 @@ def main():
     print("="*70)
     print(f"\nStarted: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # Load model and template
-    model = load_model()
-    features, template_df = load_feature_template()
+    # Load model (stops here when the model takes other features)
+    try:
+        model = load_model()
+    except (KeyError, model_registry.FeatureMismatch) as e:
+        print(f"\n✗ {e.args[0]}")
+        sys.exit(1)
+    features = FEATURE_COLUMNS
     
     # Generate prediction data
-    df = generate_prediction_data(features, template_df)
+    df = generate_prediction_data(features)
     
     # Make predictions
     df = make_predictions(model, df, features)
@@ -1,12 +1,19 @@
 import pandas as pd
 import matplotlib.pyplot as plt
+import os
+import sys
+
+# Shared helpers live in the pipeline folder
+PIPELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '01 Foundation & Data')
+sys.path.append(PIPELINE_DIR)
+from artifact_cache import read_artifact
 
 # 1. Load the data
 # We use the filename you provided, assuming it is formatted as a CSV
 file_name = '02.1_predictions_2026.csv'
 
 try:
-    df = pd.read_csv(file_name)
+    df = read_artifact(file_name)  # Served from memory when artifact_cache.py is running
     print(f"✅ Successfully loaded {len(df)} rows.")
 except Exception as e:
     print(f"❌ Error loading file: {e}")
@@ -10,6 +10,13 @@ Output: Event impact report with recommended multipliers
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import os
+import sys
+
+# Shared helpers live in the pipeline folder
+PIPELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '01 Foundation & Data')
+sys.path.append(PIPELINE_DIR)
+from artifact_cache import read_artifact
 
 # ============================================================
 # FILE PATHS
@@ -146,7 +153,7 @@ def load_data():
     print("="*70)
     
     print(f"\nReading: {SEVERITY_DATA}")
-    df = pd.read_csv(SEVERITY_DATA)
+    df = read_artifact(SEVERITY_DATA)  # Served from memory when artifact_cache.py is running
     
     print(f"✓ Loaded {len(df):,} crime records")
     print(f"  Date range: {df['Date'].min()} to {df['Date'].max()}")
@@ -0,0 +1,137 @@
+"""
+CATEGORICAL FEATURES BENCHMARK
+Ordinal numbers vs XGBoost's native categories for Community Area and the
+calendar features (categories.py)
+
+Trains each variant on the training split of 01_train_model.py (the cached
+split when there is one) and measures training time, model size, inference
+speed on the test split and test RMSE. Every variant uses the hist tree
+method, so only the feature encoding and the tree shape differ.
+
+Output: categorical_benchmark.md
+
+Usage:
+    python categorical_benchmark.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import xgboost as xgb
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.join(SCRIPT_DIR, '..', '01 Foundation & Data')
+if PIPELINE_DIR not in sys.path:
+    sys.path.append(PIPELINE_DIR)
+
+from pipeline_utils import load_stage  # noqa: E402
+from temporal_cv import regression_metrics  # noqa: E402
+import categories  # noqa: E402
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+TRAIN_SCRIPT = '01_train_model.py'
+OUTPUT_FILE = 'categorical_benchmark.md'
+
+# (label, categorical?, changes to QUICK_PARAMS)
+VARIANTS = [
+    ('numeric (default)', False, {}),
+    ('categorical', True, {}),
+    ('categorical, depth 5 x 100 trees', True, {'max_depth': 5, 'n_estimators': 100}),
+]
+PREDICT_REPEATS = 3    # Inference speed = best of this many passes over the test split
+# ============================================================
+
+
+def run_variant(train, params, X_train, y_train, X_test, y_test):
+    start = time.perf_counter()
+    model = xgb.XGBRegressor(**params, enable_categorical=True)
+    model.fit(X_train, y_train, sample_weight=train.sample_weights(y_train), verbose=False)
+    fit_seconds = time.perf_counter() - start
+
+    predict_seconds = float('inf')
+    for _ in range(PREDICT_REPEATS):
+        start = time.perf_counter()
+        predictions = model.predict(X_test)
+        predict_seconds = min(predict_seconds, time.perf_counter() - start)
+
+    booster = model.get_booster()
+    return {
+        'fit_seconds': fit_seconds,
+        'model_kb': len(booster.save_raw('ubj')) / 1024,
+        'nodes': sum(len(tree.splitlines()) for tree in booster.get_dump()),
+        'predict_rows_per_second': len(X_test) / predict_seconds,
+        **regression_metrics(y_test.to_numpy(dtype=np.float32), predictions),
+    }
+
+
+def save_report(rows, train_rows, test_rows, output_file):
+    baseline = rows[0]
+    lines = [
+        "# Categorical Features Benchmark",
+        "",
+        f"**Date:** {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"**Data:** {train_rows:,} training rows, {test_rows:,} test rows",
+        f"**Categorical:** {', '.join(categories.CATEGORICAL_FEATURES)} (where present)",
+        "",
+        "| Variant | max_depth | Trees | Fit (s) | Model (KB) | Nodes | Predict (rows/s) | Test RMSE | Test R² |",
+        "|---------|-----------|-------|---------|------------|-------|------------------|-----------|---------|",
+    ]
+    for row in rows:
+        lines.append(
+            f"| {row['label']} | {row['max_depth']} | {row['n_estimators']} | {row['fit_seconds']:.1f} | "
+            f"{row['model_kb']:,.0f} | {row['nodes']:,} | {row['predict_rows_per_second']:,.0f} | "
+            f"{row['rmse']:.4f} | {row['r2']:.4f} |"
+        )
+    lines.append("")
+    lines.append(f"Relative to {baseline['label']}:")
+    lines.append("")
+    for row in rows[1:]:
+        lines.append(
+            f"- **{row['label']}:** fit time {row['fit_seconds'] / baseline['fit_seconds']:.2f}x, "
+            f"model size {row['model_kb'] / baseline['model_kb']:.2f}x, "
+            f"inference speed {row['predict_rows_per_second'] / baseline['predict_rows_per_second']:.2f}x, "
+            f"RMSE {row['rmse'] - baseline['rmse']:+.4f}"
+        )
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def main():
+    print("\n" + "=" * 80)
+    print("     CATEGORICAL FEATURES BENCHMARK")
+    print("=" * 80)
+
+    train = load_stage(os.path.join(SCRIPT_DIR, TRAIN_SCRIPT))
+    train.CATEGORICAL = False   # Plain numbers; the categorical variants convert them
+    X_train, X_test, y_train, y_test, _, _ = train.prepare_data(
+        os.path.join(SCRIPT_DIR, train.INPUT_OVERRIDE or train.INPUT_FILE)
+    )
+    frames = {
+        False: (X_train, X_test),
+        True: (categories.as_categorical(X_train), categories.as_categorical(X_test)),
+    }
+
+    rows = []
+    for i, (label, categorical, changes) in enumerate(VARIANTS, 1):
+        params = dict(train.QUICK_PARAMS, tree_method='hist', **changes)
+        print(f"\n[{i}/{len(VARIANTS)}] {label}")
+        X_fit, X_eval = frames[categorical]
+        result = run_variant(train, params, X_fit, y_train, X_eval, y_test)
+        rows.append({'label': label, 'max_depth': params['max_depth'],
+                     'n_estimators': params['n_estimators'], **result})
+        print(f"  ✓ Fit {result['fit_seconds']:.1f}s | model {result['model_kb']:,.0f} KB | "
+              f"predict {result['predict_rows_per_second']:,.0f} rows/s | RMSE {result['rmse']:.4f}")
+
+    output_file = os.path.join(SCRIPT_DIR, OUTPUT_FILE)
+    save_report(rows, len(X_train), len(X_test), output_file)
+    print(f"\n✓ Report saved: {OUTPUT_FILE}")
+    print("=" * 80)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
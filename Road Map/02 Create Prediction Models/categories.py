@@ -0,0 +1,67 @@
+"""
+Categorical model features, with categories shared by training and prediction
+
+Community Area, time_block, day_of_week and month are labels, not
+quantities. With XGBoost's native categorical support (hist method) one
+split sends any set of categories to one side, where an ordinal number needs
+a run of threshold splits to carve out the same areas.
+
+The categories are fixed here instead of taken from the data, so a value has
+the same code (its position in the list) in every training run, prediction
+grid and worker process. Values outside the list become missing.
+"""
+
+import numpy as np
+import pandas as pd
+
+CATEGORICAL_FEATURES = {
+    'Community Area': list(range(1, 78)),
+    'time_block': list(range(8)),
+    'day_of_week': list(range(7)),    # 0 = Monday
+    'month': list(range(1, 13)),
+}
+
+
+def as_categorical(X):
+    """Copy of X with the categorical features (those present) as pandas categories"""
+    X = X.copy()
+    for column, values in CATEGORICAL_FEATURES.items():
+        if column in X.columns and not isinstance(X[column].dtype, pd.CategoricalDtype):
+            X[column] = pd.Categorical(X[column], categories=values)
+    return X
+
+
+def feature_types(X):
+    """XGBoost feature types of a frame: 'c' for category columns, 'q' otherwise"""
+    return ['c' if isinstance(X[column].dtype, pd.CategoricalDtype) else 'q' for column in X.columns]
+
+
+def category_codes(X):
+    """
+    Copy of X with category columns replaced by their codes (float32, missing = NaN)
+    This is what XGBoost splits on, for the paths that hand it plain arrays
+    (shared-memory workers, external-memory parts).
+    """
+    categorical = [column for column in X.columns if isinstance(X[column].dtype, pd.CategoricalDtype)]
+    if not categorical:
+        return X
+    X = X.copy()
+    for column in categorical:
+        codes = X[column].cat.codes.to_numpy().astype(np.float32)
+        codes[codes < 0] = np.nan
+        X[column] = codes
+    return X
+
+
+def encode(column, values):
+    """Codes of raw values of one feature (float32, missing = NaN); values unchanged if not categorical"""
+    if column not in CATEGORICAL_FEATURES:
+        return np.asarray(values, dtype=np.float32)
+    codes = pd.Categorical(values, categories=CATEGORICAL_FEATURES[column]).codes.astype(np.float32)
+    codes[codes < 0] = np.nan
+    return codes
+
+
+def is_categorical_model(booster):
+    """True when the booster was trained with categorical features"""
+    return 'c' in (booster.feature_types or [])
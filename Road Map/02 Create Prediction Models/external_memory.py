@@ -0,0 +1,205 @@
+"""
+External-memory training: the training set streamed from columnar parts
+
+For inputs that don't fit in memory next to their pandas copies (full
+history, beat-level grids). The input CSV is read in chunks sized by the
+memory budget (memory_budget.py in '01 Foundation & Data') and written once
+per data version as parts with one .npy file per column:
+
+    cache/<key>/parts/train_00000/<i>.npy, train_00001/ ...
+    cache/<key>/parts/test_00000/<i>.npy, ...
+
+Each chunk is split train/test on its own (stratified like split_data), so
+no step needs every row at once. Training reads the train parts through an
+XGBoost DataIter: ExtMemQuantileDMatrix sketches the quantiles batch by
+batch and keeps its pages on disk, so peak memory follows the batch size
+rather than the row count. Sample weights are computed per batch by the same
+function as in-memory training; rows it weights 0 (zero blocks left out by
+downsampling) never reach XGBoost. Evaluation predicts part by part and adds
+up the metrics; feature contributions (feature_contributions.py) are
+computed part by part too.
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+PIPELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '01 Foundation & Data')
+if PIPELINE_DIR not in sys.path:
+    sys.path.append(PIPELINE_DIR)
+
+import memory_budget  # noqa: E402
+import categories  # noqa: E402
+
+PARTS_DIR = 'parts'
+MANIFEST = 'parts.json'
+BATCH_SHARE = 0.1   # Share of the memory budget one part may take when parsed
+
+
+def _part_dir(folder, split, index):
+    return os.path.join(folder, PARTS_DIR, f'{split}_{index:05d}')
+
+
+def write_parts(input_file, folder, target, drop_features, split_chunk, batch_rows=None, categorical=()):
+    """
+    Stream input_file into train / test parts under folder/parts/
+    split_chunk(X, y, index) -> (X_train, X_test, y_train, y_test) for one chunk.
+    Parts keep the raw values; the `categorical` features are read back as
+    category codes (categories.py).
+    Returns the manifest (features, parts and rows per split, throughput).
+    Written to a temporary folder and renamed, like the cached split.
+    """
+    final = os.path.join(folder, PARTS_DIR)
+    manifest_path = os.path.join(final, MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            return dict(json.load(f), cached=True)
+
+    partial = final + f'.partial{os.getpid()}'
+    shutil.rmtree(partial, ignore_errors=True)
+    os.makedirs(partial)
+    if batch_rows:
+        chunks = pd.read_csv(input_file, chunksize=batch_rows)
+    else:
+        chunks = memory_budget.iter_csv(input_file, share=BATCH_SHARE)
+
+    start = time.perf_counter()
+    manifest = {'features': None, 'target': target, 'parts': {'train': [], 'test': []}}
+    for index, chunk in enumerate(chunks):
+        chunk = chunk.drop(columns=[c for c in drop_features if c in chunk.columns])
+        X, y = chunk.drop(columns=target), chunk[target]
+        if manifest['features'] is None:
+            manifest['features'] = list(X.columns)
+            manifest['categorical'] = [column for column in X.columns if column in categorical]
+        for split, (X_part, y_part) in zip(('train', 'test'), _pairs(split_chunk(X, y, index))):
+            part = os.path.join(partial, os.path.basename(_part_dir(final, split, index)))
+            os.makedirs(part)
+            for i, column in enumerate(manifest['features']):
+                np.save(os.path.join(part, f'{i}.npy'), X_part[column].to_numpy())
+            np.save(os.path.join(part, 'target.npy'), y_part.to_numpy(dtype=np.float32))
+            manifest['parts'][split].append({'name': os.path.basename(part), 'rows': len(X_part)})
+    seconds = time.perf_counter() - start
+
+    rows = sum(p['rows'] for parts in manifest['parts'].values() for p in parts)
+    manifest.update({'rows': rows, 'seconds': seconds, 'rows_per_second': rows / max(seconds, 1e-9)})
+    with open(os.path.join(partial, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    shutil.rmtree(final, ignore_errors=True)
+    os.replace(partial, final)
+    return dict(manifest, cached=False)
+
+
+def _pairs(split):
+    X_train, X_test, y_train, y_test = split
+    return (X_train, y_train), (X_test, y_test)
+
+
+def read_part(folder, split, index, manifest, raw=False):
+    """(X as a float32 matrix, y) of one part; raw=True gives X as a DataFrame of the stored values"""
+    part = _part_dir(folder, split, index)
+    columns = {column: np.load(os.path.join(part, f'{i}.npy')) for i, column in enumerate(manifest['features'])}
+    y = np.load(os.path.join(part, 'target.npy'))
+    if raw:
+        return pd.DataFrame(columns), y
+    X = np.column_stack([
+        categories.encode(column, values) if column in manifest['categorical'] else values
+        for column, values in columns.items()
+    ])
+    return X.astype(np.float32, copy=False), y
+
+
+def feature_types(manifest):
+    return ['c' if column in manifest['categorical'] else 'q' for column in manifest['features']]
+
+
+class PartIterator(xgb.DataIter):
+    """
+    Feeds the parts of one split to XGBoost, one part per batch
+    weight_fn(y, part index) gives the rows' weights; rows weighted 0 are dropped.
+    It is called again on every pass, so any sampling in it must be seeded by the index.
+    """
+
+    def __init__(self, folder, manifest, split, weight_fn, cache_prefix):
+        self.folder = folder
+        self.manifest = manifest
+        self.split = split
+        self.weight_fn = weight_fn
+        self.batches = 0
+        self._index = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self._index == len(self.manifest['parts'][self.split]):
+            return False
+        X, y = read_part(self.folder, self.split, self._index, self.manifest)
+        weights = self.weight_fn(y, self._index)
+        keep = weights > 0
+        if not keep.all():
+            X, y, weights = X[keep], y[keep], weights[keep]
+        input_data(data=X, label=y, weight=weights, feature_names=self.manifest['features'],
+                   feature_types=feature_types(self.manifest))
+        self._index += 1
+        self.batches += 1
+        return True
+
+    def reset(self):
+        self._index = 0
+
+
+def training_matrix(folder, manifest, weight_fn, max_bin=None):
+    """
+    Training matrix over the train parts, sketched batch by batch
+    Returns (matrix, {'seconds', 'rows', 'batches', 'passes'})
+    """
+    cache_prefix = os.path.join(folder, PARTS_DIR, 'xgb_pages')
+    iterator = PartIterator(folder, manifest, 'train', weight_fn, cache_prefix)
+    start = time.perf_counter()
+    if hasattr(xgb, 'ExtMemQuantileDMatrix'):
+        matrix = xgb.ExtMemQuantileDMatrix(iterator, max_bin=max_bin)
+    else:
+        # XGBoost < 3.0: external-memory DMatrix, sketched when training starts
+        matrix = xgb.DMatrix(iterator)
+    return matrix, {
+        'seconds': time.perf_counter() - start,
+        'rows': matrix.num_row(),
+        'batches': len(manifest['parts']['train']),
+        'passes': iterator.batches // max(1, len(manifest['parts']['train'])),
+    }
+
+
+def evaluate(booster, folder, manifest, split):
+    """Metrics of one split, predicted part by part (with MAE on zero / non-zero blocks)"""
+    n = sq = ab = y_sum = y_sq = 0.0
+    zero = {'n': 0, 'ab': 0.0}
+    nonzero = {'n': 0, 'ab': 0.0}
+    start = time.perf_counter()
+    for index in range(len(manifest['parts'][split])):
+        X, y = read_part(folder, split, index, manifest)
+        errors = np.abs(y - booster.inplace_predict(X))
+        n += len(y)
+        sq += float(np.sum(errors ** 2))
+        ab += float(np.sum(errors))
+        y_sum += float(np.sum(y, dtype=np.float64))
+        y_sq += float(np.sum(y.astype(np.float64) ** 2))
+        for bucket, mask in ((zero, y == 0), (nonzero, y > 0)):
+            bucket['n'] += int(mask.sum())
+            bucket['ab'] += float(errors[mask].sum())
+    seconds = time.perf_counter() - start
+
+    total = y_sq - y_sum ** 2 / n
+    return {
+        'mse': sq / n,
+        'rmse': (sq / n) ** 0.5,
+        'mae': ab / n,
+        'r2': 1.0 - sq / total if total else 0.0,
+        'zero_mae': zero['ab'] / zero['n'] if zero['n'] else None,
+        'nonzero_mae': nonzero['ab'] / nonzero['n'] if nonzero['n'] else None,
+        'rows_per_second': n / max(seconds, 1e-9),
+    }
+
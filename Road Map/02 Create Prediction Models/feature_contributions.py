@@ -0,0 +1,138 @@
+"""
+Feature contribution ranges over the whole test split
+
+XGBoost's native contribution prediction (Booster.predict with
+pred_contribs=True) gives the exact TreeSHAP value of every feature for
+every row, plus the bias, without the shap package. Every test row is
+explained instead of a sample, so the min / max effects are the real
+extremes rather than those of 5,000 random rows.
+
+Rows go through in batches sized from the memory budget (memory_budget.py in
+'01 Foundation & Data') as float32 matrices (category columns as their
+codes). Exact TreeSHAP costs trees x leaves x depth^2 per row, but the grid
+repeats itself: each batch is reduced to its distinct rows, which are
+explained once and counted as often as they occur. XGBoost spreads each
+batch over all cores. Per feature, the min, max and sum of |contribution|
+are updated batch by batch, so only one batch's contributions are in memory
+at a time.
+
+Results are cached next to the prepared split as
+cache/<key>/contributions_<model hash>.json: the same model on the same test
+split is reported again without predicting.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+PIPELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '01 Foundation & Data')
+if PIPELINE_DIR not in sys.path:
+    sys.path.append(PIPELINE_DIR)
+
+from memory_budget import chunk_rows  # noqa: E402
+from sharded_executor import resolve_workers  # noqa: E402
+from categories import category_codes  # noqa: E402
+
+CONTRIB_SHARE = 0.25   # Share of the memory budget for one batch (features + contributions)
+APPROX_CONTRIBS = False   # True = Saabas approximation: ~100x faster, but not exact SHAP values
+CACHE_FILE = 'contributions_{}{}.json'
+COLUMNS = ['feature', 'min_effect', 'max_effect', 'range', 'mean_abs_effect']
+
+
+def model_hash(booster):
+    """Content hash of a booster (same trees = same hash)"""
+    return hashlib.blake2b(bytes(booster.save_raw('ubj')), digest_size=12).hexdigest()
+
+
+def frame_batches(X, batch_rows=None):
+    """float32 matrices of a feature frame, batch_rows rows at a time (None = sized from the budget)"""
+    if batch_rows is None:
+        # Input row + one contribution per feature and the bias, all float32
+        batch_rows = chunk_rows((2 * X.shape[1] + 1) * 4, CONTRIB_SHARE)
+    for start in range(0, len(X), batch_rows):
+        yield category_codes(X.iloc[start:start + batch_rows]).to_numpy(dtype=np.float32)
+
+
+def contribution_ranges(booster, batches, feature_names, nthread=None):
+    """
+    Per-feature contribution range over every row of `batches` (float32 matrices)
+    Returns (DataFrame of COLUMNS sorted by range, stats)
+    """
+    nthread = resolve_workers(nthread)
+    booster.set_param({'nthread': nthread})
+    n_features = len(feature_names)
+    low = np.full(n_features, np.inf)
+    high = np.full(n_features, -np.inf)
+    abs_sum = np.zeros(n_features)
+    bias = 0.0
+    rows = unique_rows = batch_count = 0
+
+    start = time.perf_counter()
+    for batch in batches:
+        if not len(batch):
+            continue
+        # Same features, same contributions: explain each distinct row once
+        distinct, counts = np.unique(batch, axis=0, return_counts=True)
+        matrix = xgb.DMatrix(distinct, feature_names=list(feature_names),
+                             feature_types=booster.feature_types, nthread=nthread)
+        contribs = booster.predict(matrix, pred_contribs=True,
+                                   approx_contribs=APPROX_CONTRIBS)   # (rows, features + bias), float32
+        values = contribs[:, :n_features]
+        low = np.minimum(low, values.min(axis=0))
+        high = np.maximum(high, values.max(axis=0))
+        abs_sum += (np.abs(values, dtype=np.float64) * counts[:, None]).sum(axis=0)
+        bias = float(contribs[0, -1])
+        rows += int(counts.sum())
+        unique_rows += len(distinct)
+        batch_count += 1
+    seconds = time.perf_counter() - start
+    if not rows:
+        raise ValueError("no rows to explain")
+
+    df = pd.DataFrame({
+        'feature': list(feature_names),
+        'min_effect': low,
+        'max_effect': high,
+        'range': high - low,
+        'mean_abs_effect': abs_sum / rows,
+    }).sort_values('range', ascending=False)
+    stats = {
+        'rows': rows,
+        'unique_rows': unique_rows,
+        'batches': batch_count,
+        'threads': nthread,
+        'bias': bias,
+        'seconds': seconds,
+        'rows_per_second': rows / max(seconds, 1e-9),
+    }
+    return df, stats
+
+
+def cached_ranges(booster, batches, feature_names, cache_folder=None):
+    """
+    contribution_ranges(), served from cache_folder when this model was explained on it before
+    batches is a callable returning the batch iterator (not called on a cache hit).
+    Returns (DataFrame, stats with 'cached' and 'model_hash')
+    """
+    digest = model_hash(booster)
+    name = CACHE_FILE.format(digest, '_approx' if APPROX_CONTRIBS else '')
+    path = os.path.join(cache_folder, name) if cache_folder else None
+    if path and os.path.exists(path):
+        with open(path) as f:
+            cached = json.load(f)
+        return pd.DataFrame(cached['ranges'], columns=COLUMNS), dict(cached['stats'], cached=True)
+
+    df, stats = contribution_ranges(booster, batches(), feature_names)
+    stats['model_hash'] = digest
+    if path:
+        os.makedirs(cache_folder, exist_ok=True)
+        with open(path + '.partial', 'w') as f:
+            json.dump({'ranges': df[COLUMNS].values.tolist(), 'stats': stats}, f)
+        os.replace(path + '.partial', path)
+    return df, dict(stats, cached=False)
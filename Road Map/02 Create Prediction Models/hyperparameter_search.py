@@ -0,0 +1,556 @@
+"""
+HYPERPARAMETER SEARCH - SUCCESSIVE HALVING ON BOOSTING ROUNDS
+Finds better XGBoost settings than the hand-picked QUICK_PARAMS at a
+fraction of a grid search's cost
+
+Candidates are proposed at random or by a tree-structured Parzen estimator
+(TPE, a Bayesian method: it samples near settings that scored well so far).
+Each bracket starts many candidates with few boosting rounds and keeps the
+best 1/ETA at every rung while multiplying their rounds by ETA:
+
+    27 candidates x 25 rounds -> 9 x 75 -> 3 x 225 -> 1 x 675
+
+A promoted candidate continues boosting its saved model instead of starting
+over, so a bracket costs about 4 full fits instead of 27. With
+--schedule hyperband the brackets trade candidates against starting rounds.
+
+Scoring: RMSE on a validation part of the training split (the test split of
+01_train_model.py is only used to score the winner at the end). Trials of a
+rung run side by side in worker processes with cores / workers XGBoost
+threads each. The fit / validation matrices are built once per data version
+and stored as XGBoost binary buffers next to the cached split (see
+training_cache.py), so every trial loads them in milliseconds.
+
+Every finished trial is appended to search/trials.jsonl (its model saved
+first), so a killed search resumes where it stopped: re-run the same command.
+
+Outputs (search/):
+  - trials.jsonl      checkpoint: candidates and finished trials
+  - leaderboard.md    best candidates and the settings to copy into QUICK_PARAMS
+  - pareto.png        validation RMSE vs training time, Pareto front highlighted
+
+Usage:
+    python hyperparameter_search.py                         # settings below
+    python hyperparameter_search.py --proposer random --schedule hyperband
+    python hyperparameter_search.py --candidates 9 --max-rounds 225 --workers 2
+    python hyperparameter_search.py --restart               # discard the checkpoint
+    python chicago_crime.py search --candidates 9
+"""
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+# Search space: name -> (kind, low, high); kind is 'int', 'float' or 'log'
+SEARCH_SPACE = {
+    'max_depth': ('int', 3, 10),
+    'learning_rate': ('log', 0.01, 0.3),
+    'subsample': ('float', 0.5, 1.0),
+    'colsample_bytree': ('float', 0.5, 1.0),
+    'min_child_weight': ('log', 1, 20),
+    'reg_lambda': ('log', 0.1, 10),
+}
+FIXED_PARAMS = {'objective': 'reg:squarederror', 'random_state': 42}
+
+PROPOSER = 'tpe'          # 'tpe' (Bayesian) or 'random'
+SCHEDULE = 'halving'      # 'halving' (HALVING_BRACKETS brackets) or 'hyperband'
+CANDIDATES = 27           # Candidates per successive-halving bracket
+HALVING_BRACKETS = 2      # Later brackets propose from earlier results (TPE)
+MIN_ROUNDS = 25           # Boosting rounds at the first rung
+MAX_ROUNDS = 675          # Boosting rounds at the last rung
+ETA = 3                   # Keep 1/ETA per rung, ETA x the rounds
+
+VALIDATION_SIZE = 0.2     # Share of the training split used for scoring
+SEARCH_WORKERS = None     # Trials at once (None = all CPU cores)
+SEED = 42
+
+TPE_STARTUP = 10          # Finished candidates before TPE replaces random proposals
+TPE_GAMMA = 0.25          # Share of candidates counted as "good"
+TPE_SAMPLES = 64          # Random draws scored per proposal
+TPE_BANDWIDTH = 0.15      # Kernel width in the unit search space
+
+TRAIN_SCRIPT = '01_train_model.py'
+OUTPUT_DIR = 'search'
+CHECKPOINT = 'trials.jsonl'
+LEADERBOARD = 'leaderboard.md'
+PARETO_PLOT = 'pareto.png'
+LEADERBOARD_ROWS = 15
+# ============================================================
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import xgboost as xgb
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.join(SCRIPT_DIR, '..', '01 Foundation & Data')
+if PIPELINE_DIR not in sys.path:
+    sys.path.append(PIPELINE_DIR)
+
+from pipeline_utils import load_stage  # noqa: E402
+from sharded_executor import resolve_workers  # noqa: E402
+from temporal_cv import regression_metrics  # noqa: E402
+import training_cache  # noqa: E402
+from categories import category_codes  # noqa: E402
+
+
+# ============================================================
+# SEARCH SPACE AND PROPOSALS
+# ============================================================
+
+def to_params(unit):
+    """Point in the unit cube -> XGBoost parameters"""
+    params = {}
+    for u, (name, (kind, low, high)) in zip(unit, SEARCH_SPACE.items()):
+        if kind == 'log':
+            value = math.exp(math.log(low) + u * (math.log(high) - math.log(low)))
+        else:
+            value = low + u * (high - low)
+        params[name] = int(round(value)) if kind == 'int' else round(float(value), 5)
+    return params
+
+
+def to_unit(params):
+    unit = []
+    for name, (kind, low, high) in SEARCH_SPACE.items():
+        value = params[name]
+        if kind == 'log':
+            unit.append((math.log(value) - math.log(low)) / (math.log(high) - math.log(low)))
+        else:
+            unit.append((value - low) / (high - low))
+    return np.clip(unit, 0.0, 1.0)
+
+
+def _kde_log_density(points, centers):
+    """Log density of a Gaussian kernel mixture in the unit cube"""
+    diff = (points[:, None, :] - centers[None, :, :]) / TPE_BANDWIDTH
+    log_kernels = -0.5 * np.sum(diff ** 2, axis=2)
+    top = log_kernels.max(axis=1, keepdims=True)
+    return (top + np.log(np.exp(log_kernels - top).mean(axis=1, keepdims=True))).ravel()
+
+
+def propose(n, scored, rng, proposer):
+    """
+    n new candidates (unit-cube points)
+    scored = [(unit point, rank percentile)] of finished candidates; TPE draws
+    near the best TPE_GAMMA of them and keeps the draws that are most likely
+    under the good points relative to the rest.
+    """
+    dims = len(SEARCH_SPACE)
+    if proposer == 'random' or len(scored) < TPE_STARTUP:
+        return [rng.random(dims) for _ in range(n)]
+
+    points = np.array([point for point, _ in scored])
+    ranks = np.array([rank for _, rank in scored])
+    cutoff = max(TPE_GAMMA, np.sort(ranks)[1])   # At least two good points
+    good = points[ranks <= cutoff]
+    bad = points[ranks > cutoff]
+    if len(bad) == 0:
+        bad = points
+
+    proposals = []
+    for _ in range(n):
+        centers = good[rng.integers(len(good), size=TPE_SAMPLES)]
+        draws = np.clip(centers + rng.normal(0, TPE_BANDWIDTH, size=centers.shape), 0, 1)
+        score = _kde_log_density(draws, good) - _kde_log_density(draws, bad)
+        proposals.append(draws[int(np.argmax(score))])
+    return proposals
+
+
+def rank_percentiles(results):
+    """
+    (trial -> percentile) from each trial's deepest rung: trials are ranked
+    against the others evaluated at the same number of rounds
+    """
+    deepest = {}
+    for result in results:
+        if result['rounds'] >= deepest.get(result['trial'], {'rounds': -1})['rounds']:
+            deepest[result['trial']] = result
+    by_rounds = {}
+    for result in deepest.values():
+        by_rounds.setdefault(result['rounds'], []).append(result)
+    percentiles = {}
+    for group in by_rounds.values():
+        group.sort(key=lambda r: r['val_rmse'])
+        for i, result in enumerate(group):
+            percentiles[result['trial']] = (i + 0.5) / len(group)
+    return percentiles
+
+
+def brackets(schedule, candidates, min_rounds, max_rounds, eta, halving_brackets):
+    """[(candidates, first-rung rounds)] for the schedule"""
+    if schedule == 'halving':
+        return [(candidates, min_rounds)] * halving_brackets
+    if schedule == 'hyperband':
+        s_max = max(0, int(math.log(max_rounds / min_rounds, eta) + 1e-9))
+        return [
+            (int(math.ceil((s_max + 1) / (s + 1) * eta ** s)), max(min_rounds, int(max_rounds / eta ** s)))
+            for s in range(s_max, -1, -1)
+        ]
+    raise ValueError(f"unknown schedule '{schedule}' (expected halving or hyperband)")
+
+
+def rungs(first_rounds, max_rounds, eta):
+    rounds = [first_rounds]
+    while rounds[-1] * eta <= max_rounds:
+        rounds.append(rounds[-1] * eta)
+    if rounds[-1] < max_rounds:
+        rounds.append(max_rounds)
+    return rounds
+
+
+# ============================================================
+# TRIALS (worker processes)
+# ============================================================
+
+def _run_trial(matrices, params, rounds, previous, model_path, nthread):
+    """Boost a candidate to `rounds` (continuing `previous` if given), score it, save the model"""
+    dfit = xgb.DMatrix(matrices['fit'])
+    dval = xgb.DMatrix(matrices['val'])
+
+    start_rounds = 0
+    if previous:
+        booster = xgb.Booster(model_file=previous['model'])
+        start_rounds = booster.num_boosted_rounds()
+    else:
+        booster = None
+
+    start = time.perf_counter()
+    model = xgb.XGBRegressor(**dict(FIXED_PARAMS, **params, n_jobs=nthread))
+    booster = xgb.train(model.get_xgb_params(), dfit, num_boost_round=rounds - start_rounds,
+                        xgb_model=booster)
+    seconds = time.perf_counter() - start
+
+    metrics = regression_metrics(dval.get_label(), booster.predict(dval))
+    # Written whole, then renamed: a killed trial never leaves a half-written model
+    partial = model_path + '.partial'
+    with open(partial, 'wb') as f:
+        f.write(booster.save_raw('json'))
+    os.replace(partial, model_path)
+    return {
+        'rounds': rounds,
+        'val_rmse': metrics['rmse'],
+        'val_mae': metrics['mae'],
+        'val_r2': metrics['r2'],
+        'seconds': seconds + (previous['seconds'] if previous else 0.0),
+        'rung_seconds': seconds,
+        'trained_rounds': rounds - start_rounds,
+        'model': model_path,
+    }
+
+
+# ============================================================
+# CHECKPOINT
+# ============================================================
+
+class Checkpoint:
+    """Append-only record of candidates and finished trials (trials.jsonl)"""
+
+    def __init__(self, folder, fingerprint, restart):
+        self.folder = folder
+        self.path = os.path.join(folder, CHECKPOINT)
+        self.candidates = {}
+        self.results = []
+        if restart:
+            shutil.rmtree(folder, ignore_errors=True)
+        os.makedirs(os.path.join(folder, 'models'), exist_ok=True)
+
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                lines = [json.loads(line) for line in f if line.strip()]
+            if lines and lines[0].get('fingerprint') != fingerprint:
+                raise SystemExit(f"✗ {os.path.relpath(self.path, SCRIPT_DIR)} belongs to a search with other "
+                                 f"data or settings - use --restart to start over")
+            for line in lines[1:]:
+                if line['event'] == 'candidate':
+                    self.candidates[line['trial']] = line
+                elif line['event'] == 'result':
+                    self.results.append(line)
+        else:
+            self._append({'event': 'search', 'fingerprint': fingerprint,
+                          'started': time.strftime('%Y-%m-%d %H:%M:%S')})
+
+    def _append(self, record):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def add_candidate(self, trial, bracket, params):
+        record = {'event': 'candidate', 'trial': trial, 'bracket': bracket, 'params': params}
+        self.candidates[trial] = record
+        self._append(record)
+
+    def add_result(self, trial, result):
+        record = {'event': 'result', 'trial': trial, **result}
+        self.results.append(record)
+        self._append(record)
+
+    def result(self, trial, rounds):
+        for record in self.results:
+            if record['trial'] == trial and record['rounds'] == rounds:
+                return record
+        return None
+
+    def model_path(self, trial, rounds):
+        return os.path.join(self.folder, 'models', f'trial_{trial:04d}_r{rounds}.json')
+
+
+def search_fingerprint(input_file, settings):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(training_cache.file_hash(input_file).encode())
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def search_matrices(key, X_train, y_train, output_dir, nonzero_weight):
+    """
+    Paths of the fit / validation DMatrix buffers, built on first use
+    Kept with the cached split of this data version (key), or in the search
+    folder when 01_train_model.py's cache is off (key None).
+    """
+    paths = {
+        part: (training_cache.matrix_path(key, f'search_{part}_{VALIDATION_SIZE}_{SEED}') if key
+               else os.path.join(output_dir, f'{part}.buffer'))
+        for part in ('fit', 'val')
+    }
+    if all(os.path.exists(path) for path in paths.values()):
+        print("✓ Fit / validation matrices loaded from the cache")
+        return paths
+
+    fit = np.random.default_rng(SEED).random(len(X_train)) >= VALIDATION_SIZE
+    y = y_train.to_numpy(dtype=np.float32)
+    training_cache.save_matrix(paths['fit'], xgb.DMatrix(
+        X_train[fit], label=y[fit], weight=np.where(y[fit] == 0, 1.0, nonzero_weight), enable_categorical=True))
+    training_cache.save_matrix(paths['val'], xgb.DMatrix(X_train[~fit], label=y[~fit], enable_categorical=True))
+    print(f"✓ Fit / validation matrices built: {int(fit.sum()):,} / {int((~fit).sum()):,} rows")
+    return paths
+
+
+# ============================================================
+# SEARCH
+# ============================================================
+
+def run_rung(checkpoint, matrices, trials, rounds, previous_rounds, workers, nthread):
+    """Run every trial of a rung that isn't in the checkpoint yet"""
+    todo = [trial for trial in trials if checkpoint.result(trial, rounds) is None]
+    if len(todo) < len(trials):
+        print(f"        {len(trials) - len(todo)} trial(s) already in the checkpoint")
+    if not todo:
+        return
+
+    def task_args(trial):
+        previous = checkpoint.result(trial, previous_rounds) if previous_rounds else None
+        return (matrices, checkpoint.candidates[trial]['params'], rounds, previous,
+                checkpoint.model_path(trial, rounds), nthread)
+
+    def report(trial, result):
+        checkpoint.add_result(trial, result)
+        print(f"        ✓ trial {trial:3d}: RMSE {result['val_rmse']:.4f} ({result['rung_seconds']:.1f}s)")
+
+    if workers == 1:
+        for trial in todo:
+            report(trial, _run_trial(*task_args(trial)))
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as executor:
+        futures = {executor.submit(_run_trial, *task_args(trial)): trial for trial in todo}
+        for future in as_completed(futures):
+            report(futures[future], future.result())
+
+
+def run_bracket(index, n_candidates, first_rounds, args, checkpoint, matrices, rng, workers, nthread):
+    # Candidates are proposed once and checkpointed, so a resumed bracket keeps them
+    trials = sorted(t for t, c in checkpoint.candidates.items() if c['bracket'] == index)
+    if not trials:
+        percentiles = rank_percentiles(checkpoint.results)
+        scored = [(to_unit(checkpoint.candidates[t]['params']), p) for t, p in percentiles.items()]
+        first_id = max(checkpoint.candidates, default=0) + 1
+        for offset, unit in enumerate(propose(n_candidates, scored, rng, args.proposer)):
+            checkpoint.add_candidate(first_id + offset, index, to_params(unit))
+        trials = list(range(first_id, first_id + n_candidates))
+        how = 'TPE' if args.proposer == 'tpe' and len(scored) >= TPE_STARTUP else 'random'
+        print(f"      {n_candidates} new candidates ({how})")
+
+    previous_rounds = None
+    for rounds in rungs(first_rounds, args.max_rounds, ETA):
+        print(f"      Rung: {len(trials)} candidate(s) x {rounds} rounds")
+        run_rung(checkpoint, matrices, trials, rounds, previous_rounds, workers, nthread)
+        ranked = sorted(trials, key=lambda t: checkpoint.result(t, rounds)['val_rmse'])
+        trials = ranked[:max(1, len(ranked) // ETA)]
+        previous_rounds = rounds
+
+
+def leaderboard(checkpoint):
+    """Each candidate at its deepest rung, best first (deeper rungs rank above shallower ones)"""
+    deepest = {}
+    for result in checkpoint.results:
+        if result['rounds'] >= deepest.get(result['trial'], {'rounds': -1})['rounds']:
+            deepest[result['trial']] = result
+    return sorted(deepest.values(), key=lambda r: (-r['rounds'], r['val_rmse']))
+
+
+def pareto_front(results):
+    """Results not beaten on both validation RMSE and training time"""
+    front = []
+    best = math.inf
+    for result in sorted(results, key=lambda r: (r['seconds'], r['val_rmse'])):
+        if result['val_rmse'] < best:
+            front.append(result)
+            best = result['val_rmse']
+    return front
+
+
+def plot_pareto(results, output_file):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    front = pareto_front(results)
+    plt.figure(figsize=(10, 6))
+    scatter = plt.scatter([r['seconds'] for r in results], [r['val_rmse'] for r in results],
+                          c=[r['rounds'] for r in results], norm=matplotlib.colors.LogNorm(),
+                          cmap='viridis', alpha=0.6, s=30)
+    plt.plot([r['seconds'] for r in front], [r['val_rmse'] for r in front], 'r-o', markersize=5,
+             label='Pareto front')
+    plt.colorbar(scatter, label='Boosting rounds')
+    plt.xscale('log')
+    plt.xlabel('Training time (s, cumulative over rungs)', fontsize=12, fontweight='bold')
+    plt.ylabel('Validation RMSE', fontsize=12, fontweight='bold')
+    plt.title('Hyperparameter Search: Accuracy vs Training Time', fontsize=14, fontweight='bold')
+    plt.legend()
+    plt.grid(alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=150, bbox_inches='tight')
+    plt.close()
+
+
+def save_leaderboard(board, checkpoint, best_test, settings, output_file):
+    best = board[0]
+    best_params = checkpoint.candidates[best['trial']]['params']
+    lines = [
+        "# Hyperparameter Search Leaderboard",
+        "",
+        f"**Generated:** {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"**Proposer:** {settings['proposer']} | **Schedule:** {settings['schedule']} | "
+        f"**Rounds:** {settings['min_rounds']}-{settings['max_rounds']} (ETA {ETA})",
+        f"**Candidates:** {len(checkpoint.candidates)} | **Trials run:** {len(checkpoint.results)} | "
+        f"**Training time:** {sum(r['rung_seconds'] for r in checkpoint.results):.0f}s",
+        "",
+        "| Rank | Trial | Rounds | Val RMSE | Val MAE | Val R² | Time (s) | " + " | ".join(SEARCH_SPACE) + " |",
+        "|" + "---|" * (7 + len(SEARCH_SPACE)),
+    ]
+    for rank, result in enumerate(board[:LEADERBOARD_ROWS], 1):
+        params = checkpoint.candidates[result['trial']]['params']
+        lines.append(f"| {rank} | {result['trial']} | {result['rounds']} | {result['val_rmse']:.4f} | "
+                     f"{result['val_mae']:.4f} | {result['val_r2']:.4f} | {result['seconds']:.1f} | "
+                     + " | ".join(str(params[name]) for name in SEARCH_SPACE) + " |")
+    lines += [
+        "",
+        "## Best Candidate",
+        "",
+        f"Test set (never used for selection): RMSE {best_test['rmse']:.4f}, "
+        f"MAE {best_test['mae']:.4f}, R² {best_test['r2']:.4f}",
+        "",
+        "For `QUICK_PARAMS` in `01_train_model.py`:",
+        "",
+        "```python",
+        f"'n_estimators': {best['rounds']},",
+        *(f"'{name}': {value}," for name, value in best_params.items()),
+        "```",
+    ]
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hyperparameter search with successive halving")
+    parser.add_argument('--proposer', choices=['tpe', 'random'], default=PROPOSER)
+    parser.add_argument('--schedule', choices=['halving', 'hyperband'], default=SCHEDULE)
+    parser.add_argument('--candidates', type=int, default=CANDIDATES, help="candidates per halving bracket")
+    parser.add_argument('--brackets', type=int, default=HALVING_BRACKETS, help="halving brackets")
+    parser.add_argument('--min-rounds', type=int, default=MIN_ROUNDS)
+    parser.add_argument('--max-rounds', type=int, default=MAX_ROUNDS)
+    parser.add_argument('--workers', type=int, default=SEARCH_WORKERS, help="trials at once")
+    parser.add_argument('--restart', action='store_true', help="discard the checkpoint and start over")
+    args = parser.parse_args(argv)
+
+    train = load_stage(os.path.join(SCRIPT_DIR, TRAIN_SCRIPT))
+    input_file = os.path.join(SCRIPT_DIR, train.INPUT_OVERRIDE or train.INPUT_FILE)
+    output_dir = os.path.join(SCRIPT_DIR, OUTPUT_DIR)
+    settings = {
+        'space': SEARCH_SPACE, 'fixed': FIXED_PARAMS, 'proposer': args.proposer, 'schedule': args.schedule,
+        'candidates': args.candidates, 'brackets': args.brackets, 'min_rounds': args.min_rounds,
+        'max_rounds': args.max_rounds, 'eta': ETA, 'validation': VALIDATION_SIZE, 'seed': SEED,
+        'drop': train.DROP_FEATURES, 'weight': train.NONZERO_WEIGHT, 'categorical': train.CATEGORICAL,
+    }
+    plan = brackets(args.schedule, args.candidates, args.min_rounds, args.max_rounds, ETA, args.brackets)
+
+    print("\n" + "=" * 80)
+    print("     HYPERPARAMETER SEARCH - CHICAGO CRIME PREDICTION")
+    print("=" * 80)
+    print(f"Proposer: {args.proposer} | Schedule: {args.schedule} ({len(plan)} bracket(s))")
+    print(f"Rounds per rung: {args.min_rounds} -> {args.max_rounds} (x{ETA})")
+
+    checkpoint = Checkpoint(output_dir, search_fingerprint(input_file, settings), args.restart)
+    if checkpoint.results:
+        print(f"\n🔁 Resuming: {len(checkpoint.candidates)} candidate(s), "
+              f"{len(checkpoint.results)} finished trial(s) in the checkpoint")
+
+    # Data: the training split of 01_train_model.py, part of it held out for scoring
+    # (cached split and matrices when this data version was seen before)
+    X_train, X_test, y_train, y_test, _, key = train.prepare_data(input_file)
+    matrices = search_matrices(key, X_train, y_train, output_dir, train.NONZERO_WEIGHT)
+
+    # A resumed search continues with fresh draws instead of repeating the first ones
+    rng = np.random.default_rng(SEED + len(checkpoint.candidates))
+
+    workers = resolve_workers(args.workers)
+    nthread = max(1, (os.cpu_count() or 1) // workers)
+    train.print_header(f"SEARCHING ({workers} trial(s) at once, {nthread} thread(s) each)")
+    start_time = time.perf_counter()
+    for index, (n_candidates, first_rounds) in enumerate(plan):
+        print(f"\n[{index + 1}/{len(plan)}] Bracket: {n_candidates} candidate(s) from {first_rounds} rounds")
+        run_bracket(index, n_candidates, first_rounds, args, checkpoint, matrices, rng, workers, nthread)
+    elapsed = time.perf_counter() - start_time
+
+    # Leaderboard, test score of the winner, Pareto chart
+    train.print_header("LEADERBOARD")
+    board = leaderboard(checkpoint)
+    best = board[0]
+    booster = xgb.Booster(model_file=best['model'])
+    best_test = regression_metrics(y_test.to_numpy(dtype=np.float32),
+                                   booster.inplace_predict(category_codes(X_test).to_numpy(dtype=np.float32)))
+
+    print(f"{'Rank':<5} {'Trial':>5} {'Rounds':>7} {'Val RMSE':>9} {'Time (s)':>9}  Parameters")
+    print("-" * 80)
+    for rank, result in enumerate(board[:10], 1):
+        params = checkpoint.candidates[result['trial']]['params']
+        print(f"{rank:<5} {result['trial']:>5} {result['rounds']:>7} {result['val_rmse']:>9.4f} "
+              f"{result['seconds']:>9.1f}  {params}")
+
+    save_leaderboard(board, checkpoint, best_test, settings, os.path.join(output_dir, LEADERBOARD))
+    plot_pareto(checkpoint.results, os.path.join(output_dir, PARETO_PLOT))
+
+    full_fits = sum(n for n, _ in plan) * args.max_rounds
+    rounds_run = sum(r['trained_rounds'] for r in checkpoint.results)
+    print(f"\nBest: trial {best['trial']} - validation RMSE {best['val_rmse']:.4f}, "
+          f"test RMSE {best_test['rmse']:.4f}")
+    print(f"Search time: {elapsed:.0f}s this run")
+    print(f"Boosting rounds trained: {rounds_run:,} (every candidate to {args.max_rounds}: {full_fits:,})")
+    print(f"\n📁 Output Files:")
+    print(f"  1. {OUTPUT_DIR}/{CHECKPOINT}")
+    print(f"  2. {OUTPUT_DIR}/{LEADERBOARD}")
+    print(f"  3. {OUTPUT_DIR}/{PARETO_PLOT}")
+    print("=" * 80)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+Versioned model registry: every trained booster with what it was trained on
+
+01_train_model.py used to overwrite 01.3_xgboost_model_final.json, and
+02_generate_prediction_data.py loaded whatever was there. Each training run
+now registers its model as a new version under registry/<version>/:
+
+    model.ubj     the booster (XGBoost's binary format)
+    meta.json     training-data content hash, features (in order) and their
+                  types, params, split settings, metrics, training time and
+                  the request key
+    rows_*.npy    content hashes of the training and test rows, so an
+                  incremental run can tell new and changed rows from the
+                  ones the model has seen (01_train_model.py)
+
+The request key is a hash of the data hash, params and settings: a run with
+the same key as a registered version gets that model back instead of
+training again. registry/current.json names the version predictions use by
+default; 01.3_xgboost_model_final.json is still written as the current
+model's export for tools that read the file.
+
+Prediction loads by version (current by default, PREDICT_MODEL_VERSION to
+pin one) and stops before predicting when the features it builds differ
+from the model's, in name or order.
+
+MODEL_REGISTRY_DIR points a run at another registry: variant sweeps and
+benchmarks train into their own, so their models never become current
+for prediction or the nightly incremental update. Version numbers are
+claimed with os.mkdir, so parallel training runs never share one.
+
+Usage:
+    python model_registry.py list
+    python model_registry.py show [version]
+    python model_registry.py use <version>      # make a version current (and export it)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import xgboost as xgb
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+REGISTRY_DIR = (os.environ.get('MODEL_REGISTRY_DIR')
+                or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'registry'))
+CURRENT_FILE = 'current.json'
+MODEL_FILE = 'model.ubj'
+META_FILE = 'meta.json'
+KEEP_VERSIONS = 20     # Oldest versions beyond this are deleted (never the current one)
+# The current model's copy for tools that read the file (01_train_model.py's MODEL_OUTPUT)
+EXPORT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '01.3_xgboost_model_final.json')
+# ============================================================
+
+
+class FeatureMismatch(ValueError):
+    """The features built for prediction aren't the ones the model was trained on"""
+
+
+def version_dir(version):
+    return os.path.join(REGISTRY_DIR, version)
+
+
+def request_key(data_hash, params, settings):
+    """Hash of everything that decides the trained model: data content, params, settings"""
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(json.dumps({'data': data_hash, 'params': params, 'settings': settings},
+                             sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def versions():
+    """Registered versions, oldest first"""
+    if not os.path.isdir(REGISTRY_DIR):
+        return []
+    return sorted(name for name in os.listdir(REGISTRY_DIR)
+                  if name[:1] == 'v' and name[1:].isdigit()
+                  and os.path.exists(os.path.join(REGISTRY_DIR, name, META_FILE)))
+
+
+def meta(version):
+    with open(os.path.join(version_dir(version), META_FILE)) as f:
+        return json.load(f)
+
+
+def current():
+    """The current version, or None when nothing is registered"""
+    path = os.path.join(REGISTRY_DIR, CURRENT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        version = json.load(f)['version']
+    return version if version in versions() else None
+
+
+def set_current(version):
+    if version not in versions():
+        raise KeyError(f"model version {version} is not registered")
+    partial = os.path.join(REGISTRY_DIR, CURRENT_FILE + f'.partial{os.getpid()}')
+    with open(partial, 'w') as f:
+        json.dump({'version': version, 'since': time.strftime('%Y-%m-%d %H:%M:%S')}, f)
+    os.replace(partial, os.path.join(REGISTRY_DIR, CURRENT_FILE))
+
+
+def find(key):
+    """Newest version registered for this request key, or None"""
+    for version in reversed(versions()):
+        if meta(version).get('request_key') == key:
+            return version
+    return None
+
+
+def claim_version():
+    """
+    The next free version, claimed by creating its (empty) folder
+    os.mkdir fails when another run got there first, so two runs registering
+    at once never pick the same number. versions() skips the folder until
+    its meta.json arrives.
+    """
+    os.makedirs(REGISTRY_DIR, exist_ok=True)
+    taken = [int(name[1:5]) for name in os.listdir(REGISTRY_DIR)
+             if name.startswith('v') and name[1:5].isdigit()]
+    number = max(taken, default=0) + 1
+    while True:
+        version = f'v{number:04d}'
+        try:
+            os.mkdir(version_dir(version))
+            return version
+        except FileExistsError:
+            number += 1
+
+
+def register(booster, key, data_hash, features, params, settings, metrics, train_seconds, extra=None,
+             arrays=None):
+    """
+    Store a trained booster as a new version and make it current
+    Written into the claimed folder; meta.json comes last (written to a
+    temporary file and renamed), so the version only appears when complete.
+    arrays ({name: ndarray}) are stored next to the model as <name>.npy.
+    Returns the version (v0001, v0002, ...)
+    """
+    version = claim_version()
+    folder = version_dir(version)
+    booster.save_model(os.path.join(folder, MODEL_FILE))
+    for name, values in (arrays or {}).items():
+        np.save(os.path.join(folder, f'{name}.npy'), values)
+    info = {
+        'version': version,
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'request_key': key,
+        'data_hash': data_hash,
+        'features': list(features),
+        'feature_types': booster.feature_types,
+        'trees': booster.num_boosted_rounds(),
+        'params': params,
+        'settings': settings,
+        'metrics': metrics,
+        'train_seconds': train_seconds,
+        **(extra or {}),
+    }
+    partial = os.path.join(folder, META_FILE + '.partial')
+    with open(partial, 'w') as f:
+        json.dump(info, f, indent=2, default=str)
+    os.replace(partial, os.path.join(folder, META_FILE))
+    set_current(version)
+    prune()
+    return version
+
+
+def load(version=None):
+    """(Booster, meta) of a version (None = current); KeyError when there is none"""
+    version = version or current()
+    if version is None or version not in versions():
+        raise KeyError(f"model version {version} is not registered" if version
+                       else "no model registered yet (run 01_train_model.py)")
+    booster = xgb.Booster()
+    booster.load_model(os.path.join(version_dir(version), MODEL_FILE))
+    return booster, meta(version)
+
+
+def array(version, name):
+    """An array stored with a version (see register), or None"""
+    path = os.path.join(version_dir(version), f'{name}.npy')
+    return np.load(path) if os.path.exists(path) else None
+
+
+def check_features(info, features):
+    """Raise FeatureMismatch unless `features` are the version's features in the same order"""
+    expected = info['features']
+    features = list(features)
+    if features == expected:
+        return
+    if sorted(features) == sorted(expected):
+        raise FeatureMismatch(f"model {info['version']} expects features in the order {expected}, got {features}")
+    missing = [f for f in expected if f not in features]
+    extra = [f for f in features if f not in expected]
+    raise FeatureMismatch(f"model {info['version']} was trained on {expected}: "
+                          f"missing {missing or 'none'}, unexpected {extra or 'none'}")
+
+
+def prune(keep=KEEP_VERSIONS):
+    """Delete the oldest versions beyond `keep`, never the current one"""
+    keep_version = current()
+    for version in versions()[:-keep]:
+        if version != keep_version:
+            shutil.rmtree(version_dir(version), ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Versioned model registry")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help="registered versions")
+    show = sub.add_parser('show', help="one version's metadata")
+    show.add_argument('version', nargs='?')
+    use = sub.add_parser('use', help="make a version current")
+    use.add_argument('version')
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        registered = versions()
+        if not registered:
+            print("No model registered yet")
+            return 0
+        active = current()
+        print(f"{'':2s}{'Version':9s}{'Created':21s}{'Data':10s}{'Trees':>7s}{'Test RMSE':>11s}{'Train (s)':>11s}")
+        for version in registered:
+            info = meta(version)
+            rmse = info.get('metrics', {}).get('test_rmse')
+            print(f"{'*' if version == active else '':2s}{version:9s}{info['created']:21s}"
+                  f"{info['data_hash'][:8]:10s}{info['trees']:>7d}"
+                  f"{f'{rmse:.4f}' if rmse is not None else '-':>11s}{info['train_seconds']:>11.1f}")
+        return 0
+    if args.command == 'show':
+        try:
+            print(json.dumps(meta(args.version or current()), indent=2))
+        except (TypeError, FileNotFoundError):
+            print(f"✗ Model version {args.version or '(current)'} not found")
+            return 1
+        return 0
+    try:
+        set_current(args.version)
+    except KeyError as e:
+        print(f"✗ {e.args[0]}")
+        return 1
+    load(args.version)[0].save_model(EXPORT_FILE)
+    print(f"✓ {args.version} is now the current model (exported to {os.path.basename(EXPORT_FILE)})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
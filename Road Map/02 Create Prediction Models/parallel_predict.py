@@ -0,0 +1,78 @@
+"""
+Parallel XGBoost prediction over shared-memory feature columns
+
+The feature matrix is placed in shared memory once (see shared_columns.py in
+'01 Foundation & Data'); each worker process maps it read-only, predicts its
+own row range and writes into a shared output array. Nothing but the model
+bytes and the segment names is pickled.
+
+Large frames are predicted in batches sized from the memory budget (see
+memory_budget.py), so the shared copy of the features never exceeds
+PREDICT_SHARE of it.
+"""
+
+import os
+import sys
+
+import numpy as np
+import xgboost as xgb
+
+PIPELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '01 Foundation & Data')
+if PIPELINE_DIR not in sys.path:
+    sys.path.append(PIPELINE_DIR)
+
+from shared_columns import SharedColumns, map_row_ranges  # noqa: E402
+from sharded_executor import resolve_workers  # noqa: E402
+from memory_budget import chunk_rows  # noqa: E402
+from categories import category_codes  # noqa: E402
+
+PREDICT_SHARE = 0.25   # Share of the memory budget for one batch's feature copies
+
+
+def _predict_rows(inputs, outputs, start, stop, model_raw, feature_names, nthread):
+    """Shared-memory worker: predict rows [start, stop)"""
+    booster = xgb.Booster()
+    booster.load_model(bytearray(model_raw))
+    booster.set_param({'nthread': nthread})
+    X = np.column_stack([inputs[name][start:stop] for name in feature_names])
+    outputs['prediction'][start:stop] = booster.inplace_predict(X)
+
+
+def _predict_batch(model, X, workers):
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+
+    if workers == 1 or len(X) < workers * 10_000:
+        if hasattr(model, 'predict') and not isinstance(model, xgb.Booster):
+            return model.predict(X)
+        return booster.inplace_predict(X)
+
+    # Category columns travel as their codes (what the booster splits on)
+    X = category_codes(X)
+    feature_names = list(booster.feature_names or X.columns)
+    nthread = max(1, (os.cpu_count() or 1) // workers)
+    model_raw = bytes(booster.save_raw('json'))
+
+    with SharedColumns.from_frame(X, feature_names) as inputs, SharedColumns() as outputs:
+        outputs.allocate('prediction', 'float32', len(X))
+        map_row_ranges(_predict_rows, inputs, outputs, len(X), workers=workers,
+                       args=(model_raw, feature_names, nthread))
+        return outputs.column('prediction')
+
+
+def predict_in_parallel(model, X, workers=None, batch_rows=None):
+    """
+    Predict with an XGBRegressor (or Booster) on DataFrame X using worker processes
+    Falls back to a plain predict() when only one worker is requested
+    batch_rows = rows per batch (None = sized from the memory budget)
+    """
+    workers = resolve_workers(workers)
+    if batch_rows is None:
+        # Shared feature copy + the float32 matrix XGBoost builds from it
+        batch_rows = chunk_rows(X.shape[1] * (8 + 4), PREDICT_SHARE)
+
+    if len(X) <= batch_rows:
+        return _predict_batch(model, X, workers)
+    return np.concatenate([
+        _predict_batch(model, X.iloc[start:start + batch_rows], workers)
+        for start in range(0, len(X), batch_rows)
+    ])
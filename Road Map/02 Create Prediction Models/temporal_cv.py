@@ -0,0 +1,154 @@
+"""
+Temporal cross-validation over calendar months, folds trained in parallel
+
+A random split puts neighbouring 3-hour blocks of the same day on both sides,
+so its test score is optimistic. These folds split by (Year, month) instead:
+
+    rolling   train on every month before a test window, test on the window;
+              the last FOLDS windows of TEST_MONTHS months each
+    monthly   cut the months into FOLDS contiguous blocks; each block is the
+              test set once, the other blocks the training set
+
+The feature columns are placed in shared memory once (see shared_columns.py
+in '01 Foundation & Data') and each fold trains in its own process with
+cores / workers XGBoost threads, so K folds take about the time of
+K / workers fits instead of K.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import xgboost as xgb
+
+PIPELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '01 Foundation & Data')
+if PIPELINE_DIR not in sys.path:
+    sys.path.append(PIPELINE_DIR)
+
+from shared_columns import SharedColumns, attach, detach  # noqa: E402
+from sharded_executor import resolve_workers  # noqa: E402
+import categories  # noqa: E402
+
+MODES = ('rolling', 'monthly')
+PERIOD_COLUMN = '_period'
+TARGET_COLUMN = '_target'
+
+
+def month_periods(X):
+    """Months since year 0 for every row (needs the Year and month features)"""
+    missing = [column for column in ('Year', 'month') if column not in X.columns]
+    if missing:
+        raise ValueError(f"temporal folds need the {' and '.join(missing)} column(s)")
+    return X['Year'].to_numpy().astype(np.int64) * 12 + X['month'].to_numpy().astype(np.int64) - 1
+
+
+def period_label(period):
+    return f"{period // 12}-{period % 12 + 1:02d}"
+
+
+def span_label(periods):
+    if len(periods) == 0:
+        return '-'
+    first, last = min(periods), max(periods)
+    return period_label(first) if first == last else f"{period_label(first)}..{period_label(last)}"
+
+
+def make_folds(periods, mode, folds, test_months):
+    """[(train periods, test periods)] for the distinct months in `periods`"""
+    months = np.unique(periods)
+    if mode == 'rolling':
+        if len(months) < folds * test_months + 1:
+            raise ValueError(f"{len(months)} month(s) of data is too little for {folds} rolling "
+                             f"folds of {test_months} month(s)")
+        first_test = len(months) - folds * test_months
+        return [
+            (months[:first_test + i * test_months],
+             months[first_test + i * test_months:first_test + (i + 1) * test_months])
+            for i in range(folds)
+        ]
+    if mode == 'monthly':
+        if len(months) < folds:
+            raise ValueError(f"{len(months)} month(s) of data is too little for {folds} folds")
+        blocks = np.array_split(months, folds)
+        return [(np.setdiff1d(months, block), block) for block in blocks]
+    raise ValueError(f"unknown CV mode '{mode}' (expected {' or '.join(MODES)})")
+
+
+def regression_metrics(y_true, y_pred):
+    errors = y_true - y_pred
+    mse = float(np.mean(errors ** 2))
+    total = float(np.sum((y_true - y_true.mean()) ** 2))
+    return {
+        'mse': mse,
+        'rmse': mse ** 0.5,
+        'mae': float(np.mean(np.abs(errors))),
+        'r2': 1.0 - float(np.sum(errors ** 2)) / total if total else 0.0,
+    }
+
+
+def _fit_fold(arrays, feature_names, train_periods, test_periods, params, nthread, nonzero_weight):
+    """Train and score one fold on shared columns; returns its metrics and timings"""
+    start = time.perf_counter()
+    period = arrays[PERIOD_COLUMN]
+    train = np.isin(period, train_periods)
+    test = np.isin(period, test_periods)
+    X_train = np.column_stack([arrays[name][train] for name in feature_names])
+    X_test = np.column_stack([arrays[name][test] for name in feature_names])
+    y_train = arrays[TARGET_COLUMN][train]
+    y_test = arrays[TARGET_COLUMN][test]
+
+    fit_start = time.perf_counter()
+    model = xgb.XGBRegressor(**dict(params, n_jobs=nthread))
+    model.fit(X_train, y_train, sample_weight=np.where(y_train == 0, 1.0, nonzero_weight), verbose=False)
+    fit_seconds = time.perf_counter() - fit_start
+
+    return {
+        'train_months': span_label(train_periods),
+        'test_months': span_label(test_periods),
+        'train_rows': int(train.sum()),
+        'test_rows': int(test.sum()),
+        **regression_metrics(y_test, model.predict(X_test)),
+        'fit_seconds': fit_seconds,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def _fold_task(spec, *args):
+    """Pool entry point: attach the shared columns, run one fold"""
+    arrays, segments = attach(spec, readonly=True)
+    try:
+        return _fit_fold(arrays, *args)
+    finally:
+        arrays.clear()
+        detach(segments)
+
+
+def cross_validate(X, y, params, mode='rolling', folds=4, test_months=3, workers=None,
+                   nonzero_weight=2.5):
+    """
+    Temporal K-fold scores of an XGBRegressor with `params`
+    Returns (fold results in fold order, wall seconds, workers, threads per fold)
+    """
+    splits = make_folds(month_periods(X), mode, folds, test_months)
+    # Category columns are shared as their codes, typed as categorical for XGBoost
+    types = categories.feature_types(X)
+    if 'c' in types:
+        params = dict(params, feature_types=types, enable_categorical=True)
+    workers = min(resolve_workers(workers), len(splits))
+    nthread = max(1, (os.cpu_count() or 1) // workers)
+    feature_names = list(X.columns)
+
+    start = time.perf_counter()
+    with SharedColumns.from_frame(categories.category_codes(X), feature_names) as shared:
+        shared.add_array(PERIOD_COLUMN, month_periods(X))
+        shared.add_array(TARGET_COLUMN, y.to_numpy(dtype=np.float32))
+        args = [(feature_names, train, test, params, nthread, nonzero_weight) for train, test in splits]
+        if workers == 1:
+            results = [_fit_fold(shared.arrays(), *fold_args) for fold_args in args]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_fold_task, shared.spec, *fold_args) for fold_args in args]
+                results = [future.result() for future in futures]
+    return results, time.perf_counter() - start, workers, nthread
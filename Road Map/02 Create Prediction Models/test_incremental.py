@@ -0,0 +1,143 @@
+"""
+Tests for incremental training's row matching (01_train_model.py)
+
+match_rows() and incremental_split() decide which rows an incremental run
+fits and which stay test rows; a mistake there silently leaks test rows into
+training. Covered: duplicate rows, rows gone from the data, changed rows,
+and zero-block downsampling of the incremental training matrix.
+
+Usage:
+    python -m unittest test_incremental.py
+"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.join(SCRIPT_DIR, '..', '01 Foundation & Data')
+if PIPELINE_DIR not in sys.path:
+    sys.path.append(PIPELINE_DIR)
+
+from pipeline_utils import load_stage  # noqa: E402
+
+train = load_stage(os.path.join(SCRIPT_DIR, '01_train_model.py'))
+
+
+def hashes(*values):
+    return np.array(values, dtype=np.uint64)
+
+
+class MatchRowsTest(unittest.TestCase):
+
+    def test_unchanged_rows_keep_their_side(self):
+        matches, removed = train.match_rows(hashes(3, 1, 2), hashes(1, 3), hashes(2))
+        self.assertEqual(matches.tolist(), [0, 0, 1])
+        self.assertEqual(removed, 0)
+
+    def test_duplicates_are_matched_copy_by_copy(self):
+        # Two copies were trained on; a third copy in the new data is a new row
+        matches, removed = train.match_rows(hashes(5, 5, 5), hashes(5, 5), hashes())
+        self.assertEqual(matches.tolist(), [0, 0, -1])
+        self.assertEqual(removed, 0)
+
+    def test_duplicate_split_across_train_and_test(self):
+        matches, removed = train.match_rows(hashes(7, 7), hashes(7), hashes(7))
+        self.assertEqual(sorted(matches.tolist()), [0, 1])
+        self.assertEqual(removed, 0)
+
+    def test_removed_rows_are_counted(self):
+        matches, removed = train.match_rows(hashes(1), hashes(1, 2), hashes(3))
+        self.assertEqual(matches.tolist(), [0])
+        self.assertEqual(removed, 2)
+
+    def test_changed_row_is_new_and_its_old_version_removed(self):
+        # Row 2 changed into 9: unmatched now, and its old hash is left over
+        matches, removed = train.match_rows(hashes(1, 9), hashes(1, 2), hashes())
+        self.assertEqual(matches.tolist(), [0, -1])
+        self.assertEqual(removed, 1)
+
+
+class IncrementalSplitTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 40
+        self.X_train = pd.DataFrame({'a': np.arange(n, dtype=float), 'b': rng.random(n)})
+        self.y_train = pd.Series(rng.integers(0, 3, n), name=train.TARGET)
+        self.X_test = pd.DataFrame({'a': np.arange(100, 110, dtype=float), 'b': rng.random(10)})
+        self.y_test = pd.Series(rng.integers(0, 3, 10), name=train.TARGET)
+
+        # The registered base model's row fingerprints
+        self.registry = tempfile.TemporaryDirectory()
+        self.addCleanup(self.registry.cleanup)
+        self.original_dir = train.model_registry.REGISTRY_DIR
+        train.model_registry.REGISTRY_DIR = self.registry.name
+        self.addCleanup(setattr, train.model_registry, 'REGISTRY_DIR', self.original_dir)
+        self.base = train.model_registry.claim_version()
+        for name, X, y in (('rows_train', self.X_train, self.y_train), ('rows_test', self.X_test, self.y_test)):
+            np.save(os.path.join(train.model_registry.version_dir(self.base), f'{name}.npy'),
+                    np.sort(train.row_hashes(X, y)))
+
+    def split(self, X_train, X_test, y_train, y_test):
+        with redirect_stdout(io.StringIO()):
+            return train.incremental_split(self.base, X_train, X_test, y_train, y_test)
+
+    def test_new_changed_and_removed_rows(self):
+        X_train, y_train = self.X_train.copy(), self.y_train.copy()
+        X_train.loc[0, 'b'] = 99.0                               # changed
+        X_test, y_test = self.X_test.iloc[:-2], self.y_test.iloc[:-2]   # two removed
+        new = pd.DataFrame({'a': np.arange(200, 210, dtype=float), 'b': np.zeros(10)})
+        X_train = pd.concat([X_train, new], ignore_index=True)
+        y_train = pd.concat([y_train, pd.Series(np.ones(10, dtype=int), name=train.TARGET)], ignore_index=True)
+
+        X_tr, X_te, y_tr, y_te, fit_weights, stats = self.split(X_train, X_test, y_train, y_test)
+
+        self.assertEqual(stats['new_rows'], 11)
+        self.assertEqual(stats['removed_rows'], 3)               # the changed row's old version and two test rows
+        self.assertEqual(len(X_tr) + len(X_te), len(X_train) + len(X_test))
+        # Known rows never switch sides
+        self.assertTrue(set(self.X_train['a'][1:]) <= set(X_tr['a']))
+        self.assertTrue(set(X_test['a']) <= set(X_te['a']))
+        # Only the new training rows and the replayed known rows are fitted
+        new_train = ~X_tr['a'].isin(self.X_train['a'][1:]).to_numpy()
+        self.assertEqual(int(new_train.sum()), stats['fit_rows'])
+        self.assertTrue((fit_weights[new_train] == 1).all())
+        self.assertEqual(int((fit_weights[~new_train] > 0).sum()), stats['replay_rows'])
+
+    def test_unchanged_data_has_nothing_to_fit(self):
+        *_, fit_weights, stats = self.split(self.X_train, self.X_test, self.y_train, self.y_test)
+        self.assertEqual((stats['new_rows'], stats['removed_rows'], stats['fit_rows']), (0, 0, 0))
+        self.assertFalse((fit_weights > 0).any())
+
+
+class IncrementalMatrixTest(unittest.TestCase):
+
+    def test_zero_blocks_are_downsampled(self):
+        n = 2000
+        X = pd.DataFrame({'a': np.arange(n, dtype=float)})
+        y = pd.Series(np.where(np.arange(n) % 4 == 0, 2, 0))
+        fit_weights = np.ones(n)
+        original = train.ZERO_SAMPLE_RATE
+        self.addCleanup(setattr, train, 'ZERO_SAMPLE_RATE', original)
+
+        train.ZERO_SAMPLE_RATE = 1.0
+        self.assertEqual(train.incremental_matrix(X, y, fit_weights).num_row(), n)
+
+        train.ZERO_SAMPLE_RATE = 0.25
+        with redirect_stdout(io.StringIO()):
+            dtrain = train.incremental_matrix(X, y, fit_weights)
+        labels, weights = dtrain.get_label(), dtrain.get_weight()
+        self.assertEqual(int((labels > 0).sum()), n // 4)        # non-zero blocks all kept
+        self.assertLess(int((labels == 0).sum()), n * 3 // 4 * 0.4)
+        np.testing.assert_allclose(weights[labels == 0], 1 / 0.25)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,334 @@
+"""
+TRAINING BENCHMARK MATRIX
+Measures how training scales with data size, threads and tree settings, so
+hardware and defaults can be sized from numbers instead of rules of thumb
+
+Axes (AXES below): training rows, n_jobs, max_depth, n_estimators and
+tree_method. The default 'one-at-a-time' matrix varies one axis at a time
+around BASELINE (01_train_model.py's QUICK_PARAMS on the whole training
+split); --full runs every combination.
+
+Each configuration trains in its own process on the training split of
+01_train_model.py (the cached split when there is one), so its peak memory
+is measured on its own. Recorded per configuration:
+  - fit time and training throughput (rows x trees per second)
+  - predict throughput on the test split (best of PREDICT_REPEATS passes)
+  - peak memory of the process (RSS, including the data)
+  - test RMSE
+
+Results are kept per configuration and data version (training_benchmark/runs/),
+so a re-run only trains what's new; --restart measures everything again.
+'exact' has no categorical support: its configurations train on category
+codes as plain numbers.
+
+Outputs (training_benchmark/):
+  - results.csv   one row per configuration (read by 25_training_complexity_estimator.py)
+  - results.md    the table, plus the measured throughput
+  - results.png   fit time, predict throughput, peak memory and RMSE along each axis
+
+Usage:
+    python training_benchmark.py
+    python training_benchmark.py --axes rows n_jobs      # only these axes
+    python training_benchmark.py --full                  # every combination
+"""
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+AXES = {
+    'rows': [50_000, 200_000, None],          # None = the whole training split
+    'n_jobs': [1, 2, None],                   # None = all CPU cores
+    'max_depth': [4, 7, 10],
+    'n_estimators': [100, 200, 400],
+    'tree_method': ['hist', 'approx', 'exact'],
+}
+# Values of the axes outside their own sweep (max_depth / n_estimators come
+# from QUICK_PARAMS). None = all rows / all cores.
+BASELINE = {'rows': None, 'n_jobs': None, 'tree_method': 'hist'}
+PREDICT_REPEATS = 3
+SEED = 42
+
+TRAIN_SCRIPT = '01_train_model.py'
+OUTPUT_DIR = 'training_benchmark'
+RESULTS_CSV = 'results.csv'
+RESULTS_MD = 'results.md'
+RESULTS_PLOT = 'results.png'
+# ============================================================
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.join(SCRIPT_DIR, '..', '01 Foundation & Data')
+if PIPELINE_DIR not in sys.path:
+    sys.path.append(PIPELINE_DIR)
+
+from pipeline_utils import load_stage  # noqa: E402
+from run_history import run_child  # noqa: E402
+from temporal_cv import regression_metrics  # noqa: E402
+import training_cache  # noqa: E402
+from categories import category_codes  # noqa: E402
+
+METRIC_COLUMNS = ['fit_seconds', 'train_rate', 'predict_rate', 'peak_mb', 'rmse']
+METRIC_LABELS = {
+    'fit_seconds': 'Fit time (s)',
+    'train_rate': 'Rows x trees / s',
+    'predict_rate': 'Predict rows / s',
+    'peak_mb': 'Peak memory (MB)',
+    'rmse': 'Test RMSE',
+}
+
+
+def load_train():
+    return load_stage(os.path.join(SCRIPT_DIR, TRAIN_SCRIPT))
+
+
+def resolve(name, value, train_rows):
+    """None = all rows / all cores, as a number"""
+    if value is not None:
+        return value
+    return train_rows if name == 'rows' else os.cpu_count() or 1
+
+
+def baseline(train, train_rows):
+    base = dict(BASELINE, max_depth=train.QUICK_PARAMS['max_depth'],
+                n_estimators=train.QUICK_PARAMS['n_estimators'])
+    return {name: resolve(name, value, train_rows) for name, value in base.items()}
+
+
+def configurations(base, axes, full, train_rows):
+    """Configurations to measure: one axis at a time around the baseline, or every combination"""
+    values = {name: list(dict.fromkeys(resolve(name, v, train_rows) for v in AXES[name])) for name in AXES}
+    if full:
+        names = list(AXES)
+        combos = itertools.product(*[values[name] if name in axes else [base[name]] for name in names])
+        return [dict(zip(names, combo)) for combo in combos]
+    configs = [base]
+    for name in axes:
+        for value in values[name]:
+            config = dict(base, **{name: value})
+            if config not in configs:
+                configs.append(config)
+    return configs
+
+
+def config_key(config, data_key):
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(json.dumps([config, data_key], sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+# ============================================================
+# ONE CONFIGURATION (child process)
+# ============================================================
+
+def measure(config, result_path):
+    """Train one configuration and write its measurements to result_path (JSON)"""
+    import xgboost as xgb
+
+    train = load_train()
+    X_train, X_test, y_train, y_test, _, _ = train.prepare_data(
+        os.path.join(SCRIPT_DIR, train.INPUT_OVERRIDE or train.INPUT_FILE)
+    )
+    rows = min(config['rows'], len(X_train))
+    pick = np.sort(np.random.default_rng(SEED).permutation(len(X_train))[:rows])
+    X, y = X_train.iloc[pick], y_train.iloc[pick]
+    if config['tree_method'] == 'exact':
+        X, X_test = category_codes(X), category_codes(X_test)
+
+    params = dict(train.QUICK_PARAMS, max_depth=config['max_depth'], n_estimators=config['n_estimators'],
+                  tree_method=config['tree_method'], n_jobs=config['n_jobs'])
+    start = time.perf_counter()
+    model = xgb.XGBRegressor(**params, enable_categorical=config['tree_method'] != 'exact')
+    model.fit(X, y, sample_weight=train.sample_weights(y), verbose=False)
+    fit_seconds = time.perf_counter() - start
+
+    predict_seconds = float('inf')
+    for _ in range(PREDICT_REPEATS):
+        start = time.perf_counter()
+        predictions = model.predict(X_test)
+        predict_seconds = min(predict_seconds, time.perf_counter() - start)
+
+    result = {
+        **config,
+        'rows': rows,
+        'features': X.shape[1],
+        'fit_seconds': fit_seconds,
+        'train_rate': rows * config['n_estimators'] / fit_seconds,
+        'predict_rate': len(X_test) / predict_seconds,
+        'rmse': regression_metrics(y_test.to_numpy(dtype=np.float32), predictions)['rmse'],
+    }
+    with open(result_path, 'w') as f:
+        json.dump(result, f)
+
+
+# ============================================================
+# MATRIX
+# ============================================================
+
+def run_matrix(configs, runs_dir, data_key):
+    """Measure every configuration not measured yet; returns the results in order"""
+    results = []
+    for i, config in enumerate(configs, 1):
+        label = ', '.join(f"{name}={value}" for name, value in config.items())
+        result_path = os.path.join(runs_dir, f"{config_key(config, data_key)}.json")
+        if os.path.exists(result_path):
+            print(f"[{i}/{len(configs)}] {label}: measured before")
+        else:
+            print(f"[{i}/{len(configs)}] {label}")
+            log_path = result_path.replace('.json', '.log')
+            with open(log_path, 'w') as log:
+                returncode, _, peak_mb = run_child(
+                    [sys.executable, os.path.abspath(__file__), '--measure', json.dumps(config),
+                     '--result', result_path + '.partial'],
+                    cwd=SCRIPT_DIR, env=dict(os.environ, PIPELINE_HISTORY='0'), stdout=log,
+                )
+            if returncode != 0:
+                print(f"    ✗ Failed (exit code {returncode}) - see {os.path.relpath(log_path, SCRIPT_DIR)}")
+                continue
+            with open(result_path + '.partial') as f:
+                result = dict(json.load(f), peak_mb=peak_mb)
+            with open(result_path, 'w') as f:
+                json.dump(result, f)
+            os.remove(result_path + '.partial')
+        with open(result_path) as f:
+            result = json.load(f)
+        results.append(result)
+        peak = f"{result['peak_mb']:,.0f} MB" if result['peak_mb'] is not None else "n/a"
+        print(f"    ✓ Fit {result['fit_seconds']:.1f}s | predict {result['predict_rate']:,.0f} rows/s | "
+              f"peak {peak} | RMSE {result['rmse']:.4f}")
+    return results
+
+
+def save_report(df, base, output_file):
+    lines = [
+        "# Training Benchmark",
+        "",
+        f"**Date:** {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"**CPU cores:** {os.cpu_count()}",
+        f"**Baseline:** {', '.join(f'{k}={v}' for k, v in base.items())}",
+        "",
+        "| Rows | n_jobs | max_depth | Trees | tree_method | Fit (s) | Rows x trees / s | "
+        "Predict rows / s | Peak MB | Test RMSE |",
+        "|------|--------|-----------|-------|-------------|---------|------------------|"
+        "------------------|---------|-----------|",
+    ]
+    for row in df.itertuples():
+        peak = f"{row.peak_mb:,.0f}" if pd.notna(row.peak_mb) else '-'
+        lines.append(
+            f"| {row.rows:,} | {row.n_jobs} | {row.max_depth} | {row.n_estimators} | {row.tree_method} | "
+            f"{row.fit_seconds:.1f} | {row.train_rate:,.0f} | {row.predict_rate:,.0f} | {peak} | {row.rmse:.4f} |"
+        )
+    hist = df[df['tree_method'] == 'hist']
+    if len(hist):
+        best = hist.loc[hist['rows'].idxmax()]
+        lines += [
+            "",
+            "## Sizing",
+            "",
+            f"- hist, {best['n_jobs']} thread(s), depth {best['max_depth']}: "
+            f"**{best['train_rate']:,.0f} rows x trees per second** "
+            f"({best['train_rate'] * best['features']:,.0f} cells x trees per second over {best['features']} features)",
+            f"- Fit time ≈ rows × trees ÷ {best['train_rate']:,.0f} s for this depth and feature count. "
+            f"`25_training_complexity_estimator.py` uses this measurement.",
+        ]
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def plot(df, base, axes, output_file):
+    """One column per axis (other axes at the baseline), one row per measurement"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, grid = plt.subplots(len(METRIC_COLUMNS), len(axes), figsize=(4 * len(axes), 2.8 * len(METRIC_COLUMNS)),
+                             squeeze=False)
+    for col, axis in enumerate(axes):
+        mask = np.ones(len(df), dtype=bool)
+        for name in AXES:
+            if name != axis:
+                mask &= (df[name] == base[name]).to_numpy()
+        sweep = df[mask]
+        if sweep[axis].dtype != object:
+            sweep = sweep.sort_values(axis)
+        for row, metric in enumerate(METRIC_COLUMNS):
+            ax = grid[row][col]
+            ax.plot(sweep[axis].astype(str) if sweep[axis].dtype == object else sweep[axis],
+                    sweep[metric], 'o-', color='tab:blue')
+            ax.grid(alpha=0.3)
+            if row == 0:
+                ax.set_title(axis, fontsize=12, fontweight='bold')
+            if row == len(METRIC_COLUMNS) - 1:
+                ax.set_xlabel(axis)
+            if col == 0:
+                ax.set_ylabel(METRIC_LABELS[metric])
+    fig.suptitle('Training Benchmark (other axes at the baseline)', fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=120)
+    plt.close(fig)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Training benchmark matrix")
+    parser.add_argument('--axes', nargs='+', choices=list(AXES), default=list(AXES), help="axes to sweep")
+    parser.add_argument('--full', action='store_true', help="every combination instead of one axis at a time")
+    parser.add_argument('--restart', action='store_true', help="forget earlier measurements")
+    parser.add_argument('--measure', help=argparse.SUPPRESS)   # Child process: one configuration (JSON)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        measure(json.loads(args.measure), args.result)
+        return 0
+
+    print("\n" + "=" * 80)
+    print("     TRAINING BENCHMARK MATRIX")
+    print("=" * 80)
+
+    train = load_train()
+    input_file = os.path.join(SCRIPT_DIR, train.INPUT_OVERRIDE or train.INPUT_FILE)
+    output_dir = os.path.join(SCRIPT_DIR, OUTPUT_DIR)
+    runs_dir = os.path.join(output_dir, 'runs')
+    if args.restart:
+        shutil.rmtree(runs_dir, ignore_errors=True)
+    os.makedirs(runs_dir, exist_ok=True)
+
+    # Prepared once here, so the configurations load the cached split
+    X_train = train.prepare_data(input_file)[0]
+    data_key = training_cache.data_key(input_file, train.split_settings())
+    base = baseline(train, len(X_train))
+    configs = configurations(base, args.axes, args.full, len(X_train))
+    print(f"\n{len(configs)} configuration(s) ({'every combination' if args.full else 'one axis at a time'})\n")
+
+    start = time.perf_counter()
+    results = run_matrix(configs, runs_dir, data_key)
+    if not results:
+        print("\n✗ No configuration finished")
+        return 1
+
+    df = pd.DataFrame(results)
+    df.to_csv(os.path.join(output_dir, RESULTS_CSV), index=False)
+    save_report(df, base, os.path.join(output_dir, RESULTS_MD))
+    plot(df, base, args.axes, os.path.join(output_dir, RESULTS_PLOT))
+
+    print(f"\n✓ {len(results)} configuration(s) in {time.perf_counter() - start:.0f}s")
+    print(f"\n📁 Output Files:")
+    print(f"  1. {OUTPUT_DIR}/{RESULTS_CSV}")
+    print(f"  2. {OUTPUT_DIR}/{RESULTS_MD}")
+    print(f"  3. {OUTPUT_DIR}/{RESULTS_PLOT}")
+    print("=" * 80)
+    return 0 if len(results) == len(configs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
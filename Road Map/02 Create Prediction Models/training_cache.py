@@ -0,0 +1,161 @@
+"""
+Prepared training data, cached once per data version
+
+Most of a 01_train_model.py run used to go into preparing the data: reading
+24.1_training_ready.csv, dropping features, splitting, and building XGBoost's
+matrix. That result only changes when the file or the split settings do, so
+it is stored once per version under cache/<key>/:
+
+    <frame>_<i>.npy     train / test feature columns and targets (memory-mapped on load)
+    <name>.buffer       DMatrix with labels and sample weights, XGBoost's binary format
+    meta.json           column names, rows, the settings behind the key
+
+The key is a hash of the CSV's content plus the settings. The content hash
+is remembered per (path, size, mtime), so an unchanged file isn't read again
+to find its key. Later runs and hyperparameter_search.py trials load a version
+in milliseconds. external_memory.py keeps its columnar parts in a version of
+its own. Versions beyond KEEP_VERSIONS (least recently used) are deleted.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+KEEP_VERSIONS = 3
+FORMAT_VERSION = 1     # Bump when the stored layout changes
+HASHES_FILE = 'file_hashes.json'
+# ============================================================
+
+
+def version_dir(key):
+    return os.path.join(CACHE_DIR, key)
+
+
+def file_hash(path):
+    """Content hash of a file, re-read only when its size or mtime changed"""
+    stat = os.stat(path)
+    signature = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    memo_path = os.path.join(CACHE_DIR, HASHES_FILE)
+    memo = {}
+    if os.path.exists(memo_path):
+        with open(memo_path) as f:
+            memo = json.load(f)
+    if signature in memo:
+        return memo[signature]
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 24), b''):
+            digest.update(block)
+    memo = {k: v for k, v in memo.items() if not k.startswith(os.path.abspath(path) + '|')}
+    memo[signature] = digest.hexdigest()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(memo_path, 'w') as f:
+        json.dump(memo, f)
+    return memo[signature]
+
+
+def data_key(input_file, settings):
+    """Version key of the prepared data: the input's content plus everything that shapes the split"""
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(file_hash(input_file).encode())
+    digest.update(json.dumps({'format': FORMAT_VERSION, **settings}, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def touch(key):
+    """Mark a version as just used (creating its folder)"""
+    folder = version_dir(key)
+    os.makedirs(folder, exist_ok=True)
+    os.utime(folder)
+    return folder
+
+
+def load(key):
+    """{name: DataFrame / Series} of a cached version, or None when it isn't cached"""
+    folder = version_dir(key)
+    meta_path = os.path.join(folder, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    touch(key)
+
+    frames = {}
+    for name, info in meta['frames'].items():
+        arrays = {column: np.load(os.path.join(folder, f'{name}_{i}.npy'), mmap_mode='r')
+                  for i, column in enumerate(info['columns'])}
+        if info['series']:
+            frames[name] = pd.Series(np.asarray(arrays[info['columns'][0]]), name=info['columns'][0])
+        else:
+            frames[name] = pd.DataFrame({column: np.asarray(values) for column, values in arrays.items()})
+    return frames
+
+
+def matrix_path(key, name):
+    return os.path.join(version_dir(key), f'{name}.buffer')
+
+
+def dmatrix(key, name):
+    """A cached DMatrix, or None"""
+    path = matrix_path(key, name)
+    return xgb.DMatrix(path) if os.path.exists(path) else None
+
+
+def save_matrix(path, matrix):
+    """Write a DMatrix buffer whole, then rename it into place"""
+    partial = path + '.partial'
+    matrix.save_binary(partial, silent=True)
+    os.replace(partial, path)
+    return path
+
+
+def save(key, frames, matrices, settings):
+    """
+    Store a version: frames = {name: DataFrame / Series}, matrices = {name: DMatrix}
+    Written to a temporary folder and renamed, so a killed run never leaves a
+    half-written version behind.
+    """
+    folder = version_dir(key)
+    partial = folder + f'.partial{os.getpid()}'
+    shutil.rmtree(partial, ignore_errors=True)
+    os.makedirs(partial)
+
+    meta = {'key': key, 'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'settings': settings, 'frames': {}}
+    for name, frame in frames.items():
+        series = isinstance(frame, pd.Series)
+        columns = [frame.name] if series else list(frame.columns)
+        values = [frame.to_numpy()] if series else [frame[column].to_numpy() for column in columns]
+        for i, array in enumerate(values):
+            np.save(os.path.join(partial, f'{name}_{i}.npy'), np.ascontiguousarray(array))
+        meta['frames'][name] = {'columns': columns, 'series': series, 'rows': len(frame)}
+    for name, matrix in matrices.items():
+        matrix.save_binary(os.path.join(partial, f'{name}.buffer'), silent=True)
+    with open(os.path.join(partial, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2, default=str)
+
+    shutil.rmtree(folder, ignore_errors=True)
+    os.replace(partial, folder)
+    touch(key)
+    prune()
+
+
+def prune(keep=KEEP_VERSIONS):
+    """Delete all but the `keep` most recently used versions"""
+    versions = []
+    for name in os.listdir(CACHE_DIR):
+        folder = os.path.join(CACHE_DIR, name)
+        if os.path.isdir(folder) and '.partial' not in name:
+            versions.append((os.path.getmtime(folder), name))
+    for _, name in sorted(versions, reverse=True)[keep:]:
+        shutil.rmtree(os.path.join(CACHE_DIR, name), ignore_errors=True)
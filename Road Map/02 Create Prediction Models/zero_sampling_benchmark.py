@@ -0,0 +1,149 @@
+"""
+ZERO-BLOCK DOWNSAMPLING BENCHMARK
+Accuracy against training time for different zero-block sample rates
+
+Trains QUICK_PARAMS on the training split of 01_train_model.py (the cached
+split when there is one) once per rate in RATES, with zero blocks kept at
+that rate and reweighted 1 / rate (training_weights in 01_train_model.py),
+and scores every model on the full, untouched test split. The mean
+prediction is reported too: with the weight correction it should stay near
+the baseline's as the rate drops (the baseline sits above the mean target on
+purpose: non-zero blocks are weighted NONZERO_WEIGHT).
+
+Outputs:
+  - zero_sampling_benchmark.md    table of rows, fit time, speedup, RMSE / MAE, mean prediction
+  - zero_sampling_benchmark.png   test RMSE vs fit time, one point per rate
+
+Usage:
+    python zero_sampling_benchmark.py
+    python zero_sampling_benchmark.py --rates 1 0.5 0.2
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import xgboost as xgb
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.join(SCRIPT_DIR, '..', '01 Foundation & Data')
+if PIPELINE_DIR not in sys.path:
+    sys.path.append(PIPELINE_DIR)
+
+from pipeline_utils import load_stage  # noqa: E402
+from temporal_cv import regression_metrics  # noqa: E402
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+TRAIN_SCRIPT = '01_train_model.py'
+RATES = [1.0, 0.5, 0.25, 0.1, 0.05]   # 1.0 = every zero block (the baseline)
+OUTPUT_FILE = 'zero_sampling_benchmark.md'
+PLOT_FILE = 'zero_sampling_benchmark.png'
+# ============================================================
+
+
+def run_rate(train, rate, X_train, y_train, X_test, y_test):
+    weights = train.training_weights(y_train, rate=rate)
+    keep = weights > 0
+
+    start = time.perf_counter()
+    model = xgb.XGBRegressor(**train.QUICK_PARAMS, enable_categorical=True)
+    model.fit(X_train[keep], y_train[keep], sample_weight=weights[keep], verbose=False)
+    fit_seconds = time.perf_counter() - start
+
+    predictions = model.predict(X_test)
+    y_true = y_test.to_numpy(dtype=np.float32)
+    nonzero = y_true > 0
+    return {
+        'rate': rate,
+        'rows': int(keep.sum()),
+        'fit_seconds': fit_seconds,
+        **regression_metrics(y_true, predictions),
+        'nonzero_mae': float(np.mean(np.abs(y_true[nonzero] - predictions[nonzero]))) if nonzero.any() else None,
+        'mean_prediction': float(predictions.mean()),
+        'mean_target': float(y_true.mean()),
+    }
+
+
+def save_report(rows, output_file):
+    baseline = rows[0]
+    lines = [
+        "# Zero-Block Downsampling Benchmark",
+        "",
+        f"**Date:** {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"**Test rows:** all of the test split (mean target {baseline['mean_target']:.4f})",
+        "",
+        "| Zero rate | Training rows | Fit (s) | Speedup | Test RMSE | Δ RMSE | Test MAE | Non-zero MAE | Mean prediction |",
+        "|-----------|---------------|---------|---------|-----------|--------|----------|--------------|-----------------|",
+    ]
+    for row in rows:
+        nonzero_mae = f"{row['nonzero_mae']:.4f}" if row['nonzero_mae'] is not None else '-'
+        lines.append(
+            f"| {row['rate']:g} | {row['rows']:,} | {row['fit_seconds']:.1f} | "
+            f"{baseline['fit_seconds'] / row['fit_seconds']:.1f}x | {row['rmse']:.4f} | "
+            f"{row['rmse'] - baseline['rmse']:+.4f} | {row['mae']:.4f} | {nonzero_mae} | "
+            f"{row['mean_prediction']:.4f} |"
+        )
+    lines.append("")
+    lines.append(f"Rate {baseline['rate']:g} is the baseline. Kept zero blocks are weighted 1 / rate, "
+                 f"so the mean prediction should stay near the baseline's {baseline['mean_prediction']:.4f}.")
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def plot(rows, output_file):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.plot([r['fit_seconds'] for r in rows], [r['rmse'] for r in rows], 'o-', color='tab:blue')
+    for row in rows:
+        ax.annotate(f"rate {row['rate']:g}", (row['fit_seconds'], row['rmse']),
+                    textcoords='offset points', xytext=(6, 6), fontsize=9)
+    ax.set_xlabel('Fit time (s)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Test RMSE', fontsize=12, fontweight='bold')
+    ax.set_title('Zero-Block Downsampling: Accuracy vs Training Time', fontsize=14, fontweight='bold')
+    ax.grid(alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=150)
+    plt.close(fig)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Zero-block downsampling: accuracy vs training time")
+    parser.add_argument('--rates', type=float, nargs='+', default=RATES,
+                        help="zero-block sample rates; the first is the baseline")
+    args = parser.parse_args(argv)
+
+    print("\n" + "=" * 80)
+    print("     ZERO-BLOCK DOWNSAMPLING BENCHMARK")
+    print("=" * 80)
+
+    train = load_stage(os.path.join(SCRIPT_DIR, TRAIN_SCRIPT))
+    X_train, X_test, y_train, y_test, _, _ = train.prepare_data(
+        os.path.join(SCRIPT_DIR, train.INPUT_OVERRIDE or train.INPUT_FILE)
+    )
+    print(f"\nZero-severity training blocks: {(y_train == 0).mean():.1%} of {len(y_train):,}")
+
+    rows = []
+    for i, rate in enumerate(args.rates, 1):
+        print(f"\n[{i}/{len(args.rates)}] Zero rate {rate:g}")
+        row = run_rate(train, rate, X_train, y_train, X_test, y_test)
+        rows.append(row)
+        print(f"  ✓ {row['rows']:,} rows | fit {row['fit_seconds']:.1f}s | RMSE {row['rmse']:.4f} | "
+              f"mean prediction {row['mean_prediction']:.4f}")
+
+    save_report(rows, os.path.join(SCRIPT_DIR, OUTPUT_FILE))
+    plot(rows, os.path.join(SCRIPT_DIR, PLOT_FILE))
+    print(f"\n✓ Report saved: {OUTPUT_FILE}")
+    print(f"✓ Plot saved: {PLOT_FILE}")
+    print("=" * 80)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""
+PIPELINE BENCHMARK
+Times every stage, training and prediction on fixed-size synthetic inputs and
+compares the numbers with the committed baseline (benchmark_baselines.json)
+
+For each size a throwaway copy of the scripts is made in the work directory,
+synthetic_data.py generates the raw export and weather for it, and each
+script runs in its own process exactly as the pipeline runs it. Recorded per
+script: wall time, peak memory (RSS) and throughput (rows of its input per
+second).
+
+The synthetic rows all fall inside the years stage 04 keeps (its YEARS, or
+PIPELINE_YEARS), so a size is the number of crimes the pipeline actually
+processes, not a raw export that stage 04 mostly throws away.
+
+Usage:
+    python benchmark.py                          # default sizes, compare with baseline
+    python benchmark.py --sizes 100k 1M 10M
+    python benchmark.py --sizes 1M --update-baseline
+    python benchmark.py --sizes 1M --reuse --only 18   # re-time one stage
+    python benchmark.py --sizes 10M --reuse --only 18 --update-baseline   # ...and store just its numbers
+
+Exits with code 1 when a script fails (with or without a baseline, and also
+with --update-baseline, which then keeps the script's previous entry) or
+regresses past the tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.join(ROOT_DIR, 'Road Map', '01 Foundation & Data')
+MODELS_DIR = os.path.join(ROOT_DIR, 'Road Map', '02 Create Prediction Models')
+
+BASELINE_FILE = os.path.join(ROOT_DIR, 'benchmark_baselines.json')
+WORK_DIR = os.path.join(tempfile.gettempdir(), 'chicago_crime_bench')
+
+DEFAULT_SIZES = ['100k', '1M']
+SEED = 42
+
+TIME_TOLERANCE = 0.25          # Fail if a script is >25% slower than baseline...
+MIN_REGRESSION_SECONDS = 1.0   # ...and at least this much slower (ignores noise on tiny stages)
+MEMORY_TOLERANCE = 0.25
+MIN_REGRESSION_MB = 100
+
+# Training is timed without the optional plot / SHAP steps, and always
+# trains: no registered model reused, no cached split loaded
+BENCH_ENV = {
+    'TRAIN_MAKE_PLOTS': '0',
+    'TRAIN_RUN_SHAP': '0',
+    'TRAIN_REUSE': '0',
+    'TRAIN_CACHE': '0',
+}
+# ============================================================
+
+sys.path.insert(0, PIPELINE_DIR)
+from calendar_rules import pipeline_years  # noqa: E402
+from chicago_crime import COMMANDS  # noqa: E402
+from pipeline_utils import read_config  # noqa: E402
+from synthetic_data import RAW_OUTPUT, WEATHER_OUTPUT, parse_rows  # noqa: E402
+
+BENCH_SCRIPTS = COMMANDS['ingest'] + COMMANDS['features'] + COMMANDS['train'] + COMMANDS['predict']
+FILTER_SCRIPT = os.path.join(PIPELINE_DIR, COMMANDS['ingest'][0][1])   # Stage 04: keeps YEARS only
+
+
+def window_years():
+    """(first, last) year stage 04 keeps; the synthetic rows are generated inside it"""
+    years = pipeline_years(read_config(FILTER_SCRIPT)['YEARS'])
+    return min(years), max(years)
+
+
+def count_rows(path):
+    """Data rows in a CSV (lines minus header), counted without parsing"""
+    lines = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 24), b''):
+            lines += block.count(b'\n')
+    return max(lines - 1, 0)
+
+
+def throughput_file(folder, name, previous_output):
+    """The file whose rows define a script's throughput (its input, if declared)"""
+    config = read_config(os.path.join(folder, name))
+    relative = config.get('INPUT_FILE') or previous_output or config.get('OUTPUT_FILE')
+    return os.path.normpath(os.path.join(folder, relative)) if relative else None
+
+
+def prepare_workspace(size_label, rows, seed, work_dir, reuse):
+    """Copy the scripts into <work_dir>/<size> and add the synthetic inputs"""
+    first_year, last_year = window_years()
+    data_dir = os.path.join(work_dir, 'data', f'{size_label}_seed{seed}_{first_year}-{last_year}')
+    workspace = os.path.join(work_dir, f'run_{size_label}')
+    pipeline = os.path.join(workspace, 'Road Map', '01 Foundation & Data')
+    models = os.path.join(workspace, 'Road Map', '02 Create Prediction Models')
+
+    if reuse and os.path.isdir(pipeline):
+        return pipeline, models, data_dir
+
+    if not os.path.exists(os.path.join(data_dir, RAW_OUTPUT)):
+        print(f"\nGenerating {rows:,} synthetic rows for {first_year}-{last_year} (cached in {data_dir})...")
+        subprocess.run([sys.executable, os.path.join(PIPELINE_DIR, 'synthetic_data.py'),
+                        '--rows', str(rows), '--output-dir', data_dir, '--seed', str(seed),
+                        '--start-year', str(first_year), '--end-year', str(last_year)],
+                       check=True, stdout=subprocess.DEVNULL)
+
+    shutil.rmtree(workspace, ignore_errors=True)
+    for source, target in ((PIPELINE_DIR, pipeline), (MODELS_DIR, models)):
+        os.makedirs(target)
+        for name in os.listdir(source):
+            if name.endswith('.py'):
+                shutil.copy2(os.path.join(source, name), target)
+
+    raw_target = os.path.join(pipeline, RAW_OUTPUT)
+    try:
+        os.link(os.path.join(data_dir, RAW_OUTPUT), raw_target)
+    except OSError:
+        shutil.copy2(os.path.join(data_dir, RAW_OUTPUT), raw_target)
+    return pipeline, models, data_dir
+
+
+def run_timed(script_path, log_path, env):
+    """Run a script in a fresh interpreter; returns (ok, wall seconds, peak MB or None)"""
+    folder = os.path.dirname(script_path)
+    # Earlier runs may have left read-only outputs (stage 15 marks its file read-only)
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        if os.path.isfile(path):
+            os.chmod(path, 0o644)
+
+    with open(log_path, 'w') as log:
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, script_path], cwd=folder, env=env,
+                                stdout=log, stderr=subprocess.STDOUT)
+        if hasattr(os, 'wait4'):
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is KB on Linux, bytes on macOS
+            peak_mb = usage.ru_maxrss / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+        else:
+            proc.wait()
+            peak_mb = None
+        wall = time.perf_counter() - start
+    return proc.returncode == 0, wall, peak_mb
+
+
+def run_size(size_label, args):
+    rows = parse_rows(size_label)
+    pipeline, models, data_dir = prepare_workspace(size_label, rows, args.seed, args.work_dir, args.reuse)
+    log_dir = os.path.join(args.work_dir, f'run_{size_label}', 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+
+    env = dict(os.environ, **BENCH_ENV)
+    env['PIPELINE_WEATHER_FILE'] = os.path.join(data_dir, WEATHER_OUTPUT)
+    env['MODEL_REGISTRY_DIR'] = os.path.join(models, 'registry')   # The workspace's own, never the real one
+
+    results = {}
+    previous_output = None
+    for folder, name in BENCH_SCRIPTS:
+        folder = pipeline if folder == PIPELINE_DIR else models
+        rows_file = throughput_file(folder, name, previous_output)
+        previous_output = read_config(os.path.join(folder, name)).get('OUTPUT_FILE')
+        if args.only and not any(name.startswith(prefix) for prefix in args.only):
+            continue
+
+        print(f"  {name:45s}", end=' ', flush=True)
+        ok, wall, peak_mb = run_timed(os.path.join(folder, name),
+                                      os.path.join(log_dir, name.replace('.py', '.log')), env)
+        if not ok:
+            print(f"✗ FAILED (log: {os.path.join(log_dir, name.replace('.py', '.log'))})")
+            results[name] = {'failed': True}
+            break
+
+        stage_rows = count_rows(rows_file) if rows_file and os.path.exists(rows_file) else None
+        results[name] = {
+            'wall_seconds': round(wall, 3),
+            'peak_mb': round(peak_mb, 1) if peak_mb is not None else None,
+            'rows': stage_rows,
+            'rows_per_second': round(stage_rows / wall) if stage_rows else None,
+        }
+        peak_text = f"{peak_mb:8.0f} MB" if peak_mb is not None else "       - MB"
+        rate_text = f"{stage_rows / wall:>12,.0f} rows/s" if stage_rows else ""
+        print(f"{wall:8.2f}s {peak_text} {rate_text}")
+    return results
+
+
+def compare(size_label, results, baseline):
+    """Regression messages for one size (empty list = pass)"""
+    problems = []
+    base_size = baseline.get('results', {}).get(size_label, {})
+    for name, current in results.items():
+        base = base_size.get(name)
+        if current.get('failed'):
+            problems.append(f"{size_label} {name}: script failed"
+                            + ("" if base else " (no baseline yet)"))
+            continue
+        if not base:
+            continue
+        slower = current['wall_seconds'] - base['wall_seconds']
+        if (current['wall_seconds'] > base['wall_seconds'] * (1 + TIME_TOLERANCE)
+                and slower >= MIN_REGRESSION_SECONDS):
+            problems.append(f"{size_label} {name}: {current['wall_seconds']:.2f}s vs "
+                            f"baseline {base['wall_seconds']:.2f}s (+{slower / base['wall_seconds']:.0%})")
+        if current['peak_mb'] is not None and base.get('peak_mb') is not None:
+            grown = current['peak_mb'] - base['peak_mb']
+            if (current['peak_mb'] > base['peak_mb'] * (1 + MEMORY_TOLERANCE)
+                    and grown >= MIN_REGRESSION_MB):
+                problems.append(f"{size_label} {name}: peak {current['peak_mb']:.0f} MB vs "
+                                f"baseline {base['peak_mb']:.0f} MB")
+    return problems
+
+
+def load_baseline():
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE) as f:
+        return json.load(f)
+
+
+def save_baseline(baseline, all_results):
+    """
+    Store successful results
+    A failed script keeps its previous entry (so it stays gated), and so do
+    scripts not run this time (--only).
+    """
+    for size_label, results in all_results.items():
+        stored = baseline.setdefault('results', {}).setdefault(size_label, {})
+        stored.update({name: result for name, result in results.items() if not result.get('failed')})
+    baseline['updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    baseline['machine'] = {
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+    }
+    with open(BASELINE_FILE, 'w') as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages against the stored baseline")
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, help="raw row counts, e.g. 100k 1M 10M")
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--work-dir', default=WORK_DIR)
+    parser.add_argument('--reuse', action='store_true', help="reuse the existing workspace (keeps earlier outputs)")
+    parser.add_argument('--only', nargs='+', metavar='PREFIX', help="time only scripts starting with these prefixes")
+    parser.add_argument('--update-baseline', action='store_true', help="store these results as the new baseline")
+    parser.add_argument('--output', help="also write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("PIPELINE BENCHMARK")
+    print("=" * 80)
+    print(f"Sizes: {', '.join(args.sizes)}   Work dir: {args.work_dir}")
+
+    baseline = load_baseline()
+    all_results = {}
+    problems = []
+    for size_label in args.sizes:
+        print(f"\n[{size_label} rows]")
+        results = run_size(size_label, args)
+        all_results[size_label] = results
+        problems += compare(size_label, results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(all_results, f, indent=2)
+
+    print("\n" + "=" * 80)
+    if args.update_baseline:
+        save_baseline(baseline, all_results)
+        print(f"✓ Baseline updated: {BASELINE_FILE}")
+        failed = [f"{size} {name}" for size, results in all_results.items()
+                  for name, r in results.items() if r.get('failed')]
+        for name in failed:
+            print(f"  ✗ {name} failed (its previous baseline entry, if any, is kept)")
+        return 1 if failed else 0
+
+    if not baseline:
+        print("ℹ️  No baseline yet - run with --update-baseline to store one")
+        return 1 if problems else 0
+    if problems:
+        print(f"⚠️  {len(problems)} REGRESSION(S) (tolerance: time +{TIME_TOLERANCE:.0%}, "
+              f"memory +{MEMORY_TOLERANCE:.0%})")
+        for problem in problems:
+            print(f"  ✗ {problem}")
+        return 1
+    print("✓ No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
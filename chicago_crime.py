@@ -0,0 +1,381 @@
+"""
+CHICAGO CRIME PREDICTION - COMMAND LINE
+One entry point for the whole project
+
+Usage:
+    python chicago_crime.py ingest              # 04-11: raw export -> severity-scored crimes
+    python chicago_crime.py features            # 13-24: features -> 24.1_training_ready.csv
+    python chicago_crime.py train [--no-plots] [--no-shap] [--cv rolling|monthly] [--external-memory]
+                                  [--categorical] [--zero-rate 0.25] [--retrain]
+                                  [--incremental [--incremental-rounds 10] [--compare-full]]
+    python chicago_crime.py predict [--model-version v0003]   # 2026 prediction grid
+    python chicago_crime.py analyze             # analyzer / report scripts
+    python chicago_crime.py check               # column contracts of the whole chain (seconds)
+    python chicago_crime.py sweep --vary 10:THRESHOLD=50,100,200   # compare pipeline variants
+    python chicago_crime.py search              # resumable hyperparameter search
+    python chicago_crime.py startup-check       # measure CLI start-up against the budget
+
+Common options:
+    --dry-run        list the scripts that would run, then exit
+    --from NAME      start at the first script whose name starts with NAME
+    --only NAME      run just the scripts whose names start with NAME
+    --workers N      worker processes for the parallel stages (PIPELINE_WORKERS)
+    --profile        profile each script (report + flamegraph next to its output)
+    --memory-budget GB   memory the heavy stages may use (PIPELINE_MEMORY_BUDGET), e.g. 4 or 512MB
+    --no-preflight   skip the column contract check run before the scripts (contracts.py)
+
+Every run is recorded in run_history.db (see run_history.py for queries).
+
+Scripts run inside this interpreter (no subprocess per stage), so pandas and
+friends are imported once per command. This file itself only imports the
+standard library: heavy modules are imported by the scripts that use them.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.join(ROOT_DIR, 'Road Map', '01 Foundation & Data')
+MODELS_DIR = os.path.join(ROOT_DIR, 'Road Map', '02 Create Prediction Models')
+
+COMMANDS = {
+    'ingest': [
+        (PIPELINE_DIR, '04_data_row_truncator_2023_2025.py'),
+        (PIPELINE_DIR, '05_data_column_truncator.py'),
+        (PIPELINE_DIR, '07_domestic_remove.py'),
+        (PIPELINE_DIR, '08_remove_enforcement_crimes.py'),
+        (PIPELINE_DIR, '10_remove_rare_combinations.py'),
+        (PIPELINE_DIR, '11_add_severity_scores.py'),
+    ],
+    'features': [
+        (PIPELINE_DIR, '13_adding_weekly_columns.py'),
+        (PIPELINE_DIR, '14_adding_holidays.py'),
+        (PIPELINE_DIR, '15_download_add_weather.py'),
+        (PIPELINE_DIR, '16_weather_DI_add.py'),
+        (PIPELINE_DIR, '17_column_truncator.py'),
+        (PIPELINE_DIR, '18_3h_blocks_0_crime_blocks.py'),
+        (PIPELINE_DIR, '20_school_in_out.py'),
+        (PIPELINE_DIR, '21_big_events.py'),
+        (PIPELINE_DIR, '22_moon_illumination.py'),
+        (PIPELINE_DIR, '23_add_solar_altitude.py'),
+        (PIPELINE_DIR, '24_pretain_prune.py'),
+    ],
+    'train': [
+        (MODELS_DIR, '01_train_model.py'),
+    ],
+    'predict': [
+        (MODELS_DIR, '02_generate_prediction_data.py'),
+    ],
+    'analyze': [
+        (PIPELINE_DIR, '06_data_analyzer.py'),
+        (PIPELINE_DIR, '09_severity_analyzer.py'),
+        (PIPELINE_DIR, '25_training_complexity_estimator.py'),
+        (MODELS_DIR, '03_predictions_alalzyer.py'),
+        (MODELS_DIR, '04_major_events_analyzer.py'),
+    ],
+}
+
+# Start-up budget per subcommand (seconds): time from launching the CLI to
+# the first stage starting work - the CLI, its helpers and every module-level
+# import of the subcommand's scripts - measured in a fresh interpreter.
+# About 1.5x the median on the 1-core benchmark machine: pandas alone takes
+# ~0.35s, xgboost ~1.2s (it imports sklearn itself), matplotlib ~0.4s
+STARTUP_BUDGETS = {
+    'ingest': 0.8,
+    'features': 0.8,
+    'train': 3.0,
+    'predict': 3.0,
+    'analyze': 1.5,
+}
+PASSTHROUGH_COMMANDS = ['sweep', 'search']
+STARTUP_RUNS = 5   # Median of this many launches is compared to the budget
+
+# Imported only inside the steps that use them, never at start-up
+LAZY_MODULES = ['sklearn', 'matplotlib', 'seaborn', 'shap', 'astral', 'meteostat']
+LAZY_EXEMPT = {
+    'train': ['sklearn'],        # xgboost imports it itself when it is installed (xgboost.compat)
+    'predict': ['sklearn'],
+    'analyze': ['matplotlib'],   # 03_predictions_alalzyer.py is a plotting script
+}
+# ============================================================
+
+
+def select_scripts(command, only=None, start_from=None):
+    """Scripts for a subcommand, filtered by --only / --from"""
+    scripts = COMMANDS[command]
+    if start_from:
+        names = [name for _, name in scripts]
+        matches = [i for i, name in enumerate(names) if name.startswith(start_from)]
+        if not matches:
+            raise SystemExit(f"✗ No '{command}' script starts with '{start_from}'")
+        scripts = scripts[matches[0]:]
+    if only:
+        scripts = [(folder, name) for folder, name in scripts if name.startswith(only)]
+        if not scripts:
+            raise SystemExit(f"✗ No '{command}' script starts with '{only}'")
+    return scripts
+
+
+def run_command(args):
+    scripts = select_scripts(args.command, args.only, args.start_from)
+
+    if args.dry_run:
+        print(f"{args.command}: {len(scripts)} script(s)")
+        for folder, name in scripts:
+            found = "✓" if os.path.exists(os.path.join(folder, name)) else "✗ missing"
+            print(f"  {found} {os.path.relpath(os.path.join(folder, name), ROOT_DIR)}")
+        return 0
+
+    if args.workers is not None:
+        os.environ['PIPELINE_WORKERS'] = str(args.workers)
+    if args.memory_budget:
+        os.environ['PIPELINE_MEMORY_BUDGET'] = args.memory_budget
+    if getattr(args, 'no_plots', False):
+        os.environ['TRAIN_MAKE_PLOTS'] = '0'
+    if getattr(args, 'no_shap', False):
+        os.environ['TRAIN_RUN_SHAP'] = '0'
+    if getattr(args, 'cv', None):
+        os.environ['TRAIN_CV'] = args.cv
+    if getattr(args, 'external_memory', False):
+        os.environ['TRAIN_EXTERNAL_MEMORY'] = '1'
+    if getattr(args, 'categorical', False):
+        os.environ['TRAIN_CATEGORICAL'] = '1'
+    if getattr(args, 'zero_rate', None) is not None:
+        os.environ['TRAIN_ZERO_RATE'] = str(args.zero_rate)
+    if getattr(args, 'retrain', False):
+        os.environ['TRAIN_REUSE'] = '0'
+    if getattr(args, 'incremental', False):
+        os.environ['TRAIN_INCREMENTAL'] = '1'
+    if getattr(args, 'incremental_rounds', None) is not None:
+        os.environ['TRAIN_INCREMENTAL_ROUNDS'] = str(args.incremental_rounds)
+    if getattr(args, 'compare_full', False):
+        os.environ['TRAIN_COMPARE_FULL'] = '1'
+    if getattr(args, 'model_version', None):
+        os.environ['PREDICT_MODEL_VERSION'] = args.model_version
+
+    # Imported here so the dry-run path stays as small as possible
+    sys.path.insert(0, PIPELINE_DIR)
+    import run_history
+    from contracts import preflight
+    if args.profile:
+        from profiling import profile_script as run_script
+    else:
+        from pipeline_utils import run_script
+
+    if args.imports_only:
+        # startup-check: everything the scripts import before they start work, nothing else
+        from pipeline_utils import run_imports
+        for folder, name in scripts:
+            run_imports(os.path.join(folder, name))
+        return 0
+
+    if not args.no_preflight and not preflight([os.path.join(folder, name) for folder, name in scripts]):
+        return 1
+
+    start_time = time.perf_counter()
+    run_id = run_history.start_run(args.command)
+    for i, (folder, name) in enumerate(scripts, 1):
+        print("\n" + "=" * 80)
+        print(f"[{i}/{len(scripts)}] RUNNING: {name}")
+        print("=" * 80)
+        started = datetime.now()
+        print(f"Started at: {started.strftime('%Y-%m-%d %H:%M:%S')}")
+        print()
+
+        script_start = time.perf_counter()
+        run_history.reset_peak()
+        # This process's peak misses the work done in worker processes (sharded stages, prediction)
+        with run_history.ChildMemory() as workers:
+            ok = run_script(os.path.join(folder, name))
+        run_history.record_stage(run_id, os.path.join(folder, name), started.isoformat(timespec='seconds'),
+                                 time.perf_counter() - script_start, run_history.peak_mb(), ok, workers)
+        if not ok:
+            run_history.finish_run(run_id, False)
+            print(f"\n✗ FAILED: {name}")
+            print(f"\n{args.command.upper()} STOPPED - Script failed")
+            return 1
+        print(f"\n✓ COMPLETED: {name} ({time.perf_counter() - script_start:.1f}s)")
+
+    run_history.finish_run(run_id, True)
+    print(f"\n✓ {args.command} finished in {time.perf_counter() - start_time:.1f}s")
+    return 0
+
+
+def check_contracts(args):
+    sys.path.insert(0, PIPELINE_DIR)
+    from contracts import check, known_stages
+
+    stages = [stage.path for stage in known_stages() if stage.has_contract]
+    errors, _ = check(stages)
+    return 1 if errors else 0
+
+
+def run_sweep(args):
+    sys.path.insert(0, PIPELINE_DIR)
+    from variant_sweep import main as sweep
+
+    return sweep(args.passthrough_args)
+
+
+def run_search(args):
+    sys.path.insert(0, MODELS_DIR)
+    from hyperparameter_search import main as search
+
+    return search(args.passthrough_args)
+
+
+def import_costs(importtime_log):
+    """
+    From `python -X importtime` output: ({package: cumulative seconds} of the
+    imports made directly, every package imported at any depth)
+    """
+    costs = {}
+    imported = set()
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split(':', 1)[1].split('|')
+        if not cumulative.strip().isdigit():   # The header line
+            continue
+        package = name.strip().split('.')[0]
+        imported.add(package)
+        if not name.startswith('   '):         # Not nested: includes everything it imported
+            costs[package] = costs.get(package, 0) + int(cumulative) / 1e6
+    return costs, imported
+
+
+def measure_startup(command):
+    """
+    Start-up of a subcommand in fresh interpreters: `chicago_crime.py <command>
+    --imports-only` runs the CLI as usual, then only the module-level imports
+    of the scripts (pipeline_utils.run_imports) instead of the scripts
+    Returns (median seconds, {package: seconds}, packages imported) of the median run
+    """
+    cmd = [sys.executable, '-X', 'importtime', os.path.abspath(__file__), command, '--imports-only']
+    runs = []
+    for _ in range(STARTUP_RUNS):
+        start = time.perf_counter()
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        seconds = time.perf_counter() - start
+        if result.returncode != 0:
+            raise RuntimeError(f"'{command} --imports-only' failed:\n{result.stderr[-2000:]}")
+        runs.append((seconds, *import_costs(result.stderr)))
+    runs.sort(key=lambda run: run[0])
+    return runs[len(runs) // 2]
+
+
+def startup_check(args):
+    print("=" * 70)
+    print("CLI START-UP CHECK")
+    print("=" * 70)
+    print(f"Median of {STARTUP_RUNS} fresh launches per subcommand, up to the first stage starting work\n")
+
+    # Bare interpreter start-up, for reference
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], check=True)
+    baseline = time.perf_counter() - start
+
+    print(f"{'Subcommand':<12} {'Start-up':>10} {'Budget':>10}  Result / largest imports")
+    print("-" * 70)
+    failures = 0
+    for command, budget in STARTUP_BUDGETS.items():
+        seconds, costs, imported = measure_startup(command)
+        lazy = [m for m in LAZY_MODULES if m in imported and m not in LAZY_EXEMPT.get(command, [])]
+        ok = seconds <= budget and not lazy
+        failures += not ok
+        note = "✓" if ok else "✗ over budget" if seconds > budget else "✗"
+        if lazy:
+            note += f" (imports {', '.join(lazy)} at start-up)"
+        largest = sorted(costs.items(), key=lambda item: -item[1])[:3]
+        note += "  " + ", ".join(f"{name} {cost:.2f}s" for name, cost in largest)
+        print(f"{command:<12} {seconds:>9.3f}s {budget:>9.2f}s  {note}")
+
+    print("-" * 70)
+    print(f"Bare interpreter start-up: {baseline:.3f}s")
+    if failures:
+        print(f"\n⚠️  {failures} subcommand(s) over the start-up budget")
+        return 1
+    print("\n✓ All subcommands within budget")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Chicago crime prediction pipeline")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    for command in COMMANDS:
+        sub = subparsers.add_parser(command, help=f"run the {command} scripts")
+        sub.add_argument('--dry-run', action='store_true', help="list the scripts, don't run them")
+        sub.add_argument('--only', metavar='NAME', help="run only scripts starting with NAME")
+        sub.add_argument('--from', dest='start_from', metavar='NAME',
+                         help="start at the script starting with NAME")
+        sub.add_argument('--workers', type=int, help="worker processes for parallel stages")
+        sub.add_argument('--profile', action='store_true', help="profile each script (see profiling.py)")
+        sub.add_argument('--memory-budget', metavar='GB',
+                         help="memory the heavy stages may use, e.g. 4 or 512MB (see memory_budget.py)")
+        sub.add_argument('--no-preflight', action='store_true', help="skip the column contract check")
+        sub.add_argument('--imports-only', action='store_true', help=argparse.SUPPRESS)   # startup-check
+        if command == 'train':
+            sub.add_argument('--no-plots', action='store_true', help="skip the feature importance plot")
+            sub.add_argument('--no-shap', action='store_true', help="skip the SHAP contribution analysis")
+            sub.add_argument('--cv', choices=['rolling', 'monthly'],
+                             help="temporal cross-validation by month before the final fit")
+            sub.add_argument('--external-memory', action='store_true',
+                             help="stream the training set from disk in parts (see external_memory.py)")
+            sub.add_argument('--categorical', action='store_true',
+                             help="feed Community Area and the calendar features as native categories")
+            sub.add_argument('--zero-rate', type=float, metavar='RATE',
+                             help="keep this share of zero-severity training blocks, reweighted (e.g. 0.25)")
+            sub.add_argument('--retrain', action='store_true',
+                             help="train even when the registry has a model for the same data and params")
+            sub.add_argument('--incremental', action='store_true',
+                             help="add trees to the current model, fitted on the new and changed rows only")
+            sub.add_argument('--incremental-rounds', type=int, metavar='N',
+                             help="trees added by an incremental run (default 10)")
+            sub.add_argument('--compare-full', action='store_true',
+                             help="with --incremental: also train from scratch and report the gap")
+        if command == 'predict':
+            sub.add_argument('--model-version', metavar='VERSION',
+                             help="registered model to predict with (default: current, see model_registry.py)")
+        sub.set_defaults(handler=run_command)
+
+    contracts = subparsers.add_parser('check', help="check the column contracts of every stage")
+    contracts.set_defaults(handler=check_contracts)
+
+    sweep = subparsers.add_parser('sweep', help="run and compare pipeline variants (see variant_sweep.py)",
+                                  add_help=False)
+    sweep.set_defaults(handler=run_sweep)
+
+    search = subparsers.add_parser('search', help="hyperparameter search (see hyperparameter_search.py)",
+                                   add_help=False)
+    search.set_defaults(handler=run_search)
+
+    check = subparsers.add_parser('startup-check', help="measure CLI start-up time against the budget")
+    check.set_defaults(handler=startup_check)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    # sweep and search pass their options through to their scripts
+    args, extra = parser.parse_known_args(argv)
+    if args.command in PASSTHROUGH_COMMANDS:
+        args.passthrough_args = extra
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\nCancelled")
+        sys.exit(1)
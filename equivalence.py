@@ -0,0 +1,326 @@
+"""
+DIFFERENTIAL EQUIVALENCE CHECK
+Proves an optimized script still produces the same artifact as the reference
+
+The reference is the project as committed at a git revision (default: HEAD);
+the candidate is the working tree. For every requested artifact the script
+that writes it is run in both versions on the same input files, and the two
+outputs are compared column by column:
+
+  - numeric columns: equal within a tolerance (per-column overrides below,
+    e.g. heat_DI / solar_altitude are rounded to 2 decimals), NaN == NaN
+  - integer / boolean / text columns: exact
+  - text that differs only in datetime formatting counts as equal
+
+Row-level differences (first few per column) are printed, and optionally all
+of them are written to a CSV.
+
+With --budgets A B the working tree is compared with itself instead: each
+script runs once with PIPELINE_MEMORY_BUDGET=A and once with B, and the two
+outputs must match exactly (no tolerance). A memory setting may change how
+a stage chunks its work, never what it writes. Chunks are never smaller than
+MIN_CHUNK_ROWS (memory_budget.py), so the inputs need more rows than that for
+the small budget to split anything (the 1M benchmark workspace does).
+
+Usage:
+    python equivalence.py                                 # 11.1, 18.1, 24.1, 02.1 vs HEAD
+    python equivalence.py --reference 28daf03 --artifacts 18.1_3hour_blocks_with_zeros.csv
+    python equivalence.py --data-root /tmp/chicago_crime_bench/run_100k
+    python equivalence.py --budgets 4MB 8GB --artifacts 18.1_3hour_blocks_with_zeros.csv \
+                          --data-root /tmp/chicago_crime_bench/run_1M
+
+Inputs are taken from --data-root (a project folder with the usual 'Road Map'
+layout and existing artifacts); nothing there is modified. Exits with code 1
+when any artifact differs.
+"""
+
+import argparse
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_FOLDER = os.path.join('Road Map', '01 Foundation & Data')
+MODELS_FOLDER = os.path.join('Road Map', '02 Create Prediction Models')
+
+DEFAULT_ARTIFACTS = [
+    '11.1_severity_added.csv',
+    '18.1_3hour_blocks_with_zeros.csv',
+    '24.1_training_ready.csv',
+    '02.1_predictions_2026.csv',
+]
+
+# Rows are matched on these columns when present (otherwise by position)
+ROW_KEYS = ['ID', 'Community Area', 'Community_Area', 'block_datetime', 'block_date',
+            'time_block', 'Date']
+
+DEFAULT_RTOL = 1e-9
+DEFAULT_ATOL = 1e-9
+# Columns written with rounding get a tolerance of one unit in the last place
+COLUMN_ATOL = {
+    'heat_DI': 0.01,
+    'cold_DI': 0.01,
+    'solar_altitude': 0.01,
+    'moon_illumination': 0.01,
+    'Predicted_Severity': 0.01,   # float32 model output, written with 2 decimals
+    'Relative_to_Max': 0.1,       # percent of the area's maximum, 1 decimal
+}
+MAX_ROWS_SHOWN = 5   # Row-level diffs printed per column
+# ============================================================
+
+sys.path.insert(0, os.path.join(ROOT_DIR, PIPELINE_FOLDER))
+from pipeline_utils import read_config  # noqa: E402
+
+
+def find_producer(folder, artifact):
+    """Script in `folder` whose OUTPUT_FILE is the artifact"""
+    for name in sorted(os.listdir(folder)):
+        if name.endswith('.py') and name[:2].isdigit():
+            if read_config(os.path.join(folder, name)).get('OUTPUT_FILE') == artifact:
+                return name
+    return None
+
+
+def export_reference(revision, target):
+    """Extract the .py files of 'Road Map' at a git revision into target"""
+    archive = subprocess.run(['git', '-C', ROOT_DIR, 'archive', '--format=tar', revision, 'Road Map'],
+                             check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        members = [m for m in tar.getmembers() if m.isdir() or m.name.endswith('.py')]
+        tar.extractall(target, members=members)
+
+
+def copy_scripts(source_root, target_root):
+    for folder in (PIPELINE_FOLDER, MODELS_FOLDER):
+        os.makedirs(os.path.join(target_root, folder), exist_ok=True)
+        for name in os.listdir(os.path.join(source_root, folder)):
+            if name.endswith('.py'):
+                shutil.copy2(os.path.join(source_root, folder, name), os.path.join(target_root, folder))
+
+
+def script_inputs(script_path):
+    """Files a script reads, from its *_FILE / *_DATA settings (outputs excluded)"""
+    inputs = []
+    for key, value in read_config(script_path).items():
+        if key.startswith('OUTPUT') or not isinstance(value, str):
+            continue
+        if key.endswith(('_FILE', '_DATA')) and os.path.splitext(value)[1] in ('.csv', '.json'):
+            inputs.append(value)
+    return inputs
+
+
+def stage_inputs(workspace, folder, script, data_root):
+    """Link the script's inputs from data_root into the workspace (same relative paths)"""
+    for relative in script_inputs(os.path.join(workspace, folder, script)):
+        source = os.path.normpath(os.path.join(data_root, folder, relative))
+        target = os.path.normpath(os.path.join(workspace, folder, relative))
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"Input not found: {source}")
+        if os.path.exists(target):
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+
+
+def run_script(workspace, folder, script, env=None):
+    """Run a script inside a workspace (extra environment variables in env); returns wall seconds"""
+    cwd = os.path.join(workspace, folder)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, script], cwd=cwd, capture_output=True, text=True,
+                            env=dict(os.environ, **(env or {})))
+    if result.returncode != 0:
+        raise RuntimeError(f"{script} failed in {workspace}:\n{result.stdout[-1500:]}{result.stderr[-1500:]}")
+    return time.perf_counter() - start
+
+
+def align_rows(reference, candidate):
+    """Sort both frames on the shared key columns so rows line up"""
+    keys = [k for k in ROW_KEYS if k in reference.columns and k in candidate.columns]
+    if keys:
+        reference = reference.sort_values(keys, kind='mergesort').reset_index(drop=True)
+        candidate = candidate.sort_values(keys, kind='mergesort').reset_index(drop=True)
+    return reference, candidate, keys
+
+
+def column_mismatches(name, ref, new, exact=False):
+    """Boolean mask of rows where the column differs, honouring dtype and tolerance (none when exact)"""
+    both_missing = ref.isna().to_numpy() & new.isna().to_numpy()
+
+    ref_numeric = pd.api.types.is_numeric_dtype(ref) and not pd.api.types.is_bool_dtype(ref)
+    new_numeric = pd.api.types.is_numeric_dtype(new) and not pd.api.types.is_bool_dtype(new)
+    if ref_numeric and new_numeric:
+        is_float = pd.api.types.is_float_dtype(ref) or pd.api.types.is_float_dtype(new)
+        a = ref.to_numpy(dtype='float64')
+        b = new.to_numpy(dtype='float64')
+        if is_float and exact:
+            close = a == b
+        elif is_float:
+            close = np.isclose(a, b, rtol=DEFAULT_RTOL, atol=COLUMN_ATOL.get(name, DEFAULT_ATOL) + 1e-12)
+        else:
+            close = a == b
+        return ~(close | both_missing)
+
+    equal = (ref.astype(str).to_numpy() == new.astype(str).to_numpy()) | both_missing
+    if not equal.all():
+        # Same instant written differently ('2023-01-01' vs '2023-01-01 00:00:00')
+        idx = np.flatnonzero(~equal)
+        a = pd.to_datetime(ref.iloc[idx], errors='coerce')
+        b = pd.to_datetime(new.iloc[idx], errors='coerce')
+        same_time = (a.notna() & (a.to_numpy() == b.to_numpy())).to_numpy()
+        equal[idx[same_time]] = True
+    return ~equal
+
+
+def _plain(value):
+    """NumPy scalar -> Python value, for readable diff output"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def compare_frames(reference, candidate, artifact, diff_rows, exact=False):
+    """Print a column-by-column report; returns True when equivalent"""
+    ok = True
+    missing = [c for c in reference.columns if c not in candidate.columns]
+    extra = [c for c in candidate.columns if c not in reference.columns]
+    if missing:
+        print(f"      ✗ Columns missing in candidate: {missing}")
+        ok = False
+    if extra:
+        print(f"      ✗ Extra columns in candidate: {extra}")
+        ok = False
+    if len(reference) != len(candidate):
+        print(f"      ✗ Row count differs: reference {len(reference):,}, candidate {len(candidate):,}")
+        return False
+
+    reference, candidate, keys = align_rows(reference, candidate)
+    if keys:
+        print(f"      Rows matched on: {keys}")
+
+    for column in [c for c in reference.columns if c in candidate.columns]:
+        ref, new = reference[column], candidate[column]
+        mask = column_mismatches(column, ref, new, exact)
+        n_diff = int(mask.sum())
+        if n_diff == 0:
+            continue
+        ok = False
+        detail = ''
+        if pd.api.types.is_numeric_dtype(ref) and pd.api.types.is_numeric_dtype(new):
+            delta = (ref.astype('float64') - new.astype('float64')).abs()[mask]
+            detail = f", max |diff| {delta.max():.6g}"
+        print(f"      ✗ {column}: {n_diff:,} row(s) differ{detail} "
+              f"(dtype {ref.dtype} vs {new.dtype})")
+        rows = np.flatnonzero(mask)
+        for row in rows[:MAX_ROWS_SHOWN]:
+            key_text = ', '.join(f"{k}={reference.at[row, k]}" for k in keys) or f"row {row}"
+            print(f"          {key_text}: {_plain(ref.iat[row])!r} -> {_plain(new.iat[row])!r}")
+        for row in rows:
+            diff_rows.append({
+                'artifact': artifact, 'column': column, 'row': int(row),
+                'key': '; '.join(f"{k}={reference.at[row, k]}" for k in keys),
+                'reference': _plain(ref.iat[row]), 'candidate': _plain(new.iat[row]),
+            })
+    return ok
+
+
+def check_artifact(artifact, ref_root, new_root, data_root, diff_rows, envs=(None, None), exact=False):
+    for folder in (PIPELINE_FOLDER, MODELS_FOLDER):
+        script = find_producer(os.path.join(new_root, folder), artifact)
+        if script:
+            break
+    else:
+        print(f"      ✗ No script writes {artifact}")
+        return False
+
+    print(f"      Script: {script}")
+    for workspace in (ref_root, new_root):
+        if not os.path.exists(os.path.join(workspace, folder, script)):
+            print(f"      ✗ {script} does not exist in the reference")
+            return False
+        stage_inputs(workspace, folder, script, data_root)
+
+    ref_seconds = run_script(ref_root, folder, script, envs[0])
+    new_seconds = run_script(new_root, folder, script, envs[1])
+    print(f"      Time: reference {ref_seconds:.2f}s, candidate {new_seconds:.2f}s "
+          f"({ref_seconds / new_seconds:.2f}x)")
+
+    reference = pd.read_csv(os.path.join(ref_root, folder, artifact))
+    candidate = pd.read_csv(os.path.join(new_root, folder, artifact))
+    ok = compare_frames(reference, candidate, artifact, diff_rows, exact)
+    if ok:
+        print(f"      ✓ Equivalent ({len(reference):,} rows x {len(reference.columns)} columns)")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare artifacts from reference and current scripts")
+    parser.add_argument('--reference', default='HEAD', help="git revision of the reference scripts")
+    parser.add_argument('--artifacts', nargs='+', default=DEFAULT_ARTIFACTS)
+    parser.add_argument('--data-root', default=ROOT_DIR, help="project folder holding the input artifacts")
+    parser.add_argument('--diff-report', help="write every differing row to this CSV")
+    parser.add_argument('--budgets', nargs=2, metavar=('A', 'B'),
+                        help="compare the working tree at two memory budgets (e.g. 16MB 8GB), exactly")
+    args = parser.parse_args()
+
+    envs = (None, None)
+    if args.budgets:
+        envs = tuple({'PIPELINE_MEMORY_BUDGET': budget} for budget in args.budgets)
+
+    print("=" * 70)
+    print("DIFFERENTIAL EQUIVALENCE CHECK")
+    print("=" * 70)
+    if args.budgets:
+        print(f"Reference: working tree at {args.budgets[0]}   "
+              f"Candidate: working tree at {args.budgets[1]} (exact)")
+    else:
+        print(f"Reference: {args.reference}   Candidate: working tree")
+    print(f"Inputs from: {args.data_root}")
+
+    diff_rows = []
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='equivalence_') as scratch:
+        ref_root = os.path.join(scratch, 'reference')
+        new_root = os.path.join(scratch, 'candidate')
+        if args.budgets:
+            copy_scripts(ROOT_DIR, ref_root)
+        else:
+            export_reference(args.reference, ref_root)
+        copy_scripts(ROOT_DIR, new_root)
+
+        for i, artifact in enumerate(args.artifacts, 1):
+            print(f"\n[{i}/{len(args.artifacts)}] {artifact}")
+            try:
+                results[artifact] = check_artifact(artifact, ref_root, new_root, args.data_root, diff_rows,
+                                                   envs, exact=bool(args.budgets))
+            except (FileNotFoundError, RuntimeError) as e:
+                print(f"      ✗ {e}")
+                results[artifact] = False
+
+    if args.diff_report and diff_rows:
+        pd.DataFrame(diff_rows).to_csv(args.diff_report, index=False)
+        print(f"\nRow-level diffs written to: {args.diff_report}")
+
+    print("\n" + "=" * 70)
+    for artifact, ok in results.items():
+        print(f"{'✓' if ok else '✗'} {artifact}")
+    if all(results.values()):
+        print("\n✓ All artifacts equivalent")
+        return 0
+    print(f"\n⚠️  {sum(not ok for ok in results.values())} artifact(s) differ or could not be checked")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
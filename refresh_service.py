@@ -0,0 +1,473 @@
+"""
+NIGHTLY REFRESH SERVICE
+Unattended ingest -> features -> retrain -> re-predict, doing only the work
+whose inputs changed since the last refresh
+
+Each refresh first checks the column contracts of every script it may run
+(contracts.py, a few seconds) and stops before any work if one fails. Then:
+  [1/4] Ingest (04-11): a stage runs only when its script, its input file or
+        PIPELINE_YEARS changed since its last successful run. Replacing the
+        raw export re-runs ingest; an unchanged export skips it in seconds.
+  [2/4] Features: full_history.py rebuilds only the year partitions whose
+        crimes changed (normally just the current year) and re-assembles 24.1.
+  [3/4] Train: only when 24.1 or the training code (01_train_model.py and
+        the local modules it imports) changed. Incremental update (trees added to
+        the current model, fitted on the new and changed rows only, see
+        01_train_model.py); 01_train_model.py retrains in full instead when
+        the last full retrain is FULL_RETRAIN_DAYS old or much of the data
+        changed.
+  [4/4] Predict: the next HORIZON_DAYS days, when the model or the
+        prediction code changed or the horizon moved to a new day.
+
+What has been done is recorded in .refresh/state.json (content hashes per
+step), so a night without new data finishes in seconds. Only one refresh runs
+at a time (.refresh/refresh.lock holds the PID; a lock left behind by a dead
+process is taken over). Each script's output goes to .refresh/logs/<run>/.
+
+Usage:
+    python refresh_service.py run                   # one refresh (cron / Task Scheduler)
+    python refresh_service.py run --full-retrain    # retrain from scratch this time
+    python refresh_service.py serve --at 02:30      # long-running daemon, one refresh a night
+    python refresh_service.py status
+
+    crontab:  30 2 * * *  cd /path/to/repo && python refresh_service.py run
+
+Like chicago_crime.py this file only imports the standard library; every step
+runs as its own process, so a crashed stage can't take the daemon down. An
+error in the refresh itself (state or log files, a missing metrics file ...)
+fails that night's run, is logged and recorded, and `serve` carries on.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+import traceback
+from datetime import date, datetime, timedelta
+
+from chicago_crime import COMMANDS, PIPELINE_DIR, ROOT_DIR
+
+sys.path.insert(0, PIPELINE_DIR)
+import run_history                       # standard library only
+from contracts import preflight
+from pipeline_utils import read_config, script_dependencies
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+STATE_DIR = os.path.join(ROOT_DIR, '.refresh')
+STATE_FILE = os.path.join(STATE_DIR, 'state.json')
+LOCK_FILE = os.path.join(STATE_DIR, 'refresh.lock')
+LOG_DIR = os.path.join(STATE_DIR, 'logs')
+
+INGEST_SCRIPTS = COMMANDS['ingest']
+FEATURE_SCRIPT = (PIPELINE_DIR, 'full_history.py')
+TRAIN_SCRIPT = COMMANDS['train'][0]
+PREDICT_SCRIPT = COMMANDS['predict'][0]
+
+DEFAULT_RUN_AT = '02:30'        # serve: local time of the nightly refresh
+HORIZON_DAYS = 365              # Predict this many days, starting tomorrow
+FULL_RETRAIN_DAYS = 7           # Incremental updates in between, full retrain at least this often
+REFRESH_BUDGET_MINUTES = 30     # Warn when a refresh takes longer than this
+KEEP_LOGS = 30                  # Log folders kept (oldest deleted first)
+
+# Unattended runs never plot or run SHAP
+SCRIPT_ENV = {'TRAIN_MAKE_PLOTS': '0', 'TRAIN_RUN_SHAP': '0'}
+# Settings that change what the ingest / feature steps produce
+TRACKED_ENV = ['PIPELINE_YEARS', 'PIPELINE_WEATHER_FILE', 'PIPELINE_GRID_START',
+               'PIPELINE_GRID_END', 'PIPELINE_GRID_AREAS']
+# ============================================================
+
+
+# ============================================================
+# STATE, HASHES AND THE LOCK
+# ============================================================
+
+def load_state():
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    return {'steps': {}, 'hashes': {}, 'runs': []}
+
+
+def save_state(state):
+    tmp = STATE_FILE + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, STATE_FILE)
+
+
+def file_hash(path, state):
+    """
+    Content hash of a file (None if missing)
+    Cached by size + modification time, so unchanged multi-GB CSVs aren't
+    re-read every night.
+    """
+    if not os.path.exists(path):
+        return None
+    info = os.stat(path)
+    key = os.path.abspath(path)
+    cached = state['hashes'].get(key)
+    if cached and cached['size'] == info.st_size and cached['mtime_ns'] == info.st_mtime_ns:
+        return cached['hash']
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    state['hashes'][key] = {'size': info.st_size, 'mtime_ns': info.st_mtime_ns,
+                            'hash': digest.hexdigest()}
+    return digest.hexdigest()
+
+
+def fingerprint(*parts):
+    return hashlib.blake2b(json.dumps(parts).encode(), digest_size=16).hexdigest()
+
+
+def tracked_env():
+    return {name: os.environ.get(name) for name in TRACKED_ENV}
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def acquire_lock():
+    """Create the lock file; False if another live refresh holds it"""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    for _ in range(2):
+        try:
+            fd = os.open(LOCK_FILE, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                with open(LOCK_FILE, encoding='utf-8') as f:
+                    pid = int(f.read().split()[0])
+            except (OSError, ValueError, IndexError):
+                pid = None
+            if pid and pid_alive(pid):
+                return False
+            print(f"⚠️  Removing stale lock (process {pid} is gone)")
+            os.remove(LOCK_FILE)
+            continue
+        with os.fdopen(fd, 'w') as f:
+            f.write(f"{os.getpid()} {datetime.now().isoformat(timespec='seconds')}\n")
+        return True
+    return False
+
+
+def release_lock():
+    if os.path.exists(LOCK_FILE):
+        os.remove(LOCK_FILE)
+
+
+# ============================================================
+# STEPS
+# ============================================================
+
+def run_script(folder, name, log_dir, env=None):
+    """Run one script in its folder as a child process (recorded in the run history); returns (ok, seconds)"""
+    log_path = os.path.join(log_dir, f"{os.path.splitext(name)[0]}.log")
+    started = datetime.now().isoformat(timespec='seconds')
+    with open(log_path, 'w', encoding='utf-8') as log:
+        returncode, seconds, peak_mb = run_history.run_child(
+            [sys.executable, name], cwd=folder, stdout=log,
+            env={**os.environ, **SCRIPT_ENV, **(env or {})})
+    run_history.record_stage(os.environ.get('PIPELINE_RUN_ID'), os.path.join(folder, name),
+                             started, seconds, peak_mb, returncode == 0)
+    mark = "✓" if returncode == 0 else f"✗ (exit {returncode}, see {log_path})"
+    print(f"    {mark} {name} ({seconds:.1f}s)")
+    return returncode == 0, seconds
+
+
+def script_config(folder, name):
+    return read_config(os.path.join(folder, name))
+
+
+def ingest(state, log_dir):
+    """Stages 04-11, each skipped when its script, input and settings are unchanged"""
+    changed = False
+    for folder, name in INGEST_SCRIPTS:
+        config = script_config(folder, name)
+        input_path = os.path.join(folder, config['INPUT_FILE'])
+        output_path = os.path.join(folder, config['OUTPUT_FILE'])
+        key = fingerprint(file_hash(os.path.join(folder, name), state),
+                          file_hash(input_path, state), tracked_env())
+
+        if state['steps'].get(name) == key and os.path.exists(output_path):
+            print(f"    - {name} (unchanged)")
+            continue
+        if not os.path.exists(input_path):
+            print(f"    ✗ {name}: input {config['INPUT_FILE']} not found")
+            return None
+        ok, _ = run_script(folder, name, log_dir)
+        if not ok:
+            return None
+        state['steps'][name] = key
+        changed = True
+    return changed
+
+
+def build_features(state, log_dir):
+    """full_history.py, skipped when 11.1, the settings and the feature scripts are unchanged"""
+    folder, name = FEATURE_SCRIPT
+    config = script_config(folder, name)
+    input_path = os.path.join(folder, config['INPUT_FILE'])
+    output_path = os.path.join(folder, config['OUTPUT_FILE'])
+    scripts = script_dependencies([name] + config['PARTITION_STAGES'])
+    key = fingerprint(file_hash(input_path, state), tracked_env(),
+                      [file_hash(path, state) for path in scripts])
+
+    if state['steps'].get(name) == key and os.path.exists(output_path):
+        print(f"    - {name} (unchanged)")
+        return False
+    ok, _ = run_script(folder, name, log_dir)
+    if not ok:
+        return None
+    state['steps'][name] = key
+    return True
+
+
+def train(state, log_dir, force_full):
+    """01_train_model.py when 24.1 changed: incremental update, or a full retrain when due or forced"""
+    folder, name = TRAIN_SCRIPT
+    config = script_config(folder, name)
+    data_path = os.path.normpath(os.path.join(folder, config['INPUT_FILE']))
+    model_path = os.path.join(folder, config['MODEL_OUTPUT'])
+    scripts = script_dependencies([os.path.join(folder, name)])
+    key = fingerprint(file_hash(data_path, state), [file_hash(path, state) for path in scripts])
+
+    if state['steps'].get(name) == key and os.path.exists(model_path) and not force_full:
+        print(f"    - {name} (unchanged)")
+        return False
+
+    # The full-retrain policy itself lives in 01_train_model.py (it knows the model's history)
+    full = force_full or not os.path.exists(model_path)
+    metrics_path = os.path.join(log_dir, 'train_metrics.json')
+    env = {'TRAIN_METRICS_FILE': metrics_path}
+    if not full:
+        env.update(TRAIN_INCREMENTAL='1', TRAIN_FULL_RETRAIN_DAYS=str(FULL_RETRAIN_DAYS))
+    print(f"    {'Full retrain' if full else 'Incremental update of the current model, unless a full retrain is due'}")
+    ok, _ = run_script(folder, name, log_dir, env=env)
+    if not ok:
+        return None
+    state['steps'][name] = key
+    with open(metrics_path, encoding='utf-8') as f:
+        metrics = json.load(f)
+    if metrics.get('incremental'):
+        print(f"    Incremental: {metrics['new_rows']:,.0f} new or changed rows, "
+              f"{metrics.get('time_saved_seconds', 0):.1f}s saved")
+    elif not metrics.get('model_reused'):
+        print("    Full retrain")
+        state['last_full_train'] = datetime.now().isoformat(timespec='seconds')
+    return True
+
+
+def predict(state, log_dir):
+    """02_generate_prediction_data.py for tomorrow + HORIZON_DAYS, when the model or horizon changed"""
+    folder, name = PREDICT_SCRIPT
+    config = script_config(folder, name)
+    start = date.today() + timedelta(days=1)
+    end = start + timedelta(days=HORIZON_DAYS - 1)
+    scripts = script_dependencies([os.path.join(folder, name)])
+    key = fingerprint(file_hash(os.path.join(folder, config['MODEL_FILE']), state),
+                      [file_hash(path, state) for path in scripts], start.isoformat())
+
+    if state['steps'].get(name) == key and os.path.exists(os.path.join(folder, config['OUTPUT_FILE'])):
+        print(f"    - {name} (unchanged)")
+        return False
+    print(f"    Horizon: {start} to {end}")
+    ok, _ = run_script(folder, name, log_dir, env={'PREDICT_START_DATE': start.isoformat(),
+                                                   'PREDICT_END_DATE': end.isoformat()})
+    if not ok:
+        return None
+    state['steps'][name] = key
+    return True
+
+
+def prune_logs():
+    runs = sorted(os.listdir(LOG_DIR)) if os.path.isdir(LOG_DIR) else []
+    for old in runs[:-KEEP_LOGS]:
+        folder = os.path.join(LOG_DIR, old)
+        for f in os.listdir(folder):
+            os.remove(os.path.join(folder, f))
+        os.rmdir(folder)
+
+
+def refresh(full_retrain=False):
+    """One refresh; returns an exit code (0 also when another refresh holds the lock)"""
+    if not acquire_lock():
+        print("ℹ️  Another refresh is running - skipping this one")
+        return 0
+
+    run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+    log_dir = os.path.join(LOG_DIR, run_id)
+    start = time.perf_counter()
+    record = {'run': run_id, 'steps': {}}
+    status = 'failed'   # Until every step has run
+    state = history_id = None
+
+    print("=" * 70)
+    print(f"NIGHTLY REFRESH {run_id}")
+    print("=" * 70)
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+        state = load_state()
+        history_id = run_history.start_run('refresh')
+        steps = [
+            ('ingest', "Ingest (04-11)", lambda: ingest(state, log_dir)),
+            ('features', "Features (full_history.py)", lambda: build_features(state, log_dir)),
+            ('train', "Train", lambda: train(state, log_dir, full_retrain)),
+            ('predict', f"Predict next {HORIZON_DAYS} days", lambda: predict(state, log_dir)),
+        ]
+        # Every script the refresh may run, checked against its column contract
+        folder, name = FEATURE_SCRIPT
+        chain = INGEST_SCRIPTS + [(folder, stage) for stage in script_config(folder, name)['PARTITION_STAGES']]
+        if preflight([os.path.join(f, n) for f, n in chain + [TRAIN_SCRIPT, PREDICT_SCRIPT]]):
+            status = 'ok'
+        else:
+            record['steps']['preflight'] = {'result': 'failed', 'seconds': 0}
+            steps = []
+        for i, (step, title, action) in enumerate(steps, 1):
+            print(f"\n[{i}/{len(steps)}] {title}")
+            step_start = time.perf_counter()
+            changed = action()
+            record['steps'][step] = {
+                'result': 'failed' if changed is None else 'ran' if changed else 'skipped',
+                'seconds': round(time.perf_counter() - step_start, 1),
+            }
+            save_state(state)
+            if changed is None:
+                status = 'failed'
+                print(f"\n✗ Refresh stopped at: {title}")
+                break
+    except Exception as e:
+        # Unattended: a crash (a missing metrics file, an unreadable header, a
+        # full disk ...) fails this refresh like a failed step, it isn't raised
+        status = 'failed'
+        record['error'] = f"{type(e).__name__}: {e}"
+        print(f"\n✗ Refresh crashed: {record['error']}")
+        traceback.print_exc(file=sys.stdout)
+    finally:
+        elapsed = time.perf_counter() - start
+        record.update(status=status, seconds=round(elapsed, 1))
+        try:
+            if state is not None:
+                state['runs'] = (state['runs'] + [record])[-KEEP_LOGS:]
+                save_state(state)
+            run_history.finish_run(history_id, status == 'ok')
+        finally:
+            release_lock()   # Even when the bookkeeping fails, or serve would skip every later night
+        prune_logs()
+
+    print(f"\n{'✓' if record['status'] == 'ok' else '✗'} Refresh {record['status']} in {elapsed:.1f}s")
+    if elapsed > REFRESH_BUDGET_MINUTES * 60:
+        print(f"⚠️  Over the {REFRESH_BUDGET_MINUTES}-minute refresh window")
+    print(f"Logs: {log_dir}")
+    return 0 if record['status'] == 'ok' else 1
+
+
+# ============================================================
+# DAEMON AND CLI
+# ============================================================
+
+def seconds_until(run_at, now=None):
+    """Seconds from now until the next HH:MM"""
+    now = now or datetime.now()
+    hour, minute = (int(part) for part in run_at.split(':'))
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+async def serve(run_at, full_retrain_days):
+    """Sleep until run_at, refresh (in a worker thread), repeat"""
+    global FULL_RETRAIN_DAYS
+    FULL_RETRAIN_DAYS = full_retrain_days
+    print(f"Refresh service started (PID {os.getpid()}), refreshing daily at {run_at}")
+    while True:
+        wait = seconds_until(run_at)
+        print(f"Next refresh: {datetime.now() + timedelta(seconds=wait):%Y-%m-%d %H:%M}")
+        await asyncio.sleep(wait)
+        try:
+            await asyncio.to_thread(refresh)
+        except Exception as e:
+            # refresh() records its own failures; this is one it couldn't
+            # record (e.g. an unreadable state file). Log it and keep serving.
+            print(f"✗ Refresh failed: {type(e).__name__}: {e}")
+            traceback.print_exc(file=sys.stdout)
+            record_failed_refresh(f"{type(e).__name__}: {e}")
+
+
+def record_failed_refresh(error):
+    """Best-effort record of a refresh that failed outside its own bookkeeping"""
+    record = {'run': datetime.now().strftime('%Y%m%d_%H%M%S'), 'steps': {}, 'status': 'failed',
+              'seconds': 0, 'error': error}
+    try:
+        state = load_state()
+        state['runs'] = (state['runs'] + [record])[-KEEP_LOGS:]
+        save_state(state)
+    except Exception as e:
+        print(f"⚠️  Could not record the failed refresh in {STATE_FILE}: {e}")
+    try:
+        history_id = run_history.start_run('refresh')
+        run_history.finish_run(history_id, False)
+    except Exception as e:
+        print(f"⚠️  Could not record the failed refresh in the run history: {e}")
+
+
+def show_status():
+    state = load_state()
+    locked = os.path.exists(LOCK_FILE)
+    print("=" * 70)
+    print("REFRESH STATUS")
+    print("=" * 70)
+    print(f"Running now:       {'yes' if locked else 'no'}")
+    print(f"Last full retrain: {state.get('last_full_train') or 'never'}")
+    print(f"\n{'Run':<17} {'Status':<8} {'Time':>8}  Steps")
+    print("-" * 70)
+    for record in state['runs'][-10:]:
+        steps = ', '.join(f"{step} {info['result']}" for step, info in record['steps'].items())
+        print(f"{record['run']:<17} {record['status']:<8} {record['seconds']:>7.1f}s  {steps}")
+        if record.get('error'):
+            print(f"{'':<17} {record['error']}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Unattended nightly refresh of data, model and predictions")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help="run one refresh now (for cron)")
+    run.add_argument('--full-retrain', action='store_true', help="retrain from scratch instead of updating incrementally")
+    daemon = subparsers.add_parser('serve', help="keep running and refresh once a day")
+    daemon.add_argument('--at', default=DEFAULT_RUN_AT, metavar='HH:MM', help="local time of the daily refresh")
+    daemon.add_argument('--full-retrain-days', type=int, default=FULL_RETRAIN_DAYS,
+                        help="full retrain at least this often (days)")
+    subparsers.add_parser('status', help="show recent refreshes")
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        return refresh(args.full_retrain)
+    if args.command == 'serve':
+        asyncio.run(serve(args.at, args.full_retrain_days))
+        return 0
+    return show_status()
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\nStopped")
+        sys.exit(1)